@@ -1,20 +1,25 @@
 """
 ماژول احراز هویت برای صرافی MEXC فیوچرز.
 
-TODO: پیاده‌سازی امضای درخواست و تولید هدرهای لازم.
+امضا در :mod:`core.exchange.signing` پیاده‌سازی شده و این ماژول برای سازگاری
+با کدهای قدیمی نگه داشته شده است.
 """
-from typing import Dict
+from typing import Dict, Optional
 
-def generate_auth_headers(api_key: str, secret: str) -> Dict[str, str]:
+from core.exchange.signing import mexc_headers, mexc_param_string
+
+__all__ = ["generate_auth_headers", "mexc_param_string"]
+
+
+def generate_auth_headers(api_key: str, secret: str, param_string: str = "",
+                          request_time: Optional[int] = None) -> Dict[str, str]:
     """
     تولید هدرهای احراز هویت.
-    
+
     :param api_key: کلید API
     :param secret: کلید مخفی
+    :param param_string: بدنه JSON درخواست POST یا کوئری مرتب‌شده GET (``mexc_param_string``)
+    :param request_time: زمان درخواست به میلی‌ثانیه (پیش‌فرض: اکنون)
     :return: دیکشنری حاوی هدرها
     """
-    # TODO: ایجاد امضای درخواست مناسب
-    return {
-        "X-API-KEY": api_key,
-        "Content-Type": "application/json"
-    }
\ No newline at end of file
+    return mexc_headers(api_key, secret, param_string, request_time)
@@ -1,24 +1,30 @@
 """
 ماژول ارتباط با بایننس فیوچرز برای ارسال سفارش‌ها.
+
+پیاده‌سازی در :mod:`core.exchange.binance` است و این ماژول فقط برای سازگاری
+با کدهای قدیمی نگه داشته شده است.
 """
 from typing import Any, Dict, Optional
 import os
-import requests
 
-BASE_URL = "https://fapi.binance.com"
+import httpx
+
+from core.exchange.binance import BASE_URL, BinanceConnector, send_order
+
+__all__ = ["BASE_URL", "BinanceConnector", "place_order"]
 
 
-def place_order(order: Dict[str, Any], live: Optional[int] = None) -> Dict[str, Any]:
+def place_order(order: Dict[str, Any], live: Optional[int] = None,
+                base_url: Optional[str] = None) -> Dict[str, Any]:
     """
     ارسال سفارش به بایننس. در صورت LIVE=0 درخواست به اندپوینت تست ارسال می‌شود.
 
     :param order: اطلاعات سفارش
     :param live: 1 برای ارسال واقعی، 0 برای تست. اگر مقدار داده نشود از متغیر محیطی LIVE استفاده می‌شود.
+    :param base_url: آدرس پایه (پیش‌فرض BASE_URL)
     :return: پاسخ به صورت دیکشنری
     """
     if live is None:
         live = int(os.getenv("LIVE", "0"))
-    endpoint = "/fapi/v1/order" if live else "/fapi/v1/order/test"
-    url = f"{BASE_URL}{endpoint}"
-    response = requests.post(url, data=order)
-    return response.json()
+    with httpx.Client() as client:
+        return send_order(client, order, live=bool(live), base_url=base_url).json()
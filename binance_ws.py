@@ -3,39 +3,51 @@
 By default this module connects to Binance's WebSocket feed.  When the
 environment variable ``WS_DISABLED`` is set to ``"1"`` it instead falls back to
 REST polling via :mod:`feeds.rest_mark_funding`.
+
+Snapshots update :data:`core.data.market_cache.market_cache` and are buffered by
+:class:`core.data.tick_writer.TickWriter` into
+``data/ticks/YYYYMMDD/<symbol>.csv`` using the same
+``ts,symbol,mark,estFunding,nextFunding,src`` schema as the REST poller, with
+``src`` set to ``WS``.
 """
 import asyncio
-import csv
 import datetime as dt
-import json
 import os
-from typing import Optional
+from typing import Any, Dict, Iterable, Optional
 
 import websockets
 
-BINANCE_WS_URL = "wss://fstream.binance.com/ws"
+from core.data.market_cache import market_cache
+from core.data.tick_writer import TICK_HEADER, TickWriter
+from core.exchange import endpoints
+from feeds.binance_streams import CombinedStreamSubscriber, Gap
+from feeds.decode import MarkPrice, decode_mark_price
 
+BINANCE_WS_URL = f"{endpoints.BINANCE_WS_URL}/ws"
+HEADER = TICK_HEADER
+SRC = "WS"
 
-def _write_snapshot(symbol: str, mark_price: str, funding_rate: str, event_time: int) -> None:
-    """Append snapshot data to CSV for given symbol."""
-    os.makedirs("data/ticks", exist_ok=True)
-    path = os.path.join("data", "ticks", f"{symbol}.csv")
-    file_exists = os.path.exists(path)
-    timestamp = dt.datetime.utcfromtimestamp(event_time / 1000).isoformat()
-    with open(path, "a", newline="") as f:
-        writer = csv.writer(f)
-        if not file_exists:
-            writer.writerow(["timestamp", "markPrice", "fundingRate"])
-        writer.writerow([timestamp, mark_price, funding_rate])
 
+def _write_snapshot(writer: TickWriter, record: MarkPrice) -> None:
+    """Publish the record to the market cache and queue it for disk."""
+    market_cache.update(
+        "binance",
+        record.symbol,
+        record.event_time,
+        mark=record.mark,
+        index=record.index,
+        funding=record.funding,
+        next_funding=record.next_funding,
+    )
+    ts = dt.datetime.utcfromtimestamp(record.event_time / 1000)
+    next_funding = dt.datetime.utcfromtimestamp(record.next_funding / 1000).isoformat()
+    row = [ts.isoformat(), record.symbol, record.mark, record.funding, next_funding, SRC]
+    writer.write(record.symbol, row, ts=ts)
 
-async def _handle_message(msg: str) -> None:
-    data = json.loads(msg)
-    if isinstance(data, list):
-        for item in data:
-            _write_snapshot(item["s"], item["p"], item["r"], item["E"])
-    else:
-        _write_snapshot(data["s"], data["p"], data["r"], data["E"])
+
+async def _handle_message(msg: str, writer: TickWriter) -> None:
+    for record in decode_mark_price(msg):
+        _write_snapshot(writer, record)
 
 
 async def subscribe_mark_price(symbol: Optional[str] = None) -> None:
@@ -48,22 +60,38 @@ async def subscribe_mark_price(symbol: Optional[str] = None) -> None:
         from feeds.rest_mark_funding import poll_mark_funding
 
         symbols = [symbol] if symbol else ["BTCUSDT"]
-        await poll_mark_funding(symbols)
+        await poll_mark_funding(symbols, bulk=True)
         return
 
     stream = "!markPrice@arr@1s" if symbol is None else f"{symbol.lower()}@markPrice@1s"
     url = f"{BINANCE_WS_URL}/{stream}"
     backoff = 1
-    while True:
-        try:
-            async with websockets.connect(url) as ws:
-                backoff = 1
-                async for msg in ws:
-                    await _handle_message(msg)
-        except Exception as exc:  # pragma: no cover - network errors
-            print(f"WebSocket error: {exc}. Reconnecting in {backoff}s...")
-            await asyncio.sleep(backoff)
-            backoff = min(backoff * 2, 32)
+    async with TickWriter(HEADER) as writer:
+        while True:
+            try:
+                async with websockets.connect(url) as ws:
+                    backoff = 1
+                    async for msg in ws:
+                        await _handle_message(msg, writer)
+            except Exception as exc:  # pragma: no cover - network errors
+                print(f"WebSocket error: {exc}. Reconnecting in {backoff}s...")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 32)
+
+
+async def subscribe_mark_prices(symbols: Iterable[str]) -> None:
+    """Subscribe to mark price streams for many *symbols* over sharded connections."""
+    async with TickWriter(HEADER) as writer:
+
+        def on_message(_stream: str, data: Dict[str, Any]) -> None:
+            _write_snapshot(writer, MarkPrice.from_event(data))
+
+        def on_gap(gap: Gap) -> None:
+            print(f"Shard {gap.shard} gap of {gap.duration_ms}ms over {len(gap.streams)} streams")
+
+        subscriber = CombinedStreamSubscriber(on_message, on_gap=on_gap)
+        await subscriber.add(symbols)
+        await subscriber.run()
 
 
 if __name__ == "__main__":  # pragma: no cover
@@ -74,11 +102,13 @@ if __name__ == "__main__":  # pragma: no cover
     args = parser.parse_args()
 
     # ``--symbol`` may contain a comma separated list.  When WS is disabled the
-    # REST poller can handle multiple symbols.
-    if os.getenv("WS_DISABLED") == "1" and args.symbol:
+    # REST poller handles them; otherwise they share combined stream connections.
+    symbols = [s.strip() for s in (args.symbol or "").split(",") if s.strip()]
+    if os.getenv("WS_DISABLED") == "1" and symbols:
         from feeds.rest_mark_funding import poll_mark_funding
 
-        symbols = [s.strip() for s in args.symbol.split(",") if s.strip()]
-        asyncio.run(poll_mark_funding(symbols))
+        asyncio.run(poll_mark_funding(symbols, bulk=True))
+    elif len(symbols) > 1:
+        asyncio.run(subscribe_mark_prices(symbols))
     else:
         asyncio.run(subscribe_mark_price(args.symbol))
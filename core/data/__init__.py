@@ -1,3 +1,3 @@
-from . import logger, storage
+from . import logger, market_cache, order_book, storage, tick_store, tick_writer
 
-__all__ = ["logger", "storage"]
+__all__ = ["logger", "market_cache", "order_book", "storage", "tick_store", "tick_writer"]
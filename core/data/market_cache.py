@@ -0,0 +1,197 @@
+"""In-process cache of the latest market state per venue and symbol.
+
+Feeds call :meth:`MarketCache.update`; consumers read :meth:`MarketCache.latest`
+or :meth:`MarketCache.history`, or register callbacks with
+:meth:`MarketCache.subscribe`.  Each ``(venue, symbol)`` keeps one mutable
+:class:`Snapshot` that is updated in place, so reading the latest state is a
+dictionary lookup that allocates nothing, plus a fixed-size NumPy ring buffer
+of recent ticks.
+
+The process-wide instance used by the feeds is :data:`market_cache`.
+"""
+from __future__ import annotations
+
+import math
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .logger import logger
+
+FIELDS: Tuple[str, ...] = ("ts", "mark", "index", "funding", "bid", "ask")
+_COL = {name: i for i, name in enumerate(FIELDS)}
+
+_Key = Tuple[str, str]
+Callback = Callable[["Snapshot"], None]
+
+
+class Snapshot:
+    """Latest known state for one venue/symbol, updated in place."""
+
+    __slots__ = (
+        "venue", "symbol", "ts", "mark", "index", "funding", "next_funding", "bid", "ask", "updates"
+    )
+
+    def __init__(self, venue: str, symbol: str) -> None:
+        self.venue = venue
+        self.symbol = symbol
+        self.ts = 0
+        self.mark = math.nan
+        self.index = math.nan
+        self.funding = math.nan
+        self.next_funding = 0
+        self.bid = math.nan
+        self.ask = math.nan
+        self.updates = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"Snapshot(venue={self.venue!r}, symbol={self.symbol!r}, ts={self.ts}, "
+            f"mark={self.mark}, funding={self.funding}, bid={self.bid}, ask={self.ask})"
+        )
+
+
+class RingBuffer:
+    """Fixed-capacity buffer of ticks stored as rows of :data:`FIELDS`."""
+
+    __slots__ = ("_data", "_head", "_count")
+
+    def __init__(self, capacity: int) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self._data = np.full((capacity, len(FIELDS)), np.nan)
+        self._head = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def capacity(self) -> int:
+        return self._data.shape[0]
+
+    def append(self, snap: Snapshot) -> None:
+        row = self._data[self._head]
+        row[0] = snap.ts
+        row[1] = snap.mark
+        row[2] = snap.index
+        row[3] = snap.funding
+        row[4] = snap.bid
+        row[5] = snap.ask
+        self._head = (self._head + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def to_array(self, n: Optional[int] = None) -> np.ndarray:
+        """Return the last *n* rows (all by default), oldest first, as a copy."""
+        n = self._count if n is None else min(n, self._count)
+        idx = (self._head - n + np.arange(n)) % self.capacity
+        return self._data[idx]
+
+
+class MarketCache:
+    """Latest snapshot and recent tick history per ``(venue, symbol)``."""
+
+    def __init__(self, capacity: int = 1_024) -> None:
+        self.capacity = capacity
+        self._snapshots: Dict[_Key, Snapshot] = {}
+        self._buffers: Dict[_Key, RingBuffer] = {}
+        self._subscribers: Dict[Optional[_Key], List[Callback]] = {}
+
+    def update(
+        self,
+        venue: str,
+        symbol: str,
+        ts: int,
+        *,
+        mark: float = math.nan,
+        index: float = math.nan,
+        funding: float = math.nan,
+        next_funding: int = 0,
+        bid: float = math.nan,
+        ask: float = math.nan,
+    ) -> Snapshot:
+        """Merge a tick into the snapshot; NaN / zero fields keep their last value."""
+        key = (venue, symbol)
+        snap = self._snapshots.get(key)
+        if snap is None:
+            snap = self._snapshots[key] = Snapshot(venue, symbol)
+            self._buffers[key] = RingBuffer(self.capacity)
+        snap.ts = ts
+        if mark == mark:
+            snap.mark = mark
+        if index == index:
+            snap.index = index
+        if funding == funding:
+            snap.funding = funding
+        if next_funding:
+            snap.next_funding = next_funding
+        if bid == bid:
+            snap.bid = bid
+        if ask == ask:
+            snap.ask = ask
+        snap.updates += 1
+        self._buffers[key].append(snap)
+        self._notify(key, snap)
+        return snap
+
+    def _notify(self, key: _Key, snap: Snapshot) -> None:
+        for callbacks in (self._subscribers.get(key), self._subscribers.get(None)):
+            if not callbacks:
+                continue
+            for callback in callbacks:
+                try:
+                    callback(snap)
+                except Exception:  # noqa: BLE001 - one bad subscriber must not stall feeds
+                    logger.exception("Market cache subscriber failed for %s", key)
+
+    def latest(
+        self, venue: str, symbol: str, max_age_ms: Optional[float] = None, now_ms: Optional[float] = None
+    ) -> Optional[Snapshot]:
+        """Return the live snapshot for *venue*/*symbol*, or ``None``.
+
+        With *max_age_ms* a snapshot whose ``ts`` is further than that behind
+        *now_ms* (default: local wall-clock time) is ``None`` as well.
+        """
+        snap = self._snapshots.get((venue, symbol))
+        if snap is None or max_age_ms is None:
+            return snap
+        if now_ms is None:
+            now_ms = time.time() * 1000
+        return snap if now_ms - snap.ts <= max_age_ms else None
+
+    def history(self, venue: str, symbol: str, n: Optional[int] = None) -> np.ndarray:
+        """Return up to *n* recent ticks as rows of :data:`FIELDS`, oldest first."""
+        buf = self._buffers.get((venue, symbol))
+        if buf is None:
+            return np.empty((0, len(FIELDS)))
+        return buf.to_array(n)
+
+    def column(self, name: str) -> int:
+        """Column index of *name* in :meth:`history` rows."""
+        return _COL[name]
+
+    def keys(self) -> List[_Key]:
+        return list(self._snapshots)
+
+    def subscribe(
+        self, callback: Callback, venue: Optional[str] = None, symbol: Optional[str] = None
+    ) -> Callable[[], None]:
+        """Call *callback* with the snapshot on every update.
+
+        With *venue* and *symbol* given only that key is watched, otherwise all
+        updates are delivered.  Returns a function that removes the callback.
+        """
+        if (venue is None) != (symbol is None):
+            raise ValueError("venue and symbol must be given together")
+        key = (venue, symbol) if venue is not None else None
+        self._subscribers.setdefault(key, []).append(callback)  # type: ignore[arg-type]
+
+        def unsubscribe() -> None:
+            self._subscribers.get(key, []).remove(callback)  # type: ignore[arg-type]
+
+        return unsubscribe
+
+
+market_cache = MarketCache()
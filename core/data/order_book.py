@@ -0,0 +1,231 @@
+"""Local L2 order books kept as compact sorted arrays.
+
+Each side of an :class:`OrderBook` is a pair of ``array('d')`` columns –
+prices and quantities – sorted so that the best level is at index 0.  Bid
+prices are stored negated, so both sides are ascending and one
+:func:`bisect.bisect_left` finds a level; inserting or deleting a level is a
+single ``memmove`` inside the array.  Queries look at the columns through
+zero-copy NumPy views, so best bid/ask is two index reads and depth or VWAP
+over hundreds of levels is a ``searchsorted`` plus a dot product.
+
+Books are built and kept in sequence by the venue feeds in
+:mod:`feeds.order_books`; :class:`BookManager` holds the books of a process
+and answers the depth questions the guards ask.
+"""
+from __future__ import annotations
+
+import math
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Level = Tuple[float, float]
+
+BID = "bid"
+ASK = "ask"
+
+
+class OrderBook:
+    """Price levels of one venue/symbol."""
+
+    __slots__ = (
+        "venue", "symbol", "_bid_px", "_bid_qty", "_ask_px", "_ask_qty", "update_id", "ts", "synced", "updates",
+    )
+
+    def __init__(self, venue: str, symbol: str) -> None:
+        self.venue = venue
+        self.symbol = symbol
+        self._bid_px = array("d")  # negated, ascending
+        self._bid_qty = array("d")
+        self._ask_px = array("d")
+        self._ask_qty = array("d")
+        self.update_id = 0
+        self.ts = 0
+        self.synced = False
+        self.updates = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"OrderBook({self.venue}:{self.symbol}, bid={self.best_bid}, ask={self.best_ask}, "
+            f"levels={len(self._bid_px)}/{len(self._ask_px)}, synced={self.synced})"
+        )
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def clear(self) -> None:
+        """Drop every level and mark the book out of sync."""
+        for column in (self._bid_px, self._bid_qty, self._ask_px, self._ask_qty):
+            del column[:]
+        self.synced = False
+
+    def load(self, bids: Iterable[Level], asks: Iterable[Level], update_id: int = 0, ts: int = 0) -> None:
+        """Replace the book with a snapshot and mark it in sync."""
+        self.clear()
+        bid_levels = sorted((-p, q) for p, q in bids if q > 0)
+        ask_levels = sorted((p, q) for p, q in asks if q > 0)
+        self._bid_px.extend(p for p, _ in bid_levels)
+        self._bid_qty.extend(q for _, q in bid_levels)
+        self._ask_px.extend(p for p, _ in ask_levels)
+        self._ask_qty.extend(q for _, q in ask_levels)
+        self.update_id = update_id
+        self.ts = ts
+        self.synced = True
+        self.updates += 1
+
+    @staticmethod
+    def _set(prices: array, qtys: array, key: float, qty: float) -> None:
+        i = bisect_left(prices, key)
+        if i < len(prices) and prices[i] == key:
+            if qty > 0:
+                qtys[i] = qty
+            else:
+                del prices[i]
+                del qtys[i]
+        elif qty > 0:
+            prices.insert(i, key)
+            qtys.insert(i, qty)
+
+    def apply(self, bids: Iterable[Level], asks: Iterable[Level], update_id: int = 0, ts: int = 0) -> None:
+        """Apply absolute level quantities; a quantity of zero removes the level."""
+        bid_px, bid_qty = self._bid_px, self._bid_qty
+        for price, qty in bids:
+            self._set(bid_px, bid_qty, -price, qty)
+        ask_px, ask_qty = self._ask_px, self._ask_qty
+        for price, qty in asks:
+            self._set(ask_px, ask_qty, price, qty)
+        if update_id:
+            self.update_id = update_id
+        if ts:
+            self.ts = ts
+        self.updates += 1
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    @property
+    def best_bid(self) -> float:
+        return -self._bid_px[0] if self._bid_px else math.nan
+
+    @property
+    def best_ask(self) -> float:
+        return self._ask_px[0] if self._ask_px else math.nan
+
+    @property
+    def mid(self) -> float:
+        return (self.best_bid + self.best_ask) / 2
+
+    @property
+    def spread_bps(self) -> float:
+        mid = self.mid
+        return (self.best_ask - self.best_bid) / mid * 1e4 if mid > 0 else math.nan
+
+    def depth(self) -> Tuple[int, int]:
+        """Number of bid and ask levels."""
+        return len(self._bid_px), len(self._ask_px)
+
+    def levels(self, side: str, n: Optional[int] = None) -> np.ndarray:
+        """Best *n* levels of *side* as an ``(n, 2)`` array of price, quantity (a copy)."""
+        prices, qtys = self._side(side)
+        n = len(prices) if n is None else min(n, len(prices))
+        out = np.empty((n, 2))
+        out[:, 0] = np.frombuffer(prices, dtype=np.float64, count=n)
+        out[:, 1] = np.frombuffer(qtys, dtype=np.float64, count=n)
+        if side == BID:
+            out[:, 0] *= -1
+        return out
+
+    def _side(self, side: str) -> Tuple[array, array]:
+        if side == BID:
+            return self._bid_px, self._bid_qty
+        if side == ASK:
+            return self._ask_px, self._ask_qty
+        raise ValueError(f"side must be {BID!r} or {ASK!r}")
+
+    def _notional_within(self, side: str, bound: float) -> float:
+        prices, qtys = self._side(side)
+        if not prices:
+            return 0.0
+        px = np.frombuffer(prices, dtype=np.float64)
+        k = int(np.searchsorted(px, bound, side="right"))
+        return float(abs(np.dot(px[:k], np.frombuffer(qtys, dtype=np.float64, count=k))))
+
+    def depth_notional(self, bps: float, side: Optional[str] = None) -> float:
+        """Quote notional resting within *bps* of the mid, on one side or both."""
+        mid = self.mid
+        if not mid > 0:
+            return 0.0
+        total = 0.0
+        if side in (None, BID):
+            total += self._notional_within(BID, -mid * (1 - bps / 1e4))
+        if side in (None, ASK):
+            total += self._notional_within(ASK, mid * (1 + bps / 1e4))
+        return total
+
+    def vwap(self, side: str, quantity: float) -> float:
+        """Average price to take *quantity* from *side*; NaN if the book is too thin.
+
+        Buying takes from the asks, so pass ``"ask"`` for a buy and ``"bid"``
+        for a sell.
+        """
+        if quantity <= 0:
+            raise ValueError("quantity must be positive")
+        prices, qtys = self._side(side)
+        if not prices:
+            return math.nan
+        qty = np.frombuffer(qtys, dtype=np.float64)
+        cum = np.cumsum(qty)
+        k = int(np.searchsorted(cum, quantity, side="left"))
+        if k >= len(cum):
+            return math.nan
+        px = np.abs(np.frombuffer(prices, dtype=np.float64, count=k + 1))
+        taken = qty[: k + 1].copy()
+        taken[k] = quantity - (cum[k - 1] if k else 0.0)
+        return float(np.dot(px, taken) / quantity)
+
+    def impact_bps(self, side: str, quantity: float) -> float:
+        """Cost of taking *quantity* from *side* versus the mid, in bps."""
+        price = self.vwap(side, quantity)
+        mid = self.mid
+        return abs(price - mid) / mid * 1e4 if mid > 0 else math.nan
+
+
+class BookManager:
+    """The order books of a process, by ``(venue, symbol)``."""
+
+    def __init__(self) -> None:
+        self._books: Dict[Tuple[str, str], OrderBook] = {}
+
+    def book(self, venue: str, symbol: str) -> OrderBook:
+        """Book for *venue*/*symbol*, created empty on first use."""
+        key = (venue, symbol)
+        book = self._books.get(key)
+        if book is None:
+            book = self._books[key] = OrderBook(venue, symbol)
+        return book
+
+    def get(self, venue: str, symbol: str) -> Optional[OrderBook]:
+        return self._books.get((venue, symbol))
+
+    def keys(self) -> List[Tuple[str, str]]:
+        return list(self._books)
+
+    def __len__(self) -> int:
+        return len(self._books)
+
+    def depth_notional(self, venue: str, symbol: str, bps: float, side: Optional[str] = None) -> float:
+        """Depth within *bps* of the mid; 0 for a missing or out-of-sync book."""
+        book = self._books.get((venue, symbol))
+        if book is None or not book.synced:
+            return 0.0
+        return book.depth_notional(bps, side)
+
+
+def parse_levels(levels: Sequence[Sequence[str]]) -> List[Level]:
+    """``[[price, qty, ...], ...]`` strings from a venue into float pairs."""
+    return [(float(level[0]), float(level[1])) for level in levels]
+
+
+book_manager = BookManager()
@@ -0,0 +1,290 @@
+"""Columnar, partitioned storage for mark price / funding ticks.
+
+Ticks share one schema regardless of the feed that produced them (see
+:data:`TICK_DTYPE`).  Each ``(day, symbol)`` partition is a directory holding
+one raw little-endian file per column::
+
+    <root>/YYYYMMDD/<symbol>/ts.bin
+    <root>/YYYYMMDD/<symbol>/mark.bin
+    ...
+
+Rows inside a partition are kept sorted by ``ts`` (epoch milliseconds, UTC),
+so time-range reads prune whole days by directory name and then binary-search
+the ``ts`` column instead of scanning.  Columns are memory-mapped on read,
+which makes loading months of ticks a matter of page faults rather than text
+parsing.
+
+Legacy CSV files written by :mod:`feeds.rest_mark_funding`
+and :mod:`binance_ws` (``ts,symbol,mark,estFunding,nextFunding,src``), as
+well as older WebSocket files (``timestamp,markPrice,fundingRate``), can be
+converted with :meth:`TickStore.ingest_csv` or ``python -m core.data.tick_store``.
+"""
+from __future__ import annotations
+
+import csv
+import datetime as dt
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+TICK_DTYPE = np.dtype(
+    [
+        ("ts", "<i8"),
+        ("mark", "<f8"),
+        ("funding", "<f8"),
+        ("next_funding", "<i8"),
+        ("src", "u1"),
+    ]
+)
+COLUMNS: Tuple[str, ...] = TICK_DTYPE.names or ()
+
+SRC_CODES: Dict[str, int] = {"REST": 0, "WS": 1}
+
+DAY_MS = 86_400_000
+
+TimeLike = Union[int, float, dt.datetime, None]
+
+
+def to_ms(value: Union[int, float, str, dt.datetime]) -> int:
+    """Convert a datetime, ISO string or epoch value to epoch milliseconds.
+
+    Naive datetimes and strings are interpreted as UTC, matching what the feeds
+    write.
+    """
+    if isinstance(value, dt.datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=dt.timezone.utc)
+        return int(round(value.timestamp() * 1000))
+    if isinstance(value, str):
+        text = value.strip()
+        if not text:
+            return 0
+        if text.lstrip("-").isdigit():
+            return int(text)
+        return to_ms(dt.datetime.fromisoformat(text))
+    return int(value)
+
+
+def _day_of(ts_ms: int) -> str:
+    return dt.datetime.fromtimestamp(ts_ms / 1000, tz=dt.timezone.utc).strftime("%Y%m%d")
+
+
+def _float(value: str) -> float:
+    return float(value) if value not in ("", None) else float("nan")
+
+
+class TickStore:
+    """Append ticks to and read them back from a partitioned columnar store."""
+
+    def __init__(self, root: Union[str, Path] = os.path.join("data", "store")) -> None:
+        self.root = Path(root)
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    def _partition(self, day: str, symbol: str) -> Path:
+        return self.root / day / symbol
+
+    @staticmethod
+    def _last_ts(part: Path) -> Optional[int]:
+        path = part / "ts.bin"
+        if not path.exists() or path.stat().st_size == 0:
+            return None
+        with path.open("rb") as fh:
+            fh.seek(-TICK_DTYPE["ts"].itemsize, os.SEEK_END)
+            return int(np.frombuffer(fh.read(), dtype=TICK_DTYPE["ts"])[0])
+
+    def _load_partition(self, part: Path) -> np.ndarray:
+        cols = {name: np.fromfile(part / f"{name}.bin", dtype=TICK_DTYPE[name]) for name in COLUMNS}
+        out = np.empty(len(cols["ts"]), dtype=TICK_DTYPE)
+        for name, values in cols.items():
+            out[name] = values
+        return out
+
+    def _write_partition(self, part: Path, rows: np.ndarray, append: bool) -> None:
+        part.mkdir(parents=True, exist_ok=True)
+        for name in COLUMNS:
+            path = part / f"{name}.bin"
+            data = np.ascontiguousarray(rows[name]).tobytes()
+            if append:
+                with path.open("ab") as fh:
+                    fh.write(data)
+            else:
+                tmp = path.with_suffix(".tmp")
+                tmp.write_bytes(data)
+                os.replace(tmp, path)
+
+    def append(self, symbol: str, ticks: np.ndarray) -> int:
+        """Append *ticks* (an array of :data:`TICK_DTYPE`) for *symbol*.
+
+        Rows are split into day partitions and sorted.  Appending rows older
+        than what a partition already holds triggers a merge rewrite of that
+        partition so the ``ts`` column stays sorted.  Returns the row count.
+        """
+        ticks = np.asarray(ticks)
+        if ticks.dtype != TICK_DTYPE:
+            raise ValueError("ticks must use TICK_DTYPE")
+        if len(ticks) == 0:
+            return 0
+        ticks = ticks[np.argsort(ticks["ts"], kind="stable")]
+        day_idx = ticks["ts"] // DAY_MS
+        bounds = np.flatnonzero(np.diff(day_idx)) + 1
+        for chunk in np.split(ticks, bounds):
+            part = self._partition(_day_of(int(chunk["ts"][0])), symbol)
+            last = self._last_ts(part)
+            if last is None or chunk["ts"][0] >= last:
+                self._write_partition(part, chunk, append=True)
+            else:
+                merged = np.concatenate([self._load_partition(part), chunk])
+                merged = merged[np.argsort(merged["ts"], kind="stable")]
+                self._write_partition(part, merged, append=False)
+        return len(ticks)
+
+    def ingest_csv(self, path: Union[str, Path], symbol: Optional[str] = None) -> int:
+        """Convert a legacy tick CSV into the store and return the row count.
+
+        Both feed schemas are recognised from the header.  The symbol defaults
+        to the ``symbol`` column, or the file name for ``binance_ws`` files.
+        """
+        path = Path(path)
+        by_symbol: Dict[str, List[Tuple[int, float, float, int, int]]] = {}
+        with path.open(newline="") as fh:
+            reader = csv.DictReader(fh)
+            fields = reader.fieldnames or []
+            for row in reader:
+                if "ts" in fields:
+                    sym = symbol or row["symbol"]
+                    rec = (
+                        to_ms(row["ts"]),
+                        _float(row["mark"]),
+                        _float(row["estFunding"]),
+                        to_ms(row.get("nextFunding") or ""),
+                        SRC_CODES.get(row.get("src", "REST"), 0),
+                    )
+                elif "timestamp" in fields:
+                    sym = symbol or path.stem
+                    rec = (
+                        to_ms(row["timestamp"]),
+                        _float(row["markPrice"]),
+                        _float(row["fundingRate"]),
+                        0,
+                        SRC_CODES["WS"],
+                    )
+                else:
+                    raise ValueError(f"unrecognised tick CSV header in {path}: {fields}")
+                by_symbol.setdefault(sym, []).append(rec)
+        total = 0
+        for sym, recs in by_symbol.items():
+            total += self.append(sym, np.array(recs, dtype=TICK_DTYPE))
+        return total
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    def days(self) -> List[str]:
+        """Return all day partitions present in the store, sorted."""
+        if not self.root.exists():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir() and p.name.isdigit())
+
+    def symbols(self, day: Optional[str] = None) -> List[str]:
+        """Return the symbols stored for *day*, or across all days."""
+        days = [day] if day else self.days()
+        found = {p.name for d in days if (self.root / d).is_dir() for p in (self.root / d).iterdir()}
+        return sorted(found)
+
+    def scan(
+        self,
+        symbols: Iterable[str],
+        start: TimeLike = None,
+        end: TimeLike = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> Iterator[Tuple[str, str, Dict[str, np.ndarray]]]:
+        """Yield ``(symbol, day, columns)`` for every partition in range.
+
+        Each column is a read-only memory-mapped slice restricted to
+        ``start <= ts < end``; nothing is copied.
+        """
+        cols = tuple(columns) if columns else COLUMNS
+        unknown = set(cols) - set(COLUMNS)
+        if unknown:
+            raise ValueError(f"unknown columns: {sorted(unknown)}")
+        start_ms = to_ms(start) if start is not None else None
+        end_ms = to_ms(end) if end is not None else None
+        first_day = _day_of(start_ms) if start_ms is not None else None
+        last_day = _day_of(end_ms - 1) if end_ms is not None else None
+        days = [
+            d
+            for d in self.days()
+            if (first_day is None or d >= first_day) and (last_day is None or d <= last_day)
+        ]
+        for symbol in symbols:
+            for day in days:
+                part = self._partition(day, symbol)
+                ts_path = part / "ts.bin"
+                if not ts_path.exists() or ts_path.stat().st_size == 0:
+                    continue
+                ts = np.memmap(ts_path, dtype=TICK_DTYPE["ts"], mode="r")
+                lo = int(np.searchsorted(ts, start_ms, "left")) if start_ms is not None else 0
+                hi = int(np.searchsorted(ts, end_ms, "left")) if end_ms is not None else len(ts)
+                if lo >= hi:
+                    continue
+                out = {}
+                for name in cols:
+                    if name == "ts":
+                        arr = ts
+                    else:
+                        arr = np.memmap(part / f"{name}.bin", dtype=TICK_DTYPE[name], mode="r")
+                    out[name] = arr[lo:hi]
+                yield symbol, day, out
+
+    def read(
+        self,
+        symbols: Iterable[str],
+        start: TimeLike = None,
+        end: TimeLike = None,
+        columns: Optional[Sequence[str]] = None,
+        mmap: bool = False,
+    ) -> Dict[str, Dict[str, np.ndarray]]:
+        """Load ``start <= ts < end`` for *symbols* into per-symbol column arrays.
+
+        With ``mmap=True`` a symbol whose range falls in a single partition is
+        returned as memory-mapped views; ranges spanning several days are
+        always concatenated into regular arrays.
+        """
+        cols = tuple(columns) if columns else COLUMNS
+        parts: Dict[str, List[Dict[str, np.ndarray]]] = {}
+        symbols = list(symbols)
+        for symbol, _day, data in self.scan(symbols, start, end, cols):
+            parts.setdefault(symbol, []).append(data)
+        result: Dict[str, Dict[str, np.ndarray]] = {}
+        for symbol in symbols:
+            chunks = parts.get(symbol, [])
+            if mmap and len(chunks) == 1:
+                result[symbol] = chunks[0]
+            elif chunks:
+                result[symbol] = {n: np.concatenate([c[n] for c in chunks]) for n in cols}
+            else:
+                result[symbol] = {n: np.empty(0, dtype=TICK_DTYPE[n]) for n in cols}
+        return result
+
+
+def ingest_directory(src: Union[str, Path], store: TickStore) -> int:
+    """Convert every ``*.csv`` under *src* into *store*; returns rows ingested."""
+    total = 0
+    for path in sorted(Path(src).rglob("*.csv")):
+        total += store.ingest_csv(path)
+    return total
+
+
+if __name__ == "__main__":  # pragma: no cover
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert tick CSVs into the columnar store")
+    parser.add_argument("--src", default=os.path.join("data", "ticks"), help="CSV tick directory")
+    parser.add_argument("--root", default=os.path.join("data", "store"), help="Store root")
+    args = parser.parse_args()
+    rows = ingest_directory(args.src, TickStore(args.root))
+    print(f"Ingested {rows} rows into {args.root}")
@@ -0,0 +1,210 @@
+"""Buffered asynchronous CSV writer shared by the market data feeds.
+
+Rows are grouped per ``(day, symbol)`` and kept in memory until either
+``max_rows`` rows are pending or ``flush_interval`` seconds have elapsed.
+Flushing happens on a single worker thread so the event loop never touches
+the filesystem, and file handles stay open between flushes.  Files are
+written to ``<root>/YYYYMMDD/<symbol>.csv``; the day is derived from the row
+timestamp in UTC, so files rotate at UTC midnight and handles for previous
+days are closed on the next flush.  A file started with a different header,
+such as a day begun by an older feed, is rewritten under the current header
+before rows are appended, so one file never mixes layouts.
+
+Typical usage from a feed::
+
+    async with TickWriter(header=["ts", "symbol", "mark"]) as writer:
+        writer.write("BTCUSDT", [ts, "BTCUSDT", mark])
+"""
+from __future__ import annotations
+
+import asyncio
+import csv
+import datetime as dt
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Any, Dict, List, Optional, Sequence, Tuple
+
+from .logger import logger
+
+_Key = Tuple[str, str]
+
+# Row layout shared by every feed writing into ``data/ticks``.
+TICK_HEADER = ["ts", "symbol", "mark", "estFunding", "nextFunding", "src"]
+# Older ``binance_ws`` columns by their TICK_HEADER name, with the values
+# those files implied for the columns they lacked.
+_LEGACY_COLUMNS = {"timestamp": "ts", "markPrice": "mark", "fundingRate": "estFunding"}
+_LEGACY_DEFAULTS = {"src": "WS"}
+
+
+class TickWriter:
+    """Batch rows per ``(day, symbol)`` and append them to CSV files."""
+
+    def __init__(
+        self,
+        header: Sequence[str],
+        root: str = os.path.join("data", "ticks"),
+        max_rows: int = 1_000,
+        flush_interval: float = 1.0,
+    ) -> None:
+        if max_rows <= 0:
+            raise ValueError("max_rows must be positive")
+        if flush_interval <= 0:
+            raise ValueError("flush_interval must be positive")
+        self.header = list(header)
+        self.root = root
+        self.max_rows = max_rows
+        self.flush_interval = flush_interval
+        self._pending: Dict[_Key, List[Sequence[Any]]] = {}
+        self._pending_rows = 0
+        self._lock = threading.Lock()
+        self._handles: Dict[_Key, Tuple[IO[str], Any]] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tick-writer")
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    # ------------------------------------------------------------------
+    # Producer side (event loop)
+    # ------------------------------------------------------------------
+    def write(self, symbol: str, row: Sequence[Any], ts: Optional[dt.datetime] = None) -> None:
+        """Queue *row* for *symbol*; never blocks on disk I/O.
+
+        ``ts`` selects the day partition and defaults to the current UTC time.
+        """
+        if self._closed:
+            raise RuntimeError("TickWriter is closed")
+        day = (ts or dt.datetime.utcnow()).strftime("%Y%m%d")
+        with self._lock:
+            self._pending.setdefault((day, symbol), []).append(row)
+            self._pending_rows += 1
+            full = self._pending_rows >= self.max_rows
+        if full and self._wakeup is not None:
+            self._wakeup.set()
+
+    @property
+    def pending_rows(self) -> int:
+        """Number of rows buffered but not yet handed to the flush thread."""
+        return self._pending_rows
+
+    # ------------------------------------------------------------------
+    # Flushing
+    # ------------------------------------------------------------------
+    def _take_pending(self) -> Dict[_Key, List[Sequence[Any]]]:
+        with self._lock:
+            batches, self._pending = self._pending, {}
+            self._pending_rows = 0
+        return batches
+
+    def _handle(self, key: _Key) -> Any:
+        entry = self._handles.get(key)
+        if entry is None:
+            day, symbol = key
+            directory = os.path.join(self.root, day)
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"{symbol}.csv")
+            self._upgrade(path, symbol)
+            fh = open(path, "a", newline="")
+            writer = csv.writer(fh)
+            if fh.tell() == 0:
+                writer.writerow(self.header)
+            entry = (fh, writer)
+            self._handles[key] = entry
+        return entry[1]
+
+    def _upgrade(self, path: str, symbol: str) -> None:
+        """Rewrite *path* under ``self.header`` if it was started with another one.
+
+        Old columns are matched by name, legacy ``binance_ws`` names included;
+        columns the old file lacks are filled from the file name or left blank.
+        """
+        try:
+            with open(path, newline="") as fh:
+                rows = list(csv.reader(fh))
+        except FileNotFoundError:
+            return
+        if not rows or rows[0] == self.header:
+            return
+        old = [_LEGACY_COLUMNS.get(name, name) for name in rows[0]]
+        defaults = dict(_LEGACY_DEFAULTS) if old != rows[0] else {}
+        defaults["symbol"] = symbol
+        logger.warning("Rewriting %s from header %s to %s", path, rows[0], self.header)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", newline="") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(self.header)
+            for row in rows[1:]:
+                values = dict(zip(old, row))
+                writer.writerow([values.get(name, defaults.get(name, "")) for name in self.header])
+        os.replace(tmp, path)
+
+    def _write_batches(self, batches: Dict[_Key, List[Sequence[Any]]]) -> None:
+        """Append *batches* to disk; runs on the writer thread only."""
+        if batches:
+            latest_day = max(day for day, _ in batches)
+            for key in [k for k in self._handles if k[0] < latest_day]:
+                self._handles.pop(key)[0].close()
+        for key, rows in batches.items():
+            self._handle(key).writerows(rows)
+        for fh, _ in self._handles.values():
+            fh.flush()
+
+    def _close_handles(self) -> None:
+        for fh, _ in self._handles.values():
+            fh.close()
+        self._handles.clear()
+
+    def flush_sync(self) -> None:
+        """Flush pending rows from a non-async context, blocking until done."""
+        self._executor.submit(self._write_batches, self._take_pending()).result()
+
+    async def flush(self) -> None:
+        """Flush pending rows on the writer thread without blocking the loop."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._write_batches, self._take_pending())
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:  # noqa: BLE001 - keep the flusher alive
+                logger.exception("Tick flush failed")
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        """Start the periodic flush task on the running event loop."""
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the flush task, write every pending row and close all files."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._close_handles)
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self) -> "TickWriter":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.close()
@@ -1,3 +1,22 @@
-from . import binance, okx
+from . import binance, clock, connector, endpoints, latency, mexc, okx, rate_limit, signing, symbols
+from .connector import ConnectorRegistry, OrderAck, OrderRequest, Position, Ticker, VenueConnector, create_connector
 
-__all__ = ["binance", "okx"]
+__all__ = [
+    "ConnectorRegistry",
+    "OrderAck",
+    "OrderRequest",
+    "Position",
+    "Ticker",
+    "VenueConnector",
+    "binance",
+    "clock",
+    "connector",
+    "create_connector",
+    "endpoints",
+    "latency",
+    "mexc",
+    "okx",
+    "rate_limit",
+    "signing",
+    "symbols",
+]
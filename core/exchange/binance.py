@@ -1,55 +1,111 @@
 """Binance Futures exchange order utilities."""
 from __future__ import annotations
 import httpx
-from typing import Optional
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
 
-BASE_URL = "https://fapi.binance.com"
+from . import endpoints
+from .clock import clock
+from .connector import (
+    EXPIRED, REJECTED, OrderAck, OrderRequest, Position, Ticker, VenueConnector, register,
+)
+from .rate_limit import MARKET, ORDER, limiter
+from .signing import sign_binance_query
+from .symbols import decimal_str, to_decimal, to_float
 
-VALID_TIFS = {"IOC", "GTC", "GTX"}
+BASE_URL = endpoints.BINANCE_REST_URL
 
+VALID_TIFS = {"IOC", "GTC", "GTX", "FOK"}
 
-def place_order(
-    client: httpx.Client,
-    *,
+
+def order_params(
     symbol: str,
     side: str,
-    quantity: float,
-    price: Optional[float] = None,
+    order_type: str,
+    quantity: Any,
+    price: Any = None,
     time_in_force: str = "GTC",
     reduce_only: bool = False,
     position_side: Optional[str] = None,
-    live: bool = False,
-) -> httpx.Response:
-    """Place an order on Binance Futures.
+    new_order_resp_type: Optional[str] = None,
+    extra_params: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Unsigned ``/fapi/v1/order`` parameters, the one place order fields are checked.
 
-    The function validates time-in-force to allow IOC, GTC and GTX (post-only).
-    When ``live`` is ``False`` the order is sent to the test endpoint which is
-    guaranteed not to hit the matching engine.
+    Time-in-force may be IOC, GTC, FOK or GTX (post-only); it is only sent
+    for priced orders, which must have a price.  Numbers are sent as plain
+    decimal strings, never in exponent notation.  ``timestamp`` is on the
+    exchange clock and ``recvWindow`` is widened by its uncertainty once the
+    clock has been synced.
     """
     tif = time_in_force.upper()
     if tif not in VALID_TIFS:
-        raise ValueError("time_in_force must be one of IOC, GTC or GTX")
-    if tif == "GTX" and price is None:
-        raise ValueError("Post-only (GTX) orders require a price")
+        raise ValueError("time_in_force must be one of IOC, GTC, FOK or GTX")
+    order_type = order_type.upper()
+    if price is None and (order_type != "MARKET" or tif == "GTX"):
+        if tif == "GTX":
+            raise ValueError("Post-only (GTX) orders require a price")
+        raise ValueError("Price required for non-market orders")
 
-    endpoint = "/fapi/v1/order" if live else "/fapi/v1/order/test"
-    url = BASE_URL + endpoint
-
-    payload = {
+    params: Dict[str, Any] = {
         "symbol": symbol,
         "side": side,
-        "type": "LIMIT" if price is not None else "MARKET",
-        "quantity": quantity,
-        "timeInForce": tif,
+        "type": order_type,
+        "quantity": decimal_str(quantity),
+        "timestamp": clock.now_ms("binance"),
     }
-    if price is not None:
-        payload["price"] = price
+    recv_window = clock.recv_window_ms("binance")
+    if recv_window is not None:
+        params["recvWindow"] = recv_window
+    if new_order_resp_type:
+        params["newOrderRespType"] = new_order_resp_type
+    if order_type != "MARKET":
+        params["price"] = decimal_str(price)
+        params["timeInForce"] = tif
     if reduce_only:
-        payload["reduceOnly"] = True
+        params["reduceOnly"] = "true"
     if position_side:
-        payload["positionSide"] = position_side
+        params["positionSide"] = position_side
+    if extra_params:
+        params.update(extra_params)
+    return params
+
+
+def send_order(
+    client: httpx.Client, params: Dict[str, Any], *, live: bool = False, base_url: Optional[str] = None
+) -> httpx.Response:
+    """POST *params* to ``order`` or, unless *live*, ``order/test``."""
+    endpoint = "/fapi/v1/order" if live else "/fapi/v1/order/test"
+    limiter.acquire("binance", weight=1, orders=1 if live else 0, priority=ORDER)
+    response = client.post((base_url or BASE_URL) + endpoint, data=params)
+    limiter.record_response("binance", response.status_code, response.headers)
+    return response
+
+
+def place_order(
+    client: httpx.Client,
+    *,
+    symbol: str,
+    side: str,
+    quantity: float,
+    price: Optional[float] = None,
+    time_in_force: str = "GTC",
+    reduce_only: bool = False,
+    position_side: Optional[str] = None,
+    live: bool = False,
+    base_url: Optional[str] = None,
+) -> httpx.Response:
+    """Place an order on Binance Futures.
 
-    return client.post(url, data=payload)
+    The function validates time-in-force to allow IOC, GTC, FOK and GTX
+    (post-only).  When ``live`` is ``False`` the order is sent to the test
+    endpoint which is guaranteed not to hit the matching engine.
+    """
+    params = order_params(
+        symbol, side, "LIMIT" if price is not None else "MARKET", quantity, price,
+        time_in_force, reduce_only, position_side,
+    )
+    return send_order(client, params, live=live, base_url=base_url)
 
 
 def place_test_order(**kwargs) -> httpx.Response:
@@ -57,3 +113,132 @@ def place_test_order(**kwargs) -> httpx.Response:
     live = kwargs.pop("live", False)
     with httpx.Client() as client:
         return place_order(client, live=live, **kwargs)
+
+
+def _ack(symbol: str, status_code: int, data: Any) -> OrderAck:
+    if status_code != 200 or not isinstance(data, dict) or data.get("code", 0) not in (0, 200):
+        error = data.get("msg") if isinstance(data, dict) else str(data)
+        return OrderAck("binance", symbol, False, REJECTED, error=error, raw=data)
+    if not data:
+        # order/test answers with an empty object.
+        return OrderAck("binance", symbol, True, raw=data)
+    status = data.get("status", "NEW")
+    return OrderAck(
+        "binance",
+        symbol,
+        True,
+        EXPIRED if status == "EXPIRED_IN_MATCH" else status,
+        str(data.get("orderId", "")),
+        data.get("clientOrderId", ""),
+        to_float(data.get("executedQty")),
+        to_float(data.get("avgPrice")),
+        raw=data,
+    )
+
+
+@register
+class BinanceConnector(VenueConnector):
+    """USDⓈ-M futures connector.
+
+    *rules* is an optional object with ``validate(symbol, qty, price)``, such
+    as :class:`orders.symbol_rules.SymbolRulesIndex`, checked before an order
+    is sent.  Outside *live* mode orders go to ``order/test``.  Batch orders
+    and the WebSocket trading API are in :mod:`orders.binance`.
+    """
+
+    venue = "binance"
+    ping_path = "/fapi/v1/ping"
+
+    def __init__(
+        self,
+        api_key: str = "",
+        api_secret: str = "",
+        live: bool = False,
+        base_url: Optional[str] = None,
+        rules: Any = None,
+        **transport_kwargs: Any,
+    ) -> None:
+        super().__init__(base_url or endpoints.BINANCE_REST_URL, **transport_kwargs)
+        self.api_secret = api_secret
+        self.live = live
+        self.rules = rules
+        self._headers = {"X-MBX-APIKEY": api_key}
+
+    async def _signed(self, method: str, path: str, params: Dict[str, Any], **kwargs: Any) -> httpx.Response:
+        params.setdefault("timestamp", clock.now_ms("binance"))
+        recv_window = clock.recv_window_ms("binance")
+        if recv_window is not None:
+            params.setdefault("recvWindow", recv_window)
+        query = sign_binance_query(params, self.api_secret)
+        resp, _ = await self.transport.request(
+            method, f"{path}?{query}", headers=self._headers, endpoint=path, **kwargs
+        )
+        return resp
+
+    async def ticker(self, symbol: str) -> Ticker:
+        resp, _ = await self.transport.request(
+            "GET", "/fapi/v1/premiumIndex", params={"symbol": self.venue_symbol(symbol)}, priority=MARKET
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        return Ticker(
+            "binance",
+            self.canonical(data["symbol"]),
+            to_float(data.get("markPrice")),
+            to_float(data.get("indexPrice")),
+            to_float(data.get("lastFundingRate")),
+            int(data.get("nextFundingTime") or 0),
+        )
+
+    async def place_order(self, order: OrderRequest) -> OrderAck:
+        symbol = self.venue_symbol(order.symbol)
+        qty = to_decimal(order.quantity)
+        price: Optional[Decimal] = to_decimal(order.price) if order.price is not None else None
+        if self.rules is not None:
+            self.rules.validate(symbol, qty, price)
+        params = order_params(
+            symbol, order.side, order.order_type, qty, price, order.time_in_force,
+            order.reduce_only, None, "RESULT", order.params,
+        )
+        if order.client_order_id:
+            params["newClientOrderId"] = order.client_order_id
+        endpoint = "/fapi/v1/order" if self.live else "/fapi/v1/order/test"
+        resp = await self._signed("POST", endpoint, params, orders=1 if self.live else 0)
+        return _ack(order.symbol, resp.status_code, resp.json())
+
+    def _order_ref(self, symbol: str, order_id: Optional[str], client_order_id: Optional[str]) -> Dict[str, Any]:
+        params: Dict[str, Any] = {"symbol": self.venue_symbol(symbol)}
+        if order_id:
+            params["orderId"] = order_id
+        elif client_order_id:
+            params["origClientOrderId"] = client_order_id
+        else:
+            raise ValueError("order_id or client_order_id required")
+        return params
+
+    async def cancel_order(
+        self, symbol: str, *, order_id: Optional[str] = None, client_order_id: Optional[str] = None
+    ) -> OrderAck:
+        resp = await self._signed("DELETE", "/fapi/v1/order", self._order_ref(symbol, order_id, client_order_id))
+        return _ack(symbol, resp.status_code, resp.json())
+
+    async def order_status(
+        self, symbol: str, *, order_id: Optional[str] = None, client_order_id: Optional[str] = None
+    ) -> OrderAck:
+        resp = await self._signed("GET", "/fapi/v1/order", self._order_ref(symbol, order_id, client_order_id))
+        return _ack(symbol, resp.status_code, resp.json())
+
+    async def positions(self) -> List[Position]:
+        resp = await self._signed("GET", "/fapi/v2/positionRisk", {}, weight=5)
+        resp.raise_for_status()
+        return [
+            Position(
+                "binance",
+                self.canonical(item["symbol"]),
+                to_float(item.get("positionAmt")),
+                to_float(item.get("entryPrice")),
+                to_float(item.get("unRealizedProfit")),
+            )
+            for item in resp.json()
+            if to_float(item.get("positionAmt"))
+        ]
@@ -0,0 +1,228 @@
+"""Exchange clock offset estimation.
+
+Signed requests carry a timestamp that the venue checks against its own
+clock (Binance rejects one more than ``recvWindow`` behind or 1s ahead of
+server time), so timestamps are taken from the venue's clock as estimated
+here, not from the local one.
+
+Offsets are estimated NTP-style.  A server-time request sent at local ``t0``
+and answered at ``t1`` with server time ``s`` gives an offset
+``s - (t0 + t1) / 2``, uncertain by up to half the round trip.  Of the last
+``window`` samples the one with the shortest round trip is used, since
+queueing delay only ever adds error.  WebSocket event times refine the
+estimate between polls: an event stamped ``E`` by the venue and received at
+local ``t`` proves the offset is at least ``E - t``, so a clock that drifted
+ahead of the last sample is noticed on the next market event.
+
+All clients use the module-level :data:`clock`::
+
+    params["timestamp"] = clock.now_ms("binance")
+
+Venue connectors and :class:`orders.binance.AsyncBinanceOrderClient` take a
+first sample in ``start`` and keep the venue synced with :meth:`ClockSync.start`
+until they are closed.  Synchronous clients, which have no event loop, sample
+through :meth:`ClockSync.sync_session` before a signed request whenever
+:meth:`ClockSync.age_s` says the last sample is too old.
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Mapping, Optional, Tuple
+
+import requests
+
+from core.data.logger import logger
+
+from .rate_limit import MARKET
+
+# Server-time endpoint of each venue.
+SERVER_TIME_PATHS: Dict[str, str] = {
+    "binance": "/fapi/v1/time",
+    "okx": "/api/v5/public/time",
+    "mexc": "/api/v1/contract/ping",
+}
+
+# Binance accepts at most a 60s ``recvWindow``.
+MAX_RECV_WINDOW_MS = 60_000
+
+
+def server_time_ms(venue: str, data: Any) -> int:
+    """Server time in a response of :data:`SERVER_TIME_PATHS`."""
+    if venue == "binance":
+        return int(data["serverTime"])
+    if venue == "okx":
+        return int(data["data"][0]["ts"])
+    if venue == "mexc":
+        return int(data["data"])
+    raise ValueError(f"no server time endpoint for {venue}")
+
+
+class VenueClock:
+    """Offset samples of one venue."""
+
+    __slots__ = ("venue", "samples", "event_bound_ms", "event_bound_at", "synced_at")
+
+    def __init__(self, venue: str, window: int) -> None:
+        self.venue = venue
+        # (offset_ms, rtt_ms)
+        self.samples: Deque[Tuple[float, float]] = deque(maxlen=window)
+        self.event_bound_ms = -math.inf
+        self.event_bound_at = 0.0
+        self.synced_at = 0.0
+
+    @property
+    def best(self) -> Optional[Tuple[float, float]]:
+        """Sample with the shortest round trip."""
+        return min(self.samples, key=lambda s: s[1]) if self.samples else None
+
+
+class ClockSync:
+    """Per-venue estimates of ``server time - local time``."""
+
+    def __init__(self, window: int = 16, bound_ttl_s: float = 60.0, clock: Callable[[], float] = time.time) -> None:
+        if window <= 0:
+            raise ValueError("window must be positive")
+        self.window = window
+        self.bound_ttl_s = bound_ttl_s
+        self._clock = clock
+        self._venues: Dict[str, VenueClock] = {}
+        # venue -> (background sync task, the transport it polls)
+        self._tasks: Dict[str, Tuple[asyncio.Task, Any]] = {}
+
+    def venue(self, venue: str) -> VenueClock:
+        state = self._venues.get(venue)
+        if state is None:
+            state = self._venues[venue] = VenueClock(venue, self.window)
+        return state
+
+    # ------------------------------------------------------------------
+    # Measurements
+    # ------------------------------------------------------------------
+    def add_sample(self, venue: str, t0_ms: float, server_ms: float, t1_ms: float) -> float:
+        """Record a server-time round trip and return the new offset estimate."""
+        if t1_ms < t0_ms:
+            raise ValueError("response received before the request was sent")
+        state = self.venue(venue)
+        state.samples.append((server_ms - (t0_ms + t1_ms) / 2, t1_ms - t0_ms))
+        state.synced_at = self._clock()
+        return self.offset_ms(venue)
+
+    def observe_event(self, venue: str, event_ms: float, local_ms: Optional[float] = None) -> None:
+        """Tighten the lower bound on the offset from a venue event time."""
+        if local_ms is None:
+            local_ms = self._clock() * 1000
+        state = self.venue(venue)
+        bound = event_ms - local_ms
+        now = self._clock()
+        if bound > state.event_bound_ms or now - state.event_bound_at > self.bound_ttl_s:
+            state.event_bound_ms = bound
+            state.event_bound_at = now
+
+    # ------------------------------------------------------------------
+    # Estimates
+    # ------------------------------------------------------------------
+    def offset_ms(self, venue: str) -> float:
+        """Best estimate of ``server - local`` in ms; 0 before any measurement."""
+        state = self._venues.get(venue)
+        if state is None:
+            return 0.0
+        best = state.best
+        bound = state.event_bound_ms if self._clock() - state.event_bound_at <= self.bound_ttl_s else -math.inf
+        if best is None:
+            return bound if bound > -math.inf else 0.0
+        return max(best[0], bound)
+
+    def error_ms(self, venue: str) -> float:
+        """Half the round trip of the sample in use; ``inf`` before any sample."""
+        state = self._venues.get(venue)
+        best = state.best if state is not None else None
+        return best[1] / 2 if best is not None else math.inf
+
+    def age_s(self, venue: str) -> float:
+        """Seconds since the last server-time sample; ``inf`` before any."""
+        state = self._venues.get(venue)
+        return self._clock() - state.synced_at if state is not None and state.samples else math.inf
+
+    def now_ms(self, venue: str) -> int:
+        """Current time on *venue*'s clock, in ms."""
+        return int(self._clock() * 1000 + self.offset_ms(venue))
+
+    def recv_window_ms(self, venue: str, base_ms: float = 5_000) -> Optional[int]:
+        """``recvWindow`` widened by the offset uncertainty; ``None`` until synced.
+
+        Unsynced requests leave the field out, so the venue's default applies.
+        """
+        error = self.error_ms(venue)
+        if math.isinf(error):
+            return None
+        return int(min(MAX_RECV_WINDOW_MS, base_ms + math.ceil(error)))
+
+    # ------------------------------------------------------------------
+    # Polling
+    # ------------------------------------------------------------------
+    async def sync(self, venue: str, transport: Any) -> float:
+        """Poll *venue*'s server-time endpoint once through an ``AsyncTransport``."""
+        path = SERVER_TIME_PATHS[venue]
+        t0 = self._clock() * 1000
+        resp, _ = await transport.request("GET", path, priority=MARKET)
+        t1 = self._clock() * 1000
+        resp.raise_for_status()
+        return self.add_sample(venue, t0, server_time_ms(venue, resp.json()), t1)
+
+    def sync_session(self, venue: str, session: requests.Session, base_url: str, timeout: float = 5.0) -> float:
+        """Blocking :meth:`sync` over a ``requests`` session, for synchronous clients."""
+        t0 = self._clock() * 1000
+        resp = session.get(base_url + SERVER_TIME_PATHS[venue], timeout=timeout)
+        t1 = self._clock() * 1000
+        resp.raise_for_status()
+        return self.add_sample(venue, t0, server_time_ms(venue, resp.json()), t1)
+
+    async def run(self, transports: Mapping[str, Any], interval_s: float = 30.0, burst: int = 4) -> None:
+        """Poll every venue in *transports* until cancelled.
+
+        Each round sends *burst* back-to-back samples, so at least one is
+        likely to miss any queueing on the path.
+        """
+        while True:
+            for venue, transport in transports.items():
+                for _ in range(burst):
+                    try:
+                        await self.sync(venue, transport)
+                    except Exception as exc:  # noqa: BLE001 - keep the last estimate
+                        logger.warning("%s clock sync failed: %s", venue, exc)
+                        break
+            await asyncio.sleep(interval_s)
+
+    def start(self, venue: str, transport: Any, interval_s: float = 30.0) -> asyncio.Task:
+        """Keep *venue* synced through *transport* in a background task.
+
+        There is one task per venue; while it runs, further calls return it.
+        The first poll is *interval_s* away, callers sample with :meth:`sync`
+        first.
+        """
+        current = self._tasks.get(venue)
+        if current is not None and not current[0].done():
+            return current[0]
+
+        async def poll() -> None:
+            await asyncio.sleep(interval_s)
+            await self.run({venue: transport}, interval_s)
+
+        task = asyncio.create_task(poll())
+        self._tasks[venue] = (task, transport)
+        return task
+
+    async def stop(self, venue: str, transport: Any = None) -> None:
+        """Cancel *venue*'s background task; with *transport*, only if it polls that one."""
+        current = self._tasks.get(venue)
+        if current is None or transport is not None and current[1] is not transport:
+            return
+        del self._tasks[venue]
+        current[0].cancel()
+        await asyncio.gather(current[0], return_exceptions=True)
+
+
+clock = ClockSync()
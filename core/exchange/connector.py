@@ -0,0 +1,279 @@
+"""One interface for market data, orders, cancels and positions on every venue.
+
+A :class:`VenueConnector` speaks canonical symbols (``BTCUSDT``, see
+:mod:`core.exchange.symbols`) and base-asset quantities; it converts both to
+the venue's instrument names and contract sizes itself.  Every request goes
+through one pooled :class:`~core.exchange.transport.AsyncTransport` per
+connector, so market data, orders and position queries share keep-alive
+connections and the venue's rate-limit budget.
+
+Venue modules register their connector class with :func:`register`;
+:func:`create_connector` builds one by venue name and a
+:class:`ConnectorRegistry` holds the connectors of a process so a strategy can
+fan a call out to every venue at once::
+
+    async with ConnectorRegistry([create_connector("binance", ...),
+                                  create_connector("okx", ...)]) as venues:
+        tickers = await venues.gather("ticker", "BTCUSDT")
+"""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Type, TypeVar
+
+from core.data.logger import logger
+
+from .clock import clock
+from .symbols import to_canonical, to_venue
+from .transport import AsyncTransport
+
+# Normalised order status, shared with :mod:`orders.tracker`.
+NEW = "NEW"
+PARTIALLY_FILLED = "PARTIALLY_FILLED"
+FILLED = "FILLED"
+CANCELED = "CANCELED"
+REJECTED = "REJECTED"
+EXPIRED = "EXPIRED"
+
+
+@dataclass
+class Ticker:
+    """Mark price and funding of one perpetual."""
+
+    venue: str
+    symbol: str
+    mark_price: float
+    index_price: float = 0.0
+    funding_rate: float = 0.0
+    next_funding_ms: int = 0
+
+
+@dataclass
+class OrderRequest:
+    """Venue-neutral order; *quantity* is in base asset, not contracts.
+
+    *time_in_force* is ``GTC``, ``IOC``, ``FOK`` or ``GTX`` (post-only) and is
+    ignored for market orders.  *params* are merged into the venue request.
+    """
+
+    symbol: str
+    side: str
+    quantity: float
+    price: Optional[float] = None
+    order_type: str = ""
+    time_in_force: str = "GTC"
+    reduce_only: bool = False
+    client_order_id: Optional[str] = None
+    params: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self.side = self.side.upper()
+        if self.side not in ("BUY", "SELL"):
+            raise ValueError(f"side must be BUY or SELL, not {self.side!r}")
+        if self.quantity <= 0:
+            raise ValueError("quantity must be positive")
+        self.order_type = (self.order_type or ("LIMIT" if self.price is not None else "MARKET")).upper()
+        self.time_in_force = self.time_in_force.upper()
+        if self.order_type != "MARKET" and self.price is None:
+            raise ValueError("Price required for non-market orders")
+        if self.time_in_force not in ("GTC", "IOC", "FOK", "GTX"):
+            raise ValueError("time_in_force must be one of GTC, IOC, FOK or GTX")
+        if self.time_in_force == "GTX" and self.order_type == "MARKET":
+            raise ValueError("Post-only (GTX) orders require a price")
+
+
+@dataclass
+class OrderAck:
+    """Normalised venue response to an order or cancel request."""
+
+    venue: str
+    symbol: str
+    ok: bool
+    status: str = NEW
+    order_id: str = ""
+    client_order_id: str = ""
+    filled_qty: float = 0.0
+    avg_price: float = 0.0
+    error: Optional[str] = None
+    raw: Any = None
+
+
+@dataclass
+class Position:
+    """Open position; *quantity* is in base asset, negative when short."""
+
+    venue: str
+    symbol: str
+    quantity: float
+    entry_price: float = 0.0
+    unrealized_pnl: float = 0.0
+
+
+class VenueConnector:
+    """Base class of the venue connectors.
+
+    Subclasses set :attr:`venue` and :attr:`ping_path` and implement the
+    ``async`` methods below; quantities pass through :meth:`contract_size`,
+    which is 1 unless the venue trades in contracts.
+    """
+
+    venue = ""
+    ping_path = ""
+    clock_interval_s = 30.0
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        transport: Optional[AsyncTransport] = None,
+        **transport_kwargs: Any,
+    ) -> None:
+        self.base_url = base_url
+        self.transport = transport or AsyncTransport(self.venue, base_url, **transport_kwargs)
+
+    # ------------------------------------------------------------------
+    # Symbols and sizes
+    # ------------------------------------------------------------------
+    def venue_symbol(self, symbol: str) -> str:
+        return to_venue(symbol, self.venue)
+
+    @staticmethod
+    def canonical(venue_symbol: str) -> str:
+        return to_canonical(venue_symbol)
+
+    def contract_size(self, symbol: str) -> Decimal:
+        """Base-asset quantity of one contract of *symbol*."""
+        return Decimal(1)
+
+    # ------------------------------------------------------------------
+    # Venue API
+    # ------------------------------------------------------------------
+    async def start(self, connections: int = 2) -> None:
+        """Pre-warm the connection pool, take a first clock offset sample and
+        keep the clock synced every :attr:`clock_interval_s` until closed."""
+        if self.ping_path:
+            await self.transport.warm_up(self.ping_path, connections)
+        try:
+            await self.sync_clock()
+        except Exception as exc:  # noqa: BLE001 - local time is used until a sample succeeds
+            logger.warning("%s clock sync failed: %s", self.venue, exc)
+        clock.start(self.venue, self.transport, self.clock_interval_s)
+
+    async def sync_clock(self) -> float:
+        """Sample the venue's server time; returns the offset estimate in ms."""
+        return await clock.sync(self.venue, self.transport)
+
+    async def ticker(self, symbol: str) -> Ticker:
+        raise NotImplementedError
+
+    async def place_order(self, order: OrderRequest) -> OrderAck:
+        raise NotImplementedError
+
+    async def cancel_order(
+        self, symbol: str, *, order_id: Optional[str] = None, client_order_id: Optional[str] = None
+    ) -> OrderAck:
+        raise NotImplementedError
+
+    async def order_status(
+        self, symbol: str, *, order_id: Optional[str] = None, client_order_id: Optional[str] = None
+    ) -> OrderAck:
+        """Current state and base-asset fill of one order; not ``ok`` if the venue does not know it."""
+        raise NotImplementedError
+
+    async def positions(self) -> List[Position]:
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        await clock.stop(self.venue, self.transport)
+        await self.transport.aclose()
+
+    async def __aenter__(self) -> "VenueConnector":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.aclose()
+
+
+C = TypeVar("C", bound=Type[VenueConnector])
+
+CONNECTORS: Dict[str, Type[VenueConnector]] = {}
+
+
+def register(cls: C) -> C:
+    """Class decorator making a connector available to :func:`create_connector`."""
+    if not cls.venue:
+        raise ValueError("connector classes must set venue")
+    CONNECTORS[cls.venue] = cls
+    return cls
+
+
+def create_connector(venue: str, **kwargs: Any) -> VenueConnector:
+    """Connector for *venue*; *kwargs* go to its constructor."""
+    try:
+        cls = CONNECTORS[venue]
+    except KeyError:
+        raise ValueError(f"No connector registered for venue {venue!r}") from None
+    return cls(**kwargs)
+
+
+class ConnectorRegistry:
+    """The connectors of one process, by venue name."""
+
+    def __init__(self, connectors: Iterable[VenueConnector] = ()) -> None:
+        self._connectors: Dict[str, VenueConnector] = {}
+        for connector in connectors:
+            self.add(connector)
+
+    def add(self, connector: VenueConnector) -> VenueConnector:
+        if connector.venue in self._connectors:
+            raise ValueError(f"Venue {connector.venue!r} already registered")
+        self._connectors[connector.venue] = connector
+        return connector
+
+    def get(self, venue: str) -> VenueConnector:
+        try:
+            return self._connectors[venue]
+        except KeyError:
+            raise ValueError(f"No connector for venue {venue!r}") from None
+
+    @property
+    def venues(self) -> List[str]:
+        return list(self._connectors)
+
+    def __contains__(self, venue: object) -> bool:
+        return venue in self._connectors
+
+    def __iter__(self) -> Iterator[VenueConnector]:
+        return iter(self._connectors.values())
+
+    def __len__(self) -> int:
+        return len(self._connectors)
+
+    async def gather(
+        self, method: str, *args: Any, venues: Optional[Iterable[str]] = None, **kwargs: Any
+    ) -> Dict[str, Any]:
+        """Call *method* on every connector (or *venues*) concurrently.
+
+        Returns ``{venue: result}``; a venue that raised maps to its
+        exception instead, so one failing venue does not hide the others.
+        """
+        chosen = [self.get(v) for v in venues] if venues is not None else list(self)
+        calls: List[Callable[..., Any]] = [getattr(c, method) for c in chosen]
+        results = await asyncio.gather(*(call(*args, **kwargs) for call in calls), return_exceptions=True)
+        return {c.venue: r for c, r in zip(chosen, results)}
+
+    async def start(self, connections: int = 2) -> None:
+        await asyncio.gather(*(c.start(connections) for c in self))
+
+    async def aclose(self) -> None:
+        await asyncio.gather(*(c.aclose() for c in self), return_exceptions=True)
+
+    async def __aenter__(self) -> "ConnectorRegistry":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.aclose()
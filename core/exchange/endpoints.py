@@ -0,0 +1,31 @@
+"""Base URLs for every venue, overridable through environment variables.
+
+Production endpoints are the defaults.  Pointing the ``OMNI_*`` variables at
+:mod:`sim.exchange_server` runs the feeds and order paths against a local
+stand-in::
+
+    OMNI_BINANCE_REST_URL=http://127.0.0.1:8765
+    OMNI_BINANCE_WS_URL=ws://127.0.0.1:8765
+
+Variables are read at import time; clients that take a ``base_url`` argument
+can also be pointed elsewhere per instance.
+"""
+import os
+
+BINANCE_REST_URL = os.getenv("OMNI_BINANCE_REST_URL", "https://fapi.binance.com")
+BINANCE_WS_URL = os.getenv("OMNI_BINANCE_WS_URL", "wss://fstream.binance.com")
+BINANCE_WS_API_URL = os.getenv("OMNI_BINANCE_WS_API_URL", "wss://ws-fapi.binance.com/ws-fapi/v1")
+OKX_REST_URL = os.getenv("OMNI_OKX_REST_URL", "https://www.okx.com")
+OKX_WS_URL = os.getenv("OMNI_OKX_WS_URL", "wss://ws.okx.com:8443")
+MEXC_REST_URL = os.getenv("OMNI_MEXC_REST_URL", "https://contract.mexc.com")
+MEXC_WS_URL = os.getenv("OMNI_MEXC_WS_URL", "wss://contract-ws.mexc.com")
+
+ENV_VARS = {
+    "BINANCE_REST_URL": "OMNI_BINANCE_REST_URL",
+    "BINANCE_WS_URL": "OMNI_BINANCE_WS_URL",
+    "BINANCE_WS_API_URL": "OMNI_BINANCE_WS_API_URL",
+    "OKX_REST_URL": "OMNI_OKX_REST_URL",
+    "OKX_WS_URL": "OMNI_OKX_WS_URL",
+    "MEXC_REST_URL": "OMNI_MEXC_REST_URL",
+    "MEXC_WS_URL": "OMNI_MEXC_WS_URL",
+}
@@ -0,0 +1,182 @@
+"""Live latency histograms per venue.
+
+Two kinds of measurement are kept, each per venue and per endpoint or
+stream:
+
+* ``rtt`` – request round trips, recorded by
+  :class:`~core.exchange.transport.AsyncTransport` and the WebSocket trading
+  API,
+* ``feed_lag`` – how old a market-data event is on arrival: local receive
+  time minus the venue's event time, corrected by the clock offset from
+  :mod:`core.exchange.clock`.
+
+Histograms use fixed log-spaced buckets, so recording is one bisect and an
+increment, and the histograms of several endpoints can be merged by adding
+counts.  Each histogram covers the current and the previous ``window_s``
+window, so quantiles follow the network as it is now rather than since start
+up.  The orchestrator reads :meth:`LatencyMonitor.leg_latency_ms` instead of
+trusting the ``latency_ms`` a caller put in the signal.
+
+All clients record into the module-level :data:`latency`::
+
+    latency.record_rtt("binance", "/fapi/v1/order", 12.5)
+    latency.quantile("rtt", "binance", 0.99)
+"""
+from __future__ import annotations
+
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+RTT = "rtt"
+FEED_LAG = "feed_lag"
+KINDS = (RTT, FEED_LAG)
+
+# Endpoints an order goes out on, per venue: the round trips that count
+# towards a leg's latency.
+ORDER_ENDPOINTS: Dict[str, Tuple[str, ...]] = {
+    "binance": ("/fapi/v1/order", "/fapi/v1/order/test", "/fapi/v1/batchOrders", "ws:order.place"),
+    "okx": ("/api/v5/trade/order", "/api/v5/trade/batch-orders"),
+    "mexc": ("/api/v1/private/order",),
+}
+
+# Bucket upper bounds in ms: 10µs to 60s in 5% steps; the last bucket is open.
+BUCKET_EDGES: List[float] = list(np.geomspace(0.01, 60_000, 321))
+
+
+class LatencyHistogram:
+    """Rotating two-window histogram of latencies in ms."""
+
+    __slots__ = ("window_s", "_clock", "_current", "_previous", "_start", "count", "total", "max")
+
+    def __init__(self, window_s: float = 60.0, clock: Callable[[], float] = time.monotonic) -> None:
+        self.window_s = window_s
+        self._clock = clock
+        self._current = np.zeros(len(BUCKET_EDGES) + 1, dtype=np.int64)
+        self._previous = np.zeros_like(self._current)
+        self._start = clock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def _roll(self) -> None:
+        now = self._clock()
+        elapsed = now - self._start
+        if elapsed < self.window_s:
+            return
+        if elapsed < 2 * self.window_s:
+            self._previous, self._current = self._current, self._previous
+        else:
+            self._previous[:] = 0
+        self._current[:] = 0
+        self._start = now
+
+    def record(self, value_ms: float) -> None:
+        self._roll()
+        value_ms = max(0.0, value_ms)
+        self._current[bisect_left(BUCKET_EDGES, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+
+    def counts(self) -> np.ndarray:
+        """Bucket counts of the current and previous windows."""
+        self._roll()
+        return self._current + self._previous
+
+    @property
+    def mean(self) -> float:
+        """Mean since creation."""
+        return self.total / self.count if self.count else math.nan
+
+
+def quantile_of(counts: np.ndarray, q: float) -> float:
+    """Upper bucket edge below which a *q* share of *counts* falls; NaN when empty."""
+    if not 0 <= q <= 1:
+        raise ValueError("q must be in [0, 1]")
+    n = int(counts.sum())
+    if n == 0:
+        return math.nan
+    i = int(np.searchsorted(np.cumsum(counts), max(1, math.ceil(q * n))))
+    return BUCKET_EDGES[i] if i < len(BUCKET_EDGES) else math.inf
+
+
+class LatencyMonitor:
+    """Histograms by ``(kind, venue, key)``, where *key* is an endpoint or stream."""
+
+    def __init__(self, window_s: float = 60.0, clock: Callable[[], float] = time.monotonic) -> None:
+        self.window_s = window_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str, str], LatencyHistogram] = {}
+
+    def histogram(self, kind: str, venue: str, key: str) -> LatencyHistogram:
+        hist = self._histograms.get((kind, venue, key))
+        if hist is None:
+            if kind not in KINDS:
+                raise ValueError(f"kind must be one of {KINDS}")
+            with self._lock:
+                hist = self._histograms.setdefault((kind, venue, key), LatencyHistogram(self.window_s, self._clock))
+        return hist
+
+    def record_rtt(self, venue: str, endpoint: str, ms: float) -> None:
+        self.histogram(RTT, venue, endpoint).record(ms)
+
+    def record_feed_lag(self, venue: str, stream: str, ms: float) -> None:
+        self.histogram(FEED_LAG, venue, stream).record(ms)
+
+    def on_timing(self, venue: str, endpoint: str, timing: Any) -> None:
+        """:data:`~core.exchange.transport.TimingCallback` recording ``total_ms``."""
+        self.record_rtt(venue, endpoint, timing.total_ms)
+
+    def keys(self, kind: Optional[str] = None, venue: Optional[str] = None) -> List[Tuple[str, str, str]]:
+        return [
+            k for k in list(self._histograms)
+            if (kind is None or k[0] == kind) and (venue is None or k[1] == venue)
+        ]
+
+    def quantile(self, kind: str, venue: str, q: float, keys: Optional[Iterable[str]] = None) -> float:
+        """*q* quantile of *kind* on *venue* over *keys*, or every key; NaN without data."""
+        wanted = None if keys is None else set(keys)
+        merged = np.zeros(len(BUCKET_EDGES) + 1, dtype=np.int64)
+        for k in self.keys(kind, venue):
+            if wanted is None or k[2] in wanted:
+                merged += self._histograms[k].counts()
+        return quantile_of(merged, q)
+
+    def leg_latency_ms(self, venue: str, q: float = 0.99) -> float:
+        """Signal-to-venue latency: the *q* feed lag plus the *q* order round trip.
+
+        Only the :data:`ORDER_ENDPOINTS` of *venue* count as round trips, or
+        every endpoint for a venue not listed there.  Either part without
+        data counts as zero; NaN when both are missing.
+        """
+        lag = self.quantile(FEED_LAG, venue, q)
+        rtt = self.quantile(RTT, venue, q, keys=ORDER_ENDPOINTS.get(venue))
+        if math.isnan(lag) and math.isnan(rtt):
+            return math.nan
+        return (0.0 if math.isnan(lag) else lag) + (0.0 if math.isnan(rtt) else rtt)
+
+    def summary(self, q: Iterable[float] = (0.5, 0.9, 0.99)) -> Dict[str, Dict[str, float]]:
+        """``"kind venue key"`` -> count, mean and quantiles, for logs and dashboards."""
+        qs = list(q)
+        out = {}
+        for key in sorted(self.keys()):
+            hist = self._histograms[key]
+            counts = hist.counts()
+            row = {"count": float(hist.count), "mean": hist.mean, "max": hist.max}
+            row.update({f"p{round(x * 100):d}": quantile_of(counts, x) for x in qs})
+            out[" ".join(key)] = row
+        return out
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+
+latency = LatencyMonitor()
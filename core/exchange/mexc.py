@@ -0,0 +1,251 @@
+"""
+ماژول ارتباط REST با صرافی MEXC فیوچرز.
+
+:class:`MexcConnector` پیاده‌سازی :class:`~core.exchange.connector.VenueConnector`
+برای قراردادهای دائمی MEXC است.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from . import endpoints
+from .connector import (
+    CANCELED, FILLED, NEW, PARTIALLY_FILLED, REJECTED, OrderAck, OrderRequest, Position, Ticker,
+    VenueConnector, register,
+)
+from .rate_limit import MARKET, ORDER, limiter
+from .signing import mexc_headers, mexc_param_string
+from .symbols import decimal_str, to_decimal, to_float
+
+BASE_URL = endpoints.MEXC_REST_URL
+ORDER_PATH = "/api/v1/private/order"
+
+# Order ``type`` by time-in-force; 5 is a market order.
+_ORDER_TYPES = {"GTC": 1, "GTX": 2, "IOC": 3, "FOK": 4}
+_MARKET_TYPE = 5
+# ``side``: 1 open long, 2 close short, 3 open short, 4 close long.
+_SIDES = {("BUY", False): 1, ("BUY", True): 2, ("SELL", False): 3, ("SELL", True): 4}
+# Order ``state``: 1 uninformed, 2 uncompleted, 3 completed, 4 cancelled, 5 invalid.
+_STATES = {1: NEW, 2: NEW, 3: FILLED, 4: CANCELED, 5: REJECTED}
+
+
+def get_market_data(endpoint: str, params: Optional[Dict[str, Any]] = None,
+                    base_url: Optional[str] = None) -> Dict[str, Any]:
+    """
+    دریافت داده‌های بازار از MEXC فیوچرز.
+
+    :param endpoint: مسیر API
+    :param params: پارامترهای درخواست
+    :param base_url: آدرس پایه (پیش‌فرض BASE_URL)
+    :return: پاسخ به صورت دیکشنری
+    """
+    url = f"{base_url or BASE_URL}{endpoint}"
+    limiter.acquire("mexc", endpoint=endpoint, priority=MARKET)
+    response = requests.get(url, params=params or {})
+    limiter.record_response("mexc", response.status_code, response.headers)
+    return response.json()
+
+
+def place_order(order_details: Dict[str, Any], base_url: Optional[str] = None,
+                api_key: str = "", api_secret: str = "") -> Dict[str, Any]:
+    """
+    ارسال سفارش به MEXC فیوچرز.
+
+    :param order_details: اطلاعات سفارش
+    :param base_url: آدرس پایه (پیش‌فرض BASE_URL)
+    :param api_key: کلید API؛ در صورت وجود درخواست امضا می‌شود
+    :param api_secret: کلید مخفی
+    :return: نتیجه سفارش
+    """
+    url = f"{base_url or BASE_URL}{ORDER_PATH}"
+    body = json.dumps(order_details, separators=(",", ":"))
+    headers = mexc_headers(api_key, api_secret, body) if api_key else {"Content-Type": "application/json"}
+    limiter.acquire("mexc", endpoint=ORDER_PATH, priority=ORDER)
+    response = requests.post(url, data=body.encode(), headers=headers)
+    limiter.record_response("mexc", response.status_code, response.headers)
+    return response.json()
+
+
+@register
+class MexcConnector(VenueConnector):
+    """MEXC futures connector.
+
+    Quantities are converted to contracts (``vol``) with the contract's
+    ``contractSize`` from ``contract/detail``.  Private requests are signed
+    over the exact body or sorted query that is sent.
+    """
+
+    venue = "mexc"
+    ping_path = "/api/v1/contract/ping"
+
+    def __init__(
+        self,
+        api_key: str = "",
+        api_secret: str = "",
+        base_url: Optional[str] = None,
+        open_type: int = 2,
+        leverage: Optional[int] = None,
+        **transport_kwargs: Any,
+    ) -> None:
+        super().__init__(base_url or endpoints.MEXC_REST_URL, **transport_kwargs)
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.open_type = open_type
+        self.leverage = leverage
+        self.contract_sizes: Dict[str, Decimal] = {}
+        self._contracts_lock = asyncio.Lock()
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+    async def _request(
+        self, method: str, path: str, *, params: Optional[Dict[str, Any]] = None,
+        payload: Any = None, signed: bool = False, orders: int = 0,
+    ) -> Any:
+        body = json.dumps(payload, separators=(",", ":")) if payload is not None else ""
+        query = mexc_param_string(params)
+        if query:
+            path = f"{path}?{query}"
+        headers = {"Content-Type": "application/json"}
+        if signed:
+            headers = mexc_headers(self.api_key, self.api_secret, body or query)
+        priority = ORDER if path.startswith("/api/v1/private/") else MARKET
+        resp, _ = await self.transport.request(
+            method, path, content=body.encode() if body else None, headers=headers,
+            endpoint=path.partition("?")[0], orders=orders, priority=priority,
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        if signed and not data.get("success", False):
+            raise RuntimeError(f"MEXC error {data.get('code')}: {data.get('message') or data.get('msg')}")
+        return data
+
+    async def load_contracts(self) -> Dict[str, Decimal]:
+        """Fetch ``contractSize`` of every contract."""
+        data = await self._request("GET", "/api/v1/contract/detail")
+        self.contract_sizes = {
+            self.canonical(item["symbol"]): to_decimal(item.get("contractSize") or 1)
+            for item in data.get("data", [])
+        }
+        return self.contract_sizes
+
+    async def _contract_size(self, symbol: str) -> Decimal:
+        canonical = self.canonical(symbol)
+        if canonical not in self.contract_sizes:
+            async with self._contracts_lock:
+                if canonical not in self.contract_sizes:
+                    await self.load_contracts()
+        return self.contract_size(canonical)
+
+    def contract_size(self, symbol: str) -> Decimal:
+        try:
+            return self.contract_sizes[self.canonical(symbol)]
+        except KeyError:
+            raise ValueError(f"Unknown MEXC contract {self.venue_symbol(symbol)}") from None
+
+    async def start(self, connections: int = 2) -> None:
+        await asyncio.gather(super().start(connections), self.load_contracts())
+
+    # ------------------------------------------------------------------
+    # Venue API
+    # ------------------------------------------------------------------
+    async def ticker(self, symbol: str) -> Ticker:
+        data = await self._request("GET", "/api/v1/contract/ticker", params={"symbol": self.venue_symbol(symbol)})
+        item = data["data"]
+        return Ticker(
+            "mexc",
+            self.canonical(item["symbol"]),
+            to_float(item.get("fairPrice") or item.get("lastPrice")),
+            to_float(item.get("indexPrice")),
+            to_float(item.get("fundingRate")),
+        )
+
+    async def place_order(self, order: OrderRequest) -> OrderAck:
+        size = await self._contract_size(order.symbol)
+        vol = to_decimal(order.quantity) / size
+        if vol != vol.to_integral_value():
+            raise ValueError(f"quantity {order.quantity} is not a multiple of {decimal_str(size)}")
+        body: Dict[str, Any] = {
+            "symbol": self.venue_symbol(order.symbol),
+            "vol": int(vol),
+            "side": _SIDES[(order.side, order.reduce_only)],
+            "type": _MARKET_TYPE if order.order_type == "MARKET" else _ORDER_TYPES[order.time_in_force],
+            "openType": self.open_type,
+        }
+        if order.price is not None:
+            body["price"] = float(to_decimal(order.price))
+        if self.leverage is not None:
+            body["leverage"] = self.leverage
+        if order.client_order_id:
+            body["externalOid"] = order.client_order_id
+        body.update(order.params)
+        try:
+            data = await self._request("POST", ORDER_PATH, payload=body, signed=True, orders=1)
+        except RuntimeError as exc:
+            return OrderAck("mexc", order.symbol, False, REJECTED, client_order_id=order.client_order_id or "",
+                            error=str(exc))
+        return OrderAck("mexc", order.symbol, True, NEW, str(data.get("data", "")),
+                        order.client_order_id or "", raw=data)
+
+    async def cancel_order(
+        self, symbol: str, *, order_id: Optional[str] = None, client_order_id: Optional[str] = None
+    ) -> OrderAck:
+        if order_id:
+            path, payload = "/api/v1/private/order/cancel", [order_id]
+        elif client_order_id:
+            path = "/api/v1/private/order/cancel_with_external"
+            payload = {"symbol": self.venue_symbol(symbol), "externalOid": client_order_id}
+        else:
+            raise ValueError("order_id or client_order_id required")
+        try:
+            data = await self._request("POST", path, payload=payload, signed=True)
+        except RuntimeError as exc:
+            return OrderAck("mexc", symbol, False, REJECTED, order_id or "", client_order_id or "", error=str(exc))
+        return OrderAck("mexc", symbol, True, CANCELED, order_id or "", client_order_id or "", raw=data)
+
+    async def order_status(
+        self, symbol: str, *, order_id: Optional[str] = None, client_order_id: Optional[str] = None
+    ) -> OrderAck:
+        if order_id:
+            path = f"/api/v1/private/order/get/{order_id}"
+        elif client_order_id:
+            path = f"/api/v1/private/order/external/{self.venue_symbol(symbol)}/{client_order_id}"
+        else:
+            raise ValueError("order_id or client_order_id required")
+        try:
+            data = await self._request("GET", path, signed=True)
+        except RuntimeError as exc:
+            return OrderAck("mexc", symbol, False, REJECTED, order_id or "", client_order_id or "", error=str(exc))
+        item = data.get("data") or {}
+        filled = to_decimal(item.get("dealVol")) * await self._contract_size(symbol)
+        status = _STATES.get(int(item.get("state") or 1), NEW)
+        if status == NEW and filled:
+            status = PARTIALLY_FILLED
+        return OrderAck(
+            "mexc", symbol, True, status, str(item.get("orderId", order_id or "")),
+            item.get("externalOid", client_order_id or ""), float(filled), to_float(item.get("dealAvgPrice")),
+            raw=data,
+        )
+
+    async def positions(self) -> List[Position]:
+        data = await self._request("GET", "/api/v1/private/position/open_positions", signed=True)
+        result = []
+        for item in data.get("data") or []:
+            vol = to_decimal(item.get("holdVol"))
+            if not vol:
+                continue
+            size = await self._contract_size(item["symbol"])
+            sign = -1 if int(item.get("positionType", 1)) == 2 else 1
+            result.append(Position(
+                "mexc",
+                self.canonical(item["symbol"]),
+                float(sign * vol * size),
+                to_float(item.get("holdAvgPrice")),
+                to_float(item.get("unrealised")),
+            ))
+        return result
@@ -1,16 +1,48 @@
 """
 ماژول ارتباط با OKX برای پشتیبانی از حالت Live و Demo.
+
+:class:`OkxConnector` پیاده‌سازی :class:`~core.exchange.connector.VenueConnector`
+برای قراردادهای دائمی (SWAP) است.
 """
-from typing import Any, Dict, Optional
+from __future__ import annotations
+
+import asyncio
+import json
 import os
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlencode
+
 import requests
 
-BASE_URL = "https://www.okx.com"
+from . import endpoints
+from .connector import (
+    CANCELED, FILLED, NEW, PARTIALLY_FILLED, REJECTED, OrderAck, OrderRequest, Position, Ticker,
+    VenueConnector, register,
+)
+from .rate_limit import MARKET, ORDER, limiter
+from .signing import okx_headers
+from .symbols import decimal_str, to_decimal, to_float
+
+BASE_URL = endpoints.OKX_REST_URL
+
+# ``ordType`` for a priced order by time-in-force.
+_ORD_TYPES = {"GTC": "limit", "IOC": "ioc", "FOK": "fok", "GTX": "post_only"}
+# Normalised status of an order ``state``.
+ORDER_STATES = {
+    "live": NEW,
+    "partially_filled": PARTIALLY_FILLED,
+    "filled": FILLED,
+    "canceled": CANCELED,
+    "mmp_canceled": CANCELED,
+}
 
 
 def _request(method: str, endpoint: str, *, params: Optional[Dict[str, Any]] = None,
-             data: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None,
-             live: Optional[int] = None) -> Dict[str, Any]:
+             data: Optional[Any] = None, headers: Optional[Dict[str, str]] = None,
+             live: Optional[int] = None, base_url: Optional[str] = None,
+             orders: int = 0) -> Dict[str, Any]:
     """
     ارسال درخواست به OKX. در حالت Demo هدر x-simulated-trading: 1 اضافه می‌شود.
 
@@ -20,18 +52,225 @@ def _request(method: str, endpoint: str, *, params: Optional[Dict[str, Any]] = N
     :param data: بدنه درخواست
     :param headers: هدرهای اضافی
     :param live: 1 برای حالت واقعی، 0 برای Demo. در صورت None از متغیر محیطی LIVE استفاده می‌شود.
+    :param base_url: آدرس پایه (پیش‌فرض BASE_URL)
+    :param orders: number of orders in the request, charged to the endpoint's rate limit
     :return: پاسخ به صورت دیکشنری
     """
     if live is None:
         live = int(os.getenv("LIVE", "1"))
-    url = f"{BASE_URL}{endpoint}"
+    url = f"{base_url or BASE_URL}{endpoint}"
     headers = headers.copy() if headers else {}
     if endpoint.startswith("/api/v5/") and not live:
         headers.setdefault("x-simulated-trading", "1")
+    priority = ORDER if endpoint.startswith("/api/v5/trade/") else MARKET
+    limiter.acquire("okx", endpoint=endpoint, orders=orders, priority=priority)
     response = requests.request(method, url, params=params, json=data, headers=headers)
+    limiter.record_response("okx", response.status_code, response.headers)
     return response.json()
 
 
-def place_order(order: Dict[str, Any], live: Optional[int] = None) -> Dict[str, Any]:
+def place_order(order: Dict[str, Any], live: Optional[int] = None,
+                base_url: Optional[str] = None) -> Dict[str, Any]:
     """ارسال سفارش (v5) به OKX."""
-    return _request("POST", "/api/v5/trade/order", data=order, live=live)
+    return _request("POST", "/api/v5/trade/order", data=order, live=live, base_url=base_url)
+
+
+@dataclass
+class Instrument:
+    """Contract value (``ctVal``) and lot size (``lotSz``) of one swap."""
+
+    inst_id: str
+    contract_size: Decimal
+    lot_size: Decimal
+
+
+@register
+class OkxConnector(VenueConnector):
+    """OKX v5 swap connector.
+
+    Quantities are converted to contracts with the instrument's ``ctVal``,
+    loaded once from ``public/instruments``; a quantity that is not a whole
+    number of lots is rejected locally.  With *live* false requests carry
+    ``x-simulated-trading: 1`` and go to the demo environment.
+    """
+
+    venue = "okx"
+    ping_path = "/api/v5/public/time"
+
+    def __init__(
+        self,
+        api_key: str = "",
+        api_secret: str = "",
+        passphrase: str = "",
+        live: bool = False,
+        base_url: Optional[str] = None,
+        td_mode: str = "cross",
+        **transport_kwargs: Any,
+    ) -> None:
+        super().__init__(base_url or endpoints.OKX_REST_URL, **transport_kwargs)
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.passphrase = passphrase
+        self.live = live
+        self.td_mode = td_mode
+        self.instruments: Dict[str, Instrument] = {}
+        self._instruments_lock = asyncio.Lock()
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+    async def _request(
+        self, method: str, path: str, *, params: Optional[Dict[str, Any]] = None,
+        payload: Any = None, signed: bool = False, orders: int = 0,
+    ) -> Dict[str, Any]:
+        headers = {"Content-Type": "application/json"}
+        if not self.live:
+            headers["x-simulated-trading"] = "1"
+        body = json.dumps(payload, separators=(",", ":")) if payload is not None else ""
+        if params:
+            path = f"{path}?{urlencode(params)}"
+        if signed and self.api_key:
+            # Signed over the exact path, query and body bytes that are sent.
+            headers.update(okx_headers(self.api_key, self.api_secret, self.passphrase, method, path, body))
+        priority = ORDER if path.startswith("/api/v5/trade/") else MARKET
+        resp, _ = await self.transport.request(
+            method, path, content=body.encode() if body else None, headers=headers,
+            endpoint=path.partition("?")[0], orders=orders, priority=priority,
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+    async def load_instruments(self) -> Dict[str, Instrument]:
+        """Fetch contract values and lot sizes of every swap."""
+        data = await self._request("GET", "/api/v5/public/instruments", params={"instType": "SWAP"})
+        self.instruments = {
+            self.canonical(item["instId"]): Instrument(
+                item["instId"], to_decimal(item.get("ctVal") or 1), to_decimal(item.get("lotSz") or 1)
+            )
+            for item in data.get("data", [])
+        }
+        return self.instruments
+
+    async def _instrument(self, symbol: str) -> Instrument:
+        canonical = self.canonical(symbol)
+        if canonical not in self.instruments:
+            async with self._instruments_lock:
+                if canonical not in self.instruments:
+                    await self.load_instruments()
+        try:
+            return self.instruments[canonical]
+        except KeyError:
+            raise ValueError(f"Unknown OKX instrument {self.venue_symbol(symbol)}") from None
+
+    def contract_size(self, symbol: str) -> Decimal:
+        instrument = self.instruments.get(self.canonical(symbol))
+        if instrument is None:
+            raise ValueError(f"Instrument {symbol} not loaded")
+        return instrument.contract_size
+
+    async def start(self, connections: int = 2) -> None:
+        await asyncio.gather(super().start(connections), self.load_instruments())
+
+    # ------------------------------------------------------------------
+    # Venue API
+    # ------------------------------------------------------------------
+    async def ticker(self, symbol: str) -> Ticker:
+        inst_id = self.venue_symbol(symbol)
+        mark, funding = await asyncio.gather(
+            self._request("GET", "/api/v5/public/mark-price", params={"instType": "SWAP", "instId": inst_id}),
+            self._request("GET", "/api/v5/public/funding-rate", params={"instId": inst_id}),
+        )
+        mark_item = mark["data"][0]
+        funding_item = (funding.get("data") or [{}])[0]
+        return Ticker(
+            "okx",
+            self.canonical(inst_id),
+            to_float(mark_item.get("markPx")),
+            funding_rate=to_float(funding_item.get("fundingRate")),
+            next_funding_ms=int(funding_item.get("fundingTime") or 0),
+        )
+
+    def _ack(self, symbol: str, data: Dict[str, Any], status: str) -> OrderAck:
+        item = (data.get("data") or [{}])[0]
+        if data.get("code") != "0" or item.get("sCode", "0") != "0":
+            error = item.get("sMsg") or data.get("msg")
+            return OrderAck("okx", symbol, False, REJECTED, client_order_id=item.get("clOrdId", ""),
+                            error=error, raw=data)
+        return OrderAck("okx", symbol, True, status, item.get("ordId", ""), item.get("clOrdId", ""), raw=data)
+
+    async def place_order(self, order: OrderRequest) -> OrderAck:
+        instrument = await self._instrument(order.symbol)
+        contracts = to_decimal(order.quantity) / instrument.contract_size
+        if contracts % instrument.lot_size:
+            raise ValueError(
+                f"quantity {order.quantity} is not a multiple of "
+                f"{decimal_str(instrument.contract_size * instrument.lot_size)} for {instrument.inst_id}"
+            )
+        body: Dict[str, Any] = {
+            "instId": instrument.inst_id,
+            "tdMode": self.td_mode,
+            "side": order.side.lower(),
+            "ordType": "market" if order.order_type == "MARKET" else _ORD_TYPES[order.time_in_force],
+            "sz": decimal_str(contracts),
+        }
+        if order.order_type != "MARKET":
+            body["px"] = decimal_str(order.price)
+        if order.reduce_only:
+            body["reduceOnly"] = True
+        if order.client_order_id:
+            body["clOrdId"] = order.client_order_id
+        body.update(order.params)
+        data = await self._request("POST", "/api/v5/trade/order", payload=body, signed=True, orders=1)
+        return self._ack(order.symbol, data, "NEW")
+
+    async def cancel_order(
+        self, symbol: str, *, order_id: Optional[str] = None, client_order_id: Optional[str] = None
+    ) -> OrderAck:
+        body = {"instId": self.venue_symbol(symbol)}
+        if order_id:
+            body["ordId"] = order_id
+        elif client_order_id:
+            body["clOrdId"] = client_order_id
+        else:
+            raise ValueError("order_id or client_order_id required")
+        data = await self._request("POST", "/api/v5/trade/cancel-order", payload=body, signed=True)
+        return self._ack(symbol, data, CANCELED)
+
+    async def order_status(
+        self, symbol: str, *, order_id: Optional[str] = None, client_order_id: Optional[str] = None
+    ) -> OrderAck:
+        instrument = await self._instrument(symbol)
+        params = {"instId": instrument.inst_id}
+        if order_id:
+            params["ordId"] = order_id
+        elif client_order_id:
+            params["clOrdId"] = client_order_id
+        else:
+            raise ValueError("order_id or client_order_id required")
+        data = await self._request("GET", "/api/v5/trade/order", params=params, signed=True)
+        ack = self._ack(symbol, data, NEW)
+        if ack.ok:
+            item = data["data"][0]
+            ack.status = ORDER_STATES.get(item.get("state", ""), NEW)
+            ack.filled_qty = float(to_decimal(item.get("accFillSz")) * instrument.contract_size)
+            ack.avg_price = to_float(item.get("avgPx"))
+        return ack
+
+    async def positions(self) -> List[Position]:
+        data = await self._request("GET", "/api/v5/account/positions", params={"instType": "SWAP"}, signed=True)
+        result = []
+        for item in data.get("data", []):
+            contracts = to_decimal(item.get("pos"))
+            if not contracts:
+                continue
+            if item.get("posSide") == "short":
+                contracts = -abs(contracts)
+            instrument = await self._instrument(item["instId"])
+            result.append(Position(
+                "okx",
+                self.canonical(item["instId"]),
+                float(contracts * instrument.contract_size),
+                to_float(item.get("avgPx")),
+                to_float(item.get("upl")),
+            ))
+        return result
@@ -0,0 +1,214 @@
+"""Process-wide, weight-aware rate limiter shared by every exchange client.
+
+Budgets are fixed windows aligned to the wall clock, the way Binance and OKX
+count them.  Each venue has a set of budgets:
+
+* ``weight`` – Binance request weight (``X-MBX-USED-WEIGHT-1M``),
+* ``orders`` – Binance order count (``X-MBX-ORDER-COUNT-10S`` / ``-1M``),
+* an endpoint path such as ``/api/v5/trade/order`` – OKX per-endpoint limits,
+  with ``*`` as the fallback for endpoints without a dedicated budget.
+
+Market-data traffic may only use ``market_share`` of any budget, so the
+remaining headroom is always available to order traffic.  Responses are fed
+back through :meth:`RateLimiter.record_response`, which adopts the server's
+own usage counters and pauses a venue after HTTP 429/418.
+
+All clients use the module-level :data:`limiter`::
+
+    limiter.acquire("binance", weight=1, orders=1, priority=ORDER)
+    resp = session.post(...)
+    limiter.record_response("binance", resp.status_code, resp.headers)
+"""
+from __future__ import annotations
+
+import asyncio
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+ORDER = "order"
+MARKET = "market"
+
+_INTERVAL_SECONDS = {"S": 1, "M": 60, "H": 3600, "D": 86_400}
+_HEADER_RE = re.compile(r"^x-mbx-(used-weight|order-count)-(\d+)([smhd])$", re.IGNORECASE)
+
+# (budget key, limit, window seconds)
+DEFAULT_BUDGETS: Dict[str, List[Tuple[str, float, float]]] = {
+    "binance": [
+        ("weight", 2400, 60),
+        ("orders", 300, 10),
+        ("orders", 1200, 60),
+    ],
+    "okx": [
+        ("/api/v5/trade/order", 60, 2),
+        ("/api/v5/trade/cancel-order", 60, 2),
+        ("/api/v5/trade/batch-orders", 300, 2),
+        ("/api/v5/public/funding-rate", 20, 2),
+        ("/api/v5/market/index-tickers", 20, 2),
+        ("*", 20, 2),
+    ],
+    "mexc": [
+        ("*", 20, 2),
+    ],
+}
+
+
+class _Window:
+    __slots__ = ("key", "limit", "window_s", "used", "start")
+
+    def __init__(self, key: str, limit: float, window_s: float) -> None:
+        self.key = key
+        self.limit = float(limit)
+        self.window_s = float(window_s)
+        self.used = 0.0
+        self.start = 0.0
+
+    def roll(self, now: float) -> None:
+        start = now - (now % self.window_s)
+        if start != self.start:
+            self.start = start
+            self.used = 0.0
+
+    def wait_for(self, cost: float, cap: float, now: float) -> float:
+        """Seconds until *cost* fits under *cap*, ``0`` if it fits now."""
+        if cost <= 0 or self.used + cost <= cap:
+            return 0.0
+        if cost > cap:
+            raise ValueError(f"cost {cost} exceeds {self.key} budget cap {cap}")
+        return self.start + self.window_s - now
+
+
+class RateLimiter:
+    """Track per-venue request budgets and block callers until they fit."""
+
+    def __init__(
+        self,
+        budgets: Optional[Mapping[str, List[Tuple[str, float, float]]]] = None,
+        market_share: float = 0.8,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if not 0 < market_share <= 1:
+            raise ValueError("market_share must be in (0, 1]")
+        self.market_share = market_share
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._windows: Dict[str, List[_Window]] = {}
+        self._blocked_until: Dict[str, float] = {}
+        for venue, specs in (budgets if budgets is not None else DEFAULT_BUDGETS).items():
+            for key, limit, window_s in specs:
+                self.register(venue, key, limit, window_s)
+
+    def register(self, venue: str, key: str, limit: float, window_s: float) -> None:
+        """Add a budget of *limit* units per *window_s* seconds for *venue*."""
+        with self._lock:
+            self._windows.setdefault(venue, []).append(_Window(key, limit, window_s))
+
+    # ------------------------------------------------------------------
+    # Acquisition
+    # ------------------------------------------------------------------
+    def _costs(
+        self, venue: str, weight: float, orders: float, endpoint: Optional[str]
+    ) -> List[Tuple[_Window, float]]:
+        windows = self._windows.get(venue, [])
+        keys = {w.key for w in windows}
+        endpoint_key = endpoint if endpoint in keys else "*"
+        costs = []
+        for window in windows:
+            if window.key == "weight":
+                costs.append((window, weight))
+            elif window.key == "orders":
+                costs.append((window, orders))
+            elif window.key == endpoint_key and endpoint is not None:
+                costs.append((window, orders or 1))
+        return costs
+
+    def try_acquire(
+        self,
+        venue: str,
+        weight: float = 1,
+        *,
+        orders: float = 0,
+        endpoint: Optional[str] = None,
+        priority: str = MARKET,
+    ) -> float:
+        """Consume budget if available and return ``0``; otherwise return the wait.
+
+        Nothing is consumed when a wait is returned.
+        """
+        with self._lock:
+            now = self._clock()
+            blocked = self._blocked_until.get(venue, 0.0) - now
+            if blocked > 0:
+                return blocked
+            share = 1.0 if priority == ORDER else self.market_share
+            costs = self._costs(venue, weight, orders, endpoint)
+            wait = 0.0
+            for window, cost in costs:
+                window.roll(now)
+                wait = max(wait, window.wait_for(cost, window.limit * share, now))
+            if wait > 0:
+                return wait
+            for window, cost in costs:
+                window.used += cost
+            return 0.0
+
+    def acquire(self, venue: str, weight: float = 1, **kwargs: object) -> None:
+        """Block the calling thread until the request fits every budget."""
+        while True:
+            wait = self.try_acquire(venue, weight, **kwargs)  # type: ignore[arg-type]
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, venue: str, weight: float = 1, **kwargs: object) -> None:
+        """Wait on the event loop until the request fits every budget."""
+        while True:
+            wait = self.try_acquire(venue, weight, **kwargs)  # type: ignore[arg-type]
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    # ------------------------------------------------------------------
+    # Feedback from responses
+    # ------------------------------------------------------------------
+    def update_from_headers(self, venue: str, headers: Mapping[str, str]) -> None:
+        """Adopt Binance's ``X-MBX-USED-WEIGHT-*`` / ``X-MBX-ORDER-COUNT-*`` counters."""
+        with self._lock:
+            now = self._clock()
+            for name, value in headers.items():
+                match = _HEADER_RE.match(name)
+                if not match:
+                    continue
+                key = "weight" if match.group(1).lower() == "used-weight" else "orders"
+                window_s = int(match.group(2)) * _INTERVAL_SECONDS[match.group(3).upper()]
+                for window in self._windows.get(venue, []):
+                    if window.key == key and window.window_s == window_s:
+                        window.roll(now)
+                        window.used = max(window.used, float(value))
+
+    def penalize(self, venue: str, seconds: float) -> None:
+        """Block all traffic to *venue* for *seconds*."""
+        with self._lock:
+            until = self._clock() + seconds
+            self._blocked_until[venue] = max(self._blocked_until.get(venue, 0.0), until)
+
+    def record_response(self, venue: str, status: int, headers: Mapping[str, str]) -> None:
+        """Update budgets from a response and back off on 429/418."""
+        self.update_from_headers(venue, headers)
+        if status in (418, 429):
+            retry_after = headers.get("Retry-After") or headers.get("retry-after")
+            self.penalize(venue, float(retry_after) if retry_after else 1.0)
+
+    def headroom(self, venue: str) -> Dict[str, float]:
+        """Remaining units per budget, keyed ``"<key>/<window>s"``."""
+        with self._lock:
+            now = self._clock()
+            out = {}
+            for window in self._windows.get(venue, []):
+                window.roll(now)
+                out[f"{window.key}/{window.window_s:g}s"] = window.limit - window.used
+            return out
+
+
+limiter = RateLimiter()
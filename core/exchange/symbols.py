@@ -0,0 +1,87 @@
+"""Canonical symbols and numeric normalisation shared by the venue connectors.
+
+Strategies address a perpetual by one canonical name – the Binance spelling,
+``BTCUSDT`` – and each connector maps it to the venue's own form:
+
+============  ==================
+venue         ``BTCUSDT`` becomes
+============  ==================
+``binance``   ``BTCUSDT``
+``okx``       ``BTC-USDT-SWAP``
+``mexc``      ``BTC_USDT``
+============  ==================
+
+Venues return prices and sizes as strings, numbers or empty strings and
+expect them back without exponents; :func:`to_decimal`, :func:`to_float` and
+:func:`decimal_str` give one behaviour for all of them.
+"""
+from __future__ import annotations
+
+from decimal import Decimal, InvalidOperation
+from typing import Any, Tuple
+
+QUOTE_ASSETS = ("USDT", "USDC", "BUSD", "FDUSD", "USD")
+
+VENUES = ("binance", "okx", "mexc")
+
+
+def split_symbol(symbol: str) -> Tuple[str, str]:
+    """``(base, quote)`` of a symbol in any supported venue spelling."""
+    s = symbol.upper()
+    if s.endswith("-SWAP"):
+        s = s[: -len("-SWAP")]
+    for sep in ("-", "_", "/"):
+        if sep in s:
+            base, _, quote = s.partition(sep)
+            return base, quote
+    # Longest quote first, so ``BTCFDUSD`` is BTC/FDUSD rather than BTCFD/USD.
+    for quote in sorted(QUOTE_ASSETS, key=len, reverse=True):
+        if s.endswith(quote) and len(s) > len(quote):
+            return s[: -len(quote)], quote
+    raise ValueError(f"Cannot split symbol {symbol!r} into base and quote")
+
+
+def to_canonical(symbol: str) -> str:
+    """Canonical ``BASEQUOTE`` name of a perpetual given in any venue spelling."""
+    base, quote = split_symbol(symbol)
+    return base + quote
+
+
+def to_venue(symbol: str, venue: str) -> str:
+    """Spelling of *symbol* (any form) on *venue*."""
+    base, quote = split_symbol(symbol)
+    if venue == "binance":
+        return base + quote
+    if venue == "okx":
+        return f"{base}-{quote}-SWAP"
+    if venue == "mexc":
+        return f"{base}_{quote}"
+    raise ValueError(f"Unknown venue {venue!r}")
+
+
+def to_decimal(value: Any) -> Decimal:
+    """Exact ``Decimal`` for a venue number; ``None`` and ``""`` become zero."""
+    if value is None or value == "":
+        return Decimal(0)
+    if isinstance(value, Decimal):
+        return value
+    try:
+        # ``str`` first so floats keep their shortest repr (0.1, not 0.1000000000000000055...).
+        return Decimal(str(value))
+    except InvalidOperation as exc:
+        raise ValueError(f"Not a number: {value!r}") from exc
+
+
+def to_float(value: Any) -> float:
+    """``float`` for a venue number; ``None`` and ``""`` become zero."""
+    if value is None or value == "":
+        return 0.0
+    return float(value)
+
+
+def decimal_str(value: Any) -> str:
+    """Plain decimal string without exponent or trailing zeros (``1e-05`` -> ``0.00001``)."""
+    d = to_decimal(value)
+    if d == 0:
+        return "0"
+    return format(d.normalize(), "f")
@@ -0,0 +1,189 @@
+"""Long-lived, pooled async HTTP transport for order traffic.
+
+One :class:`AsyncTransport` per venue holds an ``httpx.AsyncClient`` whose
+connections are kept alive between orders, negotiates HTTP/2 when the
+optional ``h2`` package is installed, and can be pre-warmed so the first
+order does not pay the TCP and TLS handshakes.  Many requests can be in flight
+on one event loop at once; the shared :data:`~core.exchange.rate_limit.limiter`
+is consulted before each of them.
+
+Every request is traced through httpx's ``trace`` extension and returns a
+:class:`RequestTiming` splitting its latency into connect, TLS and
+time-to-first-byte.  A reused keep-alive connection reports zero for the first
+two.  Round trips are also recorded in the shared
+:data:`~core.exchange.latency.latency` histograms.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import httpx
+
+from core.data.logger import logger
+
+from .latency import latency
+from .rate_limit import MARKET, ORDER, limiter
+
+try:  # pragma: no cover - depends on the environment
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    HTTP2_AVAILABLE = False
+
+DEFAULT_TIMEOUT = httpx.Timeout(5.0, connect=2.0)
+
+
+class RequestTiming:
+    """Latency breakdown of one request, in milliseconds."""
+
+    __slots__ = ("connect_ms", "tls_ms", "ttfb_ms", "total_ms", "http_version")
+
+    def __init__(self) -> None:
+        self.connect_ms = 0.0
+        self.tls_ms = 0.0
+        self.ttfb_ms = 0.0
+        self.total_ms = 0.0
+        self.http_version = ""
+
+    @property
+    def reused(self) -> bool:
+        """Whether the request went over an already open connection."""
+        return self.connect_ms == 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"RequestTiming(connect_ms={self.connect_ms:.2f}, tls_ms={self.tls_ms:.2f}, "
+            f"ttfb_ms={self.ttfb_ms:.2f}, total_ms={self.total_ms:.2f})"
+        )
+
+
+class _Tracer:
+    """Collects httpcore trace events for one request."""
+
+    __slots__ = ("timing", "_marks")
+
+    def __init__(self, timing: RequestTiming) -> None:
+        self.timing = timing
+        self._marks: Dict[str, float] = {}
+
+    async def __call__(self, name: str, info: Dict[str, Any]) -> None:
+        now = time.perf_counter()
+        # ``connection.connect_tcp.started``, ``http11.send_request_body.complete``, ...
+        _, _, event = name.partition(".")
+        marks = self._marks
+        marks[event] = now
+        timing = self.timing
+        if event == "connect_tcp.complete":
+            timing.connect_ms = (now - marks["connect_tcp.started"]) * 1000
+        elif event == "start_tls.complete":
+            timing.tls_ms = (now - marks["start_tls.started"]) * 1000
+        elif event == "receive_response_headers.complete":
+            sent = marks.get("send_request_body.complete", marks.get("send_request_headers.complete", now))
+            timing.ttfb_ms = (now - sent) * 1000
+
+
+TimingCallback = Callable[[str, str, RequestTiming], None]
+
+
+class AsyncTransport:
+    """Pooled keep-alive HTTP client for one venue."""
+
+    def __init__(
+        self,
+        venue: str,
+        base_url: str,
+        *,
+        http2: bool = True,
+        timeout: httpx.Timeout = DEFAULT_TIMEOUT,
+        max_connections: int = 20,
+        keepalive_expiry: float = 60.0,
+        headers: Optional[Dict[str, str]] = None,
+        on_timing: Optional[TimingCallback] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self.venue = venue
+        self.base_url = base_url
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.on_timing = on_timing
+        self.last_timing: Optional[RequestTiming] = None
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            http2=self.http2,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            headers=headers,
+            transport=transport,
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._client
+
+    async def warm_up(self, path: str, connections: int = 1) -> int:
+        """Open *connections* pooled connections with concurrent ``GET path`` calls.
+
+        Over HTTP/2 a single connection multiplexes every request, so one is
+        enough.  Returns how many warm-up requests got a response; failures are
+        logged, not raised, since the pool then simply fills on first use.
+        """
+        count = 1 if self.http2 else max(1, connections)
+        results = await asyncio.gather(
+            *(self.request("GET", path, priority=MARKET) for _ in range(count)), return_exceptions=True
+        )
+        ok = 0
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.warning("%s warm-up request failed: %s", self.venue, result)
+            else:
+                ok += 1
+        return ok
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        weight: float = 1,
+        orders: float = 0,
+        endpoint: Optional[str] = None,
+        priority: str = ORDER,
+        **kwargs: Any,
+    ) -> Tuple[httpx.Response, RequestTiming]:
+        """Send a request through the pool and return it with its timing.
+
+        *weight*, *orders* and *endpoint* are charged to the rate limiter
+        (*endpoint* defaults to *path*); remaining keyword arguments go to
+        :meth:`httpx.AsyncClient.request`.
+        """
+        await limiter.acquire_async(
+            self.venue, weight, orders=orders, endpoint=endpoint or path, priority=priority
+        )
+        timing = RequestTiming()
+        extensions = dict(kwargs.pop("extensions", None) or {})
+        extensions["trace"] = _Tracer(timing)
+        started = time.perf_counter()
+        response = await self._client.request(method, path, extensions=extensions, **kwargs)
+        timing.total_ms = (time.perf_counter() - started) * 1000
+        timing.http_version = response.http_version
+        limiter.record_response(self.venue, response.status_code, response.headers)
+        latency.record_rtt(self.venue, endpoint or path, timing.total_ms)
+        self.last_timing = timing
+        if self.on_timing is not None:
+            self.on_timing(self.venue, endpoint or path, timing)
+        return response, timing
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def __aenter__(self) -> "AsyncTransport":
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.aclose()
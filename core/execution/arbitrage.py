@@ -1,7 +1,350 @@
-"""Arbitrage execution strategy placeholder."""
-from typing import Any, Dict
+"""Concurrent two-leg arbitrage execution.
 
+:class:`ArbitrageExecutor` fires both legs of a trade – typically a Binance
+perpetual against an OKX swap – at the same moment through the venue
+connectors, one :class:`LegSubmitter` per venue.  Every leg is stamped on send
+and on acknowledgement, so each :class:`ArbitrageResult` carries the per-leg
+latency and the skew between the legs.
+
+Every order, including repairs, has to be acknowledged within
+``max_leg_latency_ms`` – the same budget :class:`Orchestrator` checks before
+entering – or it is treated as timed out.  When the legs end up with different
+fills the executor repairs the imbalance:
+
+* a leg that was rejected or only partly filled is *hedged* by sending the
+  missing quantity again at market,
+* otherwise – or if the hedge fails too – the excess on the other leg is
+  *unwound* with a reduce-only market order.
+
+Every leg carries a client order id.  A leg that timed out or failed in
+transport may still have reached the exchange, so before repairing anything
+the executor asks the submitter to *reconcile* it – query the order by that id,
+cancelling it first if it is still open – and repairs against the real fill.
+A reconciled leg is never re-sent; the other leg is unwound instead.  If the
+fill cannot be established either, nothing is sent and the result is
+``unbalanced``.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, Optional, Protocol, Tuple
+
+from core.data.logger import logger
+from core.exchange.connector import NEW, OrderRequest
+from core.exchange.symbols import to_decimal
+from orders.tracker import TERMINAL, new_client_order_id
+
+FILLED = "FILLED"
+PARTIAL = "PARTIAL"
+REJECTED = "REJECTED"
+TIMEOUT = "TIMEOUT"
+ERROR = "ERROR"
+
+COMPLETE = "complete"
+HEDGED = "hedged"
+UNWOUND = "unwound"
+FAILED = "failed"
+UNBALANCED = "unbalanced"
+
+_QTY_EPS = 1e-12
+
+
+@dataclass
+class Leg:
+    """One order of an arbitrage pair, in canonical symbol and base-asset quantity."""
+
+    venue: str
+    symbol: str
+    side: str
+    quantity: float
+    price: Optional[float] = None
+    reduce_only: bool = False
+    params: Dict[str, Any] = field(default_factory=dict)
+    client_order_id: str = ""
+
+    def opposite(self, quantity: float) -> "Leg":
+        """Reduce-only market order that closes *quantity* of this leg.
+
+        Repair orders keep the leg's *params*, such as ``positionSide`` or
+        ``posSide`` on hedge-mode accounts.
+        """
+        side = "SELL" if self.side.upper() == "BUY" else "BUY"
+        return Leg(self.venue, self.symbol, side, quantity, reduce_only=True, params=dict(self.params))
+
+    def remainder(self, quantity: float) -> "Leg":
+        """Market order for the *quantity* this leg still lacks."""
+        return Leg(self.venue, self.symbol, self.side, quantity, reduce_only=self.reduce_only,
+                   params=dict(self.params))
+
+
+@dataclass
+class LegFill:
+    """Normalised venue acknowledgement of one order."""
+
+    status: str
+    filled_qty: float = 0.0
+    order_id: Optional[str] = None
+    response: Any = None
+    error: Optional[str] = None
+
+
+@dataclass
+class LegReport:
+    """What happened to one leg, with send/ack timestamps in ``perf_counter_ns``."""
+
+    leg: Leg
+    sent_ns: int
+    ack_ns: int
+    fill: LegFill
+    reconciled: bool = False
+
+    @property
+    def latency_ms(self) -> float:
+        return (self.ack_ns - self.sent_ns) / 1e6
+
+    @property
+    def filled_qty(self) -> float:
+        return self.fill.filled_qty
+
+    @property
+    def status(self) -> str:
+        return self.fill.status
+
+
+@dataclass
+class ArbitrageResult:
+    """Outcome of :meth:`ArbitrageExecutor.execute`."""
+
+    legs: Tuple[LegReport, LegReport]
+    outcome: str
+    repairs: Tuple[LegReport, ...] = ()
+
+    @property
+    def send_skew_ms(self) -> float:
+        return abs(self.legs[0].sent_ns - self.legs[1].sent_ns) / 1e6
+
+    @property
+    def ack_skew_ms(self) -> float:
+        """Time between the two acknowledgements – the leg skew."""
+        return abs(self.legs[0].ack_ns - self.legs[1].ack_ns) / 1e6
+
+    @property
+    def ok(self) -> bool:
+        return self.outcome in (COMPLETE, HEDGED)
+
+
+class LegSubmitter(Protocol):
+    """Sends a :class:`Leg` to one venue and reports the fill."""
+
+    async def submit(self, leg: Leg) -> LegFill:  # pragma: no cover - protocol
+        ...
+
+    async def reconcile(self, leg: Leg) -> LegFill:  # pragma: no cover - protocol
+        """Final fill of a leg whose :meth:`submit` timed out or failed."""
+        ...
+
+
+class ConnectorLegSubmitter:
+    """Adapter for a :class:`~core.exchange.connector.VenueConnector`.
+
+    Legs carry canonical symbols and base-asset quantities and the connector
+    converts both for its venue, so an OKX leg goes out in contracts of the
+    instrument's ``ctVal``.  Priced legs are sent IOC, the rest at market.
+
+    An acknowledgement that carries a final fill (Binance ``RESULT``) is
+    used as is; only the empty dry-run acknowledgement of ``order/test``
+    counts as filled in full.  Otherwise – every OKX acknowledgement, or an
+    IOC still ``NEW`` – the leg waits for the order to finish on a *tracker*
+    fed by the venue's user stream, or without one settles it as
+    :meth:`reconcile` does, and reports the real fill in base asset.
+
+    :meth:`reconcile` looks the order up by the leg's client order id; an
+    order still open is cancelled first so its fill cannot grow afterwards,
+    and an order the venue does not know was never placed.
+    """
+
+    def __init__(self, connector: Any, tracker: Any = None) -> None:
+        self.connector = connector
+        self.tracker = tracker
+
+    def _status(self, leg: Leg, filled: float) -> str:
+        return FILLED if filled >= leg.quantity - _QTY_EPS else PARTIAL if filled > 0 else REJECTED
+
+    async def submit(self, leg: Leg) -> LegFill:
+        request = OrderRequest(
+            leg.symbol,
+            leg.side,
+            leg.quantity,
+            leg.price,
+            time_in_force="IOC",
+            reduce_only=leg.reduce_only,
+            client_order_id=leg.client_order_id or new_client_order_id(),
+            params=dict(leg.params),
+        )
+        if self.tracker is not None:
+            # Registered before sending so an early push is not missed.
+            self.tracker.track(request.client_order_id, self.connector.venue, leg.symbol, request.side)
+        ack = await self.connector.place_order(request)
+        if not ack.ok:
+            self._forget(request.client_order_id)
+            return LegFill(REJECTED, order_id=ack.order_id or None, response=ack.raw, error=ack.error)
+        if not ack.raw:
+            # order/test answers with an empty object: a dry run.
+            self._forget(request.client_order_id)
+            return LegFill(FILLED, leg.quantity, ack.order_id or None, ack.raw)
+        if ack.status != NEW:
+            return LegFill(self._status(leg, ack.filled_qty), ack.filled_qty, ack.order_id, ack.raw)
+        if self.tracker is None:
+            return await self._settle(leg, request.client_order_id)
+        state = await self.tracker.wait_done(request.client_order_id)
+        # User streams report venue units, contracts on OKX.
+        filled = float(to_decimal(state.filled_qty) * self.connector.contract_size(leg.symbol))
+        return LegFill(self._status(leg, filled), filled, ack.order_id, ack.raw)
+
+    def _forget(self, client_order_id: str) -> None:
+        """Drop a tracked order the user stream will never finish."""
+        if self.tracker is None:
+            return
+        state = self.tracker.get(client_order_id)
+        if state is not None and not state.done:
+            self.tracker.forget(client_order_id)
+
+    async def _final_status(self, leg: Leg, client_order_id: str) -> Any:
+        """Status of the order once it is terminal, cancelling it if still open."""
+        ack = await self.connector.order_status(leg.symbol, client_order_id=client_order_id)
+        if ack.ok and ack.status not in TERMINAL:
+            await self.connector.cancel_order(leg.symbol, client_order_id=client_order_id)
+            ack = await self.connector.order_status(leg.symbol, client_order_id=client_order_id)
+        if ack.ok and ack.status not in TERMINAL:
+            raise RuntimeError(f"order {client_order_id} still {ack.status} after cancel")
+        return ack
+
+    async def _settle(self, leg: Leg, client_order_id: str) -> LegFill:
+        ack = await self._final_status(leg, client_order_id)
+        if not ack.ok:
+            raise RuntimeError(f"order {client_order_id} accepted but unknown: {ack.error}")
+        return LegFill(self._status(leg, ack.filled_qty), ack.filled_qty, ack.order_id, ack.raw)
+
+    async def reconcile(self, leg: Leg) -> LegFill:
+        ack = await self._final_status(leg, leg.client_order_id)
+        state = self.tracker.get(leg.client_order_id) if self.tracker is not None else None
+        if ack.ok:
+            fill = LegFill(self._status(leg, ack.filled_qty), ack.filled_qty, ack.order_id, ack.raw)
+        elif state is not None and state.done:
+            filled = float(to_decimal(state.filled_qty) * self.connector.contract_size(leg.symbol))
+            fill = LegFill(self._status(leg, filled), filled, state.order_id or None)
+        else:
+            fill = LegFill(REJECTED, response=ack.raw, error=ack.error)
+        # Settled here; an event the stream missed will not finish it there.
+        self._forget(leg.client_order_id)
+        return fill
+
+
+class ArbitrageExecutor:
+    """Submit both legs concurrently under a per-order latency budget.
+
+    *reconcile_timeout_ms* bounds the status query of a leg that timed out or
+    failed; it is not part of the latency budget.
+    """
+
+    def __init__(
+        self,
+        submitters: Dict[str, LegSubmitter],
+        max_leg_latency_ms: float = 250.0,
+        clock: Callable[[], int] = time.perf_counter_ns,
+        reconcile_timeout_ms: float = 5_000.0,
+    ) -> None:
+        if max_leg_latency_ms <= 0:
+            raise ValueError("max_leg_latency_ms must be positive")
+        if reconcile_timeout_ms <= 0:
+            raise ValueError("reconcile_timeout_ms must be positive")
+        self.submitters = submitters
+        self.max_leg_latency_ms = max_leg_latency_ms
+        self.reconcile_timeout_ms = reconcile_timeout_ms
+        self._clock = clock
+
+    async def _send(self, leg: Leg, budget_ms: float, start: asyncio.Event) -> LegReport:
+        submitter = self.submitters[leg.venue]
+        if not leg.client_order_id:
+            leg = replace(leg, client_order_id=new_client_order_id())
+        await start.wait()
+        sent = self._clock()
+        try:
+            fill = await asyncio.wait_for(submitter.submit(leg), budget_ms / 1000)
+        except asyncio.TimeoutError:
+            fill = LegFill(TIMEOUT, error=f"no ack within {budget_ms:g} ms")
+        except Exception as exc:  # noqa: BLE001 - reported per leg
+            fill = LegFill(ERROR, error=str(exc))
+        ack = self._clock()
+        if fill.status not in (TIMEOUT, ERROR):
+            return LegReport(leg, sent, ack, fill)
+        reconciled = await self._reconcile(submitter, leg)
+        if reconciled is None:
+            return LegReport(leg, sent, ack, fill)
+        reconciled.error = fill.error
+        return LegReport(leg, sent, ack, reconciled, reconciled=True)
+
+    async def _reconcile(self, submitter: LegSubmitter, leg: Leg) -> Optional[LegFill]:
+        reconcile = getattr(submitter, "reconcile", None)
+        if reconcile is None:
+            return None
+        try:
+            return await asyncio.wait_for(reconcile(leg), self.reconcile_timeout_ms / 1000)
+        except Exception as exc:  # noqa: BLE001 - the fill stays unknown
+            logger.error("Could not reconcile %s leg %s: %s", leg.venue, leg.client_order_id, exc)
+            return None
+
+    async def _send_one(self, leg: Leg, budget_ms: float) -> LegReport:
+        start = asyncio.Event()
+        start.set()
+        return await self._send(leg, budget_ms, start)
+
+    async def execute(
+        self, leg_a: Leg, leg_b: Leg, max_leg_latency_ms: Optional[float] = None
+    ) -> ArbitrageResult:
+        """Send both legs at once, then hedge or unwind any fill imbalance."""
+        for leg in (leg_a, leg_b):
+            if leg.venue not in self.submitters:
+                raise ValueError(f"No submitter for venue {leg.venue}")
+        budget = max_leg_latency_ms or self.max_leg_latency_ms
+        # Both coroutines are parked on one event so neither starts before
+        # the other has been scheduled.
+        start = asyncio.Event()
+        tasks = [asyncio.ensure_future(self._send(leg, budget, start)) for leg in (leg_a, leg_b)]
+        start.set()
+        report_a, report_b = await asyncio.gather(*tasks)
+        result = await self._repair(report_a, report_b, budget)
+        if not result.ok:
+            logger.warning(
+                "Arbitrage %s: %s %s/%s, %s %s/%s",
+                result.outcome, leg_a.venue, report_a.status, report_a.filled_qty,
+                leg_b.venue, report_b.status, report_b.filled_qty,
+            )
+        return result
+
+    async def _repair(self, a: LegReport, b: LegReport, budget: float) -> ArbitrageResult:
+        if a.status in (TIMEOUT, ERROR) or b.status in (TIMEOUT, ERROR):
+            # A fill that could not be reconciled is unknown; trading against
+            # a guess could open the naked position the repair should close.
+            return ArbitrageResult((a, b), UNBALANCED)
+        gap = a.filled_qty - b.filled_qty
+        if abs(gap) <= _QTY_EPS:
+            outcome = COMPLETE if a.filled_qty > 0 else FAILED
+            return ArbitrageResult((a, b), outcome)
+
+        ahead, behind = (a, b) if gap > 0 else (b, a)
+        missing = abs(gap)
+        repairs = []
+        if behind.status in (REJECTED, PARTIAL) and not behind.reconciled:
+            hedge = await self._send_one(behind.leg.remainder(missing), budget)
+            repairs.append(hedge)
+            missing -= hedge.filled_qty
+            if missing <= _QTY_EPS:
+                return ArbitrageResult((a, b), HEDGED, tuple(repairs))
+        unwind = await self._send_one(ahead.leg.opposite(missing), budget)
+        repairs.append(unwind)
+        outcome = UNWOUND if unwind.filled_qty >= missing - _QTY_EPS else UNBALANCED
+        return ArbitrageResult((a, b), outcome, tuple(repairs))
 
-def execute(order: Dict[str, Any]) -> Dict[str, Any]:
-    """Return the order unchanged as a stub implementation."""
-    return order
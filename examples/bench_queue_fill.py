@@ -0,0 +1,81 @@
+"""Benchmark :class:`sim.queue_fill.QueueReplay` over a synthetic trading day.
+
+Generates a day of 100ms depth messages around a random-walk mid plus a
+trade tape, builds the replay index and simulates post-only orders joining
+the best bid at a fixed interval.
+
+Run with ``python -m examples.bench_queue_fill [--hours 24] [--every-ms 10000]``.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from sim.queue_fill import DEPTH_DTYPE, MARKET_TRADE_DTYPE, QueueReplay
+
+TICK = 0.1
+LEVELS = 5
+
+
+def synthetic_day(hours: float, seed: int = 0):
+    """Depth rows for the top :data:`LEVELS` levels a side, every 100ms, and trades."""
+    rng = np.random.default_rng(seed)
+    n = int(hours * 36_000)
+    ts = 1_700_000_000_000 + np.arange(n, dtype=np.int64) * 100
+    # Best bid in ticks; the ask is one tick above.
+    best = 300_000 + np.cumsum(rng.choice([-1, 0, 0, 0, 0, 0, 1], n))
+    offsets = np.arange(LEVELS)
+    depth = np.empty((n, 2 * LEVELS), dtype=DEPTH_DTYPE)
+    depth["ts"] = ts[:, None]
+    depth["bid"][:, :LEVELS] = True
+    depth["bid"][:, LEVELS:] = False
+    depth["price"][:, :LEVELS] = (best[:, None] - offsets) * TICK
+    depth["price"][:, LEVELS:] = (best[:, None] + 1 + offsets) * TICK
+    depth["qty"] = rng.gamma(2.0, 1.0, (n, 2 * LEVELS)).round(3)
+    # Levels that left the top when the mid moved are removed.
+    moved = np.flatnonzero(np.diff(best)) + 1
+    gone = np.empty((len(moved), 2), dtype=DEPTH_DTYPE)
+    gone["ts"] = ts[moved, None]
+    gone["bid"] = [True, False]
+    up = best[moved] > best[moved - 1]
+    gone["price"][:, 0] = np.where(up, best[moved - 1] - LEVELS + 1, best[moved - 1]) * TICK
+    gone["price"][:, 1] = np.where(up, best[moved - 1] + 1, best[moved - 1] + LEVELS) * TICK
+    gone["qty"] = 0.0
+    depth = np.concatenate([depth.ravel(), gone.ravel()])
+
+    k = n // 2
+    at = rng.integers(0, n, k)
+    trades = np.empty(k, dtype=MARKET_TRADE_DTYPE)
+    trades["ts"] = ts[at] - rng.integers(0, 100, k)
+    trades["buyer_maker"] = rng.random(k) < 0.5
+    trades["price"] = np.where(trades["buyer_maker"], best[at], best[at] + 1) * TICK
+    trades["qty"] = rng.exponential(0.5, k).round(3)
+    return depth, trades
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--every-ms", type=float, default=10_000)
+    parser.add_argument("--horizon-ms", type=float, default=60_000)
+    args = parser.parse_args()
+    depth, trades = synthetic_day(args.hours)
+
+    t0 = time.perf_counter()
+    replay = QueueReplay(depth, trades)
+    index_s = time.perf_counter() - t0
+    print(f"index: {len(depth):,} depth rows, {len(trades):,} trades in {index_s:.2f}s "
+          f"({len(depth) / index_s:,.0f} rows/s)")
+
+    t0 = time.perf_counter()
+    report = replay.join_best("buy", args.every_ms, qty=0.5, horizon_ms=args.horizon_ms, latency_ms=20)
+    sim_s = time.perf_counter() - t0
+    print(f"orders: {len(report):,} in {sim_s:.2f}s ({len(report) / sim_s:,.0f} orders/s)")
+    print(f"fill probability {report.fill_probability():.3f}, reject rate {report.reject_rate:.3f}, "
+          f"fill time p50/p90 {report.fill_time_quantiles([0.5, 0.9]).round(0)} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Benchmark :class:`sim.simulator_tca.TCASimulator` in legs per second.
+
+Compares ``simulate_order`` over ``Leg`` objects with ``simulate_batch`` over
+NumPy columns, and checks both give the same floats.
+
+Run with ``python -m examples.bench_tca [--legs 1000000]``.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from sim.simulator_tca import Leg, TCASimulator
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--legs", type=int, default=1_000_000)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    n = args.legs
+    side = rng.random(n) < 0.5
+    quantity = rng.uniform(0.001, 20, n)
+    arrival_mid = rng.uniform(10, 50_000, n)
+    limit_price = arrival_mid * rng.uniform(0.99, 1.01, n)
+    sim = TCASimulator(fill_prob=0.8, adverse_selection=1.5, latency_ms=40.0, depth=5.0)
+
+    t0 = time.perf_counter()
+    batch = sim.simulate_batch(side, quantity, limit_price, arrival_mid)
+    batch_s = time.perf_counter() - t0
+
+    m = min(n, 100_000)
+    legs = [
+        Leg("buy" if b else "sell", q, p, a)
+        for b, q, p, a in zip(side[:m].tolist(), quantity[:m].tolist(), limit_price[:m].tolist(), arrival_mid[:m].tolist())
+    ]
+    t0 = time.perf_counter()
+    results = sim.simulate_order(legs)
+    loop_s = time.perf_counter() - t0
+
+    same = all(
+        (r.filled_qty, r.avg_price, r.implementation_shortfall)
+        == (batch.filled_qty[i], batch.avg_price[i], batch.implementation_shortfall[i])
+        for i, r in enumerate(results)
+    )
+    print(f"simulate_order {m / loop_s:>14.0f} legs/s")
+    print(f"simulate_batch {n / batch_s:>14.0f} legs/s  ({loop_s / m * n / batch_s:.0f}x)")
+    print(f"identical      {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark mark price frame decoding in messages per second.
+
+Compares the original ``json.loads`` + dict access path used by
+``binance_ws`` with the typed decoders in :mod:`feeds.decode` on a synthetic
+``!markPrice@arr@1s`` frame.
+
+Run with ``python -m examples.bench_ws_decode [--symbols 300]``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Callable
+
+from feeds import decode
+
+
+def make_frame(n_symbols: int) -> bytes:
+    items = [
+        {
+            "e": "markPriceUpdate",
+            "E": 1_700_000_000_000 + i,
+            "s": f"SYM{i}USDT",
+            "p": f"{100 + i * 0.37:.8f}",
+            "P": f"{100 + i * 0.36:.8f}",
+            "i": f"{100 + i * 0.35:.8f}",
+            "r": "0.00010000",
+            "T": 1_700_028_800_000,
+        }
+        for i in range(n_symbols)
+    ]
+    return json.dumps(items).encode()
+
+
+def legacy(raw: bytes) -> None:
+    for item in json.loads(raw):
+        (item["s"], item["p"], item["r"], item["E"])
+
+
+def measure(fn: Callable[[bytes], object], raw: bytes, seconds: float) -> float:
+    count = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        fn(raw)
+        count += 1
+    return count / seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=300)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+    raw = make_frame(args.symbols)
+
+    print(f"frame: {args.symbols} symbols, {len(raw)} bytes")
+    print(f"{'legacy json + string fields':<32}{measure(legacy, raw, args.seconds):>12.0f} msg/s")
+    for backend in ("json", "orjson", "msgspec"):
+        try:
+            decode.set_backend(backend)
+        except ValueError:
+            continue
+        records = measure(decode.decode_mark_price, raw, args.seconds)
+        columns = measure(decode.decode_mark_price_columns, raw, args.seconds)
+        print(f"{backend + ' records':<32}{records:>12.0f} msg/s")
+        print(f"{backend + ' columns':<32}{columns:>12.0f} msg/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,40 @@
 """
 ماژول اجرای سفارش با استفاده از Executor.
 """
-import asyncio
-from typing import Dict, Any
+from typing import Any, Dict, Optional
+
+from core.execution.arbitrage import ArbitrageExecutor, Leg
 
 
 class OrderExecutor:
-    """کلاس اجرای سفارش‌ها (به صورت dry-run برای تست اولیه)."""
+    """کلاس اجرای سفارش‌ها؛ بدون ArbitrageExecutor به صورت dry-run."""
+
+    def __init__(self, arbitrage: Optional[ArbitrageExecutor] = None) -> None:
+        self.arbitrage = arbitrage
 
     async def place(self, action: Dict[str, Any]) -> Dict[str, Any]:
         """
-        شبیه‌سازی ارسال سفارش.
+        ارسال سفارش.
+
+        اگر ``action`` دو leg داشته باشد (``legs``) و ArbitrageExecutor تنظیم
+        شده باشد، هر دو leg همزمان با بودجه ``max_leg_latency_ms`` ارسال
+        می‌شوند؛ در غیر این صورت سفارش فقط به صورت dry-run برگردانده می‌شود.
 
         :param action: دیکشنری شامل اطلاعات سفارش
         :return: دیکشنری نتیجه سفارش
         """
-        # TODO: ادغام با کانکتورهای MEXC فیوچرز جهت ارسال سفارش واقعی
-        await asyncio.sleep(1)
-        return {"status": "success", "details": action}
+        legs = action.get("legs")
+        if self.arbitrage is None or not legs:
+            return {"status": "success", "details": action}
+        if len(legs) != 2:
+            raise ValueError("arbitrage actions need exactly two legs")
+        result = await self.arbitrage.execute(
+            Leg(**legs[0]), Leg(**legs[1]), action.get("max_leg_latency_ms")
+        )
+        return {
+            "status": "success" if result.ok else "failed",
+            "outcome": result.outcome,
+            "ack_skew_ms": result.ack_skew_ms,
+            "details": action,
+            "result": result,
+        }
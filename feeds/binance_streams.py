@@ -0,0 +1,243 @@
+"""Sharded Binance Futures combined-stream subscriber.
+
+Streams for an arbitrary symbol list and any of the supported stream kinds
+(``markPrice``, ``bookTicker``, ``depth``) are packed into
+``/stream?streams=a/b/c`` combined connections.  Each connection carries at
+most ``max_streams`` streams (Binance allows 200), and additional shards are
+opened as needed.  Streams can be added or removed while running; live shards
+receive ``SUBSCRIBE`` / ``UNSUBSCRIBE`` requests instead of reconnecting.
+
+Every shard reconnects independently with exponential backoff.  When data
+resumes after a disconnect, a :class:`Gap` describing the affected streams and
+the silent interval is passed to ``on_gap``.
+
+Event times (``E``) feed the exchange clock estimate and the per-stream feed
+lag histograms of :mod:`core.exchange.latency`.
+"""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Union
+
+import websockets
+
+from core.data.logger import logger
+from core.exchange import endpoints
+from core.exchange.clock import clock
+from core.exchange.latency import latency
+from feeds.decode import loads
+
+BINANCE_STREAM_URL = f"{endpoints.BINANCE_WS_URL}/stream"
+MAX_STREAMS_PER_CONNECTION = 200
+
+STREAM_SUFFIXES: Dict[str, str] = {
+    "markPrice": "@markPrice@1s",
+    "bookTicker": "@bookTicker",
+    "depth": "@depth@100ms",
+}
+
+MessageHandler = Callable[[str, Dict[str, Any]], Union[None, Awaitable[None]]]
+GapHandler = Callable[["Gap"], Union[None, Awaitable[None]]]
+
+
+def stream_names(symbols: Iterable[str], kinds: Iterable[str] = ("markPrice",)) -> List[str]:
+    """Return combined-stream names for every ``(symbol, kind)`` pair."""
+    names = []
+    kinds = list(kinds)
+    for kind in kinds:
+        if kind not in STREAM_SUFFIXES:
+            raise ValueError(f"unsupported stream kind: {kind}")
+    for symbol in symbols:
+        for kind in kinds:
+            names.append(f"{symbol.lower()}{STREAM_SUFFIXES[kind]}")
+    return names
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+async def _maybe_await(result: Any) -> None:
+    if inspect.isawaitable(result):
+        await result
+
+
+def record_event_time(venue: str, stream: str, event_ms: float) -> None:
+    """Feed a venue event time to the clock estimate and the feed lag histogram."""
+    local_ms = time.time() * 1000
+    clock.observe_event(venue, event_ms, local_ms)
+    latency.record_feed_lag(venue, stream, local_ms + clock.offset_ms(venue) - event_ms)
+
+
+@dataclass
+class Gap:
+    """Interval during which a shard delivered no data."""
+
+    shard: int
+    streams: List[str]
+    start_ms: int
+    end_ms: int
+
+    @property
+    def duration_ms(self) -> int:
+        return self.end_ms - self.start_ms
+
+
+@dataclass
+class _Shard:
+    index: int
+    streams: Set[str] = field(default_factory=set)
+    ws: Any = None
+    task: Optional[asyncio.Task] = None
+    last_msg_ms: Optional[int] = None
+    disconnected: bool = False
+    reconnects: int = 0
+
+
+class CombinedStreamSubscriber:
+    """Subscribe to many Binance streams over a few combined connections."""
+
+    def __init__(
+        self,
+        on_message: MessageHandler,
+        on_gap: Optional[GapHandler] = None,
+        url: str = BINANCE_STREAM_URL,
+        max_streams: int = MAX_STREAMS_PER_CONNECTION,
+        connect: Callable[[str], Any] = websockets.connect,
+    ) -> None:
+        if max_streams <= 0:
+            raise ValueError("max_streams must be positive")
+        self.on_message = on_message
+        self.on_gap = on_gap
+        self.url = url
+        self.max_streams = max_streams
+        self._connect = connect
+        self._shards: List[_Shard] = []
+        self._request_id = 0
+        self._running = False
+        self._stopped: Optional[asyncio.Event] = None
+
+    # ------------------------------------------------------------------
+    # Subscription management
+    # ------------------------------------------------------------------
+    @property
+    def streams(self) -> Set[str]:
+        return {s for shard in self._shards for s in shard.streams}
+
+    @property
+    def shards(self) -> List[List[str]]:
+        """Streams assigned to each shard, in shard order."""
+        return [sorted(shard.streams) for shard in self._shards]
+
+    async def add(self, symbols: Iterable[str], kinds: Iterable[str] = ("markPrice",)) -> None:
+        """Subscribe to *kinds* for *symbols*, filling existing shards first."""
+        new = [s for s in dict.fromkeys(stream_names(symbols, kinds)) if s not in self.streams]
+        added: Dict[int, List[str]] = {}
+        for name in new:
+            shard = next((s for s in self._shards if len(s.streams) < self.max_streams), None)
+            if shard is None:
+                shard = _Shard(index=len(self._shards))
+                self._shards.append(shard)
+            shard.streams.add(name)
+            added.setdefault(shard.index, []).append(name)
+        for index, names in added.items():
+            shard = self._shards[index]
+            if shard.ws is not None:
+                await self._send(shard, "SUBSCRIBE", names)
+            elif self._running and shard.task is None:
+                shard.task = asyncio.create_task(self._run_shard(shard))
+
+    async def remove(self, symbols: Iterable[str], kinds: Iterable[str] = ("markPrice",)) -> None:
+        """Unsubscribe *kinds* for *symbols* on whichever shards carry them."""
+        targets = set(stream_names(symbols, kinds))
+        for shard in self._shards:
+            names = sorted(shard.streams & targets)
+            if not names:
+                continue
+            shard.streams.difference_update(names)
+            if shard.ws is not None:
+                await self._send(shard, "UNSUBSCRIBE", names)
+
+    async def _send(self, shard: _Shard, method: str, names: List[str]) -> None:
+        self._request_id += 1
+        payload = {"method": method, "params": names, "id": self._request_id}
+        try:
+            await shard.ws.send(json.dumps(payload))
+        except Exception as exc:  # noqa: BLE001 - reconnect will pick up the new set
+            logger.warning("Shard %d %s failed: %s", shard.index, method, exc)
+
+    # ------------------------------------------------------------------
+    # Connection handling
+    # ------------------------------------------------------------------
+    def _shard_url(self, shard: _Shard) -> str:
+        return f"{self.url}?streams={'/'.join(sorted(shard.streams))}"
+
+    async def _dispatch(self, shard: _Shard, raw: Union[str, bytes]) -> None:
+        msg = loads(raw)
+        stream = msg.get("stream")
+        if stream is None:  # SUBSCRIBE/UNSUBSCRIBE acknowledgements
+            return
+        now = _now_ms()
+        if shard.disconnected:
+            shard.disconnected = False
+            if self.on_gap is not None and shard.last_msg_ms is not None:
+                gap = Gap(shard.index, sorted(shard.streams), shard.last_msg_ms, now)
+                await _maybe_await(self.on_gap(gap))
+        shard.last_msg_ms = now
+        data = msg.get("data", {})
+        if isinstance(data, dict) and "E" in data:
+            record_event_time("binance", stream, data["E"])
+        await _maybe_await(self.on_message(stream, data))
+
+    async def _run_shard(self, shard: _Shard) -> None:
+        backoff = 1
+        while self._running:
+            if not shard.streams:
+                await asyncio.sleep(1)
+                continue
+            try:
+                async with self._connect(self._shard_url(shard)) as ws:
+                    shard.ws = ws
+                    backoff = 1
+                    async for raw in ws:
+                        await self._dispatch(shard, raw)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001 - network errors
+                logger.warning("Shard %d error: %s. Reconnecting in %ss", shard.index, exc, backoff)
+            finally:
+                shard.ws = None
+            if not self._running:
+                break
+            shard.disconnected = True
+            shard.reconnects += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 32)
+
+    async def run(self) -> None:
+        """Run every shard until :meth:`close` is called."""
+        self._running = True
+        self._stopped = asyncio.Event()
+        for shard in self._shards:
+            if shard.task is None:
+                shard.task = asyncio.create_task(self._run_shard(shard))
+        try:
+            await self._stopped.wait()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """Stop all shards and close their connections."""
+        self._running = False
+        if self._stopped is not None:
+            self._stopped.set()
+        tasks = [s.task for s in self._shards if s.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for shard in self._shards:
+            shard.task = None
@@ -0,0 +1,151 @@
+"""Typed decoding of Binance WebSocket market messages.
+
+The JSON backend is chosen once at import time, fastest first:
+
+* ``msgspec`` – frames decode straight into typed :class:`MarkPrice` structs,
+  converting the exchange's numeric strings while parsing,
+* ``orjson`` – fast generic parse, records built from the resulting dicts,
+* ``json`` – the standard library fallback.
+
+:func:`set_backend` switches it explicitly, which the benchmark in
+``examples/bench_ws_decode.py`` uses to compare them.  Frames are either a
+single event (``<symbol>@markPrice``) or an array (``!markPrice@arr``); the
+latter can also be decoded directly into column arrays via
+:func:`decode_mark_price_columns`.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Dict, List, Union
+
+import numpy as np
+
+try:  # pragma: no cover - depends on the environment
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None
+
+try:  # pragma: no cover - depends on the environment
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+Raw = Union[str, bytes]
+
+
+def _from_event(cls: Any, item: Dict[str, Any]) -> Any:
+    return cls(
+        item["s"],
+        int(item["E"]),
+        float(item["p"]),
+        float(item.get("i") or "nan"),
+        float(item.get("r") or 0.0),
+        int(item.get("T") or 0),
+    )
+
+
+if msgspec is not None:
+
+    class MarkPrice(msgspec.Struct):
+        """A decoded ``markPriceUpdate`` event."""
+
+        symbol: str = msgspec.field(name="s")
+        event_time: int = msgspec.field(name="E")
+        mark: float = msgspec.field(name="p")
+        index: float = msgspec.field(name="i", default=float("nan"))
+        funding: float = msgspec.field(name="r", default=0.0)
+        next_funding: int = msgspec.field(name="T", default=0)
+
+        from_event = classmethod(_from_event)
+
+    _MARK_DECODER = msgspec.json.Decoder(Union[List[MarkPrice], MarkPrice], strict=False)
+
+else:
+
+    class MarkPrice:  # type: ignore[no-redef]
+        """A decoded ``markPriceUpdate`` event."""
+
+        __slots__ = ("symbol", "event_time", "mark", "index", "funding", "next_funding")
+
+        def __init__(
+            self,
+            symbol: str,
+            event_time: int,
+            mark: float,
+            index: float = float("nan"),
+            funding: float = 0.0,
+            next_funding: int = 0,
+        ) -> None:
+            self.symbol = symbol
+            self.event_time = event_time
+            self.mark = mark
+            self.index = index
+            self.funding = funding
+            self.next_funding = next_funding
+
+        from_event = classmethod(_from_event)
+
+        def __repr__(self) -> str:
+            return (
+                f"MarkPrice(symbol={self.symbol!r}, event_time={self.event_time}, "
+                f"mark={self.mark}, funding={self.funding})"
+            )
+
+
+_BACKENDS: Dict[str, Callable[[Raw], Any]] = {"json": json.loads}
+if orjson is not None:
+    _BACKENDS["orjson"] = orjson.loads
+if msgspec is not None:
+    _BACKENDS["msgspec"] = msgspec.json.decode
+
+BACKEND = "msgspec" if msgspec is not None else "orjson" if orjson is not None else "json"
+_loads: Callable[[Raw], Any] = _BACKENDS[BACKEND]
+
+
+def set_backend(name: str) -> None:
+    """Select the JSON backend by name (``"msgspec"``, ``"orjson"`` or ``"json"``)."""
+    global BACKEND, _loads
+    if name not in _BACKENDS:
+        raise ValueError(f"JSON backend not available: {name}")
+    BACKEND = name
+    _loads = _BACKENDS[name]
+
+
+def loads(raw: Raw) -> Any:
+    """Parse *raw* into plain Python objects with the active backend."""
+    return _loads(raw)
+
+
+def decode_mark_price(raw: Raw) -> List[MarkPrice]:
+    """Decode a single-event or array mark price frame into records."""
+    if BACKEND == "msgspec":
+        data = _MARK_DECODER.decode(raw)
+        return data if isinstance(data, list) else [data]
+    data = _loads(raw)
+    items = data if isinstance(data, list) else [data]
+    return [MarkPrice.from_event(item) for item in items]
+
+
+def decode_mark_price_columns(raw: Raw) -> Dict[str, np.ndarray]:
+    """Decode a mark price frame straight into column arrays."""
+    if BACKEND == "msgspec":
+        recs = decode_mark_price(raw)
+        return {
+            "symbol": np.array([r.symbol for r in recs], dtype=object),
+            "event_time": np.array([r.event_time for r in recs], dtype=np.int64),
+            "mark": np.array([r.mark for r in recs], dtype=np.float64),
+            "index": np.array([r.index for r in recs], dtype=np.float64),
+            "funding": np.array([r.funding for r in recs], dtype=np.float64),
+            "next_funding": np.array([r.next_funding for r in recs], dtype=np.int64),
+        }
+    data = _loads(raw)
+    items = data if isinstance(data, list) else [data]
+    # NumPy converts the numeric strings in bulk, skipping per-event records.
+    return {
+        "symbol": np.array([it["s"] for it in items], dtype=object),
+        "event_time": np.array([it["E"] for it in items], dtype=np.int64),
+        "mark": np.array([it["p"] for it in items], dtype=np.float64),
+        "index": np.array([it.get("i") or "nan" for it in items], dtype=np.float64),
+        "funding": np.array([it.get("r") or 0 for it in items], dtype=np.float64),
+        "next_funding": np.array([it.get("T") or 0 for it in items], dtype=np.int64),
+    }
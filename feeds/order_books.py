@@ -0,0 +1,292 @@
+"""Keep local order books in sync with venue depth streams.
+
+* :class:`BinanceDepthSync` follows the Binance Futures "manage a local order
+  book" procedure.  Plug :meth:`~BinanceDepthSync.on_message` and
+  :meth:`~BinanceDepthSync.on_gap` into a
+  :class:`~feeds.binance_streams.CombinedStreamSubscriber` carrying
+  ``<symbol>@depth@100ms`` streams.  Diff events are buffered while a REST
+  snapshot is fetched.  Events older than the snapshot are dropped.  The first
+  event applied must straddle the snapshot's ``lastUpdateId``, and every later
+  event's ``pu`` must equal the previous ``u``.  Anything else (or a gap
+  reported by the subscriber) drops the book and starts over from a new
+  snapshot.
+* :class:`OkxBookFeed` subscribes to the OKX ``books`` channel, which starts
+  with a snapshot and continues with updates.  An update's ``prevSeqId`` must
+  equal the last ``seqId``; on a break the instrument is resubscribed, which
+  makes OKX send a fresh snapshot.
+
+Both write into a :class:`~core.data.order_book.BookManager`, keyed by venue
+and canonical symbol.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set
+
+import websockets
+
+from core.data.logger import logger
+from core.data.order_book import BookManager, Level, OrderBook, book_manager, parse_levels
+from core.exchange import endpoints
+from core.exchange.rate_limit import MARKET
+from core.exchange.symbols import to_canonical, to_venue
+from core.exchange.transport import AsyncTransport
+from feeds.binance_streams import Gap, record_event_time
+from feeds.decode import loads
+
+DEPTH_LIMIT = 1000
+OKX_PUBLIC_URL = f"{endpoints.OKX_WS_URL}/ws/v5/public"
+
+
+def depth_weight(limit: int) -> int:
+    """Request weight of ``GET /fapi/v1/depth`` for *limit* levels."""
+    if limit <= 50:
+        return 2
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 10
+    return 20
+
+
+# ----------------------------------------------------------------------
+# Binance
+# ----------------------------------------------------------------------
+class BinanceDepthSync:
+    """Build Binance books from a REST snapshot plus ``depthUpdate`` diffs."""
+
+    venue = "binance"
+
+    def __init__(
+        self,
+        books: BookManager = book_manager,
+        base_url: Optional[str] = None,
+        limit: int = DEPTH_LIMIT,
+        retry_s: float = 1.0,
+        transport: Optional[AsyncTransport] = None,
+    ) -> None:
+        self.books = books
+        self.limit = limit
+        self.retry_s = retry_s
+        self.transport = transport or AsyncTransport("binance", base_url or endpoints.BINANCE_REST_URL)
+        self.resyncs = 0
+        self._buffers: Dict[str, List[Dict[str, Any]]] = {}
+        self._snapshots: Dict[str, asyncio.Task] = {}
+        # Books loaded from a snapshot whose first straddling event is still due.
+        self._first: Set[str] = set()
+
+    async def snapshot(self, symbol: str) -> Dict[str, Any]:
+        resp, _ = await self.transport.request(
+            "GET", "/fapi/v1/depth", params={"symbol": symbol, "limit": self.limit},
+            weight=depth_weight(self.limit), priority=MARKET,
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+    def on_message(self, stream: str, data: Dict[str, Any]) -> None:
+        """Combined-stream handler; anything but ``depthUpdate`` is ignored."""
+        if data.get("e") != "depthUpdate":
+            return
+        symbol = data["s"]
+        book = self.books.book(self.venue, symbol)
+        if not book.synced:
+            self._buffers.setdefault(symbol, []).append(data)
+            self._ensure_snapshot(symbol)
+            return
+        self._process(book, data)
+
+    def on_gap(self, gap: Gap) -> None:
+        """Resync every depth stream of a shard that was disconnected."""
+        for stream in gap.streams:
+            if "@depth" in stream:
+                self.resync(stream.split("@")[0].upper())
+
+    def resync(self, symbol: str) -> None:
+        """Drop the book of *symbol* and rebuild it from a new snapshot."""
+        self.resyncs += 1
+        self.books.book(self.venue, symbol).clear()
+        self._first.discard(symbol)
+        self._ensure_snapshot(symbol)
+
+    def _process(self, book: OrderBook, event: Dict[str, Any]) -> None:
+        first_id, final_id = event["U"], event["u"]
+        if book.symbol in self._first:
+            if final_id < book.update_id:
+                return  # already contained in the snapshot
+            if first_id > book.update_id:
+                logger.warning("%s depth starts after snapshot %d (U=%d), resyncing",
+                               book.symbol, book.update_id, first_id)
+                self._restart(book.symbol, event)
+                return
+            self._first.discard(book.symbol)
+        elif event["pu"] != book.update_id:
+            logger.warning("%s depth gap: pu=%d, last u=%d, resyncing", book.symbol, event["pu"], book.update_id)
+            self._restart(book.symbol, event)
+            return
+        book.apply(parse_levels(event["b"]), parse_levels(event["a"]), final_id, event.get("E", 0))
+
+    def _restart(self, symbol: str, event: Dict[str, Any]) -> None:
+        self.resync(symbol)
+        self._buffers.setdefault(symbol, []).append(event)
+
+    def _ensure_snapshot(self, symbol: str) -> None:
+        if symbol not in self._snapshots:
+            self._snapshots[symbol] = asyncio.ensure_future(self._load(symbol))
+
+    async def _load(self, symbol: str) -> None:
+        try:
+            try:
+                data = await self.snapshot(symbol)
+            except Exception as exc:  # noqa: BLE001 - retried on the next event
+                logger.warning("%s depth snapshot failed: %s", symbol, exc)
+                self._buffers.pop(symbol, None)
+                await asyncio.sleep(self.retry_s)
+                return
+            book = self.books.book(self.venue, symbol)
+            book.load(parse_levels(data["bids"]), parse_levels(data["asks"]), data["lastUpdateId"], data.get("E", 0))
+            self._first.add(symbol)
+            # Replay without yielding, so no live event can interleave.
+            for event in self._buffers.pop(symbol, []):
+                if not book.synced:
+                    break
+                self._process(book, event)
+        finally:
+            if self._snapshots.get(symbol) is asyncio.current_task():
+                del self._snapshots[symbol]
+
+    async def close(self) -> None:
+        tasks = list(self._snapshots.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._snapshots.clear()
+        await self.transport.aclose()
+
+
+# ----------------------------------------------------------------------
+# OKX
+# ----------------------------------------------------------------------
+class OkxBookFeed:
+    """OKX ``books`` channel for a set of swaps.
+
+    OKX sizes are in contracts; *contract_sizes* maps canonical symbols to
+    ``ctVal`` so book quantities are in the base asset like on Binance.
+    """
+
+    venue = "okx"
+
+    def __init__(
+        self,
+        symbols: Iterable[str],
+        books: BookManager = book_manager,
+        url: Optional[str] = None,
+        channel: str = "books",
+        contract_sizes: Optional[Mapping[str, float]] = None,
+        ping_s: float = 20.0,
+        connect: Callable[[str], Any] = websockets.connect,
+    ) -> None:
+        self.symbols = [to_canonical(s) for s in symbols]
+        self.books = books
+        self.url = url or OKX_PUBLIC_URL
+        self.channel = channel
+        self.contract_sizes = dict(contract_sizes or {})
+        self.ping_s = ping_s
+        self.resyncs = 0
+        self.reconnects = 0
+        self._connect = connect
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+
+    def _args(self, symbols: Iterable[str]) -> List[Dict[str, str]]:
+        return [{"channel": self.channel, "instId": to_venue(s, "okx")} for s in symbols]
+
+    def _levels(self, symbol: str, levels: List[List[str]]) -> List[Level]:
+        size = self.contract_sizes.get(symbol, 1.0)
+        return [(price, qty * size) for price, qty in parse_levels(levels)]
+
+    async def _ping(self, ws: Any) -> None:
+        while True:
+            await asyncio.sleep(self.ping_s)
+            await ws.send("ping")
+
+    async def _handle(self, ws: Any, msg: Dict[str, Any]) -> None:
+        action = msg.get("action")
+        if action is None:
+            if msg.get("event") == "error":
+                logger.warning("OKX books error: %s", msg.get("msg"))
+            return
+        symbol = to_canonical(msg["arg"]["instId"])
+        book = self.books.book(self.venue, symbol)
+        for item in msg.get("data", []):
+            seq = int(item.get("seqId", 0))
+            bids = self._levels(symbol, item.get("bids", []))
+            asks = self._levels(symbol, item.get("asks", []))
+            ts = int(item.get("ts") or 0)
+            if ts:
+                record_event_time(self.venue, self.channel, ts)
+            if action == "snapshot":
+                book.load(bids, asks, seq, ts)
+                continue
+            if not book.synced:
+                continue  # waiting for the snapshot after a resubscribe
+            prev = int(item.get("prevSeqId", -1))
+            if prev != book.update_id and not (seq == book.update_id and not bids and not asks):
+                logger.warning("%s OKX book gap: prevSeqId=%d, last seqId=%d, resubscribing",
+                               symbol, prev, book.update_id)
+                await self.resync(ws, symbol)
+                return
+            book.apply(bids, asks, seq, ts)
+
+    async def resync(self, ws: Any, symbol: str) -> None:
+        """Drop the book of *symbol* and resubscribe for a new snapshot."""
+        self.resyncs += 1
+        self.books.book(self.venue, symbol).clear()
+        args = self._args([symbol])
+        await ws.send(json.dumps({"op": "unsubscribe", "args": args}))
+        await ws.send(json.dumps({"op": "subscribe", "args": args}))
+
+    async def _session(self, ws: Any) -> None:
+        await ws.send(json.dumps({"op": "subscribe", "args": self._args(self.symbols)}))
+        pinger = asyncio.create_task(self._ping(ws))
+        try:
+            async for raw in ws:
+                if raw == "pong":
+                    continue
+                await self._handle(ws, loads(raw))
+        finally:
+            pinger.cancel()
+            for symbol in self.symbols:
+                self.books.book(self.venue, symbol).clear()
+
+    async def run(self) -> None:
+        """Stream until :meth:`close` is called."""
+        self._running = True
+        backoff = 1
+        while self._running:
+            try:
+                async with self._connect(self.url) as ws:
+                    backoff = 1
+                    await self._session(ws)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001 - network errors
+                logger.warning("OKX books error: %s. Reconnecting in %ss", exc, backoff)
+            if not self._running:
+                break
+            self.reconnects += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 32)
+
+    def start(self) -> asyncio.Task:
+        """Run the feed in a background task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def close(self) -> None:
+        self._running = False
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
@@ -2,91 +2,175 @@
 
 For each symbol supplied, this module polls Binance or OKX REST endpoints to
 fetch mark price, estimated funding rate and next funding time.  Snapshots are
-written to ``data/ticks/YYYYMMDD/<symbol>.csv`` with schema::
+written to ``data/ticks/YYYYMMDD/<symbol>.csv`` through a shared
+:class:`core.data.tick_writer.TickWriter` with schema::
 
     ts,symbol,mark,estFunding,nextFunding,src
 
-The scheduler respects per-symbol rate limits (1 request/second) and applies an
-exponential backoff on HTTP 429 or 5xx responses.
+Every row also updates :data:`core.data.market_cache.market_cache`.
+
+Each symbol is polled once per second.  Every request goes through the shared
+:data:`core.exchange.rate_limit.limiter` at market-data priority, and an
+exponential backoff applies on HTTP 429 or 5xx responses.  In bulk mode Binance's
+``premiumIndex`` and OKX's ``instId=ANY`` / ``quoteCcy`` queries return every
+symbol in one call per venue; only symbols missing from those responses are
+fetched individually.
 """
 from __future__ import annotations
 
 import asyncio
-import csv
 import datetime as dt
 import os
-from typing import Iterable
+from typing import Any, Awaitable, Callable, Dict, Iterable, List
+from urllib.parse import urlsplit
 
 import aiohttp
 
-BINANCE_PREMIUM_INDEX = "https://fapi.binance.com/fapi/v1/premiumIndex"
-BINANCE_FUNDING_RATE = "https://fapi.binance.com/fapi/v1/fundingRate"
+from core.data.market_cache import market_cache
+from core.data.tick_writer import TICK_HEADER, TickWriter
+from core.exchange import endpoints
+from core.exchange.rate_limit import MARKET, limiter
+
+BINANCE_PREMIUM_INDEX = f"{endpoints.BINANCE_REST_URL}/fapi/v1/premiumIndex"
+BINANCE_FUNDING_RATE = f"{endpoints.BINANCE_REST_URL}/fapi/v1/fundingRate"
 
-OKX_FUNDING_RATE = "https://www.okx.com/api/v5/public/funding-rate"
-OKX_INDEX_TICKERS = "https://www.okx.com/api/v5/market/index-tickers"
+OKX_FUNDING_RATE = f"{endpoints.OKX_REST_URL}/api/v5/public/funding-rate"
+OKX_INDEX_TICKERS = f"{endpoints.OKX_REST_URL}/api/v5/market/index-tickers"
 
 POLL_INTERVAL_MS = 1_000
 SRC = "REST"
+HEADER = TICK_HEADER
+
+
+def _write_row(
+    writer: TickWriter,
+    venue: str,
+    symbol: str,
+    mark: float,
+    est_funding: float,
+    next_funding: str,
+    next_funding_ms: int,
+) -> None:
+    now = dt.datetime.utcnow()
+    market_cache.update(
+        venue,
+        symbol,
+        int(now.replace(tzinfo=dt.timezone.utc).timestamp() * 1000),
+        mark=mark,
+        funding=est_funding,
+        next_funding=next_funding_ms,
+    )
+    writer.write(symbol, [now.isoformat(), symbol, mark, est_funding, next_funding, SRC], ts=now)
+
+
+def _write_binance(writer: TickWriter, data: Dict[str, Any]) -> None:
+    mark = float(data.get("markPrice", 0))
+    est_funding = float(data.get("lastFundingRate", 0))
+    next_funding_ms = int(data.get("nextFundingTime", 0))
+    next_funding = dt.datetime.utcfromtimestamp(next_funding_ms / 1000).isoformat()
+    _write_row(writer, "binance", data["symbol"], mark, est_funding, next_funding, next_funding_ms)
 
 
-def _csv_path(symbol: str) -> str:
-    date_dir = dt.datetime.utcnow().strftime("%Y%m%d")
-    path = os.path.join("data", "ticks", date_dir)
-    os.makedirs(path, exist_ok=True)
-    return os.path.join(path, f"{symbol}.csv")
+def _write_okx(writer: TickWriter, inst_id: str, funding: Dict[str, Any], idx: Dict[str, Any]) -> None:
+    est_funding = float(funding.get("fundingRate", 0))
+    next_funding = funding.get("fundingTime", "")
+    mark = float(idx.get("idxPx") or idx.get("markPx") or 0)
+    next_funding_ms = int(next_funding) if str(next_funding).isdigit() else 0
+    _write_row(writer, "okx", inst_id, mark, est_funding, next_funding, next_funding_ms)
 
 
-def _write_row(symbol: str, mark: float, est_funding: float, next_funding: str) -> None:
-    ts = dt.datetime.utcnow().isoformat()
-    path = _csv_path(symbol)
-    file_exists = os.path.exists(path)
-    with open(path, "a", newline="") as fh:
-        writer = csv.writer(fh)
-        if not file_exists:
-            writer.writerow(["ts", "symbol", "mark", "estFunding", "nextFunding", "src"])
-        writer.writerow([ts, symbol, mark, est_funding, next_funding, SRC])
+def _okx_headers() -> Dict[str, str]:
+    return {"x-simulated-trading": os.getenv("OKX_DEMO", "0")}
 
 
-async def _fetch_binance(session: aiohttp.ClientSession, symbol: str) -> None:
-    params = {"symbol": symbol}
-    async with session.get(BINANCE_PREMIUM_INDEX, params=params) as resp:
+async def _get_json(
+    session: aiohttp.ClientSession, url: str, venue: str, weight: int = 1, **kwargs: Any
+) -> Any:
+    await limiter.acquire_async(venue, weight=weight, endpoint=urlsplit(url).path, priority=MARKET)
+    async with session.get(url, **kwargs) as resp:
+        limiter.record_response(venue, resp.status, resp.headers)
         resp.raise_for_status()
-        data = await resp.json()
-    mark = float(data.get("markPrice", 0))
-    est_funding = float(data.get("lastFundingRate", 0))
-    next_funding_ms = int(data.get("nextFundingTime", 0))
-    next_funding = dt.datetime.utcfromtimestamp(next_funding_ms / 1000).isoformat()
-    # sanity call (ignore response contents)
-    async with session.get(BINANCE_FUNDING_RATE, params={"symbol": symbol, "limit": 1}) as resp:
-        resp.raise_for_status()
-        await resp.read()
-    _write_row(symbol, mark, est_funding, next_funding)
+        return await resp.json()
 
 
-async def _fetch_okx(session: aiohttp.ClientSession, inst_id: str) -> None:
-    headers = {"x-simulated-trading": os.getenv("OKX_DEMO", "0")}
-    async with session.get(OKX_FUNDING_RATE, params={"instId": inst_id}, headers=headers) as resp:
-        resp.raise_for_status()
-        data = (await resp.json())["data"][0]
-    est_funding = float(data.get("fundingRate", 0))
-    next_funding = data.get("fundingTime", "")
-    index_id = inst_id.replace("-SWAP", "")
-    async with session.get(OKX_INDEX_TICKERS, params={"instId": index_id}, headers=headers) as resp:
-        resp.raise_for_status()
-        idx = (await resp.json())["data"][0]
-    mark = float(idx.get("idxPx") or idx.get("markPx") or 0)
-    _write_row(inst_id, mark, est_funding, next_funding)
+async def _fetch_binance(session: aiohttp.ClientSession, writer: TickWriter, symbol: str) -> None:
+    data = await _get_json(session, BINANCE_PREMIUM_INDEX, "binance", params={"symbol": symbol})
+    # sanity call (ignore response contents)
+    await _get_json(session, BINANCE_FUNDING_RATE, "binance", params={"symbol": symbol, "limit": 1})
+    _write_binance(writer, data)
 
 
-async def _poll_symbol(session: aiohttp.ClientSession, symbol: str) -> None:
+async def _fetch_okx(session: aiohttp.ClientSession, writer: TickWriter, inst_id: str) -> None:
+    headers = _okx_headers()
+    data = await _get_json(session, OKX_FUNDING_RATE, "okx", params={"instId": inst_id}, headers=headers)
+    index_id = inst_id.replace("-SWAP", "")
+    idx = await _get_json(session, OKX_INDEX_TICKERS, "okx", params={"instId": index_id}, headers=headers)
+    _write_okx(writer, inst_id, data["data"][0], idx["data"][0])
+
+
+async def _fetch_binance_bulk(
+    session: aiohttp.ClientSession, writer: TickWriter, symbols: List[str]
+) -> List[str]:
+    """Fetch ``premiumIndex`` for every symbol in one request.
+
+    Symbols absent from the bulk response are fetched individually.  Returns
+    the symbols that needed the per-symbol fallback.
+    """
+    data = await _get_json(session, BINANCE_PREMIUM_INDEX, "binance", weight=10)
+    by_symbol = {item["symbol"]: item for item in data}
+    missing = []
+    for symbol in symbols:
+        item = by_symbol.get(symbol)
+        if item is None:
+            missing.append(symbol)
+        else:
+            _write_binance(writer, item)
+    for symbol in missing:
+        item = await _get_json(session, BINANCE_PREMIUM_INDEX, "binance", params={"symbol": symbol})
+        _write_binance(writer, item)
+    return missing
+
+
+async def _fetch_okx_bulk(
+    session: aiohttp.ClientSession, writer: TickWriter, inst_ids: List[str]
+) -> List[str]:
+    """Fetch funding rates for all swaps and index tickers per quote currency.
+
+    Uses ``funding-rate?instId=ANY`` and ``index-tickers?quoteCcy=...``, so the
+    request count depends on the number of quote currencies rather than
+    instruments.  Instruments missing from either response fall back to
+    :func:`_fetch_okx`.  Returns the instruments that needed the fallback.
+    """
+    headers = _okx_headers()
+    funding = await _get_json(session, OKX_FUNDING_RATE, "okx", params={"instId": "ANY"}, headers=headers)
+    funding_by_id = {item["instId"]: item for item in funding.get("data", [])}
+    index_by_id: Dict[str, Dict[str, Any]] = {}
+    quotes = sorted({inst_id.split("-")[1] for inst_id in inst_ids if inst_id.count("-") >= 1})
+    for quote in quotes:
+        idx = await _get_json(
+            session, OKX_INDEX_TICKERS, "okx", params={"quoteCcy": quote}, headers=headers
+        )
+        index_by_id.update({item["instId"]: item for item in idx.get("data", [])})
+    missing = []
+    for inst_id in inst_ids:
+        fund = funding_by_id.get(inst_id)
+        idx_item = index_by_id.get(inst_id.replace("-SWAP", ""))
+        if fund is None or idx_item is None:
+            missing.append(inst_id)
+        else:
+            _write_okx(writer, inst_id, fund, idx_item)
+    for inst_id in missing:
+        await _fetch_okx(session, writer, inst_id)
+    return missing
+
+
+async def _with_backoff(fetch: Callable[[], Awaitable[Any]]) -> None:
+    """Call *fetch* every poll interval, backing off on errors."""
     backoff = POLL_INTERVAL_MS / 1000
     await asyncio.sleep(0)  # allow loop to start
     while True:
         try:
-            if "-" in symbol:
-                await _fetch_okx(session, symbol)
-            else:
-                await _fetch_binance(session, symbol)
+            await fetch()
             await asyncio.sleep(POLL_INTERVAL_MS / 1000)
             backoff = POLL_INTERVAL_MS / 1000
         except aiohttp.ClientResponseError as exc:  # HTTP errors
@@ -100,11 +184,33 @@ async def _poll_symbol(session: aiohttp.ClientSession, symbol: str) -> None:
             backoff = min(backoff * 2, 60)
 
 
-async def poll_mark_funding(symbols: Iterable[str]) -> None:
-    """Poll mark price and funding info for *symbols* forever."""
-    async with aiohttp.ClientSession() as session:
-        tasks = [asyncio.create_task(_poll_symbol(session, sym)) for sym in symbols]
-        await asyncio.gather(*tasks)
+async def _poll_symbol(session: aiohttp.ClientSession, writer: TickWriter, symbol: str) -> None:
+    if "-" in symbol:
+        await _with_backoff(lambda: _fetch_okx(session, writer, symbol))
+    else:
+        await _with_backoff(lambda: _fetch_binance(session, writer, symbol))
+
+
+async def poll_mark_funding(symbols: Iterable[str], bulk: bool = False) -> None:
+    """Poll mark price and funding info for *symbols* forever.
+
+    In ``bulk`` mode each venue is polled with one task that fetches all of its
+    symbols per iteration instead of one task and two requests per symbol.
+    """
+    symbols = list(symbols)
+    async with TickWriter(HEADER) as writer, aiohttp.ClientSession() as session:
+        if bulk:
+            binance = [s for s in symbols if "-" not in s]
+            okx = [s for s in symbols if "-" in s]
+            tasks = []
+            if binance:
+                tasks.append(_with_backoff(lambda: _fetch_binance_bulk(session, writer, binance)))
+            if okx:
+                tasks.append(_with_backoff(lambda: _fetch_okx_bulk(session, writer, okx)))
+            await asyncio.gather(*tasks)
+        else:
+            tasks = [asyncio.create_task(_poll_symbol(session, writer, sym)) for sym in symbols]
+            await asyncio.gather(*tasks)
 
 
 if __name__ == "__main__":  # pragma: no cover
@@ -112,6 +218,7 @@ if __name__ == "__main__":  # pragma: no cover
 
     parser = argparse.ArgumentParser(description="REST mark/funding poller")
     parser.add_argument("--symbols", required=True, help="Comma separated symbols")
+    parser.add_argument("--bulk", action="store_true", help="Fetch all symbols per venue in one call")
     args = parser.parse_args()
     symbols = [s.strip() for s in args.symbols.split(",") if s.strip()]
-    asyncio.run(poll_mark_funding(symbols))
+    asyncio.run(poll_mark_funding(symbols, bulk=args.bulk))
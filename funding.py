@@ -2,17 +2,35 @@
 
 This module fetches funding rate history and funding info (cap/floor/interval)
 from Binance every second and publishes computed NetEdge in basis points to the
-orchestrator.
+orchestrator.  The poller queries all symbols concurrently and caches funding
+info, which changes rarely, with a TTL.
+
+``/fapi/v1/fundingInfo`` takes no ``symbol``: it lists every symbol whose
+cap, floor or interval was adjusted, so the list is fetched once and indexed
+by symbol, and symbols missing from it use :data:`DEFAULT_FUNDING_INFO`.
 
 It also documents OKX's funding fee mechanism for reference.
 """
 import asyncio
-from typing import Dict, List, Callable
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+import aiohttp
 import requests
 
-BINANCE_FUNDING_RATE_URL = "https://fapi.binance.com/fapi/v1/fundingRate"
-BINANCE_FUNDING_INFO_URL = "https://fapi.binance.com/fapi/v1/fundingInfo"
+from core.data.market_cache import MarketCache
+from core.exchange import endpoints
+from core.exchange.rate_limit import MARKET, limiter
+
+BINANCE_FUNDING_RATE_URL = f"{endpoints.BINANCE_REST_URL}/fapi/v1/fundingRate"
+BINANCE_FUNDING_INFO_URL = f"{endpoints.BINANCE_REST_URL}/fapi/v1/fundingInfo"
+
+FUNDING_INFO_TTL_S = 3_600.0
+
+# Funding info of a symbol ``fundingInfo`` does not list: no adjustments.
+DEFAULT_FUNDING_INFO: Dict[str, float] = {"cap": 0.003, "floor": -0.003, "intervalHours": 8.0, "avgPremium": 0.0}
 
 
 def _clamp(value: float, floor: float, cap: float) -> float:
@@ -22,25 +40,36 @@ def _clamp(value: float, floor: float, cap: float) -> float:
 
 def fetch_funding_rate(symbol: str) -> float:
     """Fetch latest funding rate for *symbol* from Binance."""
+    limiter.acquire("binance", weight=1, priority=MARKET)
     resp = requests.get(
         BINANCE_FUNDING_RATE_URL,
         params={"symbol": symbol, "limit": 1},
         timeout=10,
         proxies={"http": None, "https": None},
     )
+    limiter.record_response("binance", resp.status_code, resp.headers)
     data = resp.json()
     return float(data[0]["fundingRate"])
 
 
+def fetch_all_funding_info() -> Dict[str, Dict[str, float]]:
+    """Fetch funding cap/floor/interval of every listed symbol from Binance."""
+    limiter.acquire("binance", weight=1, priority=MARKET)
+    resp = requests.get(BINANCE_FUNDING_INFO_URL, timeout=10, proxies={"http": None, "https": None})
+    limiter.record_response("binance", resp.status_code, resp.headers)
+    return _index_funding_info(resp.json())
+
+
 def fetch_funding_info(symbol: str) -> Dict[str, float]:
     """Fetch funding cap/floor/interval for *symbol* from Binance."""
-    resp = requests.get(
-        BINANCE_FUNDING_INFO_URL,
-        params={"symbol": symbol},
-        timeout=10,
-        proxies={"http": None, "https": None},
-    )
-    data = resp.json()[0]
+    return fetch_all_funding_info().get(symbol, DEFAULT_FUNDING_INFO)
+
+
+def _index_funding_info(data: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    return {item["symbol"]: _parse_funding_info(item) for item in data}
+
+
+def _parse_funding_info(data: Dict[str, Any]) -> Dict[str, float]:
     return {
         "cap": float(data.get("fundingRateCap", 0)),
         "floor": float(data.get("fundingRateFloor", 0)),
@@ -71,26 +100,182 @@ def publish_to_orchestrator(symbol: str, edge_bps: float) -> None:
     print("Publishing", payload)
 
 
+async def _get_json_async(session: aiohttp.ClientSession, url: str, params: Dict[str, Any]) -> Any:
+    await limiter.acquire_async("binance", weight=1, priority=MARKET)
+    async with session.get(url, params=params) as resp:
+        limiter.record_response("binance", resp.status, resp.headers)
+        resp.raise_for_status()
+        return await resp.json()
+
+
+async def fetch_funding_rate_async(session: aiohttp.ClientSession, symbol: str) -> float:
+    """Async variant of :func:`fetch_funding_rate` using a shared session."""
+    data = await _get_json_async(session, BINANCE_FUNDING_RATE_URL, {"symbol": symbol, "limit": 1})
+    return float(data[0]["fundingRate"])
+
+
+async def fetch_all_funding_info_async(session: aiohttp.ClientSession) -> Dict[str, Dict[str, float]]:
+    """Async variant of :func:`fetch_all_funding_info` using a shared session."""
+    return _index_funding_info(await _get_json_async(session, BINANCE_FUNDING_INFO_URL, {}))
+
+
+async def fetch_funding_info_async(session: aiohttp.ClientSession, symbol: str) -> Dict[str, float]:
+    """Async variant of :func:`fetch_funding_info` using a shared session."""
+    return (await fetch_all_funding_info_async(session)).get(symbol, DEFAULT_FUNDING_INFO)
+
+
+class FundingInfoCache:
+    """TTL cache of :func:`fetch_all_funding_info_async`.
+
+    One request per TTL serves every symbol.  Funding cap/floor/interval
+    change rarely, so a stale list is still served while a single background
+    task refreshes it.  Only the first lookup waits on the network.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        ttl_s: float = FUNDING_INFO_TTL_S,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.session = session
+        self.ttl_s = ttl_s
+        self._clock = clock
+        self._entry: Optional[Tuple[float, Dict[str, Dict[str, float]]]] = None
+        self._inflight: Optional[asyncio.Task] = None
+
+    def _refresh(self) -> asyncio.Task:
+        if self._inflight is None:
+            self._inflight = asyncio.create_task(self._load())
+            self._inflight.add_done_callback(self._report_failure)
+        return self._inflight
+
+    @staticmethod
+    def _report_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Funding info refresh failed: {task.exception()}")
+
+    async def _load(self) -> Dict[str, Dict[str, float]]:
+        try:
+            infos = await fetch_all_funding_info_async(self.session)
+            self._entry = (self._clock(), infos)
+            return infos
+        finally:
+            self._inflight = None
+
+    async def get(self, symbol: str) -> Dict[str, float]:
+        if self._entry is None:
+            infos = await asyncio.shield(self._refresh())
+        else:
+            fetched_at, infos = self._entry
+            if self._clock() - fetched_at >= self.ttl_s:
+                self._refresh()
+        return infos.get(symbol, DEFAULT_FUNDING_INFO)
+
+    async def close(self) -> None:
+        """Cancel an outstanding background refresh."""
+        task = self._inflight
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
+async def _funding_rate(
+    session: aiohttp.ClientSession, symbol: str, market: Optional[MarketCache], max_age_ms: int
+) -> float:
+    if market is not None:
+        snap = market.latest("binance", symbol)
+        fresh = snap is not None and time.time() * 1000 - snap.ts <= max_age_ms
+        if fresh and not math.isnan(snap.funding):
+            return snap.funding
+    return await fetch_funding_rate_async(session, symbol)
+
+
+async def compute_net_edge_bps_async(
+    session: aiohttp.ClientSession,
+    symbol: str,
+    cache: FundingInfoCache,
+    market: Optional[MarketCache] = None,
+    max_age_ms: int = 5_000,
+) -> float:
+    """Async :func:`compute_net_edge_bps` reading funding info from *cache*.
+
+    With *market* given, a funding rate cached by the feeds within
+    *max_age_ms* is used instead of a REST call.
+    """
+    rate, info = await asyncio.gather(
+        _funding_rate(session, symbol, market, max_age_ms), cache.get(symbol)
+    )
+    clamped = _clamp(info["avgPremium"], info["floor"], info["cap"])
+    return (rate - clamped) * 10_000
+
+
+@dataclass
+class CycleStats:
+    """Timing of one polling cycle over all symbols."""
+
+    iteration: int
+    duration_s: float
+    interval_s: float
+    symbols: int
+    errors: int
+
+    @property
+    def overran(self) -> bool:
+        return self.duration_s > self.interval_s
+
+
 async def poll_net_edges(
-    symbols: List[str], publish: Callable[[str, float], None], iterations: int | None = None
+    symbols: List[str],
+    publish: Callable[[str, float], None],
+    iterations: int | None = None,
+    interval_s: float = 1.0,
+    on_cycle: Optional[Callable[[CycleStats], None]] = None,
+    session: Optional[aiohttp.ClientSession] = None,
+    info_ttl_s: float = FUNDING_INFO_TTL_S,
+    market: Optional[MarketCache] = None,
 ) -> None:
-    """Poll Binance every second and publish NetEdge for *symbols*.
+    """Poll Binance every *interval_s* and publish NetEdge for *symbols*.
+
+    All symbols are fetched concurrently over one pooled session; funding info
+    comes from a :class:`FundingInfoCache` and, when *market* is given, fresh
+    funding rates from the feeds' market cache.  Each cycle's timing is passed
+    to *on_cycle*, or printed when the cycle overran the interval.
 
     :param symbols: لیست نمادها
     :param publish: تابع انتشار به orchestrator
     :param iterations: تعداد تکرار (None برای حلقه بی‌نهایت)
     """
+    owns_session = session is None
+    if session is None:
+        session = aiohttp.ClientSession(trust_env=False, timeout=aiohttp.ClientTimeout(total=10))
+    cache = FundingInfoCache(session, ttl_s=info_ttl_s)
     count = 0
-    while iterations is None or count < iterations:
-        for sym in symbols:
-            try:
-                edge = compute_net_edge_bps(sym)
-            except Exception as exc:  # noqa: BLE001 - log and continue
-                print(f"Error computing NetEdge for {sym}: {exc}")
-                continue
-            publish(sym, edge)
-        count += 1
-        await asyncio.sleep(1)
+    try:
+        while iterations is None or count < iterations:
+            started = time.monotonic()
+            results = await asyncio.gather(
+                *(compute_net_edge_bps_async(session, sym, cache, market) for sym in symbols),
+                return_exceptions=True,
+            )
+            errors = 0
+            for sym, result in zip(symbols, results):
+                if isinstance(result, BaseException):
+                    errors += 1
+                    print(f"Error computing NetEdge for {sym}: {result}")
+                    continue
+                publish(sym, result)
+            stats = CycleStats(count, time.monotonic() - started, interval_s, len(symbols), errors)
+            if on_cycle is not None:
+                on_cycle(stats)
+            elif stats.overran:
+                print(f"NetEdge cycle {count} took {stats.duration_s:.3f}s (> {interval_s}s)")
+            count += 1
+            await asyncio.sleep(max(0.0, interval_s - stats.duration_s))
+    finally:
+        await cache.close()
+        if owns_session:
+            await session.close()
 
 
 if __name__ == "__main__":
@@ -1,37 +1,27 @@
 """
 ماژول ارتباط با OKX برای پشتیبانی از حالت Live و Demo.
+
+پیاده‌سازی در :mod:`core.exchange.okx` است؛ این ماژول برای سازگاری با کدهای
+قدیمی آن را بازصادر می‌کند و ارسال دسته‌ای سفارش‌ها را اضافه می‌کند.
 """
-from typing import Any, Dict, Optional
-import os
-import requests
+from typing import Any, Dict, List, Optional, Sequence
 
-BASE_URL = "https://www.okx.com"
+from core.exchange.okx import BASE_URL, OkxConnector, _request, place_order
+from orders.batch import OKX_BATCH_LIMIT, BatchItemResult, chunks, collect_okx, prepare_okx
 
+__all__ = ["BASE_URL", "OkxConnector", "place_batch_orders", "place_order"]
 
-def _request(method: str, endpoint: str, *, params: Optional[Dict[str, Any]] = None,
-             data: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None,
-             live: Optional[int] = None) -> Dict[str, Any]:
-    """
-    ارسال درخواست به OKX. در حالت Demo هدر x-simulated-trading: 1 اضافه می‌شود.
 
-    :param method: نوع متد HTTP
-    :param endpoint: مسیر اندپوینت (باید با /api/v5/ شروع شود)
-    :param params: پارامترهای کوئری
-    :param data: بدنه درخواست
-    :param headers: هدرهای اضافی
-    :param live: 1 برای حالت واقعی، 0 برای Demo. در صورت None از متغیر محیطی LIVE استفاده می‌شود.
-    :return: پاسخ به صورت دیکشنری
-    """
-    if live is None:
-        live = int(os.getenv("LIVE", "1"))
-    url = f"{BASE_URL}{endpoint}"
-    headers = headers.copy() if headers else {}
-    if endpoint.startswith("/api/v5/") and not live:
-        headers.setdefault("x-simulated-trading", "1")
-    response = requests.request(method, url, params=params, json=data, headers=headers)
-    return response.json()
+def place_batch_orders(orders: Sequence[Dict[str, Any]], live: Optional[int] = None,
+                       base_url: Optional[str] = None) -> List[BatchItemResult]:
+    """Send orders through ``/api/v5/trade/batch-orders``, 20 per request.
 
-
-def place_order(order: Dict[str, Any], live: Optional[int] = None) -> Dict[str, Any]:
-    """ارسال سفارش (v5) به OKX."""
-    return _request("POST", "/api/v5/trade/order", data=order, live=live)
+    Every order is validated locally first and invalid ones are not sent.
+    Returns one :class:`~orders.batch.BatchItemResult` per input order.
+    """
+    results, pending = prepare_okx(orders)
+    for chunk in chunks(pending, OKX_BATCH_LIMIT):
+        data = _request("POST", "/api/v5/trade/batch-orders", data=[order for _, order in chunk],
+                        live=live, base_url=base_url, orders=len(chunk))
+        collect_okx(results, chunk, data)
+    return results
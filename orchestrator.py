@@ -1,5 +1,12 @@
 """Simple orchestrator integrating guard checks."""
-from typing import Dict
+import math
+from typing import Dict, Optional
+
+from core.calculations import net_edge_bps
+from core.data.market_cache import MarketCache
+from core.data.order_book import BookManager
+from core.exchange.clock import clock
+from core.exchange.latency import LatencyMonitor
 from guards import (
     load_risk_config,
     check_latency,
@@ -12,13 +19,76 @@ from guards import (
 class Orchestrator:
     """Evaluate signals and emit trading actions."""
 
-    def __init__(self, theta: float, live: bool = False, risk_path: str = "risk.yml") -> None:
+    def __init__(
+        self,
+        theta: float,
+        live: bool = False,
+        risk_path: str = "risk.yml",
+        market: Optional[MarketCache] = None,
+        books: Optional[BookManager] = None,
+        depth_bps: float = 10.0,
+        latency: Optional[LatencyMonitor] = None,
+        latency_quantile: float = 0.99,
+        max_age_ms: Optional[float] = None,
+    ) -> None:
         self.theta = theta
         self.live = live
         self.risk_cfg = load_risk_config(risk_path)
+        self.market = market
+        self.books = books
+        self.depth_bps = depth_bps
+        self.latency = latency
+        self.latency_quantile = latency_quantile
+        self.max_age_ms = max_age_ms if max_age_ms is not None else self.risk_cfg.get("max_snapshot_age_ms")
+
+    def _cached_net_edge(self, signal: Dict[str, float]) -> Optional[float]:
+        """NetEdge from the cached index (spot) and mark (future) prices.
+
+        A snapshot older than ``max_age_ms`` on the venue's clock is ignored.
+        """
+        if self.market is None or "symbol" not in signal:
+            return None
+        venue = signal.get("venue", "binance")
+        snap = self.market.latest(venue, signal["symbol"], self.max_age_ms, clock.now_ms(venue))
+        if snap is None or math.isnan(snap.index) or math.isnan(snap.mark) or snap.index <= 0:
+            return None
+        return net_edge_bps(snap.index, snap.mark, signal.get("costs_bps", 0.0))
+
+    def _book_depth(self, signal: Dict[str, float]) -> Optional[float]:
+        """Notional within ``depth_bps`` of the mid in the local order book."""
+        if self.books is None or "symbol" not in signal:
+            return None
+        bps = signal.get("depth_bps", self.depth_bps)
+        return self.books.depth_notional(signal.get("venue", "binance"), signal["symbol"], bps)
+
+    def _measured_latency(self, signal: Dict[str, float]) -> Optional[float]:
+        """Measured feed lag plus order round trip of the signal's venue."""
+        if self.latency is None:
+            return None
+        value = self.latency.leg_latency_ms(signal.get("venue", "binance"), self.latency_quantile)
+        return None if math.isnan(value) else value
 
     def evaluate(self, signal: Dict[str, float]) -> str:
-        """Return "ENTER" when all guard conditions pass."""
+        """Return "ENTER" when all guard conditions pass.
+
+        When the signal carries no ``net_edge`` and a market cache is attached,
+        NetEdge is computed from the latest cached snapshot of ``symbol``.
+        Likewise a missing ``depth_notional`` is read from the attached order
+        books.  With a latency monitor attached, ``latency_ms`` is raised to the
+        measured ``latency_quantile`` of the venue, so a caller's optimistic
+        guess cannot pass the latency guard.
+        """
+        if "net_edge" not in signal:
+            cached = self._cached_net_edge(signal)
+            if cached is not None:
+                signal = {**signal, "net_edge": cached}
+        measured = self._measured_latency(signal)
+        if measured is not None:
+            signal = {**signal, "latency_ms": max(measured, signal.get("latency_ms", 0))}
+        if "depth_notional" not in signal:
+            depth = self._book_depth(signal)
+            if depth is not None:
+                signal = {**signal, "depth_notional": depth}
         latency_ok = check_latency(signal.get("latency_ms", 0), signal.get("max_leg_latency_ms", float("inf")))
         slippage_ok = check_slippage(signal.get("slippage_bps", 0), signal.get("max_slippage_bps", float("inf")))
         depth_ok = check_depth(signal.get("depth_notional", 0), signal.get("min_depth_notional", 0))
@@ -1,19 +1,32 @@
 """Minimal orchestrator computing NetEdge from market data."""
 from __future__ import annotations
-from typing import Dict, Any
+import math
+from typing import Dict, Any, Optional
 from core.calculations import net_edge_bps
+from core.data.market_cache import MarketCache
 
 DEFAULT_CONFIG: Dict[str, Any] = {
     "spot": 100.0,
     "future": 101.0,
     "costs_bps": 5.0,
+    "max_age_ms": 5_000,
 }
 
 
-def run(config: Dict[str, Any] | None = None) -> Dict[str, Any]:
+def run(config: Dict[str, Any] | None = None, market: Optional[MarketCache] = None) -> Dict[str, Any]:
+    """Compute NetEdge from *config*.
+
+    When *market* is given and ``config`` names a ``symbol`` (and optionally a
+    ``venue``), spot and future come from the cached index and mark prices,
+    unless the snapshot is more than ``max_age_ms`` old.
+    """
     cfg = DEFAULT_CONFIG.copy()
     if config:
         cfg.update(config)
+    if market is not None and cfg.get("symbol"):
+        snap = market.latest(cfg.get("venue", "binance"), cfg["symbol"], cfg["max_age_ms"])
+        if snap is not None and not (math.isnan(snap.index) or math.isnan(snap.mark)):
+            cfg["spot"], cfg["future"] = snap.index, snap.mark
     edge = net_edge_bps(cfg["spot"], cfg["future"], cfg["costs_bps"])
     return {"net_edge_bps": edge, "config": cfg}
 
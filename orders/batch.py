@@ -0,0 +1,120 @@
+"""Splitting, local validation and per-item results for batch order endpoints.
+
+Binance ``/fapi/v1/batchOrders`` accepts up to :data:`BINANCE_BATCH_LIMIT`
+orders per request and OKX ``/api/v5/trade/batch-orders`` up to
+:data:`OKX_BATCH_LIMIT`.  The batch methods on the order clients validate
+every order first, send only the valid ones in as many requests as needed and
+return one :class:`BatchItemResult` per input order, in the caller's order, so
+partial failures can be told apart item by item.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+BINANCE_BATCH_LIMIT = 5
+OKX_BATCH_LIMIT = 20
+
+# OKX order types that need ``px``.
+OKX_PRICED_TYPES = {"limit", "post_only", "fok", "ioc"}
+
+T = TypeVar("T")
+Pending = List[Tuple[int, Dict[str, Any]]]
+
+
+@dataclass
+class BatchItemResult:
+    """Outcome of one order of a batch."""
+
+    index: int
+    order: Dict[str, Any]
+    ok: bool = False
+    response: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+def chunks(items: Sequence[T], size: int) -> Iterator[List[T]]:
+    """Yield consecutive slices of at most *size* items."""
+    if size <= 0:
+        raise ValueError("size must be positive")
+    for start in range(0, len(items), size):
+        yield list(items[start:start + size])
+
+
+def new_results(orders: Sequence[Dict[str, Any]]) -> List[BatchItemResult]:
+    return [BatchItemResult(i, order) for i, order in enumerate(orders)]
+
+
+def fail(results: List[BatchItemResult], pending: Pending, error: str) -> None:
+    """Mark every pending item as failed with *error*."""
+    for idx, _ in pending:
+        results[idx].ok = False
+        results[idx].error = error
+
+
+def collect_binance(results: List[BatchItemResult], pending: Pending, status: int, data: Any) -> None:
+    """Map a ``batchOrders`` response (one entry per order, in order) onto *results*."""
+    if not isinstance(data, list):
+        msg = data.get("msg") if isinstance(data, dict) else None
+        fail(results, pending, msg or f"HTTP {status}")
+        return
+    for n, (idx, _) in enumerate(pending):
+        item = data[n] if n < len(data) else None
+        result = results[idx]
+        result.response = item
+        if not isinstance(item, dict):
+            result.error = "missing in batch response"
+        elif "code" in item and item.get("code") not in (0, 200):
+            result.error = item.get("msg") or str(item["code"])
+        else:
+            result.ok = True
+
+
+def validate_okx_order(order: Dict[str, Any]) -> None:
+    """Raise ``ValueError`` if *order* lacks what OKX requires for ``trade/order``."""
+    for field in ("instId", "tdMode", "side", "ordType", "sz"):
+        if not order.get(field):
+            raise ValueError(f"Missing {field}")
+    if order["side"] not in ("buy", "sell"):
+        raise ValueError("side must be buy or sell")
+    try:
+        if Decimal(str(order["sz"])) <= 0:
+            raise ValueError("sz must be positive")
+        if order["ordType"] in OKX_PRICED_TYPES:
+            if Decimal(str(order.get("px") or 0)) <= 0:
+                raise ValueError(f"px required for {order['ordType']} orders")
+    except InvalidOperation:
+        raise ValueError("sz and px must be numeric") from None
+
+
+def prepare_okx(orders: Sequence[Dict[str, Any]]) -> Tuple[List[BatchItemResult], Pending]:
+    """Results for every order plus the locally valid ones still to send."""
+    results = new_results(orders)
+    pending: Pending = []
+    for result in results:
+        try:
+            validate_okx_order(result.order)
+            pending.append((result.index, result.order))
+        except ValueError as exc:
+            result.error = str(exc)
+    return results, pending
+
+
+def collect_okx(results: List[BatchItemResult], pending: Pending, data: Any) -> None:
+    """Map a ``batch-orders`` response (``data`` in request order) onto *results*."""
+    items = data.get("data") if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        msg = data.get("msg") if isinstance(data, dict) else None
+        fail(results, pending, msg or "invalid batch response")
+        return
+    for n, (idx, _) in enumerate(pending):
+        item = items[n] if n < len(items) else None
+        result = results[idx]
+        result.response = item
+        if not isinstance(item, dict):
+            result.error = data.get("msg") or "missing in batch response"
+        elif item.get("sCode") != "0":
+            result.error = item.get("sMsg") or item.get("sCode")
+        else:
+            result.ok = True
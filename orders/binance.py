@@ -1,35 +1,125 @@
+"""Binance Futures order clients for batches, the WebSocket API and scripts.
+
+Strategies and the arbitrage executor trade through
+:class:`core.exchange.binance.BinanceConnector`.  The two clients here stay
+for what that connector does not expose:
+
+* :class:`BinanceOrderClient` is synchronous (``requests``) for scripts and
+  tools that have no event loop, and places ``batchOrders``;
+* :class:`AsyncBinanceOrderClient` adds ``batchOrders`` and the WebSocket
+  trading API (``order.place``) with REST fallback.
+
+All three build their parameters with
+:func:`core.exchange.binance.order_params`, so validation, number formatting
+and timestamps are the same whichever path an order takes.
+"""
+import asyncio
 import os
-import time
-import hmac
-import hashlib
-from decimal import Decimal, ROUND_DOWN
-from typing import Any, Dict
+import json
+from decimal import Decimal
+from typing import Any, Dict, List, Sequence, Tuple
 
 import logging
 import requests
 
-logger = logging.getLogger(__name__)
+from core.exchange import endpoints
+from core.exchange.binance import order_params as _order_params
+from core.exchange.clock import clock
+from core.exchange.rate_limit import ORDER, limiter
+from core.exchange.signing import sign_binance_query as _signed_query
+from core.exchange.transport import AsyncTransport
 
-API_URL = "https://fapi.binance.com"
+from .batch import (
+    BINANCE_BATCH_LIMIT, BatchItemResult, Pending, chunks, collect_binance, new_results,
+)
+from .symbol_rules import SymbolRules, SymbolRulesIndex, get_index
+from .ws_api import BinanceWsApi, WsApiError
 
+logger = logging.getLogger(__name__)
 
-def _sign(params: Dict[str, Any], secret: str) -> Dict[str, Any]:
-    query = "&".join(f"{k}={v}" for k, v in params.items())
-    signature = hmac.new(secret.encode(), query.encode(), hashlib.sha256).hexdigest()
-    params["signature"] = signature
-    return params
+API_URL = endpoints.BINANCE_REST_URL
 
 
 def _get_headers(api_key: str) -> Dict[str, str]:
     return {"X-MBX-APIKEY": api_key}
 
 
+def _log_result(status: int, data: Any, new_order_resp_type: str) -> None:
+    if status != 200 or "code" in data and data.get("code", 0) != 0:
+        logger.error("Order rejected: %s", data)
+    else:
+        logger.info("Order %s: %s", new_order_resp_type, data)
+
+
+def _batch_item(rules: SymbolRulesIndex, order: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate one batch entry (``place_order`` keyword names) and build its params."""
+    symbol = order["symbol"].upper()
+    qty = Decimal(str(order["quantity"]))
+    price = Decimal(str(order["price"])) if order.get("price") is not None else None
+    rules.validate(symbol, qty, price)
+    return _order_params(
+        symbol,
+        order["side"],
+        order.get("order_type", "LIMIT"),
+        qty,
+        price,
+        order.get("time_in_force", "GTC"),
+        order.get("reduce_only", False),
+        order.get("position_side"),
+        order.get("new_order_resp_type", "RESULT"),
+        order.get("extra_params"),
+    )
+
+
+def _prepare_batch(
+    rules: SymbolRulesIndex, orders: Sequence[Dict[str, Any]]
+) -> Tuple[List[BatchItemResult], Pending]:
+    results = new_results(orders)
+    pending: Pending = []
+    for result in results:
+        try:
+            pending.append((result.index, _batch_item(rules, result.order)))
+        except (KeyError, ValueError, ArithmeticError) as exc:
+            result.error = str(exc)
+    return results, pending
+
+
+def _batch_query(chunk: Pending, secret: str) -> str:
+    items = []
+    for _, params in chunk:
+        # batchOrders entries carry no timestamp or recvWindow and take every value as a string.
+        items.append({k: str(v) for k, v in params.items() if k not in ("timestamp", "recvWindow")})
+    batch = {"batchOrders": json.dumps(items, separators=(",", ":")), "timestamp": clock.now_ms("binance")}
+    recv_window = clock.recv_window_ms("binance")
+    if recv_window is not None:
+        batch["recvWindow"] = recv_window
+    return _signed_query(batch, secret)
+
+
 class BinanceOrderClient:
-    """Simple Binance Futures order wrapper with basic validation."""
+    """Simple Binance Futures order wrapper with basic validation.
+
+    Without an event loop there is no background clock sync: a signed request
+    first samples the server time if the last sample is older than
+    *clock_interval_s*, so the first order of the session always does.
+
+    Construction does no I/O.  Trading rules are loaded on the first order,
+    or up front by :meth:`start`.
+    """
 
-    def __init__(self, api_key: str, api_secret: str, live: bool | None = None) -> None:
+    clock_interval_s = 30.0
+
+    def __init__(
+        self,
+        api_key: str,
+        api_secret: str,
+        live: bool | None = None,
+        base_url: str | None = None,
+        rules: SymbolRulesIndex | None = None,
+    ) -> None:
         self.api_key = api_key
         self.api_secret = api_secret
+        self.base_url = base_url or API_URL
         if live is None:
             live_env = os.getenv("LIVE", "0")
             self.live = bool(int(live_env))
@@ -37,58 +127,38 @@ class BinanceOrderClient:
             self.live = live
         self.session = requests.Session()
         self.session.headers.update(_get_headers(api_key))
-        self._exchange_cache: Dict[str, Dict[str, Any]] = {}
+        self._shared_rules = rules is None
+        self.rules = get_index(self.base_url) if rules is None else rules
+
+    def start(self) -> None:
+        """Load the trading rules for every symbol (from the cache file when
+        fresh) so the first order per symbol skips exchangeInfo, and keep the
+        shared index refreshed in the background."""
+        if self._shared_rules:
+            self.rules.start()
+        try:
+            self.rules.ensure_loaded()
+        except Exception as exc:  # noqa: BLE001 - retried on the first order
+            logger.warning("Could not preload trading rules: %s", exc)
 
     # ------------------------------------------------------------------
     # Exchange info helpers
     # ------------------------------------------------------------------
-    def _get_symbol_info(self, symbol: str) -> Dict[str, Any]:
-        symbol = symbol.upper()
-        if symbol not in self._exchange_cache:
-            resp = self.session.get(f"{API_URL}/fapi/v1/exchangeInfo", params={"symbol": symbol})
-            data = resp.json()
-            if "symbols" not in data or not data["symbols"]:
-                raise ValueError(f"Symbol {symbol} not found on exchange")
-            self._exchange_cache[symbol] = data["symbols"][0]
-        return self._exchange_cache[symbol]
+    def _get_symbol_info(self, symbol: str) -> SymbolRules:
+        self.rules.ensure_loaded()
+        return self.rules.get(symbol)
 
     def _validate(self, symbol: str, quantity: Decimal, price: Decimal | None) -> None:
-        info = self._get_symbol_info(symbol)
-        qty = Decimal(str(quantity))
-        prc = Decimal(str(price)) if price is not None else None
-
-        qty_precision = info.get("quantityPrecision", 8)
-        price_precision = info.get("pricePrecision", 8)
-
-        for f in info.get("filters", []):
-            f_type = f.get("filterType")
-            if f_type == "LOT_SIZE":
-                min_qty = Decimal(f["minQty"])
-                step_size = Decimal(f["stepSize"])
-                if qty < min_qty:
-                    raise ValueError("Quantity below minQty")
-                if (qty - min_qty) % step_size != 0:
-                    raise ValueError("Quantity not aligned with stepSize")
-            elif f_type == "MIN_NOTIONAL" and prc is not None:
-                min_notional = Decimal(f["notional"])
-                if prc * qty < min_notional:
-                    raise ValueError("Notional too small")
-            elif f_type == "PRICE_FILTER" and prc is not None:
-                min_price = Decimal(f["minPrice"])
-                tick = Decimal(f["tickSize"])
-                if prc < min_price:
-                    raise ValueError("Price below minPrice")
-                if (prc - min_price) % tick != 0:
-                    raise ValueError("Price not aligned with tickSize")
-
-        # Precision validation
-        q_quant = Decimal("1") / (Decimal("10") ** qty_precision)
-        if qty != qty.quantize(q_quant, rounding=ROUND_DOWN):
-            raise ValueError("Quantity exceeds allowed precision")
-        if prc is not None:
-            p_quant = Decimal("1") / (Decimal("10") ** price_precision)
-            if prc != prc.quantize(p_quant, rounding=ROUND_DOWN):
-                raise ValueError("Price exceeds allowed precision")
+        self._get_symbol_info(symbol).validate(quantity, price)
+
+    def sync_clock(self) -> None:
+        """Sample the server time unless the last sample is recent enough."""
+        if clock.age_s("binance") <= self.clock_interval_s:
+            return
+        try:
+            clock.sync_session("binance", self.session, self.base_url)
+        except Exception as exc:  # noqa: BLE001 - the last estimate, or local time, is used
+            logger.warning("binance clock sync failed: %s", exc)
 
     # ------------------------------------------------------------------
     # Order placement
@@ -110,37 +180,198 @@ class BinanceOrderClient:
         qty_dec = Decimal(str(quantity))
         price_dec = Decimal(str(price)) if price is not None else None
         self._validate(symbol, qty_dec, price_dec)
+        self.sync_clock()
 
-        params: Dict[str, Any] = {
-            "symbol": symbol,
-            "side": side,
-            "type": order_type,
-            "quantity": float(qty_dec),
-            "timestamp": int(time.time() * 1000),
-            "newOrderRespType": new_order_resp_type,
-        }
-        if order_type.upper() != "MARKET":
-            if price_dec is None:
-                raise ValueError("Price required for non-market orders")
-            tif = time_in_force.upper()
-            if tif not in {"IOC", "FOK", "GTC", "GTX"}:
-                raise ValueError("Unsupported timeInForce")
-            params["price"] = float(price_dec)
-            params["timeInForce"] = tif
-        if reduce_only:
-            params["reduceOnly"] = "true"
-        if position_side:
-            params["positionSide"] = position_side
-        if extra_params:
-            params.update(extra_params)
+        params = _order_params(
+            symbol, side, order_type, qty_dec, price_dec, time_in_force,
+            reduce_only, position_side, new_order_resp_type, extra_params,
+        )
 
         endpoint = "/fapi/v1/order" if self.live else "/fapi/v1/order/test"
-        signed = _sign(params, self.api_secret)
-        resp = self.session.post(f"{API_URL}{endpoint}", params=signed)
+        query = _signed_query(params, self.api_secret)
+        limiter.acquire("binance", weight=1, orders=1 if self.live else 0, priority=ORDER)
+        resp = self.session.post(f"{self.base_url}{endpoint}?{query}")
+        limiter.record_response("binance", resp.status_code, resp.headers)
         data = resp.json()
+        _log_result(resp.status_code, data, new_order_resp_type)
+        return data
 
-        if resp.status_code != 200 or "code" in data and data.get("code", 0) != 0:
-            logger.error("Order rejected: %s", data)
+    def place_batch_orders(self, orders: Sequence[Dict[str, Any]]) -> List[BatchItemResult]:
+        """Place several orders via ``/fapi/v1/batchOrders``, five per request.
+
+        Each order is a dict of :meth:`place_order` keyword arguments.  Orders
+        failing local validation are not sent.  Binance has no batch test
+        endpoint, so outside live mode every order goes to ``order/test``.
+        """
+        self.rules.ensure_loaded()
+        self.sync_clock()
+        results, pending = _prepare_batch(self.rules, orders)
+        if not self.live:
+            for idx, params in pending:
+                limiter.acquire("binance", weight=1, priority=ORDER)
+                resp = self.session.post(
+                    f"{self.base_url}/fapi/v1/order/test?{_signed_query(params, self.api_secret)}"
+                )
+                limiter.record_response("binance", resp.status_code, resp.headers)
+                collect_binance(results, [(idx, params)], resp.status_code, [resp.json()])
         else:
-            logger.info("Order %s: %s", new_order_resp_type, data)
+            for chunk in chunks(pending, BINANCE_BATCH_LIMIT):
+                limiter.acquire("binance", weight=5, orders=len(chunk), priority=ORDER)
+                resp = self.session.post(
+                    f"{self.base_url}/fapi/v1/batchOrders?{_batch_query(chunk, self.api_secret)}"
+                )
+                limiter.record_response("binance", resp.status_code, resp.headers)
+                collect_binance(results, chunk, resp.status_code, resp.json())
+        for result in results:
+            if not result.ok:
+                logger.error("Batch order %d rejected: %s", result.index, result.error)
+        return results
+
+
+class AsyncBinanceOrderClient:
+    """Asyncio counterpart of :class:`BinanceOrderClient` over a pooled transport.
+
+    The connection pool is opened by :meth:`start` (or ``async with``), which
+    also loads the trading rules off the event loop and syncs the exchange
+    clock, re-sampled every *clock_interval_s* until :meth:`aclose`; orders
+    can then be placed concurrently from one loop.
+
+    With ``use_ws`` live orders go over the WebSocket trading API
+    (:class:`orders.ws_api.BinanceWsApi`) and fall back to REST whenever the
+    socket is down.  Dry-run orders always use the REST test endpoint.
+    """
+
+    clock_interval_s = 30.0
+
+    def __init__(
+        self,
+        api_key: str,
+        api_secret: str,
+        live: bool | None = None,
+        base_url: str | None = None,
+        rules: SymbolRulesIndex | None = None,
+        use_ws: bool = False,
+        ws_url: str | None = None,
+        **transport_kwargs: Any,
+    ) -> None:
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.base_url = base_url or API_URL
+        self.live = bool(int(os.getenv("LIVE", "0"))) if live is None else live
+        self._shared_rules = rules is None
+        self.rules = get_index(self.base_url) if rules is None else rules
+        self.transport = AsyncTransport(
+            "binance", self.base_url, headers=_get_headers(api_key), **transport_kwargs
+        )
+        self.ws = BinanceWsApi(api_key, api_secret, url=ws_url) if use_ws else None
+
+    async def start(self, connections: int = 2) -> None:
+        """Load trading rules, pre-warm the pool, sync the clock and open the
+        WebSocket if enabled; the clock is then kept synced until closed."""
+        if self._shared_rules:
+            self.rules.start()
+        tasks = [
+            asyncio.to_thread(self.rules.ensure_loaded),
+            self.transport.warm_up("/fapi/v1/ping", connections),
+            self._sync_clock(),
+        ]
+        if self.ws is not None:
+            tasks.append(self.ws.start())
+        await asyncio.gather(*tasks)
+        clock.start("binance", self.transport, self.clock_interval_s)
+
+    async def _sync_clock(self) -> None:
+        try:
+            await clock.sync("binance", self.transport)
+        except Exception as exc:  # noqa: BLE001 - local time is used until a sample succeeds
+            logger.warning("binance clock sync failed: %s", exc)
+
+    async def _place_ws(self, params: Dict[str, Any]) -> Dict[str, Any] | None:
+        """Send over the WebSocket API; ``None`` if the socket is down and REST must be used."""
+        params = {k: v for k, v in params.items() if k != "timestamp"}
+        try:
+            return await self.ws.request("order.place", params, orders=1)
+        except ConnectionError:
+            logger.warning("WebSocket API unavailable, sending order over REST")
+            return None
+        except WsApiError as exc:
+            return {"code": exc.code, "msg": exc.msg}
+
+    async def place_order(
+        self,
+        symbol: str,
+        side: str,
+        order_type: str,
+        quantity: float,
+        price: float | None = None,
+        time_in_force: str = "GTC",
+        reduce_only: bool = False,
+        position_side: str | None = None,
+        new_order_resp_type: str = "RESULT",
+        extra_params: Dict[str, Any] | None = None,
+    ) -> Dict[str, Any]:
+        symbol = symbol.upper()
+        qty_dec = Decimal(str(quantity))
+        price_dec = Decimal(str(price)) if price is not None else None
+        if not len(self.rules):
+            await asyncio.to_thread(self.rules.ensure_loaded)
+        self.rules.validate(symbol, qty_dec, price_dec)
+
+        params = _order_params(
+            symbol, side, order_type, qty_dec, price_dec, time_in_force,
+            reduce_only, position_side, new_order_resp_type, extra_params,
+        )
+        if self.live and self.ws is not None and self.ws.connected:
+            data = await self._place_ws(params)
+            if data is not None:
+                _log_result(400 if "code" in data else 200, data, new_order_resp_type)
+                return data
+        endpoint = "/fapi/v1/order" if self.live else "/fapi/v1/order/test"
+        resp, _ = await self.transport.request(
+            "POST", f"{endpoint}?{_signed_query(params, self.api_secret)}", endpoint=endpoint,
+            orders=1 if self.live else 0,
+        )
+        data = resp.json()
+        _log_result(resp.status_code, data, new_order_resp_type)
         return data
+
+    async def place_batch_orders(self, orders: Sequence[Dict[str, Any]]) -> List[BatchItemResult]:
+        """Async :meth:`BinanceOrderClient.place_batch_orders`; chunks are sent concurrently."""
+        if not len(self.rules):
+            await asyncio.to_thread(self.rules.ensure_loaded)
+        results, pending = _prepare_batch(self.rules, orders)
+
+        async def send(chunk: Pending) -> None:
+            if self.live:
+                resp, _ = await self.transport.request(
+                    "POST", f"/fapi/v1/batchOrders?{_batch_query(chunk, self.api_secret)}",
+                    endpoint="/fapi/v1/batchOrders", weight=5, orders=len(chunk),
+                )
+                collect_binance(results, chunk, resp.status_code, resp.json())
+            else:
+                (_, params), = chunk
+                resp, _ = await self.transport.request(
+                    "POST", f"/fapi/v1/order/test?{_signed_query(params, self.api_secret)}",
+                    endpoint="/fapi/v1/order/test",
+                )
+                collect_binance(results, chunk, resp.status_code, [resp.json()])
+
+        size = BINANCE_BATCH_LIMIT if self.live else 1
+        await asyncio.gather(*(send(chunk) for chunk in chunks(pending, size)))
+        for result in results:
+            if not result.ok:
+                logger.error("Batch order %d rejected: %s", result.index, result.error)
+        return results
+
+    async def aclose(self) -> None:
+        await clock.stop("binance", self.transport)
+        if self.ws is not None:
+            await self.ws.close()
+        await self.transport.aclose()
+
+    async def __aenter__(self) -> "AsyncBinanceOrderClient":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.aclose()
@@ -0,0 +1,52 @@
+"""Asyncio MEXC futures order client over a pooled keep-alive transport."""
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Optional
+
+from auth import generate_auth_headers
+from core.exchange import endpoints
+from core.exchange.transport import AsyncTransport
+
+API_URL = endpoints.MEXC_REST_URL
+
+
+class AsyncMexcOrderClient:
+    """Place MEXC futures orders concurrently from one event loop."""
+
+    def __init__(
+        self,
+        api_key: str = "",
+        api_secret: str = "",
+        base_url: Optional[str] = None,
+        **transport_kwargs: Any,
+    ) -> None:
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.base_url = base_url or API_URL
+        self.transport = AsyncTransport(
+            "mexc", self.base_url, headers={"Content-Type": "application/json"}, **transport_kwargs
+        )
+
+    async def start(self, connections: int = 2) -> None:
+        """Pre-warm *connections* pooled connections."""
+        await self.transport.warm_up("/api/v1/contract/ping", connections)
+
+    async def place_order(self, order_details: Dict[str, Any]) -> Dict[str, Any]:
+        # The signature covers the body, so the exact bytes signed are sent.
+        body = json.dumps(order_details, separators=(",", ":"))
+        headers = generate_auth_headers(self.api_key, self.api_secret, body) if self.api_key else {}
+        resp, _ = await self.transport.request(
+            "POST", "/api/v1/private/order", content=body.encode(), headers=headers
+        )
+        return resp.json()
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+    async def __aenter__(self) -> "AsyncMexcOrderClient":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.aclose()
@@ -0,0 +1,297 @@
+"""Precompiled Binance Futures trading rules for order validation.
+
+:class:`SymbolRulesIndex` loads ``/fapi/v1/exchangeInfo`` for every symbol in
+one request, keeps the raw payload in a local JSON cache file with a TTL and
+compiles each symbol's ``LOT_SIZE``, ``PRICE_FILTER`` and ``MIN_NOTIONAL``
+filters into :class:`SymbolRules` with the steps already parsed.  Validating an
+order is then a dictionary lookup and a handful of ``Decimal`` comparisons,
+with no network access on the order path.
+
+A daemon thread started with :meth:`SymbolRulesIndex.start` refreshes the
+rules periodically; a failed refresh keeps serving the previous rules.
+Clients talking to the same base URL share one index via :func:`get_index`.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from core.exchange import endpoints
+from core.exchange.rate_limit import MARKET, limiter
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.path.join("data", "cache")
+RULES_TTL_S = 3_600.0
+
+Fetch = Callable[[], List[Dict[str, Any]]]
+
+_ZERO = Decimal(0)
+
+
+def _dec(value: Any) -> Decimal:
+    return Decimal(str(value)) if value not in (None, "") else _ZERO
+
+
+def _quantum(precision: int) -> Decimal:
+    return Decimal(1).scaleb(-int(precision))
+
+
+class SymbolRules:
+    """Order filters of one symbol, parsed once into ``Decimal`` steps."""
+
+    __slots__ = (
+        "symbol", "min_qty", "step_size", "min_price", "tick_size", "min_notional",
+        "qty_quantum", "price_quantum",
+    )
+
+    def __init__(
+        self,
+        symbol: str,
+        min_qty: Decimal = _ZERO,
+        step_size: Decimal = _ZERO,
+        min_price: Decimal = _ZERO,
+        tick_size: Decimal = _ZERO,
+        min_notional: Decimal = _ZERO,
+        qty_precision: int = 8,
+        price_precision: int = 8,
+    ) -> None:
+        self.symbol = symbol
+        self.min_qty = min_qty
+        self.step_size = step_size
+        self.min_price = min_price
+        self.tick_size = tick_size
+        self.min_notional = min_notional
+        self.qty_quantum = _quantum(qty_precision)
+        self.price_quantum = _quantum(price_precision)
+
+    @classmethod
+    def from_info(cls, info: Dict[str, Any]) -> "SymbolRules":
+        """Compile one ``symbols[]`` entry of an ``exchangeInfo`` response."""
+        filters = {f.get("filterType"): f for f in info.get("filters", [])}
+        lot = filters.get("LOT_SIZE", {})
+        price = filters.get("PRICE_FILTER", {})
+        notional = filters.get("MIN_NOTIONAL", {})
+        return cls(
+            info["symbol"],
+            min_qty=_dec(lot.get("minQty")),
+            step_size=_dec(lot.get("stepSize")),
+            min_price=_dec(price.get("minPrice")),
+            tick_size=_dec(price.get("tickSize")),
+            # Futures call it ``notional``, spot ``minNotional``.
+            min_notional=_dec(notional.get("notional", notional.get("minNotional"))),
+            qty_precision=info.get("quantityPrecision", 8),
+            price_precision=info.get("pricePrecision", 8),
+        )
+
+    def validate(self, qty: Decimal, price: Optional[Decimal] = None) -> None:
+        """Raise ``ValueError`` if the order breaks any of the symbol's filters."""
+        if qty < self.min_qty:
+            raise ValueError("Quantity below minQty")
+        if self.step_size and (qty - self.min_qty) % self.step_size:
+            raise ValueError("Quantity not aligned with stepSize")
+        if price is not None:
+            if price * qty < self.min_notional:
+                raise ValueError("Notional too small")
+            if price < self.min_price:
+                raise ValueError("Price below minPrice")
+            if self.tick_size and (price - self.min_price) % self.tick_size:
+                raise ValueError("Price not aligned with tickSize")
+        if qty % self.qty_quantum:
+            raise ValueError("Quantity exceeds allowed precision")
+        if price is not None and price % self.price_quantum:
+            raise ValueError("Price exceeds allowed precision")
+
+    def __repr__(self) -> str:
+        return (
+            f"SymbolRules({self.symbol!r}, step={self.step_size}, tick={self.tick_size}, "
+            f"min_notional={self.min_notional})"
+        )
+
+
+def default_cache_path(base_url: str) -> str:
+    """Cache file for *base_url*, so a simulator never overwrites production rules."""
+    parsed = urlparse(base_url)
+    host = (parsed.netloc or parsed.path or "default").replace(":", "_")
+    return os.path.join(CACHE_DIR, f"binance_exchange_info_{host}.json")
+
+
+def fetch_exchange_info(base_url: str, session: Optional[requests.Session] = None) -> List[Dict[str, Any]]:
+    """Fetch the ``symbols`` list for every symbol in a single request."""
+    http = session or requests
+    limiter.acquire("binance", weight=1, priority=MARKET)
+    resp = http.get(f"{base_url}/fapi/v1/exchangeInfo", timeout=10)
+    limiter.record_response("binance", resp.status_code, resp.headers)
+    resp.raise_for_status()
+    data = resp.json()
+    if not data.get("symbols"):
+        raise ValueError("exchangeInfo returned no symbols")
+    return data["symbols"]
+
+
+class SymbolRulesIndex:
+    """All symbols' compiled rules, backed by a cache file and refreshed in the background."""
+
+    def __init__(
+        self,
+        fetch: Fetch,
+        path: Optional[str] = None,
+        ttl_s: float = RULES_TTL_S,
+        refresh_s: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if ttl_s <= 0:
+            raise ValueError("ttl_s must be positive")
+        self._fetch = fetch
+        self.path = path
+        self.ttl_s = ttl_s
+        self.refresh_s = refresh_s if refresh_s is not None else ttl_s / 2
+        self._clock = clock
+        self._rules: Dict[str, SymbolRules] = {}
+        self.loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol.upper() in self._rules
+
+    @property
+    def age_s(self) -> float:
+        return self._clock() - self.loaded_at if self.loaded_at else float("inf")
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    def _install(self, infos: List[Dict[str, Any]], fetched_at: float) -> None:
+        rules = {}
+        for info in infos:
+            try:
+                rules[info["symbol"].upper()] = SymbolRules.from_info(info)
+            except (KeyError, ArithmeticError, ValueError) as exc:
+                logger.warning("Skipping malformed exchangeInfo entry %s: %s", info.get("symbol"), exc)
+        # A single reference swap, so readers never see a half-built index.
+        self._rules = rules
+        self.loaded_at = fetched_at
+
+    def _read_cache(self) -> Optional[Dict[str, Any]]:
+        if not self.path or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path) as fh:
+                data = json.load(fh)
+            if not isinstance(data.get("fetched_at"), (int, float)) or not isinstance(data.get("symbols"), list):
+                raise ValueError("missing fetched_at/symbols")
+            return data
+        except (OSError, ValueError, AttributeError) as exc:
+            logger.warning("Ignoring unreadable rules cache %s: %s", self.path, exc)
+            return None
+
+    def _write_cache(self, infos: List[Dict[str, Any]], fetched_at: float) -> None:
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w") as fh:
+                json.dump({"fetched_at": fetched_at, "symbols": infos}, fh)
+            os.replace(tmp, self.path)
+        except OSError as exc:
+            logger.warning("Could not write rules cache %s: %s", self.path, exc)
+
+    def refresh(self) -> int:
+        """Fetch every symbol from the exchange, install and persist; return the count."""
+        with self._lock:
+            infos = self._fetch()
+            now = self._clock()
+            self._install(infos, now)
+            self._write_cache(infos, now)
+            return len(self._rules)
+
+    def load(self) -> int:
+        """Load from the cache file if fresh, otherwise from the exchange.
+
+        If the exchange cannot be reached an expired cache file is still used,
+        since slightly stale filters beat rejecting every order.
+        """
+        cached = self._read_cache()
+        if cached is not None and self._clock() - cached["fetched_at"] < self.ttl_s:
+            self._install(cached["symbols"], cached["fetched_at"])
+            return len(self._rules)
+        try:
+            return self.refresh()
+        except Exception as exc:  # noqa: BLE001 - fall back to whatever is on disk
+            if cached is None:
+                raise
+            logger.warning("Rules refresh failed, using expired cache %s: %s", self.path, exc)
+            self._install(cached["symbols"], cached["fetched_at"])
+            return len(self._rules)
+
+    def ensure_loaded(self) -> None:
+        """Load once; later calls are free."""
+        if not self._rules:
+            self.load()
+
+    # ------------------------------------------------------------------
+    # Background refresh
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        while not self._stop.wait(self.refresh_s):
+            try:
+                count = self.refresh()
+                logger.debug("Refreshed trading rules for %d symbols", count)
+            except Exception as exc:  # noqa: BLE001 - keep serving the previous rules
+                logger.warning("Trading rules refresh failed: %s", exc)
+
+    def start(self) -> None:
+        """Start the periodic refresh thread (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="symbol-rules-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+    def get(self, symbol: str) -> SymbolRules:
+        rules = self._rules.get(symbol.upper())
+        if rules is None:
+            raise ValueError(f"Symbol {symbol} not found on exchange")
+        return rules
+
+    def validate(self, symbol: str, qty: Decimal, price: Optional[Decimal] = None) -> None:
+        self.get(symbol).validate(qty, price)
+
+
+_INDEXES: Dict[str, SymbolRulesIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def get_index(base_url: str = endpoints.BINANCE_REST_URL, ttl_s: float = RULES_TTL_S) -> SymbolRulesIndex:
+    """Shared, background-refreshed index for *base_url*, created on first use."""
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(base_url)
+        if index is None:
+            index = SymbolRulesIndex(
+                lambda: fetch_exchange_info(base_url), default_cache_path(base_url), ttl_s=ttl_s
+            )
+            _INDEXES[base_url] = index
+    return index
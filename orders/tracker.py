@@ -0,0 +1,242 @@
+"""Local order and fill state, keyed by client order id.
+
+User-data streams (:mod:`orders.user_stream`) translate venue events into
+:class:`OrderUpdate` and feed them to an :class:`OrderTracker`.  The tracker
+keeps one :class:`OrderState` per client order id and only moves it forward:
+cumulative fills never shrink and a terminal order never reopens, so events
+that arrive out of order or twice are harmless.
+
+Callers register an order with :meth:`OrderTracker.track` before sending it
+and then ``await`` :meth:`OrderTracker.wait_filled` or
+:meth:`OrderTracker.wait_done` instead of polling REST.
+
+Finished orders are kept for ``retention_s`` and at most ``max_done`` of them,
+oldest first out, so a long-running stream does not grow the tracker without
+bound.  Read a finished order's state before it is evicted.  An order that
+was tracked but never reached the venue – rejected on send, or a dry run –
+will never finish and must be dropped with :meth:`OrderTracker.forget`.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core.data.logger import logger
+from core.exchange.connector import CANCELED, EXPIRED, FILLED, NEW, PARTIALLY_FILLED, REJECTED
+
+TERMINAL = frozenset({FILLED, CANCELED, REJECTED, EXPIRED})
+_RANK = {NEW: 0, PARTIALLY_FILLED: 1, FILLED: 2, CANCELED: 2, REJECTED: 2, EXPIRED: 2}
+
+
+def new_client_order_id(prefix: str = "omni") -> str:
+    """Client order id valid on both Binance and OKX (alphanumeric, 32 chars)."""
+    return (prefix + uuid.uuid4().hex)[:32]
+
+
+@dataclass
+class OrderUpdate:
+    """One venue order event, normalised."""
+
+    venue: str
+    client_order_id: str
+    status: str
+    symbol: str = ""
+    side: str = ""
+    order_id: str = ""
+    quantity: float = 0.0
+    filled_qty: float = 0.0
+    last_qty: float = 0.0
+    last_price: float = 0.0
+    avg_price: float = 0.0
+    ts: int = 0
+
+
+@dataclass
+class Fill:
+    qty: float
+    price: float
+    ts: int
+
+
+class OrderState:
+    """Current state of one order."""
+
+    __slots__ = (
+        "client_order_id", "venue", "symbol", "side", "quantity", "order_id",
+        "status", "filled_qty", "avg_price", "updated_ms", "fills",
+    )
+
+    def __init__(self, client_order_id: str, venue: str = "", symbol: str = "", side: str = "",
+                 quantity: float = 0.0) -> None:
+        self.client_order_id = client_order_id
+        self.venue = venue
+        self.symbol = symbol
+        self.side = side
+        self.quantity = quantity
+        self.order_id = ""
+        self.status = NEW
+        self.filled_qty = 0.0
+        self.avg_price = 0.0
+        self.updated_ms = 0
+        self.fills: List[Fill] = []
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL
+
+    def __repr__(self) -> str:
+        return (
+            f"OrderState({self.client_order_id!r}, {self.venue}:{self.symbol}, status={self.status}, "
+            f"filled={self.filled_qty}/{self.quantity})"
+        )
+
+
+Listener = Callable[[OrderState, OrderUpdate], None]
+_Waiter = Tuple[Callable[[OrderState], bool], asyncio.Future]
+
+
+class OrderTracker:
+    """Order state machine fed by user-data streams."""
+
+    def __init__(
+        self, retention_s: float = 3_600.0, max_done: int = 10_000, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        if retention_s < 0 or max_done < 0:
+            raise ValueError("retention_s and max_done must not be negative")
+        self.retention_s = retention_s
+        self.max_done = max_done
+        self._clock = clock
+        self._orders: Dict[str, OrderState] = {}
+        self._waiters: Dict[str, List[_Waiter]] = {}
+        self._listeners: List[Listener] = []
+        # Finished orders by the time they finished, oldest first.
+        self._done: "OrderedDict[str, float]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def track(self, client_order_id: str, venue: str = "", symbol: str = "", side: str = "",
+              quantity: float = 0.0) -> OrderState:
+        """Register an order before it is sent, so no early event is missed."""
+        state = self._orders.get(client_order_id)
+        if state is None:
+            state = self._orders[client_order_id] = OrderState(client_order_id, venue, symbol, side, quantity)
+        return state
+
+    def get(self, client_order_id: str) -> Optional[OrderState]:
+        return self._orders.get(client_order_id)
+
+    def forget(self, client_order_id: str) -> Optional[OrderState]:
+        """Drop an order that will get no more events; its waiters fail with ``KeyError``."""
+        self._done.pop(client_order_id, None)
+        for _, fut in self._waiters.pop(client_order_id, ()):
+            if not fut.done():
+                fut.set_exception(KeyError(client_order_id))
+        return self._orders.pop(client_order_id, None)
+
+    def open_orders(self) -> List[OrderState]:
+        return [s for s in self._orders.values() if not s.done]
+
+    def subscribe(self, listener: Listener) -> Callable[[], None]:
+        """Call *listener* after every applied update; returns an unsubscribe function."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def apply(self, update: OrderUpdate) -> OrderState:
+        """Merge *update* into the order's state, ignoring stale information."""
+        state = self.track(update.client_order_id, update.venue, update.symbol, update.side, update.quantity)
+        was_done = state.done
+        for name in ("venue", "symbol", "side", "order_id"):
+            if not getattr(state, name) and getattr(update, name):
+                setattr(state, name, getattr(update, name))
+        if update.quantity and not state.quantity:
+            state.quantity = update.quantity
+        if update.filled_qty > state.filled_qty:
+            # Only a growing cumulative quantity is a new fill, so replays are ignored.
+            if update.last_qty > 0:
+                state.fills.append(Fill(update.last_qty, update.last_price, update.ts))
+            state.filled_qty = update.filled_qty
+            if update.avg_price:
+                state.avg_price = update.avg_price
+        if not state.done and _RANK.get(update.status, 0) >= _RANK[state.status]:
+            state.status = update.status
+        state.updated_ms = max(state.updated_ms, update.ts)
+        self._resolve(state)
+        if state.done and not was_done:
+            self._finished(state.client_order_id)
+        for listener in self._listeners:
+            try:
+                listener(state, update)
+            except Exception:  # noqa: BLE001 - one bad listener must not stall the stream
+                logger.exception("Order listener failed for %s", state.client_order_id)
+        return state
+
+    def _resolve(self, state: OrderState) -> None:
+        waiters = self._waiters.get(state.client_order_id)
+        if not waiters:
+            return
+        remaining = []
+        for predicate, fut in waiters:
+            if fut.done():
+                continue
+            if predicate(state):
+                fut.set_result(state)
+            else:
+                remaining.append((predicate, fut))
+        if remaining:
+            self._waiters[state.client_order_id] = remaining
+        else:
+            del self._waiters[state.client_order_id]
+
+    def _discard_waiter(self, client_order_id: str, waiter: _Waiter) -> None:
+        waiters = self._waiters.get(client_order_id)
+        if waiters is None:
+            return
+        if waiter in waiters:
+            waiters.remove(waiter)
+        if not waiters:
+            del self._waiters[client_order_id]
+
+    def _finished(self, client_order_id: str) -> None:
+        """Record a newly terminal order and evict those past retention or count."""
+        now = self._clock()
+        self._done[client_order_id] = now
+        while self._done:
+            oldest, finished_at = next(iter(self._done.items()))
+            if len(self._done) <= self.max_done and now - finished_at <= self.retention_s:
+                break
+            del self._done[oldest]
+            self._orders.pop(oldest, None)
+            self._waiters.pop(oldest, None)
+
+    async def wait(self, client_order_id: str, predicate: Callable[[OrderState], bool],
+                   timeout: Optional[float] = None) -> OrderState:
+        """Wait until *predicate* holds for the order; ``asyncio.TimeoutError`` after *timeout*.
+
+        Waiting does not track the order: an id without state is only checked
+        once its first event arrives.
+        """
+        state = self._orders.get(client_order_id)
+        if state is not None and predicate(state):
+            return state
+        waiter = (predicate, asyncio.get_running_loop().create_future())
+        self._waiters.setdefault(client_order_id, []).append(waiter)
+        try:
+            return await asyncio.wait_for(waiter[1], timeout)
+        finally:
+            self._discard_waiter(client_order_id, waiter)
+
+    async def wait_done(self, client_order_id: str, timeout: Optional[float] = None) -> OrderState:
+        """Wait for any terminal state: filled, canceled, rejected or expired."""
+        return await self.wait(client_order_id, lambda s: s.done, timeout)
+
+    async def wait_filled(self, client_order_id: str, timeout: Optional[float] = None) -> OrderState:
+        """Wait for the order to finish; raises ``RuntimeError`` unless it was fully filled."""
+        state = await self.wait_done(client_order_id, timeout)
+        if state.status != FILLED:
+            raise RuntimeError(f"order {client_order_id} ended {state.status}")
+        return state
@@ -0,0 +1,274 @@
+"""User-data streams feeding an :class:`~orders.tracker.OrderTracker`.
+
+* :class:`BinanceUserStream` creates a ``listenKey``, keeps it alive with a
+  periodic ``PUT`` and applies ``ORDER_TRADE_UPDATE`` events; a
+  ``listenKeyExpired`` event or a dropped socket starts over with a new key.
+* :class:`OkxUserStream` logs in to the private WebSocket, subscribes to the
+  ``orders`` channel and keeps the connection alive with ``ping``.
+
+Both reconnect with exponential backoff.  Events sent while disconnected are
+lost, so after a reconnect :meth:`OrderTracker.open_orders` lists what may need
+a REST status check; ``on_reconnect`` is called with that list.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import websockets
+
+from core.data.logger import logger
+from core.exchange import endpoints
+from core.exchange.clock import clock
+from core.exchange.okx import ORDER_STATES
+from core.exchange.rate_limit import ORDER
+from core.exchange.signing import signer
+from core.exchange.symbols import to_float
+from core.exchange.transport import AsyncTransport
+
+from .tracker import (
+    CANCELED, EXPIRED, FILLED, NEW, PARTIALLY_FILLED, REJECTED, OrderState, OrderTracker, OrderUpdate,
+)
+
+_BINANCE_STATUS = {
+    "NEW": NEW,
+    "PARTIALLY_FILLED": PARTIALLY_FILLED,
+    "FILLED": FILLED,
+    "CANCELED": CANCELED,
+    "REJECTED": REJECTED,
+    "EXPIRED": EXPIRED,
+    "EXPIRED_IN_MATCH": EXPIRED,
+}
+_OKX_STATUS = ORDER_STATES
+
+Reconnect = Callable[[List[OrderState]], Optional[Awaitable[None]]]
+
+
+def parse_binance_order_update(event: Dict[str, Any]) -> OrderUpdate:
+    """Normalise an ``ORDER_TRADE_UPDATE`` event."""
+    o = event["o"]
+    return OrderUpdate(
+        venue="binance",
+        client_order_id=o["c"],
+        status=_BINANCE_STATUS.get(o.get("X", ""), NEW),
+        symbol=o.get("s", ""),
+        side=o.get("S", ""),
+        order_id=str(o.get("i", "")),
+        quantity=to_float(o.get("q")),
+        filled_qty=to_float(o.get("z")),
+        last_qty=to_float(o.get("l")),
+        last_price=to_float(o.get("L")),
+        avg_price=to_float(o.get("ap")),
+        ts=int(event.get("T") or event.get("E") or 0),
+    )
+
+
+def parse_okx_order(item: Dict[str, Any]) -> OrderUpdate:
+    """Normalise one entry of an OKX ``orders`` channel push."""
+    return OrderUpdate(
+        venue="okx",
+        client_order_id=item.get("clOrdId") or item["ordId"],
+        status=_OKX_STATUS.get(item.get("state", ""), NEW),
+        symbol=item.get("instId", ""),
+        side=item.get("side", "").upper(),
+        order_id=item.get("ordId", ""),
+        quantity=to_float(item.get("sz")),
+        filled_qty=to_float(item.get("accFillSz")),
+        last_qty=to_float(item.get("fillSz")),
+        last_price=to_float(item.get("fillPx")),
+        avg_price=to_float(item.get("avgPx")),
+        ts=int(item.get("uTime") or 0),
+    )
+
+
+class _UserStream:
+    """Reconnect loop shared by the venue streams."""
+
+    venue = ""
+
+    def __init__(
+        self,
+        tracker: OrderTracker,
+        connect: Callable[[str], Any] = websockets.connect,
+        on_reconnect: Optional[Reconnect] = None,
+    ) -> None:
+        self.tracker = tracker
+        self.on_reconnect = on_reconnect
+        self.reconnects = 0
+        self.connected = asyncio.Event()
+        self._connect = connect
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def _url(self) -> str:
+        raise NotImplementedError
+
+    async def _session(self, ws: Any) -> None:
+        raise NotImplementedError
+
+    async def run(self) -> None:
+        """Stream until :meth:`close` is called."""
+        self._running = True
+        backoff = 1
+        while self._running:
+            try:
+                async with self._connect(await self._url()) as ws:
+                    backoff = 1
+                    if self.reconnects and self.on_reconnect is not None:
+                        result = self.on_reconnect(self.tracker.open_orders())
+                        if asyncio.iscoroutine(result):
+                            await result
+                    await self._session(ws)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001 - network and venue errors
+                logger.warning("%s user stream error: %s. Reconnecting in %ss", self.venue, exc, backoff)
+            finally:
+                self.connected.clear()
+            if not self._running:
+                break
+            self.reconnects += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 32)
+
+    def start(self) -> asyncio.Task:
+        """Run the stream in a background task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def close(self) -> None:
+        self._running = False
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+class BinanceUserStream(_UserStream):
+    """Binance Futures user-data stream over a ``listenKey``."""
+
+    venue = "binance"
+
+    def __init__(
+        self,
+        api_key: str,
+        tracker: OrderTracker,
+        base_url: Optional[str] = None,
+        ws_url: Optional[str] = None,
+        keepalive_s: float = 1_800.0,
+        connect: Callable[[str], Any] = websockets.connect,
+        on_reconnect: Optional[Reconnect] = None,
+        transport: Optional[AsyncTransport] = None,
+    ) -> None:
+        super().__init__(tracker, connect, on_reconnect)
+        self.ws_url = ws_url or endpoints.BINANCE_WS_URL
+        self.keepalive_s = keepalive_s
+        self.transport = transport or AsyncTransport(
+            "binance", base_url or endpoints.BINANCE_REST_URL, headers={"X-MBX-APIKEY": api_key}
+        )
+        self.listen_key: Optional[str] = None
+
+    async def _listen_key(self, method: str) -> Dict[str, Any]:
+        resp, _ = await self.transport.request(method, "/fapi/v1/listenKey", priority=ORDER)
+        resp.raise_for_status()
+        return resp.json()
+
+    async def _url(self) -> str:
+        self.listen_key = (await self._listen_key("POST"))["listenKey"]
+        return f"{self.ws_url}/ws/{self.listen_key}"
+
+    async def _keepalive(self) -> None:
+        while True:
+            await asyncio.sleep(self.keepalive_s)
+            try:
+                await self._listen_key("PUT")
+            except Exception as exc:  # noqa: BLE001 - the next attempt may succeed
+                logger.warning("listenKey keepalive failed: %s", exc)
+
+    async def _session(self, ws: Any) -> None:
+        self.connected.set()
+        keepalive = asyncio.create_task(self._keepalive())
+        try:
+            async for raw in ws:
+                event = json.loads(raw)
+                kind = event.get("e")
+                if kind == "ORDER_TRADE_UPDATE":
+                    self.tracker.apply(parse_binance_order_update(event))
+                elif kind == "listenKeyExpired":
+                    logger.warning("listenKey expired, reconnecting")
+                    return
+        finally:
+            keepalive.cancel()
+
+    async def close(self) -> None:
+        await super().close()
+        await self.transport.aclose()
+
+
+class OkxUserStream(_UserStream):
+    """OKX private ``orders`` channel."""
+
+    venue = "okx"
+
+    def __init__(
+        self,
+        api_key: str,
+        api_secret: str,
+        passphrase: str,
+        tracker: OrderTracker,
+        url: Optional[str] = None,
+        inst_type: str = "SWAP",
+        ping_s: float = 20.0,
+        connect: Callable[[str], Any] = websockets.connect,
+        on_reconnect: Optional[Reconnect] = None,
+    ) -> None:
+        super().__init__(tracker, connect, on_reconnect)
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.passphrase = passphrase
+        self.url = url or f"{endpoints.OKX_WS_URL}/ws/v5/private"
+        self.inst_type = inst_type
+        self.ping_s = ping_s
+
+    async def _url(self) -> str:
+        return self.url
+
+    def login_args(self) -> Dict[str, str]:
+        ts = str(clock.now_ms("okx") // 1000)
+        sign = signer(self.api_secret).b64digest(f"{ts}GET/users/self/verify")
+        return {
+            "apiKey": self.api_key,
+            "passphrase": self.passphrase,
+            "timestamp": ts,
+            "sign": sign,
+        }
+
+    async def _ping(self, ws: Any) -> None:
+        while True:
+            await asyncio.sleep(self.ping_s)
+            await ws.send("ping")
+
+    async def _session(self, ws: Any) -> None:
+        await ws.send(json.dumps({"op": "login", "args": [self.login_args()]}))
+        pinger = asyncio.create_task(self._ping(ws))
+        try:
+            async for raw in ws:
+                if raw == "pong":
+                    continue
+                msg = json.loads(raw)
+                event = msg.get("event")
+                if event == "login":
+                    await ws.send(json.dumps({
+                        "op": "subscribe", "args": [{"channel": "orders", "instType": self.inst_type}],
+                    }))
+                elif event == "subscribe":
+                    self.connected.set()
+                elif event == "error":
+                    raise RuntimeError(f"OKX private stream error {msg.get('code')}: {msg.get('msg')}")
+                elif msg.get("arg", {}).get("channel") == "orders":
+                    for item in msg.get("data", []):
+                        self.tracker.apply(parse_okx_order(item))
+        finally:
+            pinger.cancel()
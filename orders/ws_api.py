@@ -0,0 +1,218 @@
+"""Binance Futures WebSocket trading API (``ws-fapi``) transport.
+
+Orders sent over one persistent WebSocket skip the per-request HTTP overhead
+of the REST endpoints.  :class:`BinanceWsApi` keeps that connection open,
+reconnecting with exponential backoff, and correlates every response with its
+request through the request ``id``.  Requests are signed individually with the
+HMAC key – Binance only supports ``session.logon`` for Ed25519 keys – so a
+fresh connection is usable as soon as it is open.
+
+While the socket is down :meth:`BinanceWsApi.request` raises
+``ConnectionError`` immediately, which lets
+:class:`orders.binance.AsyncBinanceOrderClient` fall back to REST.  Request
+weight and order counts reported in ``rateLimits`` are fed to the shared
+:data:`~core.exchange.rate_limit.limiter`.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import websockets
+
+from core.data.logger import logger
+from core.exchange import endpoints
+from core.exchange.clock import clock
+from core.exchange.latency import latency
+from core.exchange.rate_limit import ORDER, limiter
+from core.exchange.signing import HmacSigner
+
+WS_API_URL = endpoints.BINANCE_WS_API_URL
+
+_INTERVAL_CODES = {"SECOND": "S", "MINUTE": "M", "HOUR": "H", "DAY": "D"}
+_LIMIT_HEADERS = {"REQUEST_WEIGHT": "X-MBX-USED-WEIGHT", "ORDERS": "X-MBX-ORDER-COUNT"}
+
+
+class WsApiError(Exception):
+    """Error response (``status`` other than 200) from the WebSocket API."""
+
+    def __init__(self, status: int, code: int, msg: str) -> None:
+        super().__init__(f"{status} {code}: {msg}")
+        self.status = status
+        self.code = code
+        self.msg = msg
+
+
+def _rate_limit_headers(rate_limits: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Translate ``rateLimits`` into the REST headers the limiter understands."""
+    headers = {}
+    for item in rate_limits:
+        prefix = _LIMIT_HEADERS.get(item.get("rateLimitType", ""))
+        unit = _INTERVAL_CODES.get(item.get("interval", ""))
+        if prefix and unit and "count" in item:
+            headers[f"{prefix}-{item.get('intervalNum', 1)}{unit}"] = str(item["count"])
+    return headers
+
+
+class WsApiDisconnected(Exception):
+    """The connection dropped after a request was sent; its outcome is unknown."""
+
+
+class BinanceWsApi:
+    """Persistent, request/response WebSocket connection to ``ws-fapi``."""
+
+    def __init__(
+        self,
+        api_key: str,
+        api_secret: str,
+        url: Optional[str] = None,
+        timeout_s: float = 5.0,
+        connect: Callable[[str], Any] = websockets.connect,
+    ) -> None:
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self._signer = HmacSigner(api_secret)
+        self.url = url or WS_API_URL
+        self.timeout_s = timeout_s
+        self.reconnects = 0
+        self._connect = connect
+        self._ws: Any = None
+        self._ids = itertools.count(1)
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._connected = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None
+
+    # ------------------------------------------------------------------
+    # Connection handling
+    # ------------------------------------------------------------------
+    async def start(self, wait_s: Optional[float] = None) -> bool:
+        """Start the connection loop and wait up to *wait_s* for the socket.
+
+        Returns whether the socket is open; callers fall back to REST if not.
+        """
+        if self._task is None:
+            self._running = True
+            self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._connected.wait(), wait_s if wait_s is not None else self.timeout_s)
+        except asyncio.TimeoutError:
+            logger.warning("Binance WebSocket API not connected, orders use REST")
+        return self.connected
+
+    def _fail_pending(self, exc: Exception) -> None:
+        for fut in self._pending.values():
+            if not fut.done():
+                fut.set_exception(exc)
+        self._pending.clear()
+
+    def _dispatch(self, raw: Any) -> None:
+        msg = json.loads(raw)
+        fut = self._pending.get(str(msg.get("id")))
+        if fut is not None and not fut.done():
+            fut.set_result(msg)
+
+    async def _run(self) -> None:
+        backoff = 1
+        while self._running:
+            try:
+                async with self._connect(self.url) as ws:
+                    self._ws = ws
+                    self._connected.set()
+                    backoff = 1
+                    async for raw in ws:
+                        self._dispatch(raw)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001 - network errors
+                logger.warning("Binance WebSocket API error: %s. Reconnecting in %ss", exc, backoff)
+            finally:
+                self._ws = None
+                self._connected.clear()
+                # Requests in flight will never be answered on a new socket.
+                self._fail_pending(WsApiDisconnected("WebSocket API connection lost"))
+            if not self._running:
+                break
+            self.reconnects += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 32)
+
+    async def close(self) -> None:
+        self._running = False
+        if self._ws is not None:
+            await self._ws.close()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+    def sign(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Add ``apiKey``, ``timestamp`` and the signature over the sorted params."""
+        signed = dict(params)
+        signed["apiKey"] = self.api_key
+        signed.setdefault("timestamp", clock.now_ms("binance"))
+        recv_window = clock.recv_window_ms("binance")
+        if recv_window is not None:
+            signed.setdefault("recvWindow", recv_window)
+        payload = "&".join(f"{k}={v}" for k, v in sorted(signed.items()))
+        signed["signature"] = self._signer.hexdigest(payload)
+        return signed
+
+    async def request(
+        self,
+        method: str,
+        params: Optional[Dict[str, Any]] = None,
+        *,
+        signed: bool = True,
+        weight: float = 1,
+        orders: float = 0,
+    ) -> Any:
+        """Send *method* and return its ``result``.
+
+        Raises ``ConnectionError`` when the socket is down (nothing was sent),
+        :class:`WsApiError` for error responses, and
+        :class:`WsApiDisconnected` or ``asyncio.TimeoutError`` when the request
+        went out but no response arrived – the order may still exist.
+        """
+        if self._ws is None:
+            raise ConnectionError("WebSocket API not connected")
+        await limiter.acquire_async("binance", weight, orders=orders, priority=ORDER)
+        ws = self._ws
+        if ws is None:
+            raise ConnectionError("WebSocket API not connected")
+        req_id = str(next(self._ids))
+        # Signed after any rate-limit wait so the timestamp is fresh.
+        body = self.sign(params or {}) if signed else dict(params or {})
+        fut = asyncio.get_running_loop().create_future()
+        self._pending[req_id] = fut
+        try:
+            try:
+                started = time.perf_counter()
+                await ws.send(json.dumps({"id": req_id, "method": method, "params": body}))
+            except websockets.ConnectionClosed as exc:
+                raise ConnectionError("WebSocket API connection closed") from exc
+            msg = await asyncio.wait_for(fut, self.timeout_s)
+            latency.record_rtt("binance", f"ws:{method}", (time.perf_counter() - started) * 1000)
+        finally:
+            self._pending.pop(req_id, None)
+
+        status = int(msg.get("status", 200))
+        headers = _rate_limit_headers(msg.get("rateLimits") or [])
+        error = msg.get("error") or {}
+        retry_after = (error.get("data") or {}).get("retryAfter")
+        if retry_after:
+            headers["Retry-After"] = str(max(0.0, retry_after / 1000 - time.time()))
+        limiter.record_response("binance", status, headers)
+        if status != 200:
+            raise WsApiError(status, int(error.get("code", 0)), error.get("msg", ""))
+        return msg.get("result")
@@ -0,0 +1,834 @@
+"""Local stand-in for the Binance Futures, OKX v5 and MEXC APIs we use.
+
+The server implements just enough of each venue for the feeds and order
+clients to run unchanged against it:
+
+* Binance: ``premiumIndex``, ``fundingRate``, ``fundingInfo``,
+  ``exchangeInfo``, ``ping``, ``time``, ``depth``, ``order`` (place and
+  cancel), ``order/test``, ``batchOrders``, ``positionRisk``, ``listenKey``,
+  the ``/ws/<stream>`` and ``/stream?streams=`` mark price and
+  ``@depth`` diff WebSockets,
+  ``/ws/<listenKey>`` user-data streams and the ``/ws-fapi/v1`` trading API
+  (``order.place``),
+* OKX: ``public/funding-rate``, ``public/time``, ``public/instruments``,
+  ``public/mark-price``, ``market/index-tickers``, ``trade/order``,
+  ``trade/batch-orders``, ``trade/cancel-order``, ``account/positions`` and
+  the ``/ws/v5/private`` ``orders`` channel,
+* MEXC: ``contract/ping``, ``contract/ticker``, ``contract/detail``,
+  ``private/order`` and a WebSocket that answers every message with a
+  ``pong``.
+
+Mark prices follow a seeded random walk and every step changes a few levels
+of a depth book around the mark.  :class:`SimConfig` adds latency,
+jitter, random 5xx errors and 429s to REST calls and sets the WebSocket push
+rate, so the stack can be load-tested well above production message rates.
+
+Start it with ``python -m sim.exchange_server --port 8765`` and export the
+variables printed by :meth:`ExchangeSimulator.env` (see
+:mod:`core.exchange.endpoints`) before starting the clients.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import secrets
+import time
+from dataclasses import dataclass, field
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from aiohttp import WSMsgType, web
+
+from core.exchange import endpoints
+from core.exchange.symbols import to_venue
+
+
+@dataclass
+class SimConfig:
+    """Behaviour knobs for :class:`ExchangeSimulator`."""
+
+    symbols: List[str] = field(default_factory=lambda: ["BTCUSDT", "ETHUSDT"])
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    rate_429: float = 0.0
+    retry_after_s: int = 1
+    ws_interval_ms: float = 1_000.0
+    funding_rate: float = 0.0001
+    seed: int = 0
+    # Probability that a depth diff is not delivered to a socket, forcing a resync.
+    depth_drop_rate: float = 0.0
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+# ``ctVal`` of every simulated OKX swap: one contract is 0.01 of the base asset.
+OKX_CONTRACT_VALUE = "0.01"
+MEXC_CONTRACT_SIZE = "0.0001"
+# Depth book: price levels are ``TICK_SIZE`` apart, ``DEPTH_LEVELS`` per side.
+TICK_SIZE = 0.1
+DEPTH_LEVELS = 50
+
+
+def _okx_id(symbol: str) -> str:
+    return to_venue(symbol, "okx")
+
+
+class ExchangeSimulator:
+    """aiohttp application serving the simulated venues."""
+
+    def __init__(self, config: Optional[SimConfig] = None) -> None:
+        self.config = config or SimConfig()
+        self._rng = random.Random(self.config.seed)
+        self.marks: Dict[str, float] = {s: 100.0 * (i + 1) for i, s in enumerate(self.config.symbols)}
+        self.orders: List[Dict[str, Any]] = []
+        self.requests = 0
+        self._weight_window = (0, 0)
+        self._order_id = 0
+        self._runner: Optional[web.AppRunner] = None
+        self._ticker: Optional[asyncio.Task] = None
+        self._sockets: List[web.WebSocketResponse] = []
+        self.listen_keys: Set[str] = set()
+        # venue -> venue symbol -> [signed quantity, entry price]; OKX in contracts.
+        self.positions: Dict[str, Dict[str, List[float]]] = {"binance": {}, "okx": {}}
+        self._user_sockets: Dict[str, List[web.WebSocketResponse]] = {"binance": [], "okx": []}
+        # symbol -> (bids, asks) as price -> quantity, with the last update id
+        # and the recent ``depthUpdate`` events for the diff streams.
+        self._depth_rng = random.Random(self.config.seed + 1)
+        self.depth: Dict[str, Tuple[Dict[float, float], Dict[float, float]]] = {}
+        self.depth_ids: Dict[str, int] = {}
+        self.depth_events: Dict[str, Deque[Dict[str, Any]]] = {}
+        for symbol, mark in self.marks.items():
+            self._seed_depth(symbol, mark)
+        self.base_url = ""
+        self.app = self._build_app()
+
+    # ------------------------------------------------------------------
+    # Application wiring
+    # ------------------------------------------------------------------
+    def _build_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._inject])
+        app.router.add_get("/fapi/v1/premiumIndex", self.binance_premium_index)
+        app.router.add_get("/fapi/v1/fundingRate", self.binance_funding_rate)
+        app.router.add_get("/fapi/v1/fundingInfo", self.binance_funding_info)
+        app.router.add_get("/fapi/v1/exchangeInfo", self.binance_exchange_info)
+        app.router.add_get("/fapi/v1/ping", self.binance_ping)
+        app.router.add_get("/fapi/v1/time", self.binance_time)
+        app.router.add_get("/fapi/v1/depth", self.binance_depth)
+        app.router.add_post("/fapi/v1/order", self.binance_order)
+        app.router.add_delete("/fapi/v1/order", self.binance_cancel)
+        app.router.add_get("/fapi/v1/order", self.binance_query_order)
+        app.router.add_get("/fapi/v2/positionRisk", self.binance_position_risk)
+        app.router.add_post("/fapi/v1/order/test", self.binance_order_test)
+        app.router.add_post("/fapi/v1/batchOrders", self.binance_batch_orders)
+        app.router.add_post("/fapi/v1/listenKey", self.binance_listen_key)
+        app.router.add_put("/fapi/v1/listenKey", self.binance_listen_key)
+        app.router.add_delete("/fapi/v1/listenKey", self.binance_listen_key)
+        app.router.add_get("/ws/{stream}", self.binance_ws)
+        app.router.add_get("/stream", self.binance_ws)
+        app.router.add_get("/ws-fapi/v1", self.binance_ws_api)
+        app.router.add_get("/ws/v5/private", self.okx_private_ws)
+        app.router.add_get("/api/v5/public/funding-rate", self.okx_funding_rate)
+        app.router.add_get("/api/v5/public/time", self.okx_time)
+        app.router.add_get("/api/v5/public/instruments", self.okx_instruments)
+        app.router.add_get("/api/v5/public/mark-price", self.okx_mark_price)
+        app.router.add_post("/api/v5/trade/cancel-order", self.okx_cancel)
+        app.router.add_get("/api/v5/account/positions", self.okx_positions)
+        app.router.add_get("/api/v5/market/index-tickers", self.okx_index_tickers)
+        app.router.add_post("/api/v5/trade/order", self.okx_order)
+        app.router.add_get("/api/v5/trade/order", self.okx_query_order)
+        app.router.add_post("/api/v5/trade/batch-orders", self.okx_batch_orders)
+        app.router.add_get("/api/v1/contract/ping", self.mexc_ping)
+        app.router.add_get("/api/v1/contract/ticker", self.mexc_ticker)
+        app.router.add_get("/api/v1/contract/detail", self.mexc_detail)
+        app.router.add_post("/api/v1/private/order", self.mexc_order)
+        app.router.add_get("/", self.mexc_ws)
+        return app
+
+    @web.middleware
+    async def _inject(
+        self, request: web.Request, handler: Callable[[web.Request], Awaitable[web.StreamResponse]]
+    ) -> web.StreamResponse:
+        cfg = self.config
+        if request.headers.get("Upgrade", "").lower() == "websocket":
+            return await handler(request)
+        self.requests += 1
+        delay = cfg.latency_ms + (self._rng.uniform(0, cfg.jitter_ms) if cfg.jitter_ms else 0.0)
+        if delay > 0:
+            # The request has reached the venue even if the client gives up
+            # waiting for the answer; aiohttp caches the body for the handler.
+            await request.read()
+            await asyncio.sleep(delay / 1000)
+        if cfg.rate_429 and self._rng.random() < cfg.rate_429:
+            return web.json_response(
+                {"code": -1003, "msg": "Too many requests"},
+                status=429,
+                headers={"Retry-After": str(cfg.retry_after_s)},
+            )
+        if cfg.error_rate and self._rng.random() < cfg.error_rate:
+            return web.json_response({"code": -1001, "msg": "Internal error"}, status=503)
+        response = await handler(request)
+        if request.path.startswith("/fapi/"):
+            minute = int(time.time() // 60)
+            used = self._weight_window[1] + 1 if self._weight_window[0] == minute else 1
+            self._weight_window = (minute, used)
+            response.headers["X-MBX-USED-WEIGHT-1M"] = str(used)
+        return response
+
+    def _step(self) -> None:
+        for symbol, mark in self.marks.items():
+            self.marks[symbol] = max(0.01, mark * (1 + self._rng.gauss(0, 0.0005)))
+            self._depth_step(symbol)
+
+    def _seed_depth(self, symbol: str, mark: float) -> None:
+        rng = self._depth_rng
+        top = round(mark / TICK_SIZE)
+        bids = {round((top - k) * TICK_SIZE, 1): round(rng.uniform(0.1, 5), 3) for k in range(1, DEPTH_LEVELS + 1)}
+        asks = {round((top + k) * TICK_SIZE, 1): round(rng.uniform(0.1, 5), 3) for k in range(1, DEPTH_LEVELS + 1)}
+        self.depth[symbol] = (bids, asks)
+        self.depth_ids[symbol] = 1
+        self.depth_events[symbol] = deque(maxlen=1000)
+
+    def _depth_step(self, symbol: str) -> None:
+        """Change a few levels around the mark and record the ``depthUpdate``."""
+        rng = self._depth_rng
+        bids, asks = self.depth[symbol]
+        top = round(self.marks[symbol] / TICK_SIZE)
+        changes: Tuple[Dict[float, float], Dict[float, float]] = ({}, {})
+        for _ in range(rng.randint(1, 4)):
+            is_bid = rng.random() < 0.5
+            price = round((top - rng.randint(1, DEPTH_LEVELS)) * TICK_SIZE if is_bid
+                          else (top + rng.randint(1, DEPTH_LEVELS)) * TICK_SIZE, 1)
+            qty = 0.0 if rng.random() < 0.3 else round(rng.uniform(0.1, 5), 3)
+            own, other = (bids, asks) if is_bid else (asks, bids)
+            own_changes, other_changes = changes if is_bid else changes[::-1]
+            if qty:
+                own[price] = qty
+            else:
+                own.pop(price, None)
+            own_changes[price] = qty
+            # Keep the book uncrossed as the mark moves.
+            for crossed in [p for p in other if (p <= price if is_bid else p >= price)]:
+                del other[crossed]
+                other_changes[crossed] = 0.0
+        first = self.depth_ids[symbol] + 1
+        last = first + len(changes[0]) + len(changes[1]) - 1
+        now = _now_ms()
+        self.depth_events[symbol].append({
+            "e": "depthUpdate", "E": now, "T": now, "s": symbol,
+            "U": first, "u": last, "pu": self.depth_ids[symbol],
+            "b": [[f"{p:.1f}", f"{q:.3f}"] for p, q in changes[0].items()],
+            "a": [[f"{p:.1f}", f"{q:.3f}"] for p, q in changes[1].items()],
+        })
+        self.depth_ids[symbol] = last
+
+    def _mark_event(self, symbol: str, now: int) -> Dict[str, Any]:
+        mark = self.marks[symbol]
+        return {
+            "e": "markPriceUpdate",
+            "E": now,
+            "s": symbol,
+            "p": f"{mark:.8f}",
+            "i": f"{mark * 0.9999:.8f}",
+            "P": f"{mark:.8f}",
+            "r": f"{self.config.funding_rate:.8f}",
+            "T": (now // 28_800_000 + 1) * 28_800_000,
+        }
+
+    # ------------------------------------------------------------------
+    # Binance
+    # ------------------------------------------------------------------
+    def _premium(self, symbol: str) -> Dict[str, Any]:
+        ev = self._mark_event(symbol, _now_ms())
+        return {
+            "symbol": symbol,
+            "markPrice": ev["p"],
+            "indexPrice": ev["i"],
+            "lastFundingRate": ev["r"],
+            "nextFundingTime": ev["T"],
+            "time": ev["E"],
+        }
+
+    async def binance_premium_index(self, request: web.Request) -> web.Response:
+        symbol = request.query.get("symbol")
+        if symbol is None:
+            return web.json_response([self._premium(s) for s in self.marks])
+        if symbol not in self.marks:
+            return web.json_response({"code": -1121, "msg": "Invalid symbol."}, status=400)
+        return web.json_response(self._premium(symbol))
+
+    async def binance_funding_rate(self, request: web.Request) -> web.Response:
+        symbol = request.query.get("symbol", "BTCUSDT")
+        return web.json_response(
+            [{"symbol": symbol, "fundingRate": f"{self.config.funding_rate:.8f}", "fundingTime": _now_ms()}]
+        )
+
+    async def binance_funding_info(self, request: web.Request) -> web.Response:
+        # Like Binance, ignores ``symbol`` and lists every symbol.
+        return web.json_response(
+            [
+                {
+                    "symbol": symbol,
+                    "adjustedFundingRateCap": "0.02",
+                    "adjustedFundingRateFloor": "-0.02",
+                    "fundingRateCap": "0.003",
+                    "fundingRateFloor": "-0.003",
+                    "fundingIntervalHours": 8,
+                    "lastFundingRate": f"{self.config.funding_rate:.8f}",
+                }
+                for symbol in self.marks
+            ]
+        )
+
+    def _symbol_info(self, symbol: str) -> Dict[str, Any]:
+        return {
+            "symbol": symbol,
+            "pricePrecision": 2,
+            "quantityPrecision": 3,
+            "filters": [
+                {"filterType": "PRICE_FILTER", "minPrice": "0.10", "maxPrice": "1000000", "tickSize": "0.10"},
+                {"filterType": "LOT_SIZE", "minQty": "0.001", "maxQty": "1000", "stepSize": "0.001"},
+                {"filterType": "MIN_NOTIONAL", "notional": "5"},
+            ],
+        }
+
+    async def binance_exchange_info(self, request: web.Request) -> web.Response:
+        symbol = request.query.get("symbol")
+        symbols = [symbol] if symbol else list(self.marks)
+        infos = [self._symbol_info(s) for s in symbols if s in self.marks]
+        return web.json_response({"serverTime": _now_ms(), "symbols": infos})
+
+    async def binance_ping(self, request: web.Request) -> web.Response:
+        return web.json_response({})
+
+    async def binance_time(self, request: web.Request) -> web.Response:
+        return web.json_response({"serverTime": _now_ms()})
+
+    async def binance_depth(self, request: web.Request) -> web.Response:
+        symbol = request.query.get("symbol", "")
+        if symbol not in self.depth:
+            return web.json_response({"code": -1121, "msg": "Invalid symbol."}, status=400)
+        limit = int(request.query.get("limit", 500))
+        bids, asks = self.depth[symbol]
+        now = _now_ms()
+        return web.json_response({
+            "lastUpdateId": self.depth_ids[symbol], "E": now, "T": now,
+            "bids": [[f"{p:.1f}", f"{bids[p]:.3f}"] for p in sorted(bids, reverse=True)[:limit]],
+            "asks": [[f"{p:.1f}", f"{asks[p]:.3f}"] for p in sorted(asks)[:limit]],
+        })
+
+    async def _order_params(self, request: web.Request) -> Dict[str, str]:
+        params = dict(request.query)
+        if request.can_read_body:
+            if request.content_type == "application/json":
+                params.update(await request.json())
+            else:
+                params.update(await request.post())  # type: ignore[arg-type]
+        return params
+
+    def _binance_order(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        self._order_id += 1
+        status = "NEW" if params.get("type", "LIMIT") != "MARKET" else "FILLED"
+        if status == "NEW" and params.get("timeInForce") == "IOC":
+            # IOC limits fill in full when they cross the mark, else expire.
+            mark = self.marks.get(params.get("symbol", ""), 0.0)
+            price = float(params.get("price", 0))
+            crosses = price >= mark if params.get("side") == "BUY" else price <= mark
+            status = "FILLED" if crosses else "EXPIRED"
+        order = {
+            "orderId": self._order_id,
+            "symbol": params.get("symbol"),
+            "status": status,
+            "clientOrderId": params.get("newClientOrderId") or f"sim-{self._order_id}",
+            "side": params.get("side"),
+            "type": params.get("type"),
+            "origQty": params.get("quantity"),
+            "executedQty": params.get("quantity") if status == "FILLED" else "0",
+            "price": params.get("price", "0"),
+            "updateTime": _now_ms(),
+        }
+        self.orders.append(order)
+        if status == "FILLED":
+            qty = float(order["executedQty"] or 0)
+            price = float(order["price"] or 0) or self.marks.get(order["symbol"] or "", 0.0)
+            self._fill("binance", order["symbol"], qty if order["side"] == "BUY" else -qty, price)
+        self._push_user("binance", self._binance_order_events(order))
+        return order
+
+    def _fill(self, venue: str, symbol: str, qty: float, price: float) -> None:
+        """Add a fill to the position, averaging the entry price while it grows."""
+        pos = self.positions[venue].setdefault(symbol, [0.0, 0.0])
+        new_qty = pos[0] + qty
+        if pos[0] * qty >= 0 and new_qty:
+            pos[1] = (pos[0] * pos[1] + qty * price) / new_qty
+        elif pos[0] * new_qty < 0:
+            pos[1] = price
+        pos[0] = new_qty
+
+    def _binance_order_events(self, order: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """``ORDER_TRADE_UPDATE`` events for *order*: NEW, then its final status."""
+        qty = order["origQty"] or "0"
+        price = float(order["price"] or 0) or self.marks.get(order["symbol"] or "", 0.0)
+        events = []
+        for status in ["NEW"] if order["status"] == "NEW" else ["NEW", order["status"]]:
+            filled = status == "FILLED"
+            now = _now_ms()
+            events.append({
+                "e": "ORDER_TRADE_UPDATE", "E": now, "T": now,
+                "o": {
+                    "s": order["symbol"], "c": order["clientOrderId"], "S": order["side"],
+                    "o": order["type"], "q": qty, "p": order["price"], "ap": f"{price:.8f}" if filled else "0",
+                    "x": "TRADE" if filled else status, "X": status, "i": order["orderId"],
+                    "l": qty if filled else "0", "z": qty if filled else "0",
+                    "L": f"{price:.8f}" if filled else "0", "T": now,
+                },
+            })
+        return events
+
+    def _push_user(self, venue: str, messages: List[Any]) -> None:
+        """Send *messages* in order to every user-data socket of *venue*."""
+        for ws in self._user_sockets[venue]:
+            asyncio.ensure_future(self._send_all(ws, messages))
+
+    @staticmethod
+    async def _send_all(ws: web.WebSocketResponse, messages: List[Any]) -> None:
+        for message in messages:
+            if ws.closed:
+                return
+            await ws.send_json(message)
+
+    async def binance_listen_key(self, request: web.Request) -> web.Response:
+        if request.method == "POST":
+            key = secrets.token_hex(16)
+            self.listen_keys.add(key)
+            return web.json_response({"listenKey": key})
+        return web.json_response({})
+
+    async def _user_socket(self, request: web.Request, venue: str) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self._sockets.append(ws)
+        self._user_sockets[venue].append(ws)
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                if msg.data == "ping":
+                    await ws.send_str("pong")
+                    continue
+                req = json.loads(msg.data)
+                if req.get("op") == "login":
+                    await ws.send_json({"event": "login", "code": "0", "msg": ""})
+                elif req.get("op") == "subscribe":
+                    for arg in req.get("args", []):
+                        await ws.send_json({"event": "subscribe", "arg": arg})
+        finally:
+            self._user_sockets[venue].remove(ws)
+            self._sockets.remove(ws)
+        return ws
+
+    async def binance_order(self, request: web.Request) -> web.Response:
+        return web.json_response(self._binance_order(await self._order_params(request)))
+
+    async def binance_batch_orders(self, request: web.Request) -> web.Response:
+        params = await self._order_params(request)
+        results: List[Dict[str, Any]] = []
+        for item in json.loads(params.get("batchOrders", "[]")):
+            if item.get("symbol") not in self.marks:
+                results.append({"code": -1121, "msg": "Invalid symbol."})
+            else:
+                results.append(self._binance_order(item))
+        return web.json_response(results)
+
+    async def binance_cancel(self, request: web.Request) -> web.Response:
+        params = await self._order_params(request)
+        for order in self.orders:
+            if "orderId" not in order or order["symbol"] != params.get("symbol"):
+                continue
+            if str(order["orderId"]) == params.get("orderId") or order["clientOrderId"] == params.get(
+                "origClientOrderId"
+            ):
+                if order["status"] in ("NEW", "PARTIALLY_FILLED"):
+                    order["status"] = "CANCELED"
+                    return web.json_response(order)
+        return web.json_response({"code": -2011, "msg": "Unknown order sent."}, status=400)
+
+    async def binance_query_order(self, request: web.Request) -> web.Response:
+        params = request.query
+        for order in self.orders:
+            if "orderId" not in order or order["symbol"] != params.get("symbol"):
+                continue
+            if str(order["orderId"]) == params.get("orderId") or order["clientOrderId"] == params.get(
+                "origClientOrderId"
+            ):
+                return web.json_response(order)
+        return web.json_response({"code": -2013, "msg": "Order does not exist."}, status=400)
+
+    async def binance_position_risk(self, request: web.Request) -> web.Response:
+        data = [
+            {
+                "symbol": symbol, "positionAmt": f"{qty:.8f}", "entryPrice": f"{entry:.8f}",
+                "markPrice": f"{self.marks[symbol]:.8f}",
+                "unRealizedProfit": f"{qty * (self.marks[symbol] - entry):.8f}",
+            }
+            for symbol, (qty, entry) in self.positions["binance"].items()
+        ]
+        return web.json_response(data)
+
+    async def binance_order_test(self, request: web.Request) -> web.Response:
+        await self._order_params(request)
+        return web.json_response({})
+
+    async def binance_ws(self, request: web.Request) -> web.WebSocketResponse:
+        if request.match_info.get("stream") in self.listen_keys:
+            return await self._user_socket(request, "binance")
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        combined = request.path == "/stream"
+        streams = request.query.get("streams", "").split("/") if combined else [request.match_info["stream"]]
+        self._sockets.append(ws)
+        sender = asyncio.create_task(self._push_marks(ws, set(filter(None, streams)), combined))
+        try:
+            async for msg in ws:
+                if msg.type == WSMsgType.TEXT:
+                    req = json.loads(msg.data)
+                    names = set(req.get("params", []))
+                    if req.get("method") == "SUBSCRIBE":
+                        streams.extend(names)
+                    elif req.get("method") == "UNSUBSCRIBE":
+                        streams[:] = [s for s in streams if s not in names]
+                    sender.cancel()
+                    sender = asyncio.create_task(self._push_marks(ws, set(streams), combined))
+                    await ws.send_json({"result": None, "id": req.get("id")})
+        finally:
+            sender.cancel()
+            self._sockets.remove(ws)
+        return ws
+
+    def _ws_api_reply(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        params = req.get("params") or {}
+        reply: Dict[str, Any] = {"id": req.get("id"), "status": 200}
+        if req.get("method") != "order.place":
+            reply.update(status=400, error={"code": -1100, "msg": f"Unknown method {req.get('method')}"})
+        elif "signature" not in params or "apiKey" not in params:
+            reply.update(status=401, error={"code": -1022, "msg": "Signature for this request is not valid."})
+        elif params.get("symbol") not in self.marks:
+            reply.update(status=400, error={"code": -1121, "msg": "Invalid symbol."})
+        else:
+            reply["result"] = self._binance_order({k: str(v) for k, v in params.items()})
+        minute = int(time.time() // 60)
+        used = self._weight_window[1] + 1 if self._weight_window[0] == minute else 1
+        self._weight_window = (minute, used)
+        reply["rateLimits"] = [{
+            "rateLimitType": "REQUEST_WEIGHT", "interval": "MINUTE", "intervalNum": 1,
+            "limit": 2400, "count": used,
+        }]
+        return reply
+
+    async def binance_ws_api(self, request: web.Request) -> web.WebSocketResponse:
+        """``ws-fapi`` trading API: ``order.place`` with the configured latency."""
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self._sockets.append(ws)
+        cfg = self.config
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                delay = cfg.latency_ms + (self._rng.uniform(0, cfg.jitter_ms) if cfg.jitter_ms else 0.0)
+                if delay > 0:
+                    await asyncio.sleep(delay / 1000)
+                await ws.send_json(self._ws_api_reply(json.loads(msg.data)))
+        finally:
+            self._sockets.remove(ws)
+        return ws
+
+    async def _push_marks(self, ws: web.WebSocketResponse, streams: set, combined: bool) -> None:
+        by_lower = {s.lower(): s for s in self.marks}
+        # Last depth update id sent per depth stream; diffs start from now.
+        sent = {
+            stream: self.depth_ids[by_lower[stream.split("@")[0]]]
+            for stream in streams if "@depth" in stream and stream.split("@")[0] in by_lower
+        }
+        while not ws.closed:
+            now = _now_ms()
+            if "!markPrice@arr@1s" in streams or "!markPrice@arr" in streams:
+                await ws.send_str(json.dumps([self._mark_event(s, now) for s in self.marks]))
+            for stream in streams:
+                symbol = by_lower.get(stream.split("@")[0])
+                if symbol is None:
+                    continue
+                if stream in sent:
+                    events = [e for e in self.depth_events[symbol] if e["u"] > sent[stream]]
+                    if events:
+                        sent[stream] = events[-1]["u"]
+                    rate = self.config.depth_drop_rate
+                    events = [e for e in events if not (rate and self._depth_rng.random() < rate)]
+                elif "@markPrice" in stream:
+                    events = [self._mark_event(symbol, now)]
+                else:
+                    continue
+                for event in events:
+                    await ws.send_str(json.dumps({"stream": stream, "data": event} if combined else event))
+            await asyncio.sleep(self.config.ws_interval_ms / 1000)
+
+    # ------------------------------------------------------------------
+    # OKX
+    # ------------------------------------------------------------------
+    def _okx_ids(self) -> Dict[str, str]:
+        return {_okx_id(s): s for s in self.marks}
+
+    async def okx_time(self, request: web.Request) -> web.Response:
+        return web.json_response({"code": "0", "msg": "", "data": [{"ts": str(_now_ms())}]})
+
+    async def okx_funding_rate(self, request: web.Request) -> web.Response:
+        inst_id = request.query.get("instId", "ANY")
+        ids = self._okx_ids()
+        chosen = list(ids) if inst_id == "ANY" else [i for i in [inst_id] if i in ids]
+        next_ms = (_now_ms() // 28_800_000 + 1) * 28_800_000
+        data = [
+            {"instId": i, "fundingRate": f"{self.config.funding_rate:.8f}", "fundingTime": str(next_ms)}
+            for i in chosen
+        ]
+        return web.json_response({"code": "0", "msg": "", "data": data})
+
+    async def okx_index_tickers(self, request: web.Request) -> web.Response:
+        ids = self._okx_ids()
+        inst_id = request.query.get("instId")
+        data = []
+        for swap_id, symbol in ids.items():
+            index_id = swap_id.replace("-SWAP", "")
+            if inst_id is None or inst_id == index_id:
+                data.append({"instId": index_id, "idxPx": f"{self.marks[symbol]:.8f}", "ts": str(_now_ms())})
+        return web.json_response({"code": "0", "msg": "", "data": data})
+
+    def _okx_order(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        if body.get("instId") not in self._okx_ids():
+            return {
+                "ordId": "", "clOrdId": body.get("clOrdId", ""), "sCode": "51001",
+                "sMsg": "Instrument ID does not exist",
+            }
+        self._order_id += 1
+        # Market orders and crossing limits fill at the mark; IOC/FOK that do
+        # not cross are canceled and other limits rest.
+        mark = self.marks[self._okx_ids()[body["instId"]]]
+        ord_type = body.get("ordType", "market")
+        state = "filled"
+        if ord_type != "market":
+            price = float(body.get("px", 0))
+            crosses = price >= mark if body.get("side") == "buy" else price <= mark
+            state = "filled" if crosses else "live" if ord_type in ("limit", "post_only") else "canceled"
+        order = dict(body, ordId=str(self._order_id), state=state, fillPx=f"{mark:.8f}" if state == "filled" else "")
+        self.orders.append(order)
+        if state == "filled":
+            sz = float(body.get("sz", 0))
+            self._fill("okx", body["instId"], sz if body.get("side") == "buy" else -sz, mark)
+        self._push_user("okx", self._okx_order_events(order))
+        return {"ordId": str(self._order_id), "clOrdId": body.get("clOrdId", ""), "sCode": "0", "sMsg": ""}
+
+    async def okx_query_order(self, request: web.Request) -> web.Response:
+        params = request.query
+        for order in self.orders:
+            if "ordId" not in order or order.get("instId") != params.get("instId"):
+                continue
+            if order["ordId"] == params.get("ordId") or order.get("clOrdId") == params.get("clOrdId"):
+                filled = order["state"] == "filled"
+                item = {
+                    "instId": order["instId"], "ordId": order["ordId"], "clOrdId": order.get("clOrdId", ""),
+                    "side": order.get("side", ""), "sz": str(order.get("sz", "0")), "state": order["state"],
+                    "accFillSz": str(order.get("sz", "0")) if filled else "0",
+                    "avgPx": order["fillPx"] if filled else "",
+                }
+                return web.json_response({"code": "0", "msg": "", "data": [item]})
+        return web.json_response({"code": "51603", "msg": "Order does not exist", "data": []})
+
+    def _okx_order_events(self, order: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """``orders`` channel pushes: live, then its final state unless it rests."""
+        states = ["live"] if order["state"] == "live" else ["live", order["state"]]
+        events = []
+        for state in states:
+            filled = state == "filled"
+            sz = str(order.get("sz", "0"))
+            events.append({
+                "arg": {"channel": "orders", "instType": "SWAP"},
+                "data": [{
+                    "instId": order["instId"], "ordId": order["ordId"], "clOrdId": order.get("clOrdId", ""),
+                    "side": order.get("side", ""), "ordType": order.get("ordType", "market"), "sz": sz,
+                    "state": state, "accFillSz": sz if filled else "0", "fillSz": sz if filled else "0",
+                    "fillPx": order["fillPx"] if filled else "", "avgPx": order["fillPx"] if filled else "",
+                    "uTime": str(_now_ms()),
+                }],
+            })
+        return events
+
+    async def okx_instruments(self, request: web.Request) -> web.Response:
+        data = [
+            {"instId": i, "instType": "SWAP", "ctVal": OKX_CONTRACT_VALUE, "lotSz": "1", "tickSz": "0.1"}
+            for i in self._okx_ids()
+        ]
+        return web.json_response({"code": "0", "msg": "", "data": data})
+
+    async def okx_mark_price(self, request: web.Request) -> web.Response:
+        inst_id = request.query.get("instId")
+        data = [
+            {"instId": i, "instType": "SWAP", "markPx": f"{self.marks[s]:.8f}", "ts": str(_now_ms())}
+            for i, s in self._okx_ids().items()
+            if inst_id is None or inst_id == i
+        ]
+        return web.json_response({"code": "0", "msg": "", "data": data})
+
+    async def okx_cancel(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        for order in self.orders:
+            if "ordId" not in order or order["instId"] != body.get("instId"):
+                continue
+            if order["ordId"] == body.get("ordId") or order.get("clOrdId") == body.get("clOrdId", object()):
+                if order["state"] == "live":
+                    order["state"] = "canceled"
+                    item = {"ordId": order["ordId"], "clOrdId": order.get("clOrdId", ""), "sCode": "0", "sMsg": ""}
+                    return web.json_response({"code": "0", "msg": "", "data": [item]})
+        item = {"ordId": body.get("ordId", ""), "clOrdId": body.get("clOrdId", ""), "sCode": "51400",
+                "sMsg": "Order cancellation failed as the order has been filled, canceled or does not exist"}
+        return web.json_response({"code": "1", "msg": "", "data": [item]})
+
+    async def okx_positions(self, request: web.Request) -> web.Response:
+        data = [
+            {"instId": inst_id, "posSide": "net", "pos": f"{qty:g}", "avgPx": f"{entry:.8f}",
+             "upl": f"{qty * float(OKX_CONTRACT_VALUE) * (self.marks[self._okx_ids()[inst_id]] - entry):.8f}"}
+            for inst_id, (qty, entry) in self.positions["okx"].items()
+        ]
+        return web.json_response({"code": "0", "msg": "", "data": data})
+
+    async def okx_private_ws(self, request: web.Request) -> web.WebSocketResponse:
+        """Private channel: any login succeeds, ``orders`` pushes every order."""
+        return await self._user_socket(request, "okx")
+
+    async def okx_order(self, request: web.Request) -> web.Response:
+        data = [self._okx_order(await request.json())]
+        return web.json_response({"code": "0" if data[0]["sCode"] == "0" else "1", "msg": "", "data": data})
+
+    async def okx_batch_orders(self, request: web.Request) -> web.Response:
+        data = [self._okx_order(body) for body in await request.json()]
+        failed = sum(item["sCode"] != "0" for item in data)
+        code = "0" if not failed else "1" if failed == len(data) else "2"
+        return web.json_response({"code": code, "msg": "", "data": data})
+
+    # ------------------------------------------------------------------
+    # MEXC
+    # ------------------------------------------------------------------
+    async def mexc_ping(self, request: web.Request) -> web.Response:
+        return web.json_response({"success": True, "code": 0, "data": _now_ms()})
+
+    async def mexc_ticker(self, request: web.Request) -> web.Response:
+        data = [
+            {
+                "symbol": to_venue(s, "mexc"), "lastPrice": round(m, 8), "fairPrice": round(m, 8),
+                "indexPrice": round(m, 8), "fundingRate": self.config.funding_rate,
+            }
+            for s, m in self.marks.items()
+        ]
+        symbol = request.query.get("symbol")
+        if symbol is None:
+            return web.json_response({"success": True, "code": 0, "data": data})
+        match = [item for item in data if item["symbol"] == symbol]
+        if not match:
+            return web.json_response({"success": False, "code": 1001, "message": "contract not exists"})
+        return web.json_response({"success": True, "code": 0, "data": match[0]})
+
+    async def mexc_detail(self, request: web.Request) -> web.Response:
+        data = [{"symbol": to_venue(s, "mexc"), "contractSize": float(MEXC_CONTRACT_SIZE)} for s in self.marks]
+        return web.json_response({"success": True, "code": 0, "data": data})
+
+    async def mexc_order(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        self._order_id += 1
+        self.orders.append(dict(body, orderId=str(self._order_id)))
+        return web.json_response({"success": True, "code": 0, "data": str(self._order_id)})
+
+    async def mexc_ws(self, request: web.Request) -> web.StreamResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        async for msg in ws:
+            if msg.type == WSMsgType.TEXT:
+                await ws.send_json({"channel": "pong", "data": _now_ms()})
+        return ws
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    async def _tick(self) -> None:
+        while True:
+            self._step()
+            await asyncio.sleep(self.config.ws_interval_ms / 1000)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base HTTP URL."""
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        sockets = site._server.sockets  # type: ignore[union-attr]
+        bound_port = sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{bound_port}"
+        self._ticker = asyncio.create_task(self._tick())
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._ticker is not None:
+            self._ticker.cancel()
+        for ws in list(self._sockets):
+            await ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def env(self) -> Dict[str, str]:
+        """Environment variables pointing every client at this simulator."""
+        ws_url = self.base_url.replace("http://", "ws://", 1)
+        values = {
+            "BINANCE_REST_URL": self.base_url,
+            "BINANCE_WS_URL": ws_url,
+            "BINANCE_WS_API_URL": f"{ws_url}/ws-fapi/v1",
+            "OKX_REST_URL": self.base_url,
+            "OKX_WS_URL": ws_url,
+            "MEXC_REST_URL": self.base_url,
+            "MEXC_WS_URL": ws_url,
+        }
+        return {endpoints.ENV_VARS[k]: v for k, v in values.items()}
+
+
+async def _serve(config: SimConfig, host: str, port: int) -> None:  # pragma: no cover
+    sim = ExchangeSimulator(config)
+    await sim.start(host, port)
+    for name, value in sim.env().items():
+        print(f"export {name}={value}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await sim.stop()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local exchange stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--symbols", default="BTCUSDT,ETHUSDT", help="Comma separated Binance symbols")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--ws-interval-ms", type=float, default=1_000.0)
+    args = parser.parse_args()
+    cfg = SimConfig(
+        symbols=[s.strip() for s in args.symbols.split(",") if s.strip()],
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_429=args.rate_429,
+        ws_interval_ms=args.ws_interval_ms,
+    )
+    asyncio.run(_serve(cfg, args.host, args.port))
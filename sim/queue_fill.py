@@ -0,0 +1,493 @@
+"""Queue-position fill model for resting limit orders, replayed from L2 data.
+
+:class:`~sim.simulator_tca.TCASimulator` treats a fill as a fixed probability
+scaled by depth and latency.  A post-only (``GTX``) order earns its fill by
+waiting at a price level behind everybody who was there first, so this
+model replays recorded depth and trade streams and tracks the simulated
+order's place in that queue:
+
+* on arrival (``submit_ts + latency_ms``) the order joins the back of its
+  level, so the queue ahead is the level's quantity then; a post-only order
+  that would cross the spread is rejected, as the venue does,
+* a trade at the order's price that hits its side takes the queue ahead
+  first and the order after,
+* a fall in the level's quantity that trades do not explain is
+  cancellations, split between the queue ahead and behind the order by
+  :attr:`QueueReplay.cancel_power` (see :meth:`QueueReplay._cancel`);
+  increases join behind it,
+* a trade through the price, or the opposite best moving onto it, means the
+  level has gone and fills whatever is left.
+
+Depth is one row per level change (:data:`DEPTH_DTYPE`, absolute
+quantities as in Binance ``depthUpdate`` events, zero removes the level),
+and trades one row per print (:data:`MARKET_TRADE_DTYPE`, with Binance's
+``m`` flag: a buyer-maker print was a sell hitting the bids).
+:func:`load_binance_recording` builds both from a JSON-lines recording of
+the combined stream and REST snapshots.
+
+Replay is indexed rather than stepped: depth rows are grouped by level once,
+and the best bid/ask after every depth message is computed once, from only
+the rows that add or remove a level.  An order then only loops over
+the events at its own level, and looks for the trade-through or crossing
+that ends it in windows of doubling length, so thousands of probe orders
+over a full day of one symbol take seconds::
+
+    replay = QueueReplay.from_binance_recording("data/l2/20240101/BTCUSDT.jsonl")
+    report = replay.join_best("buy", every_ms=60_000, qty=0.01, horizon_ms=30_000, latency_ms=20)
+    report.fill_probability(), report.fill_time_quantiles([0.5, 0.9])
+"""
+from __future__ import annotations
+
+import heapq
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from feeds.decode import loads
+
+DEPTH_DTYPE = np.dtype([("ts", "i8"), ("bid", "?"), ("price", "f8"), ("qty", "f8")])
+MARKET_TRADE_DTYPE = np.dtype([("ts", "i8"), ("price", "f8"), ("qty", "f8"), ("buyer_maker", "?")])
+FILL_DTYPE = np.dtype(
+    [
+        ("bid", "?"),
+        ("price", "f8"),
+        ("qty", "f8"),
+        ("submit_ts", "f8"),
+        ("arrival_ts", "f8"),
+        ("ahead", "f8"),
+        ("filled_qty", "f8"),
+        ("first_fill_ts", "f8"),
+        ("fill_ts", "f8"),
+        ("rejected", "?"),
+    ]
+)
+
+# Event kinds at the order's level; trades run first when due at the same
+# time, since a depth message already reflects the trades before it.
+_TRADE = 0
+_DEPTH = 1
+
+
+def _is_bid(side: str) -> bool:
+    side = side.lower()
+    if side not in ("buy", "sell"):
+        raise ValueError("side must be 'buy' or 'sell'")
+    return side == "buy"
+
+
+# ----------------------------------------------------------------------
+# Recordings
+# ----------------------------------------------------------------------
+def depth_rows(events: Iterable[Dict[str, Any]]) -> np.ndarray:
+    """:data:`DEPTH_DTYPE` rows of Binance depth snapshots and ``depthUpdate`` events.
+
+    A snapshot (``lastUpdateId``, ``bids``, ``asks``) replaces the book, so
+    levels it does not list get a zero row.  Events must be in sequence, as
+    :class:`~feeds.order_books.BinanceDepthSync` checks them live.
+    """
+    rows: List[Tuple[int, bool, float, float]] = []
+    live: Dict[Tuple[bool, float], None] = {}
+    for event in events:
+        if "lastUpdateId" in event:
+            ts = int(event.get("E") or event.get("T") or (rows[-1][0] if rows else 0))
+            levels = [(True, float(p), float(q)) for p, q, *_ in event["bids"]]
+            levels += [(False, float(p), float(q)) for p, q, *_ in event["asks"]]
+            listed = {(bid, price) for bid, price, _ in levels}
+            rows.extend((ts, bid, price, 0.0) for bid, price in live if (bid, price) not in listed)
+            live.clear()
+        else:
+            ts = int(event["E"])
+            levels = [(True, float(p), float(q)) for p, q, *_ in event["b"]]
+            levels += [(False, float(p), float(q)) for p, q, *_ in event["a"]]
+        for bid, price, qty in levels:
+            rows.append((ts, bid, price, qty))
+            if qty > 0:
+                live[(bid, price)] = None
+            else:
+                live.pop((bid, price), None)
+    return np.array(rows, dtype=DEPTH_DTYPE)
+
+
+def trade_rows(events: Iterable[Dict[str, Any]]) -> np.ndarray:
+    """:data:`MARKET_TRADE_DTYPE` rows of Binance ``trade``/``aggTrade`` events."""
+    return np.array(
+        [(int(e["T"]), float(e["p"]), float(e["q"]), bool(e["m"])) for e in events], dtype=MARKET_TRADE_DTYPE
+    )
+
+
+def load_binance_recording(path: Union[str, Path]) -> Tuple[np.ndarray, np.ndarray]:
+    """Depth and trade rows of a JSON-lines recording of one symbol.
+
+    Each line is a combined-stream message (``{"stream": ..., "data": ...}``)
+    or a bare event: ``depthUpdate``, ``trade`` or ``aggTrade`` events, and
+    REST depth snapshots, which must be stamped with an ``E`` time.
+    """
+    depth: List[Dict[str, Any]] = []
+    trades: List[Dict[str, Any]] = []
+    with Path(path).open("rb") as fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            msg = loads(line)
+            event = msg.get("data", msg)
+            kind = event.get("e")
+            if kind == "depthUpdate" or "lastUpdateId" in event:
+                depth.append(event)
+            elif kind in ("trade", "aggTrade"):
+                trades.append(event)
+    return depth_rows(depth), trade_rows(trades)
+
+
+def _level_order(depth: np.ndarray) -> np.ndarray:
+    """Row order grouping time-sorted *depth* by level, in time order within each."""
+    return np.lexsort((depth["price"], ~depth["bid"]))
+
+
+def _best_prices(depth: np.ndarray, order: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    ts = depth["ts"]
+    live = depth["qty"] > 0
+    # Only rows that add or remove a level can move the best prices; a
+    # quantity change at a level already there cannot.
+    grouped = live[order]
+    was = np.empty_like(live)
+    was[order[1:]] = grouped[:-1]
+    was[order[0]] = False
+    first = np.diff(depth["price"][order], prepend=np.nan) != 0
+    first |= np.diff(depth["bid"][order], prepend=~depth["bid"][order[:1]]) != 0
+    was[order[first]] = False
+    rows = np.flatnonzero(live != was)
+
+    new_msg = np.diff(ts, prepend=ts[:1] - 1) != 0
+    msg = np.cumsum(new_msg) - 1
+    row_msg = msg[rows]
+    last = np.append(row_msg[1:] != row_msg[:-1], True)
+    # Bids are keyed by negated price, so both sides are min-heaps with lazy
+    # deletion: a removed price is dropped once it reaches the top.
+    key = np.where(depth["bid"], -depth["price"], depth["price"])
+    books: Tuple[Tuple[set, List[float]], ...] = ((set(), []), (set(), []))
+    best = np.full((int(msg[-1]) + 1, 2), np.nan)
+    changed = np.zeros(len(best), dtype=bool)
+    push, pop = heapq.heappush, heapq.heappop
+    for price, ask, add, m, end in zip(
+        key[rows].tolist(), (~depth["bid"][rows]).tolist(), live[rows].tolist(), row_msg.tolist(), last.tolist()
+    ):
+        prices, heap = books[ask]
+        if add:
+            prices.add(price)
+            push(heap, price)
+        else:
+            prices.discard(price)
+        if end:
+            for side, (prices, heap) in enumerate(books):
+                while heap and heap[0] not in prices:
+                    pop(heap)
+                if heap:
+                    best[m, side] = heap[0]
+            changed[m] = True
+    # Messages without additions or removals keep the previous best prices.
+    best = best[np.maximum.accumulate(np.where(changed, np.arange(len(best)), 0))]
+    return ts[new_msg], -best[:, 0], best[:, 1]
+
+
+def best_prices(depth: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Timestamps and best bid/ask after each depth message (rows sharing a ``ts``)."""
+    depth = depth[np.argsort(depth["ts"], kind="stable")]
+    return _best_prices(depth, _level_order(depth))
+
+
+# ----------------------------------------------------------------------
+# Results
+# ----------------------------------------------------------------------
+@dataclass
+class QueueFill:
+    """Outcome of one resting order; times are epoch ms, NaN when it never happened."""
+
+    bid: bool
+    price: float
+    qty: float
+    submit_ts: float
+    arrival_ts: float
+    ahead: float
+    filled_qty: float = 0.0
+    first_fill_ts: float = math.nan
+    fill_ts: float = math.nan
+    rejected: bool = False
+
+    @property
+    def filled(self) -> bool:
+        return not math.isnan(self.fill_ts)
+
+    @property
+    def fill_time_ms(self) -> float:
+        """Time from submission to the complete fill."""
+        return self.fill_ts - self.submit_ts
+
+    def as_row(self) -> Tuple:
+        return tuple(getattr(self, name) for name in FILL_DTYPE.names)
+
+
+@dataclass
+class FillReport:
+    """Outcomes of many orders, one :data:`FILL_DTYPE` row each."""
+
+    fills: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.fills)
+
+    @property
+    def reject_rate(self) -> float:
+        return float(self.fills["rejected"].mean()) if len(self) else math.nan
+
+    def fill_probability(self, within_ms: Optional[float] = None) -> float:
+        """Share of orders filled completely, within *within_ms* of submission if given.
+
+        Rejected orders count as unfilled, so this is the chance that
+        submitting the order gets it filled.
+        """
+        if not len(self):
+            return math.nan
+        wait = self.fills["fill_ts"] - self.fills["submit_ts"]
+        done = ~np.isnan(wait)
+        if within_ms is not None:
+            done &= wait <= within_ms
+        return float(done.mean())
+
+    def fill_ratio(self) -> float:
+        """Mean filled share of the order quantity, partial fills included."""
+        return float((self.fills["filled_qty"] / self.fills["qty"]).mean()) if len(self) else math.nan
+
+    def fill_time_quantiles(self, quantiles: Sequence[float]) -> np.ndarray:
+        """Quantiles of the time to a complete fill, over filled orders."""
+        wait = self.fills["fill_ts"] - self.fills["submit_ts"]
+        wait = wait[~np.isnan(wait)]
+        if not len(wait):
+            return np.full(len(quantiles), math.nan)
+        return np.quantile(wait, quantiles)
+
+
+# ----------------------------------------------------------------------
+# Replay
+# ----------------------------------------------------------------------
+class QueueReplay:
+    """Recorded depth and trades of one symbol, indexed for queue simulation."""
+
+    def __init__(
+        self,
+        depth: np.ndarray,
+        trades: np.ndarray,
+        cancel_power: float = 1.0,
+        window_ms: float = 60_000.0,
+    ) -> None:
+        if not len(depth):
+            raise ValueError("depth is empty")
+        if cancel_power < 0:
+            raise ValueError("cancel_power must be non-negative")
+        self.cancel_power = cancel_power
+        self.window_ms = window_ms
+        depth = depth[np.argsort(depth["ts"], kind="stable")]
+        trades = trades[np.argsort(trades["ts"], kind="stable")]
+        self.start_ts = int(depth["ts"][0])
+        self.end_ts = int(max(depth["ts"][-1], trades["ts"][-1] if len(trades) else 0))
+
+        # Depth rows by level, in time order within each level.
+        order = _level_order(depth)
+        self._level_ts = depth["ts"][order]
+        self._level_qty = depth["qty"][order]
+        bid, price = depth["bid"][order], depth["price"][order]
+        starts = np.flatnonzero((np.diff(price, prepend=np.nan) != 0) | (np.diff(bid, prepend=~bid[:1]) != 0))
+        ends = np.append(starts[1:], len(order))
+        self._levels: Dict[Tuple[bool, float], Tuple[int, int]] = dict(
+            zip(zip(bid[starts].tolist(), price[starts].tolist()), zip(starts.tolist(), ends.tolist()))
+        )
+
+        # Contiguous copies: searchsorted on a strided field view copies it per call.
+        self._trade_ts = np.ascontiguousarray(trades["ts"])
+        self._trade_px = np.ascontiguousarray(trades["price"])
+        self._trade_qty = np.ascontiguousarray(trades["qty"])
+        self._trade_sells = np.ascontiguousarray(trades["buyer_maker"])
+        self._bbo_ts, self._best_bid, self._best_ask = _best_prices(depth, order)
+
+    @classmethod
+    def from_binance_recording(cls, path: Union[str, Path], **kwargs: Any) -> "QueueReplay":
+        return cls(*load_binance_recording(path), **kwargs)
+
+    # ------------------------------------------------------------------
+    # Book state
+    # ------------------------------------------------------------------
+    def best(self, ts: float) -> Tuple[float, float]:
+        """Best bid and ask as of *ts*, NaN before the first depth message."""
+        i = int(np.searchsorted(self._bbo_ts, math.floor(ts), "right")) - 1
+        if i < 0:
+            return math.nan, math.nan
+        return float(self._best_bid[i]), float(self._best_ask[i])
+
+    def level_qty(self, bid: bool, price: float, ts: float) -> float:
+        """Quantity at one level as of *ts*."""
+        lo, hi = self._levels.get((bid, price), (0, 0))
+        i = lo + int(np.searchsorted(self._level_ts[lo:hi], math.floor(ts), "right"))
+        return float(self._level_qty[i - 1]) if i > lo else 0.0
+
+    # ------------------------------------------------------------------
+    # Queue
+    # ------------------------------------------------------------------
+    def _cancel(self, ahead: float, behind: float, drop: float) -> float:
+        """Queue ahead after *drop* is cancelled from a level.
+
+        The share taken from ahead of the order is
+        ``ahead**n / (ahead**n + behind**n)`` with ``n = cancel_power``: 1
+        cancels in proportion to the queue on either side, 0 splits evenly,
+        and larger powers put the cancellations on the longer side.  What
+        exceeds the queue behind comes from ahead.
+        """
+        if ahead <= 0:
+            return 0.0
+        n = self.cancel_power
+        front = ahead ** n
+        share = front / (front + behind ** n) if behind > 0 else 1.0
+        cut = drop * share
+        cut += max(0.0, drop - cut - behind)
+        return max(0.0, ahead - cut)
+
+    def _stop_ts(self, bid: bool, price: float, t0: float, t1: float) -> float:
+        """First time in ``(t0, t1]`` the level is traded through or crossed, else inf."""
+        sign = 1.0 if bid else -1.0
+        stop = math.inf
+        i0, i1 = np.searchsorted(self._trade_ts, [math.floor(t0), math.floor(t1)], "right")
+        through = np.flatnonzero(
+            (self._trade_sells[i0:i1] == bid) & (sign * self._trade_px[i0:i1] < sign * price)
+        )
+        if len(through):
+            stop = float(self._trade_ts[i0 + through[0]])
+        i0, i1 = np.searchsorted(self._bbo_ts, [math.floor(t0), math.floor(t1)], "right")
+        opposite = self._best_ask if bid else self._best_bid
+        crossed = np.flatnonzero(sign * opposite[i0:i1] <= sign * price)
+        if len(crossed):
+            stop = min(stop, float(self._bbo_ts[i0 + crossed[0]]))
+        return stop
+
+    def _events(self, bid: bool, price: float, t0: float, t1: float) -> List[Tuple[int, int, float]]:
+        """Trades at *price* hitting the order's side and depth rows at its level in ``(t0, t1]``."""
+        lo, hi = self._levels.get((bid, price), (0, 0))
+        ts = self._level_ts[lo:hi]
+        j0, j1 = np.searchsorted(ts, [math.floor(t0), math.floor(t1)], "right")
+        events = [(t, _DEPTH, q) for t, q in zip(ts[j0:j1].tolist(), self._level_qty[lo + j0:lo + j1].tolist())]
+        i0, i1 = np.searchsorted(self._trade_ts, [math.floor(t0), math.floor(t1)], "right")
+        hit = np.flatnonzero((self._trade_sells[i0:i1] == bid) & (self._trade_px[i0:i1] == price)) + i0
+        events += [(t, _TRADE, q) for t, q in zip(self._trade_ts[hit].tolist(), self._trade_qty[hit].tolist())]
+        events.sort(key=lambda e: (e[0], e[1]))
+        return events
+
+    def simulate(
+        self,
+        side: str,
+        price: float,
+        qty: float,
+        submit_ts: float,
+        latency_ms: float = 0.0,
+        horizon_ms: float = math.inf,
+        post_only: bool = True,
+    ) -> QueueFill:
+        """Rest one limit order from arrival until filled or *horizon_ms* after arrival.
+
+        An order that would cross on arrival is rejected when *post_only*
+        and otherwise fills at once as a taker.  Fills are at the limit
+        *price*.
+        """
+        if qty <= 0:
+            raise ValueError("qty must be positive")
+        bid = _is_bid(side)
+        price = float(price)
+        arrival = submit_ts + latency_ms
+        fill = QueueFill(bid, price, qty, submit_ts, arrival, ahead=self.level_qty(bid, price, arrival))
+        best_bid, best_ask = self.best(arrival)
+        if (best_ask <= price) if bid else (best_bid >= price):
+            if post_only:
+                fill.rejected = True
+            else:
+                fill.filled_qty, fill.first_fill_ts, fill.fill_ts = qty, arrival, arrival
+            return fill
+
+        end = min(arrival + horizon_ms, self.end_ts)
+        level = ahead = fill.ahead
+        remaining = qty
+        t, span = arrival, self.window_ms
+        while t < end:
+            t1 = min(t + span, end)
+            stop = self._stop_ts(bid, price, t, t1)
+            for ts, kind, size in self._events(bid, price, t, min(t1, stop)):
+                if kind == _TRADE:
+                    taken = min(ahead, size)
+                    ahead -= taken
+                    mine = min(size - taken, remaining)
+                    if mine > 0:
+                        remaining -= mine
+                        if math.isnan(fill.first_fill_ts):
+                            fill.first_fill_ts = ts
+                        if remaining <= 0:
+                            fill.filled_qty, fill.fill_ts = qty, ts
+                            return fill
+                    level = max(0.0, level - (size - mine))
+                else:
+                    if size < level:
+                        ahead = self._cancel(ahead, max(0.0, level - ahead), level - size)
+                    level = size
+                    ahead = min(ahead, size)
+            if stop <= t1:
+                if math.isnan(fill.first_fill_ts):
+                    fill.first_fill_ts = stop
+                fill.filled_qty, fill.fill_ts = qty, stop
+                return fill
+            t, span = t1, span * 2
+        fill.filled_qty = qty - remaining
+        return fill
+
+    def simulate_many(
+        self,
+        side: Union[str, Sequence[str]],
+        price: Any,
+        qty: Any,
+        submit_ts: Any,
+        latency_ms: float = 0.0,
+        horizon_ms: float = math.inf,
+        post_only: bool = True,
+    ) -> FillReport:
+        """:meth:`simulate` over columns, which broadcast against each other."""
+        sides, prices, qtys, submits = np.broadcast_arrays(
+            np.asarray(side), np.asarray(price, dtype=float), np.asarray(qty, dtype=float),
+            np.asarray(submit_ts, dtype=float),
+        )
+        rows = [
+            self.simulate(s, p, q, t, latency_ms, horizon_ms, post_only).as_row()
+            for s, p, q, t in zip(sides.ravel().tolist(), prices.ravel().tolist(), qtys.ravel().tolist(),
+                                  submits.ravel().tolist())
+        ]
+        return FillReport(np.array(rows, dtype=FILL_DTYPE))
+
+    def join_best(
+        self,
+        side: str,
+        every_ms: float,
+        qty: float,
+        horizon_ms: float,
+        latency_ms: float = 0.0,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> FillReport:
+        """Post-only orders joining the best price on *side* every *every_ms*.
+
+        The price is the best bid (for a buy) or ask as of submission, so
+        latency can move the book before the order arrives and get it
+        rejected.
+        """
+        if every_ms <= 0:
+            raise ValueError("every_ms must be positive")
+        bid = _is_bid(side)
+        submits = np.arange(self.start_ts if start is None else start, self.end_ts if end is None else end, every_ms)
+        i = np.searchsorted(self._bbo_ts, np.floor(submits), "right") - 1
+        prices = (self._best_bid if bid else self._best_ask)[np.maximum(i, 0)]
+        keep = (i >= 0) & ~np.isnan(prices)
+        return self.simulate_many(side, prices[keep], qty, submits[keep], latency_ms, horizon_ms)
@@ -0,0 +1,255 @@
+"""Time-ordered replay of recorded tick CSVs.
+
+Files under ``data/ticks/YYYYMMDD/<symbol>.csv`` (and legacy flat
+``data/ticks/<symbol>.csv`` files) are streamed row by row.  The day files of
+a symbol are read one after another in date order and the symbols are merged
+with a k-way heap merge, so at most one file per symbol is open and memory use
+is one pending row per symbol regardless of how many days are replayed.  Both CSV schemas are understood:
+
+* ``ts,symbol,mark,estFunding,nextFunding,src`` from :mod:`feeds.rest_mark_funding`
+  and :mod:`binance_ws`
+* ``timestamp,markPrice,fundingRate`` from older :mod:`binance_ws` recordings
+
+Each event is pushed into a :class:`core.data.market_cache.MarketCache` – the
+same path the live feeds drive – and then to any registered handlers, for
+example a closure around :meth:`Orchestrator.evaluate`.  ``speed`` controls
+pacing: ``None`` replays as fast as possible, ``1.0`` at wall-clock speed and
+larger values proportionally faster.
+"""
+from __future__ import annotations
+
+import asyncio
+import csv
+import datetime as dt
+import heapq
+import itertools
+import os
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from core.data.market_cache import MarketCache, market_cache
+
+_EPOCH = dt.datetime(1970, 1, 1)
+
+
+def _ms(text: str) -> int:
+    """Parse an ISO timestamp (naive UTC) or epoch-ms string to epoch ms."""
+    if not text:
+        return 0
+    if text.isdigit():
+        return int(text)
+    delta = dt.datetime.fromisoformat(text).replace(tzinfo=None) - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1000 + delta.microseconds // 1000
+
+
+def venue_of(symbol: str) -> str:
+    """Venue implied by the symbol format used in the tick files."""
+    return "okx" if "-" in symbol else "binance"
+
+
+class TickEvent:
+    """One recorded mark price / funding observation."""
+
+    __slots__ = ("ts", "venue", "symbol", "mark", "funding", "next_funding", "src")
+
+    def __init__(
+        self, ts: int, venue: str, symbol: str, mark: float, funding: float, next_funding: int, src: str
+    ) -> None:
+        self.ts = ts
+        self.venue = venue
+        self.symbol = symbol
+        self.mark = mark
+        self.funding = funding
+        self.next_funding = next_funding
+        self.src = src
+
+    def __repr__(self) -> str:
+        return f"TickEvent(ts={self.ts}, symbol={self.symbol!r}, mark={self.mark}, funding={self.funding})"
+
+
+def iter_ticks(path: Union[str, Path]) -> Iterator[TickEvent]:
+    """Lazily yield events from one tick CSV of either schema."""
+    path = Path(path)
+    with path.open(newline="") as fh:
+        reader = csv.reader(fh)
+        header = next(reader, None)
+        if header is None:
+            return
+        if header[0] == "ts":
+            for row in reader:
+                if len(row) < 6:
+                    continue
+                symbol = row[1]
+                yield TickEvent(
+                    _ms(row[0]), venue_of(symbol), symbol, float(row[2]), float(row[3]), _ms(row[4]), row[5]
+                )
+        elif header[0] == "timestamp":
+            symbol = path.stem
+            venue = venue_of(symbol)
+            for row in reader:
+                if len(row) < 3:
+                    continue
+                yield TickEvent(_ms(row[0]), venue, symbol, float(row[1]), float(row[2]), 0, "WS")
+        else:
+            raise ValueError(f"unrecognised tick CSV header in {path}: {header}")
+
+
+def discover(
+    root: Union[str, Path] = os.path.join("data", "ticks"),
+    symbols: Optional[Iterable[str]] = None,
+    start_day: Optional[str] = None,
+    end_day: Optional[str] = None,
+) -> List[Path]:
+    """List tick files under *root*, optionally filtered by symbol and day range.
+
+    Legacy flat files directly under *root* are included only without a day
+    filter, since their day cannot be told from the path.
+    """
+    root = Path(root)
+    wanted = set(symbols) if symbols is not None else None
+    paths: List[Path] = []
+    if not root.exists():
+        return paths
+    for entry in sorted(root.iterdir()):
+        if entry.is_dir() and entry.name.isdigit():
+            if (start_day and entry.name < start_day) or (end_day and entry.name > end_day):
+                continue
+            files = sorted(entry.glob("*.csv"))
+        elif entry.suffix == ".csv" and start_day is None and end_day is None:
+            files = [entry]
+        else:
+            continue
+        paths.extend(p for p in files if wanted is None or p.stem in wanted)
+    return paths
+
+
+@dataclass
+class ReplayStats:
+    """Throughput of a finished replay."""
+
+    events: int
+    wall_s: float
+    first_ts: int
+    last_ts: int
+
+    @property
+    def events_per_s(self) -> float:
+        return self.events / self.wall_s if self.wall_s > 0 else float("inf")
+
+    @property
+    def span_s(self) -> float:
+        return (self.last_ts - self.first_ts) / 1000 if self.events else 0.0
+
+
+Handler = Callable[[TickEvent], None]
+
+
+class ReplayEngine:
+    """Merge tick files by timestamp and drive the market cache and handlers."""
+
+    def __init__(
+        self,
+        paths: Iterable[Union[str, Path]],
+        speed: Optional[float] = None,
+        market: Optional[MarketCache] = market_cache,
+    ) -> None:
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be positive or None")
+        self.paths = [Path(p) for p in paths]
+        self.speed = speed
+        self.market = market
+        self._handlers: List[Handler] = []
+
+    def subscribe(self, handler: Handler) -> None:
+        """Call *handler* with every event after the market cache is updated."""
+        self._handlers.append(handler)
+
+    def streams(self) -> List[Iterator[TickEvent]]:
+        """One lazy event stream per symbol, chaining its day files in date order.
+
+        A legacy flat file may span any days, so it is a stream of its own.
+        """
+        days: Dict[str, List[Path]] = defaultdict(list)
+        streams: List[Iterator[TickEvent]] = []
+        for path in self.paths:
+            if path.parent.name.isdigit():
+                days[path.stem].append(path)
+            else:
+                streams.append(iter_ticks(path))
+        for files in days.values():
+            files.sort(key=lambda p: p.parent.name)
+            streams.append(itertools.chain.from_iterable(iter_ticks(p) for p in files))
+        return streams
+
+    def events(self) -> Iterator[TickEvent]:
+        """Lazily merged events across all files in timestamp order."""
+        return heapq.merge(*self.streams(), key=lambda e: e.ts)
+
+    def _emit(self, event: TickEvent) -> None:
+        if self.market is not None:
+            self.market.update(
+                event.venue,
+                event.symbol,
+                event.ts,
+                mark=event.mark,
+                funding=event.funding,
+                next_funding=event.next_funding,
+            )
+        for handler in self._handlers:
+            handler(event)
+
+    def _delay(self, event: TickEvent, first_ts: int, started: float) -> float:
+        if self.speed is None:
+            return 0.0
+        due = started + (event.ts - first_ts) / 1000 / self.speed
+        return due - time.perf_counter()
+
+    def run(self) -> ReplayStats:
+        """Replay every event, blocking with ``time.sleep`` for pacing."""
+        started = time.perf_counter()
+        count, first_ts, last_ts = 0, 0, 0
+        for event in self.events():
+            if count == 0:
+                first_ts = event.ts
+            wait = self._delay(event, first_ts, started)
+            if wait > 0:
+                time.sleep(wait)
+            self._emit(event)
+            count += 1
+            last_ts = event.ts
+        return ReplayStats(count, time.perf_counter() - started, first_ts, last_ts)
+
+    async def run_async(self) -> ReplayStats:
+        """Replay every event on the event loop, yielding while pacing."""
+        started = time.perf_counter()
+        count, first_ts, last_ts = 0, 0, 0
+        for event in self.events():
+            if count == 0:
+                first_ts = event.ts
+            wait = self._delay(event, first_ts, started)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._emit(event)
+            count += 1
+            last_ts = event.ts
+        return ReplayStats(count, time.perf_counter() - started, first_ts, last_ts)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay recorded tick files")
+    parser.add_argument("--root", default=os.path.join("data", "ticks"))
+    parser.add_argument("--symbols", help="Comma separated symbols (default: all)")
+    parser.add_argument("--start-day", help="First day, YYYYMMDD")
+    parser.add_argument("--end-day", help="Last day, YYYYMMDD")
+    parser.add_argument("--speed", type=float, default=None, help="Replay speed (default: as fast as possible)")
+    args = parser.parse_args()
+
+    syms = [s.strip() for s in args.symbols.split(",")] if args.symbols else None
+    engine = ReplayEngine(discover(args.root, syms, args.start_day, args.end_day), speed=args.speed)
+    stats = engine.run()
+    print(f"Replayed {stats.events} events spanning {stats.span_s:.0f}s at {stats.events_per_s:,.0f} events/s")
@@ -2,18 +2,28 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Iterable
-import csv
-import statistics
+from typing import Any, Dict, List, Iterable, Optional
+
+import numpy as np
+
+# Columns of a leg table for :meth:`TCASimulator.simulate_table`.
+LEG_FIELDS = ("side", "quantity", "limit_price", "arrival_mid")
 
 
 @dataclass
 class Leg:
-    """Parameters describing a single trading leg."""
+    """Parameters describing a single trading leg.
+
+    ``symbol``, ``venue`` and ``ts`` (epoch ms) are only used to pick a
+    calibration stratum, see :mod:`sim.tca_calibration`.
+    """
     side: str
     quantity: float
     limit_price: float
     arrival_mid: float
+    symbol: str = ""
+    venue: str = ""
+    ts: Optional[float] = None
 
 
 @dataclass
@@ -24,6 +34,50 @@ class SimulationResult:
     implementation_shortfall: float
 
 
+@dataclass
+class BatchResult:
+    """Outcome of :meth:`TCASimulator.simulate_batch`, one array entry per leg."""
+    filled_qty: np.ndarray
+    avg_price: np.ndarray
+    implementation_shortfall: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.filled_qty)
+
+    def __getitem__(self, i: int) -> SimulationResult:
+        return SimulationResult(
+            filled_qty=float(self.filled_qty[i]),
+            avg_price=float(self.avg_price[i]),
+            implementation_shortfall=float(self.implementation_shortfall[i]),
+        )
+
+    def to_results(self) -> List[SimulationResult]:
+        return [self[i] for i in range(len(self))]
+
+
+def buy_mask(side: Any) -> np.ndarray:
+    """``True`` for buy legs.
+
+    *side* holds strings (``"buy"``/``"sell"`` in any case, as in :class:`Leg`)
+    or signs, where positive means buy.
+    """
+    side = np.asarray(side)
+    if side.dtype.kind in "biuf":
+        return side > 0
+    return np.char.lower(side.astype(str)) == "buy"
+
+
+def leg_columns(legs: Iterable[Leg]) -> Dict[str, np.ndarray]:
+    """Columns of *legs* keyed by :data:`LEG_FIELDS`."""
+    legs = list(legs)
+    return {
+        "side": buy_mask([leg.side for leg in legs]),
+        "quantity": np.array([leg.quantity for leg in legs], dtype=float),
+        "limit_price": np.array([leg.limit_price for leg in legs], dtype=float),
+        "arrival_mid": np.array([leg.arrival_mid for leg in legs], dtype=float),
+    }
+
+
 @dataclass
 class TCASimulator:
     """Simple limit order fill simulator.
@@ -48,36 +102,19 @@ class TCASimulator:
         ``arrival_mid`` and ``post_fill_mid`` – mid prices, and ``filled``
         indicating whether the order fully filled (``1``/``0`` or
         ``true``/``false``).
+
+        Logs are read in chunks into online accumulators; for stratified
+        parameters and incremental updates use
+        :class:`~sim.tca_calibration.TCACalibration` directly.
         """
+        from .tca_calibration import GLOBAL, TCACalibration
+
         file = Path(path)
         if not file.exists():  # pragma: no cover - defensive coding
             raise FileNotFoundError(f"log file not found: {file}")
-
-        latencies: List[float] = []
-        depths: List[float] = []
-        slippages: List[float] = []
-        filled, total = 0, 0
-
-        with file.open() as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                total += 1
-                if row.get("filled", "").lower() in {"1", "true", "yes"}:
-                    filled += 1
-                try:
-                    latencies.append(float(row["latency_ms"]))
-                    depths.append(float(row["depth"]))
-                    slippages.append(float(row["post_fill_mid"]) - float(row["arrival_mid"]))
-                except KeyError:
-                    # skip rows missing calibration fields
-                    continue
-
-        fill_prob = filled / total if total else 1.0
-        latency = statistics.mean(latencies) if latencies else 0.0
-        depth = statistics.mean(depths) if depths else 1.0
-        adverse = statistics.mean(slippages) if slippages else 0.0
-
-        return cls(fill_prob=fill_prob, adverse_selection=adverse, latency_ms=latency, depth=depth)
+        calibration = TCACalibration()
+        calibration.update_from_log(file)
+        return calibration.stats(GLOBAL).simulator()
 
     # ------------------------------------------------------------------
     def _effective_fill_ratio(self, qty: float) -> float:
@@ -105,3 +142,58 @@ class TCASimulator:
     def simulate_order(self, legs: Iterable[Leg]) -> List[SimulationResult]:
         """Simulate a list of legs returning per leg results."""
         return [self.simulate_leg(leg) for leg in legs]
+
+    # ------------------------------------------------------------------
+    # Batch API
+    # ------------------------------------------------------------------
+    def _fill_ratios(self, qty: np.ndarray) -> np.ndarray:
+        """:meth:`_effective_fill_ratio` over an array of quantities."""
+        # ``fmin`` drops a NaN ratio like ``min(1.0, nan)`` does.
+        ratio = np.fmin(self.depth / qty, 1.0)
+        ratio *= self.fill_prob
+        ratio *= max(0.0, 1.0 - self.latency_ms / 1000.0)
+        return ratio
+
+    def simulate_batch(self, side: Any, quantity: Any, limit_price: Any, arrival_mid: Any) -> BatchResult:
+        """Simulate many legs given as columns.
+
+        Gives exactly the floats :meth:`simulate_leg` gives for each leg.
+        Sells are handled as buys with every price negated (``max(a, b)`` is
+        ``-min(-a, -b)``, and negation is exact), which avoids branching on
+        the side.  *side* is anything :func:`buy_mask` accepts; the other
+        columns broadcast against each other.
+        """
+        buy, qty, limit, mid = np.broadcast_arrays(
+            buy_mask(side),
+            np.asarray(quantity, dtype=float),
+            np.asarray(limit_price, dtype=float),
+            np.asarray(arrival_mid, dtype=float),
+        )
+        sign = buy * 2.0 - 1.0
+        if (qty == 0).any():
+            raise ValueError("quantity must be non-zero")
+
+        # In place where possible; every product below is commutative, so
+        # the rounding matches the scalar expressions.
+        filled_qty = self._fill_ratios(qty)
+        filled_qty *= qty
+        adverse_move = self.adverse_selection * (self.latency_ms / 1000.0)
+
+        moved = sign * adverse_move
+        moved += mid
+        exec_price = sign * limit
+        np.minimum(exec_price, sign * moved, out=exec_price)
+        exec_price *= sign
+        # min/max in simulate_leg keep the limit when the moved price is NaN.
+        nan = np.isnan(moved)
+        if nan.any():
+            exec_price = np.where(nan, limit, exec_price)
+        shortfall = exec_price - mid
+        shortfall *= sign
+        shortfall *= filled_qty
+        return BatchResult(filled_qty=filled_qty, avg_price=exec_price, implementation_shortfall=shortfall)
+
+    def simulate_table(self, table: Any) -> BatchResult:
+        """:meth:`simulate_batch` over a mapping of columns or a structured
+        array with the :data:`LEG_FIELDS`."""
+        return self.simulate_batch(*(table[name] for name in LEG_FIELDS))
@@ -0,0 +1,571 @@
+"""Streaming, stratified calibration of :class:`~sim.simulator_tca.TCASimulator`.
+
+Execution logs are CSV files with the columns read by
+:meth:`TCASimulator.calibrate_from_logs` (``latency_ms``, ``depth``,
+``arrival_mid``, ``post_fill_mid``, ``filled``) plus, optionally, ``symbol``,
+``venue``, ``side`` and ``ts`` (epoch seconds or milliseconds, or ISO-8601,
+UTC).  Lines are read in blocks of ``chunk_bytes`` and folded into online
+accumulators, so memory does not grow with the log:
+
+* :class:`RunningStats` – count, mean and variance (Welford, mergeable),
+* :class:`QuantileSketch` – log-bucketed quantiles with a relative error
+  bound, mergeable as well.
+
+Accumulators are kept per stratum ``(symbol, venue, side, time-of-day
+bucket)``; a column missing from a log puts its rows in the :data:`ANY`
+stratum for that dimension.  Adverse selection is measured against the
+order: ``post_fill_mid - arrival_mid`` for buys and the reverse for sells.
+
+:class:`TCACalibration` remembers how far it has read each file, so calling
+:meth:`~TCACalibration.update_from_log` again only reads lines appended since,
+and :meth:`~TCACalibration.save` / :meth:`~TCACalibration.load` carry the
+state between runs::
+
+    cal = TCACalibration.load("tca.json") if Path("tca.json").exists() else TCACalibration()
+    cal.update_from_log("logs/executions.csv")
+    cal.save("tca.json")
+    sim = StratifiedTCASimulator(cal)
+    sim.simulate_leg(Leg("buy", 1.0, 101.0, 100.0, symbol="BTCUSDT", venue="binance", ts=ts_ms))
+
+:class:`StratifiedTCASimulator` simulates each leg with the parameters of its
+stratum, falling back to coarser strata while a stratum has fewer than
+``min_rows`` rows.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import math
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from core.data.tick_store import DAY_MS, to_ms
+from core.exchange.symbols import to_canonical
+
+from .simulator_tca import LEG_FIELDS, BatchResult, Leg, SimulationResult, TCASimulator, buy_mask
+
+# Wildcard value of a stratum dimension.
+ANY = "*"
+StratumKey = Tuple[str, str, str, str]  # symbol, venue, side, time of day
+GLOBAL: StratumKey = (ANY, ANY, ANY, ANY)
+
+FILLED_VALUES = {"1", "true", "yes"}
+
+
+# ----------------------------------------------------------------------
+# Online accumulators
+# ----------------------------------------------------------------------
+class RunningStats:
+    """Count, mean and variance of a stream of floats."""
+
+    __slots__ = ("count", "mean", "m2", "min", "max")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add_many(self, values: Any) -> None:
+        values = np.asarray(values, dtype=float)
+        if values.size == 0:
+            return
+        other = RunningStats()
+        other.count = int(values.size)
+        other.mean = float(values.mean())
+        other.m2 = float(((values - other.mean) ** 2).sum())
+        other.min = float(values.min())
+        other.max = float(values.max())
+        self.merge(other)
+
+    def merge(self, other: "RunningStats") -> None:
+        """Fold *other* in (Chan et al. parallel update)."""
+        if other.count == 0:
+            return
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / n
+        self.m2 += other.m2 + delta * delta * self.count * other.count / n
+        self.count = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance; NaN below two values."""
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def to_dict(self) -> Dict[str, float]:
+        return {"count": self.count, "mean": self.mean, "m2": self.m2, "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, float]) -> "RunningStats":
+        stats = cls()
+        stats.count = int(data["count"])
+        stats.mean, stats.m2 = float(data["mean"]), float(data["m2"])
+        stats.min, stats.max = float(data["min"]), float(data["max"])
+        return stats
+
+
+class QuantileSketch:
+    """Quantiles within a relative error *alpha*, in memory logarithmic in the range.
+
+    Each value lands in bucket ``ceil(log_gamma |x|)`` with
+    ``gamma = (1 + alpha) / (1 - alpha)``, separately for positive and
+    negative values; magnitudes below :attr:`MIN_VALUE` count as zero.
+    Sketches with the same *alpha* merge by adding bucket counts.
+    """
+
+    MIN_VALUE = 1e-9
+
+    __slots__ = ("alpha", "_log_gamma", "pos", "neg", "zeros", "count")
+
+    def __init__(self, alpha: float = 0.01) -> None:
+        if not 0 < alpha < 1:
+            raise ValueError("alpha must be in (0, 1)")
+        self.alpha = alpha
+        self._log_gamma = math.log((1 + alpha) / (1 - alpha))
+        self.pos: Dict[int, int] = {}
+        self.neg: Dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+
+    def add_many(self, values: Any) -> None:
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        self.count += int(values.size)
+        self.zeros += int((np.abs(values) < self.MIN_VALUE).sum())
+        for store, part in ((self.pos, values[values >= self.MIN_VALUE]), (self.neg, -values[values <= -self.MIN_VALUE])):
+            if part.size:
+                index, counts = np.unique(np.ceil(np.log(part) / self._log_gamma).astype(np.int64), return_counts=True)
+                for i, c in zip(index.tolist(), counts.tolist()):
+                    store[i] = store.get(i, 0) + c
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.alpha != self.alpha:
+            raise ValueError("cannot merge sketches with different alpha")
+        for store, theirs in ((self.pos, other.pos), (self.neg, other.neg)):
+            for i, c in theirs.items():
+                store[i] = store.get(i, 0) + c
+        self.zeros += other.zeros
+        self.count += other.count
+
+    def buckets(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Representative values in ascending order and their counts."""
+        scale = 2.0 / (1.0 + math.exp(self._log_gamma))
+        neg = sorted(self.neg, reverse=True)
+        pos = sorted(self.pos)
+        values = np.concatenate([
+            -np.exp(np.array(neg, dtype=float) * self._log_gamma) * scale,
+            np.zeros(1 if self.zeros else 0),
+            np.exp(np.array(pos, dtype=float) * self._log_gamma) * scale,
+        ])
+        counts = np.array([self.neg[i] for i in neg] + ([self.zeros] if self.zeros else []) + [self.pos[i] for i in pos],
+                          dtype=np.int64)
+        return values, counts
+
+    def quantile(self, q: Any) -> Any:
+        """Value at quantile *q* (a float or an array of them); NaN when empty."""
+        q_arr = np.asarray(q, dtype=float)
+        if ((q_arr < 0) | (q_arr > 1)).any():
+            raise ValueError("q must be in [0, 1]")
+        if self.count == 0:
+            out = np.full(q_arr.shape, math.nan)
+        else:
+            values, counts = self.buckets()
+            rank = q_arr * (self.count - 1)
+            out = values[np.minimum(np.searchsorted(np.cumsum(counts), rank, side="right"), len(values) - 1)]
+        return float(out) if out.ndim == 0 else out
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "alpha": self.alpha, "zeros": self.zeros, "count": self.count,
+            "pos": {str(i): c for i, c in self.pos.items()}, "neg": {str(i): c for i, c in self.neg.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "QuantileSketch":
+        sketch = cls(float(data["alpha"]))
+        sketch.zeros, sketch.count = int(data["zeros"]), int(data["count"])
+        sketch.pos = {int(i): int(c) for i, c in data["pos"].items()}
+        sketch.neg = {int(i): int(c) for i, c in data["neg"].items()}
+        return sketch
+
+
+class StratumStats:
+    """Accumulators of one stratum."""
+
+    __slots__ = ("rows", "filled", "latency", "depth", "adverse", "latency_q", "adverse_q")
+
+    def __init__(self, alpha: float = 0.01) -> None:
+        self.rows = 0
+        self.filled = 0
+        self.latency = RunningStats()
+        self.depth = RunningStats()
+        self.adverse = RunningStats()
+        self.latency_q = QuantileSketch(alpha)
+        self.adverse_q = QuantileSketch(alpha)
+
+    def update(self, filled: np.ndarray, latency: np.ndarray, depth: np.ndarray, adverse: np.ndarray) -> None:
+        """Add rows; a row missing any of the value fields only counts towards the fill rate."""
+        self.rows += int(filled.size)
+        self.filled += int(filled.sum())
+        ok = np.isfinite(latency) & np.isfinite(depth) & np.isfinite(adverse)
+        latency, depth, adverse = latency[ok], depth[ok], adverse[ok]
+        self.latency.add_many(latency)
+        self.depth.add_many(depth)
+        self.adverse.add_many(adverse)
+        self.latency_q.add_many(latency)
+        self.adverse_q.add_many(adverse)
+
+    def merge(self, other: "StratumStats") -> None:
+        self.rows += other.rows
+        self.filled += other.filled
+        for name in ("latency", "depth", "adverse", "latency_q", "adverse_q"):
+            getattr(self, name).merge(getattr(other, name))
+
+    @property
+    def fill_prob(self) -> float:
+        return self.filled / self.rows if self.rows else 1.0
+
+    def simulator(self) -> TCASimulator:
+        """Parameters of this stratum, with the defaults of ``calibrate_from_logs``."""
+        return TCASimulator(
+            fill_prob=self.fill_prob,
+            adverse_selection=self.adverse.mean if self.adverse.count else 0.0,
+            latency_ms=self.latency.mean if self.latency.count else 0.0,
+            depth=self.depth.mean if self.depth.count else 1.0,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"rows": self.rows, "filled": self.filled}
+        for name in ("latency", "depth", "adverse", "latency_q", "adverse_q"):
+            data[name] = getattr(self, name).to_dict()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "StratumStats":
+        stats = cls()
+        stats.rows, stats.filled = int(data["rows"]), int(data["filled"])
+        for name in ("latency", "depth", "adverse"):
+            setattr(stats, name, RunningStats.from_dict(data[name]))
+        for name in ("latency_q", "adverse_q"):
+            setattr(stats, name, QuantileSketch.from_dict(data[name]))
+        return stats
+
+
+# ----------------------------------------------------------------------
+# Column parsing
+# ----------------------------------------------------------------------
+def _floats(values: Sequence[Any]) -> np.ndarray:
+    try:
+        return np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        out = np.empty(len(values))
+        for i, v in enumerate(values):
+            try:
+                out[i] = float(v)
+            except (TypeError, ValueError):
+                out[i] = math.nan
+        return out
+
+
+# A label column as (distinct names, code of each row).
+Labels = Tuple[List[str], np.ndarray]
+
+
+def _labels(values: Sequence[Any], normalise: Callable[[str], str]) -> Labels:
+    """Normalised labels of *values*; each distinct raw value is normalised once."""
+    uniq, codes = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    return [normalise(u) if u else ANY for u in uniq.tolist()], codes.reshape(-1)
+
+
+def _constant(n: int) -> Labels:
+    return [ANY], np.zeros(n, dtype=np.int64)
+
+
+def _symbol(value: str) -> str:
+    try:
+        return to_canonical(value)
+    except ValueError:
+        return value.upper()
+
+
+def epoch_ms(values: Sequence[Any]) -> np.ndarray:
+    """Epoch milliseconds of numeric (seconds or ms) or ISO timestamps; NaN if missing."""
+    out = _floats(values)
+    for i in np.flatnonzero(np.isnan(out)).tolist():
+        if values[i] not in ("", None):
+            try:
+                out[i] = to_ms(values[i])
+            except ValueError:
+                pass
+    seconds = out < 1e11
+    out[seconds] *= 1000
+    return out
+
+
+def time_of_day(ts_ms: np.ndarray, bucket_minutes: int) -> Labels:
+    """``"HH:MM"`` start of the UTC time-of-day bucket of each timestamp; :data:`ANY` if NaN."""
+    buckets = DAY_MS // (bucket_minutes * 60_000)
+    codes = np.full(ts_ms.shape, buckets, dtype=np.int64)
+    ok = np.isfinite(ts_ms)
+    codes[ok] = (ts_ms[ok] % DAY_MS) // (bucket_minutes * 60_000)
+    names = [f"{b * bucket_minutes // 60:02d}:{b * bucket_minutes % 60:02d}" for b in range(buckets)]
+    return names + [ANY], codes
+
+
+def _groups(*dims: Labels) -> Iterator[Tuple[StratumKey, np.ndarray]]:
+    """Row indices of each distinct stratum key of the label columns *dims*.
+
+    Raw values normalised to the same label form separate groups with the
+    same key.
+    """
+    combined = np.zeros(len(dims[0][1]), dtype=np.int64)
+    for names, codes in dims:
+        combined *= len(names)
+        combined += codes
+    uniq, inverse = np.unique(combined, return_inverse=True)
+    order = np.argsort(inverse, kind="stable")
+    bounds = np.searchsorted(inverse[order], np.arange(len(uniq) + 1))
+    for j, code in enumerate(uniq.tolist()):
+        key = []
+        for names, _ in reversed(dims):
+            code, i = divmod(code, len(names))
+            key.append(names[i])
+        yield tuple(reversed(key)), order[bounds[j]:bounds[j + 1]]
+
+
+# ----------------------------------------------------------------------
+# Calibration
+# ----------------------------------------------------------------------
+class TCACalibration:
+    """Stratified TCA statistics, updated incrementally from execution logs."""
+
+    def __init__(self, bucket_minutes: int = 60, chunk_bytes: int = 1 << 23, alpha: float = 0.01) -> None:
+        if bucket_minutes <= 0 or DAY_MS % (bucket_minutes * 60_000):
+            raise ValueError("bucket_minutes must divide a day")
+        self.bucket_minutes = bucket_minutes
+        self.chunk_bytes = chunk_bytes
+        self.alpha = alpha
+        self.strata: Dict[StratumKey, StratumStats] = {}
+        # path -> {"offset": bytes read, "header": column names}
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self._rollups: Dict[StratumKey, StratumStats] = {}
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def update(self, columns: Mapping[str, Sequence[Any]]) -> int:
+        """Fold rows given as columns named like the log header; returns the row count."""
+        n = len(next(iter(columns.values()), ()))
+        if n == 0:
+            return 0
+
+        def column(name: str, default: Any = "") -> Sequence[Any]:
+            values = columns.get(name)
+            return [default] * n if values is None else values
+
+        filled = np.isin(np.char.lower(np.asarray(column("filled"), dtype=str)), list(FILLED_VALUES))
+        latency = _floats(column("latency_ms", None))
+        depth = _floats(column("depth", None))
+        arrival = _floats(column("arrival_mid", None))
+        adverse = _floats(column("post_fill_mid", None)) - arrival
+        side = _labels(column("side"), str.lower)
+        adverse[np.array(side[0], dtype=object)[side[1]] == "sell"] *= -1
+
+        symbol = _labels(column("symbol"), _symbol)
+        venue = _labels(column("venue"), str.lower)
+        tod = time_of_day(epoch_ms(column("ts")), self.bucket_minutes) if "ts" in columns else _constant(n)
+
+        for key, idx in _groups(symbol, venue, side, tod):
+            stats = self.strata.get(key)
+            if stats is None:
+                stats = self.strata[key] = StratumStats(self.alpha)
+            stats.update(filled[idx], latency[idx], depth[idx], adverse[idx])
+        self._rollups.clear()
+        return n
+
+    def _chunks(self, fh: Any, header: List[str]) -> Iterator[Tuple[Dict[str, Sequence[str]], int]]:
+        """Column chunks of about ``chunk_bytes`` of complete lines, and the offset after each."""
+        width = len(header)
+        while True:
+            block = fh.read(self.chunk_bytes)
+            if not block.endswith(b"\n"):
+                block += fh.readline()
+            end = block.rfind(b"\n") + 1
+            if end < len(block):
+                fh.seek(end - len(block), 1)  # a line still being written; read it next time
+            if end == 0:
+                return
+            text = block[:end].decode()
+            if '"' in text:
+                rows = [r for r in csv.reader(text.splitlines()) if r]
+            else:
+                rows = [line.split(",") for line in text.splitlines() if line]
+            if set(map(len, rows)) != {width}:
+                rows = [(r + [""] * width)[:width] for r in rows]
+            yield dict(zip(header, zip(*rows))), fh.tell()
+
+    def update_from_log(self, path: Union[str, Path]) -> int:
+        """Read the lines of *path* not read before; returns the number of new rows.
+
+        A file that shrank or whose header changed since the last call is
+        taken to be a new file and read from the start.
+        """
+        path = Path(path)
+        state = self.files.get(str(path))
+        total = 0
+        with path.open("rb") as fh:
+            first = fh.readline()
+            if not first.endswith(b"\n"):
+                return 0
+            header = next(csv.reader([first.decode()]))
+            size = path.stat().st_size
+            if state is not None and state["header"] == header and state["offset"] <= size:
+                fh.seek(state["offset"])
+            state = self.files[str(path)] = {"offset": fh.tell(), "header": header}
+            for cols, offset in self._chunks(fh, header):
+                total += self.update(cols)
+                state["offset"] = offset
+        return total
+
+    def merge(self, other: "TCACalibration") -> None:
+        """Add the statistics of *other*, e.g. from a log read in another process."""
+        if other.bucket_minutes != self.bucket_minutes:
+            raise ValueError("cannot merge calibrations with different time buckets")
+        for key, stats in other.strata.items():
+            self.strata.setdefault(key, StratumStats(self.alpha)).merge(stats)
+        self._rollups.clear()
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+    def stats(self, key: StratumKey) -> StratumStats:
+        """Statistics of *key*, where :data:`ANY` matches every value of a dimension."""
+        if key in self.strata and ANY not in key:
+            return self.strata[key]
+        rollup = self._rollups.get(key)
+        if rollup is None:
+            rollup = StratumStats(self.alpha)
+            for k, stats in self.strata.items():
+                if all(want == ANY or want == have for want, have in zip(key, k)):
+                    rollup.merge(stats)
+            self._rollups[key] = rollup
+        return rollup
+
+    def stratum(self, symbol: str = ANY, venue: str = ANY, side: str = ANY, ts_ms: Optional[float] = None) -> StratumKey:
+        """Key of a leg; empty values mean :data:`ANY`."""
+        if ts_ms is None:
+            tod = ANY
+        else:
+            names, codes = time_of_day(np.array([float(ts_ms)]), self.bucket_minutes)
+            tod = names[codes[0]]
+        return (_symbol(symbol) if symbol and symbol != ANY else ANY, venue.lower() or ANY, side.lower() or ANY, tod)
+
+    def lookup(self, key: StratumKey, min_rows: int = 1) -> Tuple[StratumKey, StratumStats]:
+        """Finest stratum on the path ``key`` -> any time -> any side -> any
+        symbol -> any venue with at least *min_rows* rows (the last one if none)."""
+        symbol, venue, side, tod = key
+        path = [key, (symbol, venue, side, ANY), (symbol, venue, ANY, ANY), (ANY, venue, ANY, ANY), GLOBAL]
+        for candidate in path:
+            stats = self.stats(candidate)
+            if stats.rows >= min_rows:
+                return candidate, stats
+        return GLOBAL, self.stats(GLOBAL)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "bucket_minutes": self.bucket_minutes,
+            "alpha": self.alpha,
+            "files": self.files,
+            "strata": [{"key": list(k), **s.to_dict()} for k, s in self.strata.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any], chunk_bytes: int = 1 << 23) -> "TCACalibration":
+        cal = cls(int(data["bucket_minutes"]), chunk_bytes, float(data["alpha"]))
+        cal.files = {p: dict(s) for p, s in data["files"].items()}
+        cal.strata = {tuple(s["key"]): StratumStats.from_dict(s) for s in data["strata"]}
+        return cal
+
+    def save(self, path: Union[str, Path]) -> None:
+        path = Path(path)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.to_dict()))
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path], chunk_bytes: int = 1 << 23) -> "TCACalibration":
+        return cls.from_dict(json.loads(Path(path).read_text()), chunk_bytes)
+
+
+# ----------------------------------------------------------------------
+# Simulation
+# ----------------------------------------------------------------------
+class StratifiedTCASimulator:
+    """:class:`TCASimulator` with the parameters of each leg's stratum.
+
+    Legs are matched on their ``symbol``, ``venue``, ``side`` and ``ts``; a
+    stratum with fewer than *min_rows* rows defers to a coarser one (see
+    :meth:`TCACalibration.lookup`).
+    """
+
+    def __init__(self, calibration: TCACalibration, min_rows: int = 30) -> None:
+        self.calibration = calibration
+        self.min_rows = min_rows
+        self._simulators: Dict[StratumKey, TCASimulator] = {}
+
+    def simulator(self, key: StratumKey) -> TCASimulator:
+        sim = self._simulators.get(key)
+        if sim is None:
+            sim = self._simulators[key] = self.calibration.lookup(key, self.min_rows)[1].simulator()
+        return sim
+
+    def simulator_for(self, leg: Leg) -> TCASimulator:
+        return self.simulator(self.calibration.stratum(leg.symbol, leg.venue, leg.side, leg.ts))
+
+    def refresh(self) -> None:
+        """Forget cached parameters after the calibration was updated."""
+        self._simulators.clear()
+
+    def simulate_leg(self, leg: Leg) -> SimulationResult:
+        return self.simulator_for(leg).simulate_leg(leg)
+
+    def simulate_order(self, legs: Iterable[Leg]) -> List[SimulationResult]:
+        return [self.simulate_leg(leg) for leg in legs]
+
+    def simulate_table(self, table: Any) -> BatchResult:
+        """:meth:`TCASimulator.simulate_table` with per-stratum parameters.
+
+        Besides :data:`~sim.simulator_tca.LEG_FIELDS`, *table* may have
+        ``symbol``, ``venue`` and ``ts`` (epoch ms) columns; missing ones
+        match any value.
+        """
+        names = getattr(getattr(table, "dtype", None), "names", None) or list(table)
+        n = len(table["quantity"])
+        cal = self.calibration
+        side = (["sell", "buy"], buy_mask(table["side"]).astype(np.int64))
+        symbol = _labels(table["symbol"], _symbol) if "symbol" in names else _constant(n)
+        venue = _labels(table["venue"], str.lower) if "venue" in names else _constant(n)
+        tod = (time_of_day(np.asarray(table["ts"], dtype=float), cal.bucket_minutes)
+               if "ts" in names else _constant(n))
+
+        columns = [np.asarray(table[name]) for name in LEG_FIELDS]
+        out = BatchResult(np.empty(n), np.empty(n), np.empty(n))
+        for key, idx in _groups(symbol, venue, side, tod):
+            part = self.simulator(key).simulate_batch(*(c[idx] for c in columns))
+            out.filled_qty[idx] = part.filled_qty
+            out.avg_price[idx] = part.avg_price
+            out.implementation_shortfall[idx] = part.implementation_shortfall
+        return out
@@ -0,0 +1,225 @@
+"""Monte Carlo TCA: shortfall distributions instead of a single expected value.
+
+:class:`~sim.simulator_tca.TCASimulator` multiplies average parameters,
+which says nothing about how bad a leg can get.  Here every path draws its
+own outcome per leg:
+
+* whether the order fills at all – Bernoulli with the calibrated fill rate,
+* the latency – from the calibrated latency quantiles,
+* the book depth – lognormal with the calibrated mean and deviation,
+* the adverse move per second of latency – from the calibrated quantiles,
+
+and then applies the same fill and price rules as
+:meth:`TCASimulator.simulate_batch`.  With every distribution collapsed to a
+point the paths reproduce the deterministic simulator, apart from the
+Bernoulli fill.
+
+Distributions come from :class:`~sim.tca_calibration.TCACalibration`
+strata (:meth:`FillDistributions.from_stats`).  Paths are simulated in
+blocks of ``block_paths``, vectorised over paths, and the blocks are spread
+over a process pool.  Block *i* always uses the *i*-th child of
+``SeedSequence(seed)``, so results depend on the seed and the path count
+only, not on the number of workers::
+
+    mc = MonteCarloTCA(paths=1_000_000, workers=8, seed=7)
+    result = mc.run(legs, stratified_distributions(legs, calibration), orders=[0, 0, 1])
+    result.leg_quantiles, result.order_cvar
+
+Shortfall is a cost: larger is worse, so CVaR at ``alpha`` is the mean of
+the worst ``1 - alpha`` share of paths.
+"""
+from __future__ import annotations
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .simulator_tca import Leg, TCASimulator, buy_mask, leg_columns
+
+# Quantile grid of the empirical distributions.
+GRID = np.linspace(0.0, 1.0, 1001)
+
+
+@dataclass
+class FillDistributions:
+    """Per-path distributions of one stratum's TCA parameters.
+
+    ``latency_ms`` and ``adverse`` are values at the quantiles :data:`GRID`,
+    sampled by inverse transform.
+    """
+
+    fill_prob: float
+    latency_ms: np.ndarray
+    adverse: np.ndarray
+    depth_mean: float
+    depth_std: float = 0.0
+
+    @classmethod
+    def from_simulator(cls, sim: TCASimulator) -> "FillDistributions":
+        """Point distributions at *sim*'s parameters."""
+        return cls(
+            fill_prob=sim.fill_prob,
+            latency_ms=np.full(len(GRID), float(sim.latency_ms)),
+            adverse=np.full(len(GRID), float(sim.adverse_selection)),
+            depth_mean=float(sim.depth),
+        )
+
+    @classmethod
+    def from_stats(cls, stats: Any) -> "FillDistributions":
+        """Distributions of a :class:`~sim.tca_calibration.StratumStats`.
+
+        Falls back to the deterministic defaults of
+        :meth:`StratumStats.simulator` where the stratum has no values.
+        """
+        sim = stats.simulator()
+        point = cls.from_simulator(sim)
+        depth_std = stats.depth.std if stats.depth.count > 1 else 0.0
+        return cls(
+            fill_prob=sim.fill_prob,
+            latency_ms=stats.latency_q.quantile(GRID) if stats.latency_q.count else point.latency_ms,
+            adverse=stats.adverse_q.quantile(GRID) if stats.adverse_q.count else point.adverse,
+            depth_mean=sim.depth,
+            depth_std=0.0 if math.isnan(depth_std) else depth_std,
+        )
+
+    def sample_depth(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        if self.depth_std <= 0 or not self.depth_mean > 0 or math.isinf(self.depth_mean):
+            return np.full(n, self.depth_mean)
+        # Lognormal with the calibrated mean and deviation.
+        sigma2 = math.log1p((self.depth_std / self.depth_mean) ** 2)
+        return rng.lognormal(math.log(self.depth_mean) - sigma2 / 2, math.sqrt(sigma2), n)
+
+
+def stratified_distributions(legs: Sequence[Leg], calibration: Any, min_rows: int = 30) -> List[FillDistributions]:
+    """Distributions of each leg's stratum in a :class:`~sim.tca_calibration.TCACalibration`."""
+    cache: Dict[Tuple[str, ...], FillDistributions] = {}
+    out = []
+    for leg in legs:
+        key = calibration.stratum(leg.symbol, leg.venue, leg.side, leg.ts)
+        if key not in cache:
+            cache[key] = FillDistributions.from_stats(calibration.lookup(key, min_rows)[1])
+        out.append(cache[key])
+    return out
+
+
+@dataclass
+class MonteCarloResult:
+    """Shortfall statistics per leg and per order."""
+
+    quantiles: np.ndarray
+    leg_mean: np.ndarray
+    leg_quantiles: np.ndarray  # (legs, quantiles)
+    leg_cvar: np.ndarray
+    order_mean: np.ndarray
+    order_quantiles: np.ndarray  # (orders, quantiles)
+    order_cvar: np.ndarray
+    alpha: float
+    paths: int
+
+
+def _simulate_block(
+    columns: Tuple[np.ndarray, ...],
+    dists: Sequence[FillDistributions],
+    orders: np.ndarray,
+    n: int,
+    seed: np.random.SeedSequence,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Shortfall of *n* paths of every leg and every order."""
+    buy, qty, limit, mid = columns
+    rng = np.random.default_rng(seed)
+    legs = np.empty((len(qty), n))
+    for i, dist in enumerate(dists):
+        sign = 1.0 if buy[i] else -1.0
+        latency = np.interp(rng.random(n), GRID, dist.latency_ms)
+        adverse = np.interp(rng.random(n), GRID, dist.adverse)
+        filled = np.fmin(dist.sample_depth(rng, n) / qty[i], 1.0)
+        filled *= rng.random(n) < dist.fill_prob
+        filled *= np.maximum(0.0, 1.0 - latency / 1000.0)
+        filled *= qty[i]
+        moved = adverse * (latency / 1000.0)
+        moved *= sign
+        moved += mid[i]
+        exec_price = sign * np.minimum(sign * limit[i], sign * moved)
+        exec_price = np.where(np.isnan(moved), limit[i], exec_price)
+        legs[i] = sign * (exec_price - mid[i]) * filled
+    totals = np.zeros((int(orders.max()) + 1, n))
+    for i, order in enumerate(orders.tolist()):
+        totals[order] += legs[i]
+    return legs, totals
+
+
+def _summary(paths: np.ndarray, quantiles: np.ndarray, alpha: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Mean, quantiles and CVaR along the last axis."""
+    mean = paths.mean(axis=1)
+    qs = np.quantile(paths, quantiles, axis=1).T
+    k = max(1, int(math.ceil((1 - alpha) * paths.shape[1])))
+    tail = np.partition(paths, paths.shape[1] - k, axis=1)[:, -k:]
+    return mean, qs, tail.mean(axis=1)
+
+
+class MonteCarloTCA:
+    """Shortfall paths of many legs, simulated in parallel blocks."""
+
+    def __init__(
+        self,
+        paths: int = 100_000,
+        block_paths: int = 1 << 16,
+        workers: Optional[int] = None,
+        seed: int = 0,
+        quantiles: Sequence[float] = (0.5, 0.9, 0.95, 0.99),
+        alpha: float = 0.95,
+    ) -> None:
+        if paths <= 0 or block_paths <= 0:
+            raise ValueError("paths and block_paths must be positive")
+        if not 0 < alpha < 1:
+            raise ValueError("alpha must be in (0, 1)")
+        self.paths = paths
+        self.block_paths = block_paths
+        self.workers = workers or os.cpu_count() or 1
+        self.seed = seed
+        self.quantiles = np.asarray(quantiles, dtype=float)
+        self.alpha = alpha
+
+    def run(
+        self,
+        legs: Sequence[Leg],
+        distributions: Union[FillDistributions, Sequence[FillDistributions]],
+        orders: Optional[Sequence[int]] = None,
+    ) -> MonteCarloResult:
+        """Simulate *legs*; *orders* assigns each leg an order number (default: one order)."""
+        legs = list(legs)
+        if not legs:
+            raise ValueError("no legs to simulate")
+        dists = [distributions] * len(legs) if isinstance(distributions, FillDistributions) else list(distributions)
+        if len(dists) != len(legs):
+            raise ValueError("need one distribution per leg")
+        order_ids = np.zeros(len(legs), dtype=np.int64) if orders is None else np.asarray(orders, dtype=np.int64)
+        if order_ids.shape != (len(legs),) or (order_ids < 0).any():
+            raise ValueError("orders must give a non-negative order number per leg")
+        table = leg_columns(legs)
+        if (table["quantity"] == 0).any():
+            raise ValueError("quantity must be non-zero")
+        columns = (buy_mask(table["side"]), table["quantity"], table["limit_price"], table["arrival_mid"])
+
+        sizes = [self.block_paths] * (self.paths // self.block_paths)
+        if self.paths % self.block_paths:
+            sizes.append(self.paths % self.block_paths)
+        seeds = np.random.SeedSequence(self.seed).spawn(len(sizes))
+        args = [(columns, dists, order_ids, n, s) for n, s in zip(sizes, seeds)]
+        if self.workers == 1 or len(args) == 1:
+            blocks = [_simulate_block(*a) for a in args]
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(args))) as pool:
+                blocks = list(pool.map(_simulate_block, *zip(*args)))
+
+        leg_paths = np.concatenate([b[0] for b in blocks], axis=1)
+        order_paths = np.concatenate([b[1] for b in blocks], axis=1)
+        leg_mean, leg_q, leg_cvar = _summary(leg_paths, self.quantiles, self.alpha)
+        order_mean, order_q, order_cvar = _summary(order_paths, self.quantiles, self.alpha)
+        return MonteCarloResult(
+            self.quantiles, leg_mean, leg_q, leg_cvar, order_mean, order_q, order_cvar, self.alpha, self.paths
+        )
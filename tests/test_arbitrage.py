@@ -0,0 +1,223 @@
+import asyncio
+
+import pytest
+
+from core.execution.arbitrage import (
+    COMPLETE, FAILED, FILLED, HEDGED, PARTIAL, REJECTED, TIMEOUT, UNBALANCED, UNWOUND,
+    ArbitrageExecutor, ConnectorLegSubmitter, Leg, LegFill,
+)
+from core.exchange.connector import OrderAck, create_connector
+from exec.engine import OrderExecutor
+from orders.symbol_rules import SymbolRulesIndex, fetch_exchange_info
+from orders.tracker import OrderTracker
+from orders.user_stream import OkxUserStream
+from sim.exchange_server import ExchangeSimulator, SimConfig
+
+
+class FakeSubmitter:
+    """Replays scripted fills, optionally after a delay; *reconciled* is the real fill of a lost ack."""
+
+    def __init__(self, *fills, delay=0.0, reconciled=None):
+        self.fills = list(fills)
+        self.delay = delay
+        self.reconciled = reconciled
+        self.sent = []
+        self.queried = []
+
+    async def submit(self, leg):
+        self.sent.append(leg)
+        await asyncio.sleep(self.delay)
+        fill = self.fills.pop(0)
+        return LegFill(fill[0], fill[1]) if isinstance(fill, tuple) else fill
+
+    async def reconcile(self, leg):
+        self.queried.append(leg.client_order_id)
+        if self.reconciled is None:
+            raise ConnectionError("venue unreachable")
+        return LegFill(*self.reconciled)
+
+
+BN = Leg("binance", "BTCUSDT", "BUY", 1.0)
+OK = Leg("okx", "BTCUSDT", "SELL", 1.0)
+
+
+def run(executor, *args):
+    return asyncio.run(executor.execute(*args))
+
+
+def test_both_legs_filled():
+    executor = ArbitrageExecutor({"binance": FakeSubmitter((FILLED, 1.0)), "okx": FakeSubmitter((FILLED, 1.0))})
+    result = run(executor, BN, OK)
+    assert result.outcome == COMPLETE and result.ok and not result.repairs
+    assert result.send_skew_ms < 5
+
+
+def test_rejected_leg_is_hedged():
+    okx = FakeSubmitter((REJECTED, 0.0), (FILLED, 1.0))
+    executor = ArbitrageExecutor({"binance": FakeSubmitter((FILLED, 1.0)), "okx": okx})
+    result = run(executor, BN, OK)
+    assert result.outcome == HEDGED
+    assert okx.sent[1].side == "SELL" and okx.sent[1].quantity == 1.0 and okx.sent[1].price is None
+
+
+def test_partial_fill_hedge_failure_unwinds_excess():
+    binance = FakeSubmitter((FILLED, 1.0), (FILLED, 0.6))
+    okx = FakeSubmitter((PARTIAL, 0.4), (REJECTED, 0.0))
+    result = run(ArbitrageExecutor({"binance": binance, "okx": okx}), BN, OK)
+    assert result.outcome == UNWOUND and len(result.repairs) == 2
+    unwind = binance.sent[1]
+    assert unwind.side == "SELL" and unwind.reduce_only and unwind.quantity == pytest.approx(0.6)
+
+
+def test_repairs_keep_leg_params():
+    binance = FakeSubmitter((FILLED, 1.0), (FILLED, 0.6))
+    okx = FakeSubmitter((PARTIAL, 0.4), (REJECTED, 0.0))
+    legs = (Leg("binance", "BTCUSDT", "BUY", 1.0, params={"positionSide": "LONG"}),
+            Leg("okx", "BTCUSDT", "SELL", 1.0, params={"posSide": "short"}))
+    run(ArbitrageExecutor({"binance": binance, "okx": okx}), *legs)
+    assert okx.sent[1].params == {"posSide": "short"}
+    assert binance.sent[1].params == {"positionSide": "LONG"} and binance.sent[1].reduce_only
+
+
+def test_timed_out_leg_is_not_resent():
+    okx = FakeSubmitter((FILLED, 1.0), delay=0.2, reconciled=(REJECTED, 0.0))
+    binance = FakeSubmitter((FILLED, 1.0), (FILLED, 1.0))
+    result = run(ArbitrageExecutor({"binance": binance, "okx": okx}, max_leg_latency_ms=50), BN, OK)
+    assert result.legs[1].reconciled and result.legs[1].fill.error.startswith("no ack")
+    assert result.legs[1].latency_ms < 150
+    assert result.outcome == UNWOUND and len(okx.sent) == 1
+    assert binance.sent[1].reduce_only
+
+
+def test_timed_out_leg_that_filled_is_not_unwound():
+    okx = FakeSubmitter((FILLED, 1.0), delay=0.2, reconciled=(FILLED, 1.0))
+    binance = FakeSubmitter((FILLED, 1.0))
+    result = run(ArbitrageExecutor({"binance": binance, "okx": okx}, max_leg_latency_ms=50), BN, OK)
+    assert result.outcome == COMPLETE and not result.repairs
+    assert result.legs[1].status == FILLED and result.legs[1].reconciled
+    # The status query used the id the order was sent with.
+    assert okx.queried == [okx.sent[0].client_order_id] and okx.sent[0].client_order_id
+    assert OK.client_order_id == ""
+
+
+def test_unknown_fill_is_left_alone():
+    okx = FakeSubmitter((FILLED, 1.0), delay=0.2)
+    binance = FakeSubmitter((FILLED, 1.0))
+    result = run(ArbitrageExecutor({"binance": binance, "okx": okx}, max_leg_latency_ms=50), BN, OK)
+    assert result.legs[1].status == TIMEOUT and not result.legs[1].reconciled
+    assert result.outcome == UNBALANCED and not result.repairs and len(binance.sent) == 1
+
+
+def test_nothing_filled_and_unknown_venue():
+    executor = ArbitrageExecutor({"binance": FakeSubmitter((REJECTED, 0)), "okx": FakeSubmitter((REJECTED, 0))})
+    assert run(executor, BN, OK).outcome == FAILED
+    with pytest.raises(ValueError):
+        run(executor, BN, Leg("mexc", "BTC_USDT", "SELL", 1.0))
+
+
+class AckConnector:
+    """Answers every order with one fixed acknowledgement."""
+
+    venue = "binance"
+
+    def __init__(self, ack):
+        self.ack = ack
+
+    async def place_order(self, request):
+        return self.ack
+
+
+def test_orders_that_never_reach_the_venue_are_not_left_open():
+    tracker = OrderTracker()
+    rejected = ConnectorLegSubmitter(AckConnector(OrderAck("binance", "BTCUSDT", False, "REJECTED", error="-2019")),
+                                     tracker)
+    dry_run = ConnectorLegSubmitter(AckConnector(OrderAck("binance", "BTCUSDT", True, raw={})), tracker)
+    assert asyncio.run(rejected.submit(BN)).status == REJECTED
+    assert asyncio.run(dry_run.submit(BN)).status == FILLED
+    assert len(tracker) == 0 and tracker.open_orders() == []
+
+
+def test_order_executor_against_simulator():
+    async def main():
+        sim = ExchangeSimulator(SimConfig())
+        await sim.start()
+        tracker = OrderTracker()
+        stream = OkxUserStream("k", "s", "p", tracker, url=sim.env()["OMNI_OKX_WS_URL"] + "/ws/v5/private")
+        try:
+            stream.start()
+            await asyncio.wait_for(stream.connected.wait(), 2)
+            rules = SymbolRulesIndex(lambda: fetch_exchange_info(sim.base_url))
+            await asyncio.to_thread(rules.ensure_loaded)
+            async with create_connector("binance", api_key="k", api_secret="s", live=True,
+                                        base_url=sim.base_url, rules=rules) as bn, \
+                    create_connector("okx", live=True, base_url=sim.base_url) as ok:
+                executor = OrderExecutor(ArbitrageExecutor({
+                    "binance": ConnectorLegSubmitter(bn), "okx": ConnectorLegSubmitter(ok, tracker),
+                }))
+                action = {
+                    "legs": [
+                        {"venue": "binance", "symbol": "BTCUSDT", "side": "BUY", "quantity": 0.1},
+                        {"venue": "okx", "symbol": "BTCUSDT", "side": "SELL", "quantity": 0.1},
+                    ],
+                    "max_leg_latency_ms": 1_000,
+                }
+                return await executor.place(action), await OrderExecutor().place({"x": 1}), sim.positions
+        finally:
+            await stream.close()
+            await sim.stop()
+
+    live, dry, positions = asyncio.run(main())
+    assert live["status"] == "success" and live["outcome"] == COMPLETE
+    assert [r.filled_qty for r in live["result"].legs] == [0.1, pytest.approx(0.1)]
+    assert all(r.latency_ms > 0 for r in live["result"].legs)
+    # Both legs hold 0.1 BTC: OKX contracts are worth 0.01 BTC each.
+    assert positions["binance"]["BTCUSDT"][0] == pytest.approx(0.1)
+    assert positions["okx"]["BTC-USDT-SWAP"][0] == pytest.approx(-10)
+    assert dry == {"status": "success", "details": {"x": 1}}
+
+
+def test_timed_out_legs_reconciled_against_simulator():
+    async def main():
+        # Every request takes 150 ms, three times the budget: both acks are
+        # lost but the orders still reach the matching engine.
+        sim = ExchangeSimulator(SimConfig(latency_ms=150))
+        await sim.start()
+        try:
+            async with create_connector("binance", api_key="k", api_secret="s", live=True,
+                                        base_url=sim.base_url) as bn, \
+                    create_connector("okx", live=True, base_url=sim.base_url) as ok:
+                executor = ArbitrageExecutor(
+                    {"binance": ConnectorLegSubmitter(bn), "okx": ConnectorLegSubmitter(ok)}, max_leg_latency_ms=50,
+                )
+                result = await executor.execute(
+                    Leg("binance", "BTCUSDT", "BUY", 0.1), Leg("okx", "BTCUSDT", "SELL", 0.1)
+                )
+                return result, sim.positions
+        finally:
+            await sim.stop()
+
+    result, positions = asyncio.run(main())
+    assert [r.fill.error for r in result.legs] == ["no ack within 50 ms"] * 2
+    assert all(r.reconciled and r.status == FILLED for r in result.legs)
+    assert result.outcome == COMPLETE and not result.repairs
+    assert positions["binance"]["BTCUSDT"][0] == pytest.approx(0.1)
+    assert positions["okx"]["BTC-USDT-SWAP"][0] == pytest.approx(-10)
+
+
+def test_unfilled_okx_ack_without_tracker_is_not_reported_filled():
+    async def main():
+        sim = ExchangeSimulator(SimConfig())
+        await sim.start()
+        try:
+            async with create_connector("okx", live=True, base_url=sim.base_url) as ok:
+                submitter = ConnectorLegSubmitter(ok)
+                missed = await submitter.submit(Leg("okx", "BTCUSDT", "BUY", 0.02, price=0.1))
+                filled = await submitter.submit(Leg("okx", "BTCUSDT", "BUY", 0.02))
+                return missed, filled
+        finally:
+            await sim.stop()
+
+    missed, filled = asyncio.run(main())
+    # OKX acks every order as NEW; the fill comes from the order status.
+    assert (missed.status, missed.filled_qty) == (REJECTED, 0.0)
+    assert filled.status == FILLED and filled.filled_qty == pytest.approx(0.02)
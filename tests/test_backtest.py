@@ -0,0 +1,98 @@
+import math
+
+import numpy as np
+import pytest
+
+from core.calculations import net_edge_bps
+from core.data.tick_store import TICK_DTYPE, TickStore
+from sim.backtest import ORDER, BacktestConfig, Backtester, EventQueue, edge_bps
+from sim.simulator_tca import TCASimulator
+
+DAY = 86_400_000
+T0 = 1_700_006_400_000 - 1_700_006_400_000 % DAY
+
+
+def _basis_ticks():
+    ts = T0 + np.arange(10) * 1000
+    index = np.full(10, 100.0)
+    mark = np.array([100.0, 100.01, 100.1, 100.1, 100.08, 100.01, 100.0, 99.97, 100.0, 100.0])
+    return {"ts": ts, "mark": mark, "index": index, "funding": np.zeros(10), "next_funding": np.zeros(10, np.int64)}
+
+
+def test_event_queue_orders_by_time_then_kind():
+    queue = EventQueue()
+    queue.push(5, ORDER, "b")
+    queue.push(5, 0, "a")
+    queue.push(1, ORDER, "first")
+    assert [queue.pop()[2] for _ in range(len(queue))] == ["first", "a", "b"]
+
+
+def test_basis_round_trip_with_latencies():
+    data = _basis_ticks()
+    assert edge_bps(data)[2] == pytest.approx(net_edge_bps(100.0, 100.1))
+    cfg = BacktestConfig(theta_bps=5, exit_bps=2, notional=1000, feed_latency_ms=500, decision_latency_ms=100,
+                         order_latency_ms=500, fee_bps=1)
+    result = Backtester(cfg).run({"BTCUSDT": data})
+    (trade,) = result.trades
+    # Edge 10bp at tick 2 is seen at +2.5s, decided at +2.6s, filled at +3.1s on tick 3.
+    assert trade["side"] == -1 and trade["entry_ts"] == T0 + 3100 and trade["entry_price"] == 100.1
+    # Edge 1bp at tick 5 is acted on at +6.1s, filled on tick 6.
+    assert trade["exit_ts"] == T0 + 6100 and trade["exit_price"] == 100.0
+    qty = 1000 / 100.1
+    fees = 1e-4 * qty * (100.1 + 100.0) + 1e-4 * qty * (100.0 + 100.0)
+    assert trade["pnl"] == pytest.approx(qty * 0.1 - fees)
+    assert result.total_pnl == pytest.approx(trade["pnl"])
+    assert result.period_start.tolist() == [T0] and result.returns[0] == pytest.approx(trade["pnl"] / cfg.capital)
+
+
+def test_funding_carry_hook_and_partial_fills():
+    n = 3 * 8 * 3600  # three funding intervals of 1s ticks
+    ts = T0 + np.arange(n) * 1000
+    next_funding = (ts // (8 * 3_600_000) + 1) * 8 * 3_600_000
+    funding = np.full(n, 0.001)
+    funding[n // 2:] = -0.0002
+    data = {"ts": ts, "mark": np.full(n, 50.0), "funding": funding, "next_funding": next_funding}
+
+    result = Backtester(BacktestConfig(theta_bps=5, exit_bps=1)).run({"ETHUSDT": data})
+    (trade,) = result.trades
+    assert trade["side"] == -1 and trade["exit_ts"] == T0 + (n // 2) * 1000 + 71
+    assert trade["funding"] == pytest.approx(1000 / 50 * 50 * 0.001)  # paid once at the 8h mark
+    assert trade["pnl"] == pytest.approx(trade["funding"])
+
+    seen = []
+    vetoed = Backtester(BacktestConfig(theta_bps=5), evaluate=lambda s: seen.append(s) or "HOLD").run({"ETHUSDT": data})
+    assert len(vetoed.trades) == 0 and len(seen) == n // 2 and seen[0]["net_edge"] == pytest.approx(10)
+
+    half = TCASimulator(fill_prob=0.5, adverse_selection=0.0, latency_ms=0.0, depth=math.inf)
+    partial = Backtester(BacktestConfig(theta_bps=5, exit_bps=1), tca=half).run({"ETHUSDT": data})
+    (trade,) = partial.trades
+    assert trade["qty"] == pytest.approx(10.0)  # half of 20 filled on entry, exits until flat
+    assert partial.events > result.events
+
+
+def test_fill_after_the_last_period_boundary():
+    # The entry signal is on the last tick, 10 ms before midnight; its fill
+    # lands 71 ms later, in a period without ticks.
+    ts = T0 + DAY + np.array([-3000, -2000, -10])
+    data = {"ts": ts, "mark": np.array([100.0, 100.0, 100.1]), "index": np.full(3, 100.0),
+            "funding": np.zeros(3), "next_funding": np.zeros(3, np.int64)}
+    result = Backtester(BacktestConfig(theta_bps=5)).run({"BTCUSDT": data})
+    (trade,) = result.trades
+    assert trade["entry_ts"] == T0 + DAY + 61 and trade["exit_ts"] >= trade["entry_ts"]
+    assert result.period_start.tolist() == [T0, T0 + DAY]
+    assert result.total_pnl == pytest.approx(trade["pnl"])
+
+
+def test_run_store_reads_one_symbol_at_a_time(tmp_path):
+    store = TickStore(tmp_path)
+    data = _basis_ticks()
+    rows = np.zeros(10, dtype=TICK_DTYPE)
+    rows["ts"], rows["mark"] = data["ts"], data["mark"]
+    rows["funding"] = 0.001
+    rows["next_funding"] = T0 + 5000
+    store.append("BTCUSDT", rows)
+    result = Backtester(BacktestConfig(theta_bps=5, period_ms=5000)).run_store(store, ["BTCUSDT", "ETHUSDT"])
+    (trade,) = result.trades
+    assert trade["symbol"] == "BTCUSDT" and trade["exit_ts"] == T0 + 9000
+    assert trade["funding"] == pytest.approx(-trade["side"] * trade["qty"] * 100.08 * 0.001)
+    assert result.period_start.tolist() == [T0, T0 + 5000]
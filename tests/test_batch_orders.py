@@ -0,0 +1,74 @@
+import asyncio
+import threading
+
+import pytest
+
+import okx
+from orders.batch import chunks, validate_okx_order
+from orders.binance import AsyncBinanceOrderClient, BinanceOrderClient
+from orders.okx import AsyncOkxOrderClient
+from orders.symbol_rules import SymbolRulesIndex, fetch_exchange_info
+from sim.exchange_server import ExchangeSimulator, SimConfig
+
+
+@pytest.fixture
+def simulator():
+    loop = asyncio.new_event_loop()
+    sim = ExchangeSimulator(SimConfig(symbols=["BTCUSDT", "ETHUSDT", "DOGEUSDT"]))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(sim.start(), loop).result(5)
+    yield sim
+    asyncio.run_coroutine_threadsafe(sim.stop(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+
+
+def _binance_orders():
+    good = {"symbol": "BTCUSDT", "side": "BUY", "order_type": "LIMIT", "quantity": 0.1, "price": 100.0}
+    return [good] * 6 + [dict(good, quantity=0.0005), dict(good, symbol="XRPUSDT")]
+
+
+def test_chunks_split_evenly():
+    assert [len(c) for c in chunks(list(range(12)), 5)] == [5, 5, 2]
+    with pytest.raises(ValueError):
+        list(chunks([1], 0))
+
+
+def test_okx_local_validation():
+    validate_okx_order({"instId": "BTC-USDT-SWAP", "tdMode": "cross", "side": "buy", "ordType": "market", "sz": "1"})
+    with pytest.raises(ValueError, match="px"):
+        validate_okx_order({"instId": "BTC-USDT-SWAP", "tdMode": "cross", "side": "buy", "ordType": "limit", "sz": "1"})
+    with pytest.raises(ValueError, match="tdMode"):
+        validate_okx_order({"instId": "BTC-USDT-SWAP", "side": "buy", "ordType": "market", "sz": "1"})
+
+
+def test_binance_batch_splits_and_correlates(simulator):
+    rules = SymbolRulesIndex(lambda: fetch_exchange_info(simulator.base_url))
+    client = BinanceOrderClient("k", "s", live=True, base_url=simulator.base_url, rules=rules)
+    results = client.place_batch_orders(_binance_orders())
+    assert [r.index for r in results] == list(range(8))
+    assert all(r.ok for r in results[:6])
+    assert len({r.response["orderId"] for r in results[:6]}) == 6
+    assert "minQty" in results[6].error and "XRPUSDT" in results[7].error
+    assert len(simulator.orders) == 6
+
+
+def test_async_batches_report_partial_failures(simulator):
+    base = {"tdMode": "cross", "side": "buy", "ordType": "market", "sz": "1"}
+    okx_orders = [dict(base, instId="BTC-USDT-SWAP")] * 21 + [dict(base, instId="NOPE-USDT-SWAP"), {"sz": "1"}]
+
+    async def run():
+        rules = SymbolRulesIndex(lambda: fetch_exchange_info(simulator.base_url))
+        async with AsyncBinanceOrderClient("k", "s", live=True, base_url=simulator.base_url, rules=rules) as bn, \
+                AsyncOkxOrderClient(live=1, base_url=simulator.base_url) as ok:
+            return await asyncio.gather(bn.place_batch_orders(_binance_orders()), ok.place_batch_orders(okx_orders))
+
+    bn_results, okx_results = asyncio.run(run())
+    assert [r.ok for r in bn_results] == [True] * 6 + [False, False]
+    assert [r.ok for r in okx_results] == [True] * 21 + [False, False]
+    assert okx_results[21].error == "Instrument ID does not exist"
+    assert "Missing" in okx_results[22].error
+
+    sync = okx.place_batch_orders(okx_orders[20:], live=1, base_url=simulator.base_url)
+    assert [r.ok for r in sync] == [True, False, False]
@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+import pytest
+
+from feeds.binance_streams import CombinedStreamSubscriber, stream_names
+
+_REAL_SLEEP = asyncio.sleep
+
+
+async def _fast_sleep(delay):
+    """Skip reconnect backoff while leaving idle sockets parked."""
+    await _REAL_SLEEP(0 if delay < 3600 else delay)
+
+
+class FakeSocket:
+    def __init__(self, url, frames, fail=False):
+        self.url = url
+        self.frames = list(frames)
+        self.fail = fail
+        self.sent = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def send(self, payload):
+        self.sent.append(json.loads(payload))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await asyncio.sleep(0)
+        if self.frames:
+            return self.frames.pop(0)
+        if self.fail:
+            self.fail = False
+            raise ConnectionError("dropped")
+        await asyncio.sleep(3600)
+
+
+def _frame(stream, symbol):
+    return json.dumps({"stream": stream, "data": {"s": symbol}})
+
+
+def test_stream_names_and_sharding():
+    sub = CombinedStreamSubscriber(lambda s, d: None, max_streams=3)
+    asyncio.run(sub.add(["BTCUSDT", "ETHUSDT"], kinds=["markPrice", "bookTicker"]))
+    assert [len(s) for s in sub.shards] == [3, 1]
+    assert stream_names(["BTCUSDT"], ["depth"]) == ["btcusdt@depth@100ms"]
+    with pytest.raises(ValueError):
+        stream_names(["BTCUSDT"], ["trades"])
+
+
+def test_dynamic_subscribe_and_gap_report(monkeypatch):
+    sockets = []
+    received = []
+    gaps = []
+    monkeypatch.setattr("feeds.binance_streams.asyncio.sleep", _fast_sleep)
+
+    def connect(url):
+        first = not sockets
+        frames = [_frame("btcusdt@markPrice@1s", "BTCUSDT")]
+        ws = FakeSocket(url, frames, fail=first)
+        sockets.append(ws)
+        return ws
+
+    async def run():
+        sub = CombinedStreamSubscriber(lambda s, d: received.append(s), on_gap=gaps.append, connect=connect)
+        await sub.add(["BTCUSDT"])
+        runner = asyncio.create_task(sub.run())
+        while len(sockets) < 2 or not received[1:]:
+            await _REAL_SLEEP(0)
+        await sub.add(["ETHUSDT"])
+        await sub.close()
+        await runner
+
+    asyncio.run(run())
+    assert sockets[0].url.endswith("?streams=btcusdt@markPrice@1s")
+    assert len(gaps) == 1 and gaps[0].streams == ["btcusdt@markPrice@1s"]
+    assert sockets[1].sent[0]["method"] == "SUBSCRIBE"
+    assert sockets[1].sent[0]["params"] == ["ethusdt@markPrice@1s"]
@@ -0,0 +1,181 @@
+import asyncio
+import hashlib
+import hmac
+import json
+from urllib.parse import urlencode
+
+import httpx
+import pytest
+
+import auth
+from core.exchange import ConnectorRegistry, OrderRequest, create_connector
+from core.exchange.binance import order_params
+from core.exchange.mexc import MexcConnector
+from core.exchange.signing import HmacSigner, binance_query, hmac_sha256, mexc_param_string, sign_binance_query
+from core.exchange.symbols import decimal_str, split_symbol, to_canonical, to_venue
+from core.exchange.transport import AsyncTransport
+from sim.exchange_server import ExchangeSimulator, SimConfig
+
+
+def test_symbol_mapping_round_trips():
+    assert to_venue("BTCUSDT", "okx") == "BTC-USDT-SWAP"
+    assert to_venue("BTC-USDT-SWAP", "mexc") == "BTC_USDT"
+    assert to_canonical("eth_usdt") == "ETHUSDT"
+    assert split_symbol("BTCFDUSD") == ("BTC", "FDUSD")
+    with pytest.raises(ValueError):
+        to_venue("BTCUSDT", "kraken")
+    with pytest.raises(ValueError):
+        split_symbol("XYZ")
+
+
+def test_numbers_never_use_exponents():
+    assert decimal_str(1e-05) == "0.00001"
+    assert decimal_str(1234567.0) == "1234567"
+    assert decimal_str("0.1000") == "0.1"
+    assert decimal_str("") == "0"
+    params = order_params("BTCUSDT", "BUY", "LIMIT", 0.00001, 25000.0)
+    assert (params["quantity"], params["price"]) == ("0.00001", "25000")
+
+
+def test_order_request_validation():
+    assert OrderRequest("BTCUSDT", "buy", 1).order_type == "MARKET"
+    with pytest.raises(ValueError):
+        OrderRequest("BTCUSDT", "BUY", 1, time_in_force="GTX")
+    with pytest.raises(ValueError):
+        OrderRequest("BTCUSDT", "BUY", 1, order_type="LIMIT")
+    with pytest.raises(ValueError):
+        OrderRequest("BTCUSDT", "HOLD", 1)
+
+
+def test_mexc_signature():
+    headers = auth.generate_auth_headers("key", "secret", '{"a":1}', request_time=1700000000000)
+    expected = hmac_sha256("secret", 'key1700000000000{"a":1}').hex()
+    assert headers["Signature"] == expected and headers["Request-Time"] == "1700000000000"
+    assert mexc_param_string({"symbol": "BTC_USDT", "a": 1, "b": None}) == "a=1&symbol=BTC_USDT"
+
+
+def test_connectors_against_simulator():
+    async def run():
+        sim = ExchangeSimulator(SimConfig())
+        await sim.start()
+        venues = ConnectorRegistry([
+            create_connector("binance", api_key="k", api_secret="s", live=True, base_url=sim.base_url),
+            create_connector("okx", live=True, base_url=sim.base_url),
+        ])
+        try:
+            async with venues:
+                tickers = await venues.gather("ticker", "BTCUSDT")
+                assert {t.symbol for t in tickers.values()} == {"BTCUSDT"}
+                assert tickers["binance"].mark_price == pytest.approx(tickers["okx"].mark_price, rel=0.01)
+
+                buys = await venues.gather("place_order", OrderRequest("BTCUSDT", "BUY", 0.05))
+                assert all(ack.ok for ack in buys.values())
+                assert sim.orders[-1]["sz"] == "5"  # 0.05 BTC in 0.01 BTC contracts
+
+                positions = await venues.gather("positions")
+                assert [(p.symbol, p.quantity) for p in positions["binance"]] == [("BTCUSDT", 0.05)]
+                assert [(p.symbol, p.quantity) for p in positions["okx"]] == [("BTCUSDT", 0.05)]
+
+                okx = venues.get("okx")
+                with pytest.raises(ValueError, match="multiple"):
+                    await okx.place_order(OrderRequest("BTCUSDT", "BUY", 0.005))
+                resting = await okx.place_order(OrderRequest("BTCUSDT", "BUY", 0.01, price=1.0, client_order_id="r1"))
+                canceled = await okx.cancel_order("BTCUSDT", client_order_id="r1")
+                assert canceled.ok and canceled.order_id == resting.order_id
+                assert not (await okx.cancel_order("BTCUSDT", order_id=resting.order_id)).ok
+
+                binance = venues.get("binance")
+                order = OrderRequest("ETHUSDT", "SELL", 0.1, price=1000.0, client_order_id="b1")
+                assert (await binance.place_order(order)).status == "NEW"
+                assert (await binance.cancel_order("ETHUSDT", client_order_id="b1")).status == "CANCELED"
+
+                failed = await venues.gather("ticker", "NOPEUSDT")
+                assert all(isinstance(r, Exception) for r in failed.values())
+        finally:
+            await sim.stop()
+
+    asyncio.run(run())
+
+
+def test_mexc_connector_signs_and_converts_contracts():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        path = request.url.path
+        if path == "/api/v1/contract/detail":
+            return httpx.Response(200, json={"success": True, "data": [{"symbol": "BTC_USDT", "contractSize": 0.0001}]})
+        if path == "/api/v1/private/order":
+            return httpx.Response(200, json={"success": True, "code": 0, "data": "42"})
+        if path == "/api/v1/private/position/open_positions":
+            return httpx.Response(200, json={"success": True, "code": 0, "data": [
+                {"symbol": "BTC_USDT", "positionType": 2, "holdVol": 30, "holdAvgPrice": 100},
+            ]})
+        if path == "/api/v1/private/order/external/BTC_USDT/x":
+            return httpx.Response(200, json={"success": True, "code": 0, "data": {
+                "orderId": "42", "externalOid": "x", "state": 4, "dealVol": 5, "dealAvgPrice": 100.5,
+            }})
+        return httpx.Response(200, json={"success": False, "code": 2009, "message": "order not exists"})
+
+    async def run():
+        transport = AsyncTransport("mexc", "http://mexc", transport=httpx.MockTransport(handler))
+        connector = MexcConnector("key", "secret", base_url="http://mexc", transport=transport)
+        try:
+            ack = await connector.place_order(OrderRequest("BTCUSDT", "SELL", 0.002, price=100.5, client_order_id="x"))
+            positions = await connector.positions()
+            failed = await connector.cancel_order("BTCUSDT", order_id="7")
+            status = await connector.order_status("BTCUSDT", client_order_id="x")
+            unknown = await connector.order_status("BTCUSDT", order_id="7")
+        finally:
+            await connector.aclose()
+        return ack, positions, failed, status, unknown
+
+    ack, positions, failed, status, unknown = asyncio.run(run())
+    assert ack.ok and ack.order_id == "42"
+    order = seen[1]
+    body = json.loads(order.content)
+    assert body == {"symbol": "BTC_USDT", "vol": 20, "side": 3, "type": 1, "openType": 2,
+                    "price": 100.5, "externalOid": "x"}
+    req_time = order.headers["Request-Time"]
+    assert order.headers["Signature"] == hmac_sha256("secret", f"key{req_time}{order.content.decode()}").hex()
+    assert [(p.symbol, p.quantity) for p in positions] == [("BTCUSDT", -0.003)]
+    assert not failed.ok and "2009" in failed.error
+    # 5 of 20 contracts filled before the cancel, reported in base asset.
+    assert (status.status, status.order_id, status.avg_price) == ("CANCELED", "42", 100.5)
+    assert status.filled_qty == pytest.approx(0.0005)
+    assert not unknown.ok and "2009" in unknown.error
+
+
+def test_binance_query_matches_urlencode():
+    cases = [
+        {"symbol": "BTCUSDT", "side": "BUY", "quantity": "0.012", "timestamp": 1700000000000},
+        {"batchOrders": json.dumps([{"symbol": "BTCUSDT", "side": "BUY"}]), "timestamp": 1},
+        {"a": "x=y"}, {"a": "x&y=z"}, {"a&b": "1"}, {"a": "é b"}, {"a": ""}, {},
+    ]
+    for params in cases:
+        assert binance_query(params) == urlencode(params)
+    assert HmacSigner("secret").digest("payload") == hmac.new(b"secret", b"payload", hashlib.sha256).digest()
+    assert sign_binance_query({"a": 1}, "secret") == "a=1&signature=" + hmac_sha256("secret", "a=1").hex()
+
+
+def test_binance_connector_sends_the_signed_query():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json={"orderId": 1, "status": "NEW", "clientOrderId": "c", "executedQty": "0"})
+
+    async def run():
+        transport = AsyncTransport("binance", "http://binance", transport=httpx.MockTransport(handler))
+        connector = create_connector("binance", api_key="k", api_secret="secret", live=True,
+                                     base_url="http://binance", transport=transport)
+        try:
+            await connector.place_order(OrderRequest("BTCUSDT", "BUY", 0.01, price=43250.1, client_order_id="c"))
+        finally:
+            await connector.aclose()
+
+    asyncio.run(run())
+    query = seen[0].url.query.decode()
+    payload, _, signature = query.rpartition("&signature=")
+    assert signature == hmac_sha256("secret", payload).hex()
+    assert "symbol=BTCUSDT" in payload and seen[0].headers["X-MBX-APIKEY"] == "k"
@@ -0,0 +1,36 @@
+import json
+import math
+
+import pytest
+
+from feeds import decode
+
+EVENT = {"e": "markPriceUpdate", "E": 1700000000000, "s": "BTCUSDT", "p": "42000.50", "r": "0.0001", "T": 1700028800000}
+
+
+@pytest.fixture(params=sorted(decode._BACKENDS))
+def backend(request):
+    previous = decode.BACKEND
+    decode.set_backend(request.param)
+    yield request.param
+    decode.set_backend(previous)
+
+
+def test_records_have_numeric_fields(backend):
+    (rec,) = decode.decode_mark_price(json.dumps(EVENT))
+    assert (rec.symbol, rec.event_time, rec.mark, rec.funding) == ("BTCUSDT", 1700000000000, 42000.5, 0.0001)
+    assert math.isnan(rec.index)
+
+
+def test_array_frame_to_columns(backend):
+    frame = json.dumps([EVENT, dict(EVENT, s="ETHUSDT", p="2300", i="2299.5")]).encode()
+    cols = decode.decode_mark_price_columns(frame)
+    assert cols["symbol"].tolist() == ["BTCUSDT", "ETHUSDT"]
+    assert cols["mark"].tolist() == [42000.5, 2300.0]
+    assert cols["index"][1] == 2299.5
+    assert cols["next_funding"].dtype.kind == "i"
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        decode.set_backend("simdjson")
@@ -0,0 +1,74 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+import okx
+from core.exchange import binance
+from feeds.binance_streams import CombinedStreamSubscriber
+from orders.binance import BinanceOrderClient
+from orders.symbol_rules import SymbolRulesIndex, fetch_exchange_info
+from sim.exchange_server import ExchangeSimulator, SimConfig
+
+
+@pytest.fixture
+def simulator():
+    """Run the simulator on its own event loop thread."""
+    loop = asyncio.new_event_loop()
+    sim = ExchangeSimulator(SimConfig(ws_interval_ms=10))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(sim.start(), loop).result(5)
+    yield sim
+    asyncio.run_coroutine_threadsafe(sim.stop(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+
+
+def test_order_clients_accept_simulator_endpoint(simulator):
+    rules = SymbolRulesIndex(lambda: fetch_exchange_info(simulator.base_url))
+    client = BinanceOrderClient("key", "secret", live=True, base_url=simulator.base_url, rules=rules)
+    assert not len(rules)  # loaded on the first order
+    resp = client.place_order("BTCUSDT", "BUY", "LIMIT", 0.1, price=100.0)
+    assert resp["status"] == "NEW" and "BTCUSDT" in rules
+
+    with httpx.Client() as http:
+        r = binance.place_order(http, symbol="ETHUSDT", side="SELL", quantity=1, price=10,
+                                live=False, base_url=simulator.base_url)
+    assert r.status_code == 200 and r.headers["X-MBX-USED-WEIGHT-1M"]
+
+    data = okx.place_order({"instId": "BTC-USDT-SWAP", "sz": "1"}, live=1, base_url=simulator.base_url)
+    assert data["code"] == "0"
+    assert len(simulator.orders) == 2
+
+
+def test_combined_stream_against_simulator(simulator):
+    received = []
+
+    async def run():
+        url = simulator.base_url.replace("http://", "ws://") + "/stream"
+        sub = CombinedStreamSubscriber(lambda s, d: received.append(d["s"]), url=url)
+        await sub.add(["BTCUSDT", "ETHUSDT"])
+        runner = asyncio.create_task(sub.run())
+        while len(set(received)) < 2:
+            await asyncio.sleep(0.01)
+        await sub.close()
+        await runner
+
+    asyncio.run(asyncio.wait_for(run(), 5))
+    assert set(received) == {"BTCUSDT", "ETHUSDT"}
+
+
+def test_injected_429():
+    async def run():
+        sim = ExchangeSimulator(SimConfig(rate_429=1.0, retry_after_s=3))
+        await sim.start()
+        try:
+            async with httpx.AsyncClient() as http:
+                return await http.get(f"{sim.base_url}/fapi/v1/premiumIndex")
+        finally:
+            await sim.stop()
+
+    resp = asyncio.run(run())
+    assert resp.status_code == 429 and resp.headers["Retry-After"] == "3"
@@ -0,0 +1,99 @@
+import asyncio
+
+import funding
+
+
+class FakeResponse:
+    status = 200
+    headers = {}
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    async def json(self):
+        return self.payload
+
+
+class FakeSession:
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, params=None):
+        self.calls.append((url, params.get("symbol")))
+        if url == funding.BINANCE_FUNDING_RATE_URL:
+            return FakeResponse([{"fundingRate": "0.0003"}])
+        # fundingInfo ignores ``symbol`` and lists every adjusted symbol.
+        return FakeResponse([
+            {"symbol": "ETHUSDT", "fundingRateCap": "0.02", "fundingRateFloor": "-0.02", "fundingIntervalHours": 4},
+            {"symbol": "BTCUSDT", "fundingRateCap": "0.003", "fundingRateFloor": "-0.003",
+             "lastFundingRate": "0.0001"},
+        ])
+
+
+def _info_calls(session):
+    return [sym for url, sym in session.calls if url == funding.BINANCE_FUNDING_INFO_URL]
+
+
+def test_poll_fetches_concurrently_and_caches_funding_info():
+    session = FakeSession()
+    published, cycles = {}, []
+
+    asyncio.run(
+        funding.poll_net_edges(
+            ["BTCUSDT", "ETHUSDT"],
+            lambda sym, edge: published.setdefault(sym, []).append(edge),
+            iterations=3,
+            interval_s=0.0,
+            on_cycle=cycles.append,
+            session=session,
+        )
+    )
+
+    assert _info_calls(session) == [None]
+    assert len(published["BTCUSDT"]) == 3
+    assert round(published["BTCUSDT"][0], 6) == 2.0
+    assert [c.iteration for c in cycles] == [0, 1, 2]
+    assert all(c.errors == 0 for c in cycles)
+
+
+def test_stale_entry_is_served_while_refreshing():
+    now = [0.0]
+    session = FakeSession()
+
+    async def run():
+        cache = funding.FundingInfoCache(session, ttl_s=10, clock=lambda: now[0])
+        first = await cache.get("BTCUSDT")
+        now[0] = 11.0
+        stale = await cache.get("BTCUSDT")
+        await asyncio.sleep(0)
+        await cache.close()
+        return first, stale
+
+    first, stale = asyncio.run(run())
+    assert stale is first
+    assert _info_calls(session) == [None, None]
+
+
+def test_one_funding_info_list_serves_every_symbol():
+    session = FakeSession()
+
+    async def run():
+        cache = funding.FundingInfoCache(session)
+        infos = await asyncio.gather(*(cache.get(s) for s in ("BTCUSDT", "ETHUSDT", "SOLUSDT")))
+        await cache.close()
+        return infos
+
+    btc, eth, sol = asyncio.run(run())
+    assert btc["avgPremium"] == 0.0001 and btc["cap"] == 0.003
+    assert eth["cap"] == 0.02 and eth["intervalHours"] == 4
+    assert sol == funding.DEFAULT_FUNDING_INFO
+    assert _info_calls(session) == [None]
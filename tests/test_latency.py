@@ -0,0 +1,155 @@
+import asyncio
+import math
+import time
+
+import pytest
+
+from core.exchange import binance as core_binance
+from core.exchange import connector as core_connector
+from core.exchange.clock import ClockSync, clock
+from core.exchange.latency import FEED_LAG, RTT, LatencyHistogram, LatencyMonitor, latency, quantile_of
+from core.exchange.transport import AsyncTransport
+from feeds.binance_streams import record_event_time
+from orders import binance as orders_binance
+from orders.symbol_rules import SymbolRulesIndex, fetch_exchange_info
+from sim.exchange_server import ExchangeSimulator, SimConfig
+
+
+class FakeClock:
+    def __init__(self, now=1_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_offset_uses_shortest_round_trip_and_event_bound():
+    t = FakeClock()
+    sync = ClockSync(window=4, clock=t)
+    assert sync.offset_ms("binance") == 0.0 and sync.recv_window_ms("binance") is None
+    sync.add_sample("binance", 1000, 1600, 1200)  # offset 500 +- 100
+    sync.add_sample("binance", 2000, 2455, 2010)  # offset 450 +- 5
+    sync.add_sample("binance", 3000, 3900, 3400)  # offset 700 +- 200, ignored
+    assert sync.offset_ms("binance") == 450 and sync.error_ms("binance") == 5
+    assert sync.now_ms("binance") == 1_000_450
+    assert sync.recv_window_ms("binance") == 5_005
+    assert sync.recv_window_ms("binance", base_ms=59_999) == 60_000
+
+    sync.observe_event("binance", event_ms=10_480, local_ms=10_000)  # offset is at least 480
+    assert sync.offset_ms("binance") == 480
+    t.now += 61
+    assert sync.offset_ms("binance") == 450  # bound expired
+    sync.observe_event("okx", event_ms=5_020, local_ms=5_000)
+    assert sync.offset_ms("okx") == 20 and math.isinf(sync.error_ms("okx"))
+    with pytest.raises(ValueError):
+        sync.add_sample("binance", 10, 0, 5)
+
+
+def test_signed_params_use_exchange_clock(monkeypatch):
+    sync = ClockSync(clock=FakeClock(1_700_000_000.0))
+    sync.add_sample("binance", 0, 2_000, 20)
+    monkeypatch.setattr(core_binance, "clock", sync)
+    params = core_binance.order_params("BTCUSDT", "BUY", "MARKET", 1)
+    assert params["timestamp"] == 1_700_000_001_990
+    assert params["recvWindow"] == 5_010
+
+
+def test_order_clients_keep_the_clock_synced(monkeypatch):
+    sync = ClockSync()
+    for module in (core_binance, core_connector, orders_binance):
+        monkeypatch.setattr(module, "clock", sync)
+
+    async def run():
+        sim = ExchangeSimulator(SimConfig())
+        await sim.start()
+        try:
+            rules = SymbolRulesIndex(lambda: fetch_exchange_info(sim.base_url))
+            await asyncio.to_thread(rules.ensure_loaded)
+            # The synchronous client samples before its first signed request.
+            client = orders_binance.BinanceOrderClient("k", "s", live=True, base_url=sim.base_url, rules=rules)
+            assert math.isinf(sync.age_s("binance"))
+            await asyncio.to_thread(client.place_order, "BTCUSDT", "BUY", "MARKET", 0.01)
+            assert sync.age_s("binance") < 5
+            async with orders_binance.AsyncBinanceOrderClient(
+                "k", "s", live=True, base_url=sim.base_url, rules=rules
+            ) as bn:
+                polling = sync._tasks["binance"]
+                # One background task per venue, owned by the first transport.
+                async with core_connector.create_connector("binance", base_url=sim.base_url):
+                    assert sync._tasks["binance"] == polling and polling[1] is bn.transport
+            assert "binance" not in sync._tasks and polling[0].cancelled()
+        finally:
+            await sim.stop()
+        return len(sync.venue("binance").samples)
+
+    assert asyncio.run(run()) == 3
+
+
+def test_histogram_quantiles_and_rotation():
+    t = FakeClock()
+    hist = LatencyHistogram(window_s=10, clock=t)
+    for ms in range(1, 101):
+        hist.record(ms)
+    assert math.isnan(LatencyMonitor().quantile(RTT, "binance", 0.5))
+    assert quantile_of(hist.counts(), 0.5) == pytest.approx(50, rel=0.05)
+    assert quantile_of(hist.counts(), 0.99) == pytest.approx(99, rel=0.05)
+    t.now += 10
+    hist.record(1000)
+    assert hist.counts().sum() == 101  # previous window still counted
+    t.now += 10
+    assert hist.counts().sum() == 1
+    t.now += 25
+    assert hist.counts().sum() == 0 and hist.count == 101
+
+
+def test_monitor_merges_endpoints_and_sums_leg_latency():
+    monitor = LatencyMonitor()
+    for _ in range(10):
+        monitor.record_rtt("binance", "/fapi/v1/order", 20)
+        monitor.record_rtt("binance", "/fapi/v1/ticker", 2)
+        monitor.record_feed_lag("binance", "btcusdt@markPrice@1s", 5)
+    assert monitor.quantile(RTT, "binance", 0.99) == pytest.approx(20, rel=0.05)
+    assert monitor.quantile(RTT, "binance", 0.99, keys=["/fapi/v1/ticker"]) == pytest.approx(2, rel=0.05)
+    assert monitor.leg_latency_ms("binance") == pytest.approx(25, rel=0.05)
+    # Slow market-data and account endpoints do not count towards a leg.
+    for _ in range(10):
+        monitor.record_rtt("binance", "/fapi/v1/exchangeInfo", 400)
+        monitor.record_rtt("binance", "/fapi/v1/listenKey", 300)
+        monitor.record_rtt("binance", "ws:order.place", 10)
+    assert monitor.leg_latency_ms("binance") == pytest.approx(25, rel=0.05)
+    assert math.isnan(monitor.leg_latency_ms("okx"))
+    monitor.record_rtt("okx", "/api/v5/public/instruments", 100)
+    assert math.isnan(monitor.leg_latency_ms("okx"))
+    row = monitor.summary()["rtt binance /fapi/v1/order"]
+    assert row["count"] == 10 and row["p99"] == pytest.approx(20, rel=0.05)
+    with pytest.raises(ValueError):
+        monitor.histogram("jitter", "binance", "x")
+
+
+def test_clock_sync_and_rtt_against_simulator():
+    async def run():
+        sim = ExchangeSimulator(SimConfig(latency_ms=5))
+        await sim.start()
+        sync = ClockSync()
+        try:
+            for venue in ("binance", "okx", "mexc"):
+                async with AsyncTransport(venue, sim.base_url) as transport:
+                    await sync.sync(venue, transport)
+                    await sync.sync(venue, transport)
+        finally:
+            await sim.stop()
+        return sync
+
+    sync = asyncio.run(run())
+    for venue in ("binance", "okx", "mexc"):
+        assert abs(sync.offset_ms(venue)) < 50
+        assert sync.error_ms(venue) >= 2.5
+    assert latency.quantile(RTT, "okx", 0.5, keys=["/api/v5/public/time"]) >= 5
+
+
+def test_event_times_record_feed_lag():
+    now = time.time() * 1000
+    clock.add_sample("test-venue", now, now + 1, now + 2)
+    record_event_time("test-venue", "btcusdt@markPrice", now - 250)
+    assert latency.quantile(FEED_LAG, "test-venue", 1.0) == pytest.approx(250, rel=0.05)
+    assert clock.offset_ms("test-venue") == 0
@@ -0,0 +1,69 @@
+import importlib.util
+import math
+import pathlib
+import time
+
+from core.calculations import net_edge_bps
+from core.data.market_cache import MarketCache
+from orchestrator import finrobot_flow
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+
+
+def test_latest_snapshot_is_updated_in_place():
+    cache = MarketCache(capacity=4)
+    first = cache.update("binance", "BTCUSDT", 1, mark=100.0, funding=0.0001)
+    second = cache.update("binance", "BTCUSDT", 2, bid=99.5, ask=100.5)
+    assert first is second is cache.latest("binance", "BTCUSDT")
+    assert (second.ts, second.mark, second.funding, second.bid) == (2, 100.0, 0.0001, 99.5)
+    assert cache.latest("okx", "BTCUSDT") is None
+
+
+def test_ring_buffer_keeps_most_recent_ticks():
+    cache = MarketCache(capacity=3)
+    for ts in range(5):
+        cache.update("binance", "ETHUSDT", ts, mark=float(ts))
+    rows = cache.history("binance", "ETHUSDT")
+    assert rows[:, cache.column("ts")].tolist() == [2, 3, 4]
+    assert cache.history("binance", "ETHUSDT", n=1)[0, cache.column("mark")] == 4.0
+    assert cache.history("okx", "ETHUSDT").shape == (0, 6)
+
+
+def test_subscribers_are_notified_per_key_and_globally():
+    cache = MarketCache()
+    seen, everything = [], []
+    unsubscribe = cache.subscribe(lambda s: seen.append(s.ts), "binance", "BTCUSDT")
+    cache.subscribe(lambda s: everything.append(s.symbol))
+    cache.update("binance", "BTCUSDT", 1, mark=1.0)
+    cache.update("binance", "ETHUSDT", 2, mark=1.0)
+    unsubscribe()
+    cache.update("binance", "BTCUSDT", 3, mark=1.0)
+    assert seen == [1]
+    assert everything == ["BTCUSDT", "ETHUSDT", "BTCUSDT"]
+
+
+def test_flow_reads_prices_from_cache():
+    cache = MarketCache()
+    cache.update("binance", "BTCUSDT", int(time.time() * 1000), mark=101.0, index=100.0)
+    result = finrobot_flow.run({"symbol": "BTCUSDT", "costs_bps": 0.0}, market=cache)
+    assert math.isclose(result["net_edge_bps"], 100.0)
+
+
+def test_stale_snapshots_are_not_used():
+    cache = MarketCache()
+    cache.update("binance", "BTCUSDT", 1_000, mark=101.0, index=100.0)
+    assert cache.latest("binance", "BTCUSDT", max_age_ms=500, now_ms=1_500) is not None
+    assert cache.latest("binance", "BTCUSDT", max_age_ms=500, now_ms=1_501) is None
+    # The flow falls back to its configured prices.
+    result = finrobot_flow.run({"symbol": "BTCUSDT"}, market=cache)
+    assert (result["config"]["spot"], result["config"]["future"]) == (100.0, 101.0)
+    assert finrobot_flow.run({"symbol": "BTCUSDT", "max_age_ms": None}, market=cache)["config"]["spot"] == 100.0
+
+    # orchestrator.py is shadowed by the orchestrator package, so load it by path.
+    spec = importlib.util.spec_from_file_location("orchestrator_module", ROOT / "orchestrator.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    orch = module.Orchestrator(theta=5, risk_path=str(ROOT / "risk.yml"), market=cache)
+    assert orch.max_age_ms == 5_000 and orch._cached_net_edge({"symbol": "BTCUSDT"}) is None
+    cache.update("binance", "BTCUSDT", int(time.time() * 1000))
+    assert math.isclose(orch._cached_net_edge({"symbol": "BTCUSDT"}), net_edge_bps(100.0, 101.0))
@@ -0,0 +1,190 @@
+import asyncio
+import json
+import math
+
+import httpx
+import pytest
+
+from core.data.order_book import ASK, BID, BookManager, OrderBook
+from core.exchange.transport import AsyncTransport
+from feeds.binance_streams import CombinedStreamSubscriber, Gap
+from feeds.order_books import BinanceDepthSync, OkxBookFeed
+from sim.exchange_server import ExchangeSimulator, SimConfig
+
+
+def test_levels_stay_sorted():
+    book = OrderBook("binance", "BTCUSDT")
+    book.load([(99.0, 1.0), (100.0, 2.0)], [(101.0, 1.0), (102.0, 3.0)], 10)
+    book.apply([(100.5, 1.0), (99.0, 0.0)], [(101.0, 0.0), (101.5, 4.0), (103.0, 0.0)], 11)
+    assert (book.best_bid, book.best_ask) == (100.5, 101.5)
+    assert book.levels(BID).tolist() == [[100.5, 1.0], [100.0, 2.0]]
+    assert book.levels(ASK, 1).tolist() == [[101.5, 4.0]]
+    assert book.depth() == (2, 2) and book.update_id == 11
+
+
+def test_depth_and_vwap():
+    book = OrderBook("binance", "BTCUSDT")
+    book.load([(99.0, 1.0), (98.0, 1.0)], [(101.0, 1.0), (102.0, 2.0)])
+    assert book.mid == 100.0 and book.spread_bps == pytest.approx(200.0)
+    assert book.depth_notional(100) == pytest.approx(99.0 + 101.0)
+    assert book.depth_notional(200, ASK) == pytest.approx(101.0 + 204.0)
+    assert book.vwap(ASK, 2.0) == pytest.approx((101.0 + 102.0) / 2)
+    assert book.vwap(BID, 0.5) == 99.0
+    assert math.isnan(book.vwap(ASK, 3.5))
+    assert book.impact_bps(ASK, 1.0) == pytest.approx(100.0)
+    with pytest.raises(ValueError):
+        book.vwap("mid", 1.0)
+
+    books = BookManager()
+    assert books.depth_notional("binance", "BTCUSDT", 10) == 0.0
+    books.book("binance", "BTCUSDT").load([(99.99, 10.0)], [(100.01, 10.0)])
+    assert books.depth_notional("binance", "BTCUSDT", 10) == pytest.approx(2000.0)
+
+
+def _event(first, last, prev, bids=(), asks=()):
+    return {"e": "depthUpdate", "E": 1, "s": "BTCUSDT", "U": first, "u": last, "pu": prev,
+            "b": [[str(p), str(q)] for p, q in bids], "a": [[str(p), str(q)] for p, q in asks]}
+
+
+def test_binance_sync_buffers_and_resyncs():
+    snapshots = [
+        {"lastUpdateId": 10, "bids": [["99", "1"]], "asks": [["101", "1"]]},
+        {"lastUpdateId": 20, "bids": [["98", "5"]], "asks": [["102", "5"]]},
+    ]
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json=snapshots[len(requests) - 1])
+
+    async def run():
+        books = BookManager()
+        transport = AsyncTransport("binance", "http://binance", transport=httpx.MockTransport(handler))
+        sync = BinanceDepthSync(books, transport=transport)
+        sync.on_message("s", _event(5, 8, 4, bids=[(97, 1)]))  # older than the snapshot
+        sync.on_message("s", _event(9, 12, 8, bids=[(100, 2)]))  # straddles lastUpdateId 10
+        await asyncio.sleep(0.05)
+        book = books.get("binance", "BTCUSDT")
+        assert book.synced and book.update_id == 12
+        assert book.levels(BID).tolist() == [[100.0, 2.0], [99.0, 1.0]]
+
+        sync.on_message("s", _event(13, 13, 12, asks=[(101, 0)]))
+        assert math.isnan(book.best_ask)
+        sync.on_message("s", _event(15, 16, 14))  # pu != 13: gap
+        assert not book.synced and sync.resyncs == 1
+        sync.on_message("s", _event(17, 21, 16, asks=[(103, 1)]))
+        await asyncio.sleep(0.05)
+        assert book.synced and book.update_id == 21
+        assert (book.best_bid, book.best_ask) == (98.0, 102.0)
+
+        sync.on_gap(Gap(0, ["btcusdt@depth@100ms"], 0, 1))
+        assert sync.resyncs == 2 and not book.synced
+        await sync.close()
+
+    asyncio.run(run())
+    assert requests[0].url.params["limit"] == "1000"
+
+
+def test_binance_books_follow_simulator():
+    async def run():
+        sim = ExchangeSimulator(SimConfig(ws_interval_ms=10, depth_drop_rate=0.05))
+        await sim.start()
+        books = BookManager()
+        sync = BinanceDepthSync(books, base_url=sim.base_url, limit=100)
+        ws_url = sim.base_url.replace("http://", "ws://", 1)
+        sub = CombinedStreamSubscriber(sync.on_message, sync.on_gap, url=f"{ws_url}/stream")
+        await sub.add(["BTCUSDT", "ETHUSDT"], kinds=["depth"])
+        runner = asyncio.create_task(sub.run())
+        try:
+            for _ in range(500):
+                ready = [b for b in map(books.get, ["binance"] * 2, sim.depth) if b and b.synced and b.updates > 20]
+                if sync.resyncs and len(ready) == 2:
+                    break
+                await asyncio.sleep(0.01)
+            sim.config.depth_drop_rate = 0.0
+            await asyncio.sleep(0.1)
+            sim._ticker.cancel()
+            for _ in range(100):
+                if all(books.get("binance", s).update_id == sim.depth_ids[s] for s in sim.depth):
+                    break
+                await asyncio.sleep(0.01)
+            for symbol, (bids, asks) in sim.depth.items():
+                book = books.get("binance", symbol)
+                assert book.synced
+                assert book.levels(BID).tolist() == [[p, bids[p]] for p in sorted(bids, reverse=True)]
+                assert book.levels(ASK).tolist() == [[p, asks[p]] for p in sorted(asks)]
+            assert sync.resyncs > 0
+        finally:
+            await sub.close()
+            await runner
+            await sync.close()
+            await sim.stop()
+
+    asyncio.run(run())
+
+
+class FakeSocket:
+    def __init__(self, frames):
+        self.frames = [json.dumps(f) for f in frames]
+        self.sent = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def send(self, payload):
+        self.sent.append(payload)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await asyncio.sleep(0)
+        if self.frames:
+            return self.frames.pop(0)
+        await asyncio.sleep(3600)
+
+
+def _okx(action, seq, prev, bids=(), asks=()):
+    return {"arg": {"channel": "books", "instId": "BTC-USDT-SWAP"}, "action": action, "data": [{
+        "bids": [[str(p), str(q), "0", "1"] for p, q in bids],
+        "asks": [[str(p), str(q), "0", "1"] for p, q in asks],
+        "ts": "1", "seqId": seq, "prevSeqId": prev,
+    }]}
+
+
+def test_okx_books_check_sequence():
+    ws = FakeSocket([
+        {"event": "subscribe", "arg": {"channel": "books", "instId": "BTC-USDT-SWAP"}},
+        _okx("snapshot", 100, -1, bids=[(99, 10)], asks=[(101, 10)]),
+        _okx("update", 105, 100, bids=[(100, 5)]),
+        _okx("update", 105, 105),  # heartbeat
+        _okx("update", 110, 107, asks=[(100.5, 1)]),  # gap
+        _okx("update", 112, 110, asks=[(100.6, 1)]),  # ignored until the snapshot
+        _okx("snapshot", 200, -1, bids=[(98, 1)], asks=[(102, 1)]),
+    ])
+
+    async def run():
+        books = BookManager()
+        feed = OkxBookFeed(["BTCUSDT"], books, contract_sizes={"BTCUSDT": 0.01}, connect=lambda url: ws)
+        feed.start()
+        seen = []
+        while len(ws.frames):
+            await asyncio.sleep(0)
+            book = books.get("okx", "BTCUSDT")
+            if book is not None and book.update_id == 105 and not seen:
+                seen.append(book.levels(BID).tolist())
+        await asyncio.sleep(0.01)
+        book = books.get("okx", "BTCUSDT")
+        top = (book.best_bid, book.best_ask, book.update_id)
+        await feed.close()
+        return top, book.synced, feed, seen
+
+    top, synced, feed, seen = asyncio.run(run())
+    assert seen == [[[100.0, 0.05], [99.0, 0.1]]]
+    assert feed.resyncs == 1
+    assert [json.loads(m)["op"] for m in ws.sent] == ["subscribe", "unsubscribe", "subscribe"]
+    assert top == (98.0, 102.0, 200)
+    assert not synced  # dropped with the connection
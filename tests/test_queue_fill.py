@@ -0,0 +1,76 @@
+import json
+import math
+
+import numpy as np
+import pytest
+
+from sim.queue_fill import QueueReplay, best_prices, depth_rows, load_binance_recording
+
+EVENTS = [
+    {"lastUpdateId": 1, "E": 1000, "bids": [["100", "5"], ["99", "3"]], "asks": [["101", "4"]]},
+    {"e": "aggTrade", "T": 1100, "p": "100", "q": "2", "m": True},
+    {"e": "depthUpdate", "E": 1100, "b": [["100", "3"]], "a": []},
+    {"e": "depthUpdate", "E": 1200, "b": [["100", "5"]], "a": []},  # 2 join behind
+    {"e": "depthUpdate", "E": 1300, "b": [["100", "4"]], "a": []},  # 1 cancelled
+    {"e": "aggTrade", "T": 1400, "p": "100", "q": "3", "m": True},
+    {"e": "aggTrade", "T": 1450, "p": "100", "q": "9", "m": False},  # buy, hits the asks
+    {"e": "aggTrade", "T": 1500, "p": "99.5", "q": "1", "m": True},  # through 100
+    {"e": "depthUpdate", "E": 1500, "b": [["100", "0"]], "a": []},
+    {"e": "depthUpdate", "E": 1600, "b": [["99", "0"]], "a": [["99", "1"]]},
+]
+
+
+def _replay(tmp_path, **kwargs):
+    path = tmp_path / "BTCUSDT.jsonl"
+    path.write_text("\n".join(json.dumps({"stream": "btcusdt@x", "data": e}) for e in EVENTS) + "\n")
+    return QueueReplay(*load_binance_recording(path), **kwargs)
+
+
+def test_queue_advances_on_trades_and_cancels(tmp_path):
+    replay = _replay(tmp_path)
+    fill = replay.simulate("buy", 100.0, 1.0, submit_ts=1000, latency_ms=10)
+    assert fill.ahead == 5 and not fill.rejected
+    # 2 traded ahead, 2 joined behind, the cancel takes 3/5 of 1 from ahead,
+    # so 0.6 of the next 3 traded is ours; the trade through fills the rest.
+    assert fill.first_fill_ts == 1400 and fill.fill_ts == 1500 and fill.fill_time_ms == 500
+    assert fill.filled_qty == 1.0
+
+    partial = replay.simulate("buy", 100.0, 1.0, submit_ts=1000, latency_ms=10, horizon_ms=450)
+    assert partial.filled_qty == pytest.approx(0.6) and math.isnan(partial.fill_ts) and not partial.filled
+    even = _replay(tmp_path, cancel_power=0.0).simulate("buy", 100.0, 1.0, 1000, 10, horizon_ms=450)
+    assert even.filled_qty == pytest.approx(0.5)
+
+    # The ask moving onto 99 fills the bid there; the trade at 99.5 does not.
+    assert replay.simulate("buy", 99.0, 1.0, 1000).fill_ts == 1600
+    assert replay.simulate("sell", 101.0, 1.0, 1000).filled_qty == 0
+
+
+def test_post_only_rejected_when_crossing(tmp_path):
+    replay = _replay(tmp_path)
+    assert replay.best(1050) == (100.0, 101.0) and replay.level_qty(True, 100.0, 1250) == 5
+    assert replay.simulate("buy", 101.0, 1.0, 1000).rejected
+    taker = replay.simulate("buy", 101.0, 1.0, 1000, post_only=False)
+    assert taker.fill_ts == 1000 and not taker.rejected
+    with pytest.raises(ValueError):
+        replay.simulate("hold", 100.0, 1.0, 1000)
+
+    report = replay.simulate_many(["buy", "buy", "sell"], [100.0, 101.0, 101.0], 1.0, 1000, latency_ms=10)
+    assert report.reject_rate == pytest.approx(1 / 3)
+    assert report.fill_probability() == pytest.approx(1 / 3)
+    assert report.fill_probability(within_ms=400) == 0
+    assert report.fill_time_quantiles([0.5]).tolist() == [500]
+
+    probes = replay.join_best("buy", every_ms=100, qty=1.0, horizon_ms=1000)
+    assert probes.fills["price"].tolist() == [100.0, 100.0, 100.0, 100.0, 100.0, 99.0]
+    assert probes.fill_probability() == 1.0
+
+
+def test_snapshot_removes_unlisted_levels():
+    depth = depth_rows([
+        {"lastUpdateId": 1, "E": 10, "bids": [["100", "1"]], "asks": [["102", "1"]]},
+        {"e": "depthUpdate", "E": 20, "b": [["101", "2"]], "a": []},
+        {"lastUpdateId": 5, "E": 30, "bids": [["99", "1"]], "asks": [["102", "1"]]},
+    ])
+    assert depth[depth["ts"] == 30]["qty"].tolist().count(0.0) == 2
+    ts, bid, ask = best_prices(depth)
+    assert ts.tolist() == [10, 20, 30] and bid.tolist() == [100, 101, 99] and np.all(ask == 102)
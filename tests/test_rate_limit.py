@@ -0,0 +1,56 @@
+import pytest
+
+from core.exchange.rate_limit import MARKET, ORDER, RateLimiter
+
+
+class Clock:
+    def __init__(self, now=1_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _limiter(clock, **kwargs):
+    budgets = {
+        "binance": [("weight", 10, 60), ("orders", 2, 10)],
+        "okx": [("/api/v5/trade/order", 3, 2), ("*", 1, 2)],
+    }
+    return RateLimiter(budgets, clock=clock, **kwargs)
+
+
+def test_market_traffic_leaves_headroom_for_orders():
+    clock = Clock(1_020.0)
+    limiter = _limiter(clock, market_share=0.5)
+    assert limiter.try_acquire("binance", 5, priority=MARKET) == 0
+    wait = limiter.try_acquire("binance", 1, priority=MARKET)
+    assert wait == pytest.approx(60.0)  # window started at t=1020
+    assert limiter.try_acquire("binance", 1, orders=1, priority=ORDER) == 0
+    assert limiter.headroom("binance") == {"weight/60s": 4, "orders/10s": 1}
+
+
+def test_window_rolls_over():
+    clock = Clock(1_020.0)
+    limiter = _limiter(clock)
+    assert limiter.try_acquire("binance", 1, orders=2, priority=ORDER) == 0
+    assert limiter.try_acquire("binance", 1, orders=1, priority=ORDER) > 0
+    clock.now = 1_030.0
+    assert limiter.try_acquire("binance", 1, orders=1, priority=ORDER) == 0
+
+
+def test_headers_override_local_usage_and_429_blocks():
+    clock = Clock()
+    limiter = _limiter(clock)
+    limiter.record_response("binance", 200, {"X-MBX-USED-WEIGHT-1M": "9", "X-MBX-ORDER-COUNT-10S": "2"})
+    assert limiter.headroom("binance") == {"weight/60s": 1, "orders/10s": 0}
+    limiter.record_response("binance", 429, {"Retry-After": "7"})
+    assert limiter.try_acquire("binance", 0, priority=ORDER) == pytest.approx(7.0)
+
+
+def test_okx_endpoint_budgets_fall_back_to_default():
+    limiter = _limiter(Clock())
+    for _ in range(3):
+        assert limiter.try_acquire("okx", endpoint="/api/v5/trade/order", priority=ORDER) == 0
+    assert limiter.try_acquire("okx", endpoint="/api/v5/trade/order", priority=ORDER) > 0
+    assert limiter.try_acquire("okx", endpoint="/api/v5/public/time", priority=ORDER) == 0
+    assert limiter.try_acquire("okx", endpoint="/api/v5/public/time", priority=ORDER) > 0
@@ -0,0 +1,72 @@
+from core.data.market_cache import MarketCache
+from sim import replay
+from sim.replay import ReplayEngine, discover
+
+
+def _write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def test_replay_merges_files_of_both_schemas_in_time_order(tmp_path):
+    _write(
+        tmp_path / "20240101" / "BTCUSDT.csv",
+        "ts,symbol,mark,estFunding,nextFunding,src\n"
+        "2024-01-01T00:00:00,BTCUSDT,100,0.0001,2024-01-01T08:00:00,REST\n"
+        "2024-01-01T00:00:02,BTCUSDT,101,0.0001,2024-01-01T08:00:00,REST\n",
+    )
+    _write(
+        tmp_path / "20240101" / "BTC-USDT-SWAP.csv",
+        "ts,symbol,mark,estFunding,nextFunding,src\n"
+        "2024-01-01T00:00:01,BTC-USDT-SWAP,99,0.0002,1704096000000,REST\n",
+    )
+    _write(tmp_path / "20240102" / "ETHUSDT.csv", "timestamp,markPrice,fundingRate\n2024-01-02T00:00:00,2300,0.0003\n")
+
+    cache = MarketCache()
+    engine = ReplayEngine(discover(tmp_path), market=cache)
+    seen = []
+    engine.subscribe(lambda e: seen.append((e.symbol, e.venue)))
+    stats = engine.run()
+
+    assert seen == [
+        ("BTCUSDT", "binance"),
+        ("BTC-USDT-SWAP", "okx"),
+        ("BTCUSDT", "binance"),
+        ("ETHUSDT", "binance"),
+    ]
+    assert stats.events == 4 and stats.events_per_s > 0
+    assert cache.latest("binance", "BTCUSDT").mark == 101.0
+    assert cache.latest("okx", "BTC-USDT-SWAP").next_funding == 1704096000000
+
+
+def test_discover_filters_by_day_and_symbol(tmp_path):
+    for day in ("20240101", "20240102", "20240103"):
+        _write(tmp_path / day / "BTCUSDT.csv", "timestamp,markPrice,fundingRate\n")
+        _write(tmp_path / day / "ETHUSDT.csv", "timestamp,markPrice,fundingRate\n")
+    _write(tmp_path / "BTCUSDT.csv", "timestamp,markPrice,fundingRate\n")
+
+    paths = discover(tmp_path, symbols=["BTCUSDT"], start_day="20240102", end_day="20240103")
+    assert [p.parent.name for p in paths] == ["20240102", "20240103"]
+    assert len(discover(tmp_path, symbols=["BTCUSDT"])) == 4
+
+
+def test_one_open_file_per_symbol(tmp_path, monkeypatch):
+    for i, day in enumerate(("20240101", "20240102", "20240103")):
+        for j, symbol in enumerate(("BTCUSDT", "ETHUSDT")):
+            _write(tmp_path / day / f"{symbol}.csv",
+                   f"timestamp,markPrice,fundingRate\n{2 * i + j}000,{i},0\n{2 * i + j}500,{i},0\n")
+    open_files, peak = [0], [0]
+    iter_ticks = replay.iter_ticks
+
+    def counting(path):
+        open_files[0] += 1
+        peak[0] = max(peak[0], open_files[0])
+        try:
+            yield from iter_ticks(path)
+        finally:
+            open_files[0] -= 1
+
+    monkeypatch.setattr(replay, "iter_ticks", counting)
+    ts = [e.ts for e in ReplayEngine(discover(tmp_path), market=None).events()]
+    assert ts == sorted(ts) and len(ts) == 12
+    assert peak[0] == 2
@@ -0,0 +1,78 @@
+import asyncio
+
+from feeds import rest_mark_funding as rmf
+
+
+class FakeResponse:
+    status = 200
+    headers = {}
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    async def json(self):
+        return self.payload
+
+
+class FakeSession:
+    def __init__(self, routes):
+        self.routes = routes
+        self.calls = []
+
+    def get(self, url, params=None, headers=None):
+        params = params or {}
+        self.calls.append((url, params))
+        return FakeResponse(self.routes(url, params))
+
+
+class FakeWriter:
+    def __init__(self):
+        self.rows = []
+
+    def write(self, symbol, row, ts=None):
+        self.rows.append(row)
+
+
+def _premium(symbol, mark):
+    return {"symbol": symbol, "markPrice": mark, "lastFundingRate": "0.0001", "nextFundingTime": 0}
+
+
+def test_binance_bulk_fans_out_and_falls_back_for_missing():
+    def routes(url, params):
+        if "symbol" in params:
+            return _premium(params["symbol"], "5")
+        return [_premium("BTCUSDT", "42000"), _premium("ETHUSDT", "2300")]
+
+    session, writer = FakeSession(routes), FakeWriter()
+    missing = asyncio.run(rmf._fetch_binance_bulk(session, writer, ["BTCUSDT", "ETHUSDT", "NEWUSDT"]))
+
+    assert missing == ["NEWUSDT"]
+    assert [r[1] for r in writer.rows] == ["BTCUSDT", "ETHUSDT", "NEWUSDT"]
+    assert all(url == rmf.BINANCE_PREMIUM_INDEX for url, _ in session.calls)
+    assert len(session.calls) == 2
+
+
+def test_okx_bulk_uses_batched_queries():
+    def routes(url, params):
+        if url == rmf.OKX_FUNDING_RATE:
+            return {"data": [{"instId": "BTC-USDT-SWAP", "fundingRate": "0.0002", "fundingTime": "1"}]}
+        return {"data": [{"instId": "BTC-USDT", "idxPx": "42000"}]}
+
+    session, writer = FakeSession(routes), FakeWriter()
+    missing = asyncio.run(rmf._fetch_okx_bulk(session, writer, ["BTC-USDT-SWAP"]))
+
+    assert missing == []
+    assert session.calls == [
+        (rmf.OKX_FUNDING_RATE, {"instId": "ANY"}),
+        (rmf.OKX_INDEX_TICKERS, {"quoteCcy": "USDT"}),
+    ]
+    assert writer.rows[0][1:5] == ["BTC-USDT-SWAP", 42000.0, 0.0002, "1"]
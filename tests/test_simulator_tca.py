@@ -0,0 +1,152 @@
+import numpy as np
+import pytest
+
+from sim.simulator_tca import LEG_FIELDS, Leg, TCASimulator, leg_columns
+
+
+def _legs(n, seed=0):
+    rng = np.random.default_rng(seed)
+    mids = rng.uniform(10, 50_000, n)
+    return [
+        Leg(side=rng.choice(["buy", "SELL", "Buy", "sell"]), quantity=float(rng.uniform(0.001, 20)),
+            limit_price=float(mid * rng.uniform(0.99, 1.01)), arrival_mid=float(mid))
+        for mid in mids
+    ] + [Leg("buy", 1.0, float("nan"), 100.0), Leg("sell", 1.0, 99.0, float("nan")), Leg("sell", -2.0, 99.0, 100.0)]
+
+
+def test_batch_matches_simulate_leg_exactly():
+    sim = TCASimulator(fill_prob=0.83, adverse_selection=1.7, latency_ms=37.0, depth=3.3)
+    legs = _legs(2000)
+    batch = sim.simulate_table(leg_columns(legs))
+    expected = sim.simulate_order(legs)
+    assert len(batch) == len(legs)
+    for got, want in zip(batch.to_results(), expected):
+        assert np.array_equal([got.filled_qty, got.avg_price, got.implementation_shortfall],
+                              [want.filled_qty, want.avg_price, want.implementation_shortfall], equal_nan=True)
+
+
+def test_batch_accepts_signs_and_structured_arrays():
+    sim = TCASimulator(fill_prob=1.0, adverse_selection=10.0, latency_ms=100.0, depth=5.0)
+    table = np.zeros(2, dtype=[(name, float) for name in LEG_FIELDS])
+    table["side"] = [1, -1]
+    table["quantity"] = [10.0, 2.0]
+    table["limit_price"] = [102.0, 98.0]
+    table["arrival_mid"] = [100.0, 100.0]
+    result = sim.simulate_table(table)
+    assert result.filled_qty.tolist() == [4.5, 1.8]  # 0.9 latency factor
+    assert result.avg_price.tolist() == [101.0, 99.0]
+    assert result.implementation_shortfall.tolist() == [4.5, 1.8]
+    with pytest.raises(ValueError):
+        sim.simulate_batch(["buy"], [0.0], [1.0], [1.0])
+    broadcast = sim.simulate_batch("buy", [10.0, 2.0], 102.0, 100.0)
+    assert broadcast.avg_price.tolist() == [101.0, 101.0] and broadcast[1].filled_qty == 1.8
+
+
+def _write_log(path, rows, header=True, mode="w"):
+    with open(path, mode) as fh:
+        if header:
+            fh.write("ts,symbol,venue,side,latency_ms,depth,arrival_mid,post_fill_mid,filled\n")
+        for row in rows:
+            fh.write(",".join(map(str, row)) + "\n")
+
+
+def test_calibrate_from_logs_matches_plain_means(tmp_path):
+    log = tmp_path / "log.csv"
+    log.write_text("latency_ms,depth,arrival_mid,post_fill_mid,filled\n"
+                   "10,5,100,100.5,1\n30,7,100,99.5,0\n20,6,100,101,true\n")
+    sim = TCASimulator.calibrate_from_logs(log)
+    assert sim.fill_prob == pytest.approx(2 / 3)
+    assert (sim.latency_ms, sim.depth) == pytest.approx((20.0, 6.0))
+    assert sim.adverse_selection == pytest.approx(1 / 3)
+
+
+def test_streaming_calibration_is_stratified_and_incremental(tmp_path):
+    from sim.tca_calibration import ANY, GLOBAL, StratifiedTCASimulator, TCACalibration
+
+    day = 1_700_000_000_000 - 1_700_000_000_000 % 86_400_000
+    log = tmp_path / "executions.csv"
+    rows = []
+    for i in range(400):
+        ts = day + (3 if i % 2 else 15) * 3_600_000 + i
+        side = "BUY" if i % 4 < 2 else "sell"
+        move = 2.0 if side == "BUY" else -1.0  # always against the order
+        rows.append((ts, "BTC-USDT-SWAP", "OKX", side, 10 + i % 2 * 90, 5, 100, 100 + move, int(i % 2 == 0)))
+    _write_log(log, rows[:300])
+    with open(log, "a") as fh:
+        fh.write("1,BTCUSDT,mexc,buy,1")  # partial line, still being written
+
+    cal = TCACalibration(bucket_minutes=240, chunk_bytes=2048)
+    assert cal.update_from_log(log) == 300
+    assert cal.update_from_log(log) == 0
+    with open(log, "a") as fh:
+        fh.write(",1,100,100,1\n")
+    _write_log(log, rows[300:], header=False, mode="a")
+    assert cal.update_from_log(log) == 101
+
+    night = cal.stats(("BTCUSDT", "okx", "buy", "00:00"))
+    day_ = cal.stats(("BTCUSDT", "okx", "buy", "12:00"))
+    assert night.fill_prob == 0.0 and day_.fill_prob == 1.0
+    assert night.latency.mean == 100 and day_.latency.mean == 10
+    assert cal.stats(("BTCUSDT", ANY, "sell", ANY)).simulator().adverse_selection == pytest.approx(1.0)
+    assert cal.stats(GLOBAL).rows == 401 and cal.stats(GLOBAL).latency_q.quantile(0.9) == pytest.approx(100, rel=0.02)
+
+    path = tmp_path / "tca.json"
+    cal.save(path)
+    restored = TCACalibration.load(path)
+    assert restored.update_from_log(log) == 0
+    assert restored.stats(GLOBAL).to_dict() == cal.stats(GLOBAL).to_dict()
+
+    sim = StratifiedTCASimulator(restored, min_rows=10)
+    night_leg = Leg("buy", 1.0, 105.0, 100.0, symbol="BTCUSDT", venue="okx", ts=day + 3 * 3_600_000)
+    assert sim.simulate_leg(night_leg).filled_qty == 0.0
+    assert sim.simulator_for(Leg("buy", 1.0, 105.0, 100.0, symbol="ETHUSDT", venue="okx")).fill_prob == pytest.approx(
+        cal.stats((ANY, "okx", ANY, ANY)).fill_prob)
+    table = {"side": ["buy", "buy"], "quantity": [1.0, 1.0], "limit_price": [105.0, 105.0],
+             "arrival_mid": [100.0, 100.0], "symbol": ["BTCUSDT"] * 2, "venue": ["okx"] * 2,
+             "ts": [day + 3 * 3_600_000, day + 15 * 3_600_000]}
+    batch = sim.simulate_table(table)
+    assert batch.filled_qty[0] == 0.0 and batch[1] == sim.simulate_leg(
+        Leg("buy", 1.0, 105.0, 100.0, symbol="BTCUSDT", venue="okx", ts=day + 15 * 3_600_000))
+
+
+def test_monte_carlo_matches_point_model_and_is_reproducible():
+    from sim.tca_montecarlo import FillDistributions, MonteCarloTCA
+
+    sim = TCASimulator(fill_prob=1.0, adverse_selection=2.0, latency_ms=30.0, depth=5.0)
+    legs = [Leg("buy", 3.0, 101.0, 100.0), Leg("sell", 8.0, 99.0, 100.0)]
+    point = MonteCarloTCA(paths=1000, block_paths=300, workers=1).run(legs, FillDistributions.from_simulator(sim))
+    expected = [r.implementation_shortfall for r in sim.simulate_order(legs)]
+    assert point.leg_mean == pytest.approx(expected)
+    assert point.leg_cvar == pytest.approx(expected) and point.order_mean == pytest.approx([sum(expected)])
+
+    noisy = FillDistributions(0.8, np.linspace(0, 200, 1001), np.linspace(-1, 5, 1001), depth_mean=5.0, depth_std=2.0)
+    runs = [MonteCarloTCA(paths=5000, block_paths=1024, workers=w, seed=11).run(legs, noisy, orders=[0, 1])
+            for w in (1, 2)]
+    assert np.array_equal(runs[0].leg_quantiles, runs[1].leg_quantiles)
+    assert np.array_equal(runs[0].order_cvar, runs[1].order_cvar)
+    result = runs[0]
+    assert (result.leg_cvar >= result.leg_quantiles[:, 2]).all()
+    assert (result.leg_quantiles[:, 3] > result.leg_mean).all()
+    assert result.order_mean == pytest.approx(result.leg_mean)
+    with pytest.raises(ValueError):
+        MonteCarloTCA(paths=10).run(legs, [noisy])
+
+
+def test_monte_carlo_uses_calibrated_strata():
+    from sim.tca_calibration import TCACalibration
+    from sim.tca_montecarlo import MonteCarloTCA, stratified_distributions
+
+    cal = TCACalibration()
+    n = 200
+    cal.update({
+        "symbol": ["BTCUSDT"] * n + ["ETHUSDT"] * n, "side": ["buy"] * 2 * n, "filled": ["1"] * 2 * n,
+        "latency_ms": [10.0] * n + list(np.linspace(0, 400, n)), "depth": [100.0] * 2 * n,
+        "arrival_mid": [100.0] * 2 * n, "post_fill_mid": [100.5] * n + list(np.linspace(99, 106, n)),
+    })
+    legs = [Leg("buy", 1.0, 110.0, 100.0, symbol="BTCUSDT"), Leg("buy", 1.0, 110.0, 100.0, symbol="ETHUSDT")]
+    dists = stratified_distributions(legs, cal)
+    assert dists[0].latency_ms[-1] == pytest.approx(10, rel=0.02)
+    result = MonteCarloTCA(paths=20_000, workers=1, seed=1).run(legs, dists, orders=[0, 1])
+    calm, wild = result.leg_quantiles
+    assert calm[-1] == pytest.approx(0.5 * 0.01 * 0.99, rel=0.05)
+    assert wild[-1] > 5 * calm[-1] and result.leg_cvar[1] > wild[2]
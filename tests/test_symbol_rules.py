@@ -0,0 +1,104 @@
+import json
+from decimal import Decimal
+
+import pytest
+
+from orders.binance import BinanceOrderClient
+from orders.symbol_rules import SymbolRules, SymbolRulesIndex
+
+INFO = {
+    "symbol": "BTCUSDT",
+    "quantityPrecision": 3,
+    "pricePrecision": 1,
+    "filters": [
+        {"filterType": "PRICE_FILTER", "minPrice": "0.10", "tickSize": "0.10"},
+        {"filterType": "LOT_SIZE", "minQty": "0.001", "stepSize": "0.001"},
+        {"filterType": "MIN_NOTIONAL", "notional": "5"},
+    ],
+}
+
+
+class Clock:
+    def __init__(self, now=1_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_compiled_rules_match_filters():
+    rules = SymbolRules.from_info(INFO)
+    rules.validate(Decimal("0.010"), Decimal("600.5"))
+    rules.validate(Decimal("0.010"))  # market order: no price checks
+    cases = [
+        (Decimal("0.0005"), Decimal("20000"), "minQty"),
+        (Decimal("0.0015"), Decimal("20000"), "stepSize"),
+        (Decimal("0.001"), Decimal("100"), "Notional"),
+        (Decimal("0.010"), Decimal("600.55"), "tickSize"),
+    ]
+    for qty, price, message in cases:
+        with pytest.raises(ValueError, match=message):
+            rules.validate(qty, price)
+
+
+def test_fresh_cache_file_skips_fetch(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"fetched_at": 900.0, "symbols": [INFO]}))
+
+    def fetch():
+        raise AssertionError("should not hit the network")
+
+    index = SymbolRulesIndex(fetch, str(path), ttl_s=600, clock=Clock())
+    assert index.load() == 1
+    assert index.get("btcusdt").tick_size == Decimal("0.10")
+    with pytest.raises(ValueError, match="not found"):
+        index.get("DOGEUSDT")
+
+
+def test_expired_cache_refreshes_and_persists(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"fetched_at": 0.0, "symbols": []}))
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return [INFO, dict(INFO, symbol="ETHUSDT")]
+
+    index = SymbolRulesIndex(fetch, str(path), ttl_s=600, clock=Clock())
+    assert index.load() == 2 and len(calls) == 1
+    saved = json.loads(path.read_text())
+    assert saved["fetched_at"] == 1_000.0 and len(saved["symbols"]) == 2
+
+
+def test_expired_cache_used_when_exchange_unreachable(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"fetched_at": 0.0, "symbols": [INFO]}))
+
+    def fetch():
+        raise ConnectionError("down")
+
+    index = SymbolRulesIndex(fetch, str(path), ttl_s=600, clock=Clock())
+    assert index.load() == 1
+    assert "BTCUSDT" in index
+
+    with pytest.raises(ConnectionError):
+        SymbolRulesIndex(fetch, str(tmp_path / "missing.json")).load()
+
+
+def test_client_constructor_does_no_io():
+    calls = []
+    index = SymbolRulesIndex(lambda: calls.append(1) or [INFO])
+    client = BinanceOrderClient("key", "secret", live=False, rules=index)
+    assert not calls and index._thread is None
+    client.start()
+    client.start()
+    assert calls == [1] and index._thread is None  # only a shared index is refreshed
+    assert "BTCUSDT" in client.rules
+
+
+def test_client_validates_without_network():
+    index = SymbolRulesIndex(lambda: [INFO])
+    client = BinanceOrderClient("key", "secret", live=False, rules=index)
+    client.session = None  # any HTTP call would fail
+    with pytest.raises(ValueError, match="stepSize"):
+        client.place_order("BTCUSDT", "BUY", "LIMIT", 0.0015, price=20000.0)
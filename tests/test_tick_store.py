@@ -0,0 +1,50 @@
+import datetime as dt
+
+import numpy as np
+
+from core.data.tick_store import TICK_DTYPE, TickStore, to_ms
+
+T0 = to_ms(dt.datetime(2024, 1, 1, 23, 59, 58))
+
+
+def _ticks(ts_list, mark=100.0):
+    out = np.zeros(len(ts_list), dtype=TICK_DTYPE)
+    out["ts"] = ts_list
+    out["mark"] = mark + np.arange(len(ts_list))
+    return out
+
+
+def test_append_partitions_by_day_and_reads_range(tmp_path):
+    store = TickStore(tmp_path)
+    store.append("BTCUSDT", _ticks([T0, T0 + 1000, T0 + 2000, T0 + 3000]))
+
+    assert store.days() == ["20240101", "20240102"]
+    data = store.read(["BTCUSDT"], start=T0 + 1000, end=T0 + 3000)["BTCUSDT"]
+    assert data["ts"].tolist() == [T0 + 1000, T0 + 2000]
+    assert data["mark"].tolist() == [101.0, 102.0]
+
+
+def test_out_of_order_append_keeps_partition_sorted(tmp_path):
+    store = TickStore(tmp_path)
+    store.append("ETHUSDT", _ticks([T0, T0 + 1000]))
+    store.append("ETHUSDT", _ticks([T0 + 500], mark=7.0))
+    ts = store.read(["ETHUSDT"], mmap=True)["ETHUSDT"]["ts"]
+    assert ts.tolist() == [T0, T0 + 500, T0 + 1000]
+
+
+def test_ingest_both_csv_schemas(tmp_path):
+    rest = tmp_path / "rest.csv"
+    rest.write_text(
+        "ts,symbol,mark,estFunding,nextFunding,src\n"
+        "2024-01-01T00:00:00,BTCUSDT,42000.5,0.0001,2024-01-01T08:00:00,REST\n"
+    )
+    legacy = tmp_path / "ETHUSDT.csv"
+    legacy.write_text("timestamp,markPrice,fundingRate\n2024-01-01T00:00:01,2300.1,0.0002\n")
+
+    store = TickStore(tmp_path / "store")
+    assert store.ingest_csv(rest) == 1
+    assert store.ingest_csv(legacy) == 1
+    out = store.read(["BTCUSDT", "ETHUSDT"], columns=["ts", "funding", "src"])
+    assert out["BTCUSDT"]["funding"][0] == 0.0001
+    assert out["ETHUSDT"]["src"][0] == 1
+    assert "mark" not in out["ETHUSDT"]
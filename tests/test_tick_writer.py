@@ -0,0 +1,66 @@
+import asyncio
+import csv
+import datetime as dt
+
+from core.data.tick_writer import TICK_HEADER, TickWriter
+
+
+def _read(path):
+    with open(path, newline="") as fh:
+        return list(csv.reader(fh))
+
+
+def test_rows_are_batched_until_flush(tmp_path):
+    async def run():
+        async with TickWriter(["ts", "mark"], root=str(tmp_path), flush_interval=60) as writer:
+            ts = dt.datetime(2024, 1, 1, 12)
+            writer.write("BTCUSDT", [ts.isoformat(), 1.0], ts=ts)
+            writer.write("BTCUSDT", [ts.isoformat(), 2.0], ts=ts)
+            assert writer.pending_rows == 2
+            assert not (tmp_path / "20240101" / "BTCUSDT.csv").exists()
+
+    asyncio.run(run())
+    rows = _read(tmp_path / "20240101" / "BTCUSDT.csv")
+    assert rows == [["ts", "mark"], ["2024-01-01T12:00:00", "1.0"], ["2024-01-01T12:00:00", "2.0"]]
+
+
+def test_size_threshold_triggers_flush(tmp_path):
+    async def run():
+        async with TickWriter(["v"], root=str(tmp_path), max_rows=2, flush_interval=60) as writer:
+            ts = dt.datetime(2024, 1, 1)
+            writer.write("ETHUSDT", [1], ts=ts)
+            writer.write("ETHUSDT", [2], ts=ts)
+            await asyncio.sleep(0.05)
+            assert writer.pending_rows == 0
+            assert len(_read(tmp_path / "20240101" / "ETHUSDT.csv")) == 3
+
+    asyncio.run(run())
+
+
+def test_rotates_at_utc_midnight_and_keeps_single_header(tmp_path):
+    writer = TickWriter(["v"], root=str(tmp_path))
+    writer.write("BTCUSDT", [1], ts=dt.datetime(2024, 1, 1, 23, 59, 59))
+    writer.flush_sync()
+    writer.write("BTCUSDT", [2], ts=dt.datetime(2024, 1, 1, 23, 59, 59))
+    writer.write("BTCUSDT", [3], ts=dt.datetime(2024, 1, 2, 0, 0, 1))
+    writer.flush_sync()
+    asyncio.run(writer.close())
+
+    assert _read(tmp_path / "20240101" / "BTCUSDT.csv") == [["v"], ["1"], ["2"]]
+    assert _read(tmp_path / "20240102" / "BTCUSDT.csv") == [["v"], ["3"]]
+
+
+def test_file_started_with_legacy_header_is_rewritten(tmp_path):
+    day = tmp_path / "20240101"
+    day.mkdir()
+    (day / "BTCUSDT.csv").write_text("timestamp,markPrice,fundingRate\n2024-01-01T00:00:00,100.0,0.0001\n")
+    writer = TickWriter(TICK_HEADER, root=str(tmp_path))
+    row = ["2024-01-01T00:00:01", "BTCUSDT", 101.0, 0.0002, "2024-01-01T08:00:00", "REST"]
+    writer.write("BTCUSDT", row, ts=dt.datetime(2024, 1, 1, 0, 0, 1))
+    asyncio.run(writer.close())
+
+    assert _read(day / "BTCUSDT.csv") == [
+        TICK_HEADER,
+        ["2024-01-01T00:00:00", "BTCUSDT", "100.0", "0.0001", "", "WS"],
+        ["2024-01-01T00:00:01", "BTCUSDT", "101.0", "0.0002", "2024-01-01T08:00:00", "REST"],
+    ]
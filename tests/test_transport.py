@@ -0,0 +1,65 @@
+import asyncio
+
+import httpx
+
+from core.exchange.transport import AsyncTransport
+from orders.binance import AsyncBinanceOrderClient
+from orders.okx import AsyncOkxOrderClient
+from orders.symbol_rules import SymbolRulesIndex, fetch_exchange_info
+from sim.exchange_server import ExchangeSimulator, SimConfig
+
+
+def test_timing_breakdown_and_connection_reuse():
+    async def run():
+        sim = ExchangeSimulator(SimConfig())
+        await sim.start()
+        try:
+            timings = []
+            async with AsyncTransport(
+                "binance", sim.base_url, on_timing=lambda v, e, t: timings.append((e, t))
+            ) as transport:
+                assert await transport.warm_up("/fapi/v1/ping") == 1
+                resp, timing = await transport.request("GET", "/fapi/v1/time")
+            return resp, timing, timings
+        finally:
+            await sim.stop()
+
+    resp, timing, timings = asyncio.run(run())
+    assert resp.status_code == 200
+    warm = timings[0][1]
+    assert warm.connect_ms > 0 and not warm.reused
+    assert timing.reused and timing.ttfb_ms > 0 and timing.total_ms >= timing.ttfb_ms
+    assert [e for e, _ in timings] == ["/fapi/v1/ping", "/fapi/v1/time"]
+
+
+def test_warm_up_failures_are_not_raised():
+    def refuse(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    async def run():
+        async with AsyncTransport("mexc", "http://venue.test", transport=httpx.MockTransport(refuse)) as t:
+            return await t.warm_up("/api/v1/contract/ping", connections=3)
+
+    assert asyncio.run(run()) == 0
+
+
+def test_concurrent_orders_on_one_loop():
+    async def run():
+        sim = ExchangeSimulator(SimConfig())
+        await sim.start()
+        try:
+            rules = SymbolRulesIndex(lambda: fetch_exchange_info(sim.base_url))
+            async with AsyncBinanceOrderClient("k", "s", live=True, base_url=sim.base_url, rules=rules) as bn, \
+                    AsyncOkxOrderClient(live=1, base_url=sim.base_url) as ok:
+                results = await asyncio.gather(
+                    *(bn.place_order("BTCUSDT", "BUY", "LIMIT", 0.1, price=100.0) for _ in range(5)),
+                    ok.place_order({"instId": "BTC-USDT-SWAP", "side": "sell", "ordType": "market", "sz": "1"}),
+                )
+            return results, len(sim.orders)
+        finally:
+            await sim.stop()
+
+    results, placed = asyncio.run(run())
+    assert placed == 6
+    assert all(r["status"] == "NEW" for r in results[:5])
+    assert results[5]["data"][0]["sCode"] == "0"
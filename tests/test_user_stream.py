@@ -0,0 +1,220 @@
+import asyncio
+import json
+
+import pytest
+
+from core.exchange.okx import OkxConnector
+from core.execution.arbitrage import FILLED as LEG_FILLED, ConnectorLegSubmitter, Leg, REJECTED as LEG_REJECTED
+from orders.binance import AsyncBinanceOrderClient
+from orders.symbol_rules import SymbolRulesIndex, fetch_exchange_info
+from orders.tracker import (
+    CANCELED, FILLED, NEW, PARTIALLY_FILLED, REJECTED, OrderTracker, OrderUpdate, new_client_order_id,
+)
+from orders.user_stream import (
+    BinanceUserStream, OkxUserStream, parse_binance_order_update, parse_okx_order,
+)
+from sim.exchange_server import ExchangeSimulator, SimConfig
+
+
+def update(status, filled=0.0, last=0.0, ts=0):
+    return OrderUpdate("binance", "c1", status, "BTCUSDT", "BUY", "7", 1.0, filled, last, 100.0, 100.0, ts)
+
+
+def test_tracker_moves_forward_only():
+    tracker = OrderTracker()
+    tracker.track("c1", "binance", "BTCUSDT", "BUY", 1.0)
+    tracker.apply(update(PARTIALLY_FILLED, 0.4, 0.4, 1))
+    tracker.apply(update(PARTIALLY_FILLED, 0.4, 0.4, 1))  # replay
+    tracker.apply(update(NEW, 0.0, 0.0, 0))  # late NEW
+    state = tracker.apply(update(FILLED, 1.0, 0.6, 2))
+    tracker.apply(update(CANCELED, 1.0, 0.0, 3))
+    assert state.status == FILLED and state.filled_qty == 1.0
+    assert [f.qty for f in state.fills] == [0.4, 0.6]
+    assert tracker.open_orders() == []
+
+
+def test_waiters_and_listeners():
+    async def run():
+        tracker = OrderTracker()
+        seen = []
+        tracker.subscribe(lambda state, upd: seen.append(upd.status))
+        waiter = asyncio.ensure_future(tracker.wait_filled("c1", timeout=1))
+        await asyncio.sleep(0)
+        tracker.apply(update(NEW))
+        assert not waiter.done()
+        tracker.apply(update(FILLED, 1.0, 1.0))
+        assert (await waiter).filled_qty == 1.0
+
+        tracker.apply(OrderUpdate("okx", "c2", CANCELED))
+        with pytest.raises(RuntimeError):
+            await tracker.wait_filled("c2", timeout=1)
+        with pytest.raises(asyncio.TimeoutError):
+            await tracker.wait_done("c3", timeout=0.01)
+        # Resolved and timed-out waiters leave no empty lists behind.
+        assert tracker._waiters == {}
+        return seen
+
+    assert asyncio.run(run()) == [NEW, FILLED, CANCELED]
+
+
+def test_wait_does_not_track_and_forget_drops_orders():
+    async def run():
+        tracker = OrderTracker()
+        waiter = asyncio.ensure_future(tracker.wait_done("x", timeout=1))
+        await asyncio.sleep(0)
+        assert tracker.get("x") is None and len(tracker) == 0
+        tracker.track("x")
+        assert tracker.forget("x").client_order_id == "x"
+        with pytest.raises(KeyError):
+            await waiter
+        return tracker
+
+    tracker = asyncio.run(run())
+    assert tracker.open_orders() == [] and tracker._waiters == {}
+
+
+def test_finished_orders_are_evicted():
+    now = [0.0]
+    tracker = OrderTracker(retention_s=60, max_done=2, clock=lambda: now[0])
+    for cid in ("a", "b", "c"):
+        tracker.track(cid)
+    tracker.apply(OrderUpdate("binance", "a", FILLED, filled_qty=1.0))
+    tracker.apply(OrderUpdate("binance", "b", CANCELED))
+    tracker.apply(OrderUpdate("binance", "b", CANCELED))  # replay does not refresh retention
+    assert len(tracker) == 3
+    tracker.apply(OrderUpdate("binance", "c", PARTIALLY_FILLED, filled_qty=0.5))
+    assert len(tracker) == 3  # open orders are never evicted
+
+    tracker.track("d")
+    tracker.apply(OrderUpdate("binance", "d", FILLED, filled_qty=1.0))
+    assert tracker.get("a") is None and tracker.get("b") is not None  # over max_done
+    now[0] = 61.0
+    tracker.track("e")
+    tracker.apply(OrderUpdate("binance", "e", REJECTED))
+    assert tracker.get("b") is tracker.get("d") is None  # past retention
+    assert [s.client_order_id for s in tracker.open_orders()] == ["c"] and len(tracker) == 2
+
+
+def test_parsers():
+    b = parse_binance_order_update({
+        "e": "ORDER_TRADE_UPDATE", "T": 5,
+        "o": {"c": "x", "s": "BTCUSDT", "S": "SELL", "X": "EXPIRED_IN_MATCH", "i": 9, "q": "2",
+              "z": "0.5", "l": "0.5", "L": "10", "ap": "10"},
+    })
+    assert (b.status, b.order_id, b.filled_qty, b.ts) == ("EXPIRED", "9", 0.5, 5)
+    o = parse_okx_order({
+        "clOrdId": "y", "ordId": "3", "instId": "BTC-USDT-SWAP", "state": "partially_filled",
+        "sz": "2", "accFillSz": "1", "fillSz": "1", "fillPx": "10", "avgPx": "", "side": "buy", "uTime": "7",
+    })
+    assert (o.status, o.side, o.filled_qty, o.avg_price) == (PARTIALLY_FILLED, "BUY", 1.0, 0.0)
+    assert len(new_client_order_id()) == 32
+
+
+def test_binance_stream_against_simulator():
+    async def run():
+        sim = ExchangeSimulator(SimConfig())
+        await sim.start()
+        env = sim.env()
+        tracker = OrderTracker()
+        stream = BinanceUserStream("k", tracker, base_url=sim.base_url, ws_url=env["OMNI_BINANCE_WS_URL"])
+        try:
+            stream.start()
+            await asyncio.wait_for(stream.connected.wait(), 2)
+            assert stream.listen_key in sim.listen_keys
+            rules = SymbolRulesIndex(lambda: fetch_exchange_info(sim.base_url))
+            async with AsyncBinanceOrderClient("k", "s", live=True, base_url=sim.base_url, rules=rules) as client:
+                cid = new_client_order_id()
+                tracker.track(cid, "binance", "BTCUSDT", "BUY", 0.01)
+                await client.place_order("BTCUSDT", "BUY", "MARKET", 0.01, extra_params={"newClientOrderId": cid})
+                state = await tracker.wait_filled(cid, timeout=2)
+                assert state.order_id and state.avg_price > 0 and len(state.fills) == 1
+        finally:
+            await stream.close()
+            await sim.stop()
+
+    asyncio.run(run())
+
+
+def test_okx_stream_feeds_leg_submitter():
+    async def run():
+        sim = ExchangeSimulator(SimConfig())
+        await sim.start()
+        tracker = OrderTracker()
+        stream = OkxUserStream("k", "s", "p", tracker, url=sim.env()["OMNI_OKX_WS_URL"] + "/ws/v5/private")
+        try:
+            stream.start()
+            await asyncio.wait_for(stream.connected.wait(), 2)
+            async with OkxConnector(live=True, base_url=sim.base_url) as client:
+                submitter = ConnectorLegSubmitter(client, tracker=tracker)
+                # 0.02 BTC is two 0.01 contracts, pushed back as accFillSz 2.
+                filled = await submitter.submit(Leg("okx", "BTCUSDT", "BUY", 0.02))
+                assert (filled.status, filled.filled_qty) == (LEG_FILLED, 0.02)
+                assert sim.orders[-1]["sz"] == "2"
+                # An IOC far from the mark is canceled without a fill.
+                missed = await submitter.submit(Leg("okx", "BTCUSDT", "BUY", 0.02, price=0.1))
+                assert (missed.status, missed.filled_qty) == (LEG_REJECTED, 0.0)
+        finally:
+            await stream.close()
+            await sim.stop()
+
+    asyncio.run(run())
+
+
+class ScriptedSocket:
+    def __init__(self, messages, sent):
+        self.messages = list(messages)
+        self.sent = sent
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def send(self, raw):
+        self.sent.append(raw)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.messages:
+            raise StopAsyncIteration
+        return self.messages.pop(0)
+
+
+def test_okx_stream_logs_in_and_reconciles_after_reconnect(monkeypatch):
+    real_sleep = asyncio.sleep
+
+    async def no_sleep(delay):
+        await real_sleep(0)
+
+    monkeypatch.setattr(asyncio, "sleep", no_sleep)
+    push = json.dumps({"arg": {"channel": "orders"}, "data": [{"clOrdId": "a", "ordId": "1", "state": "live"}]})
+    sessions = [
+        [json.dumps({"event": "login", "code": "0"}), push],
+        [json.dumps({"event": "error", "code": "60009", "msg": "Login failed."})],
+    ]
+    sent = []
+    reconciled = []
+
+    async def run():
+        tracker = OrderTracker()
+        stream = OkxUserStream(
+            "k", "s", "p", tracker, url="ws://x", ping_s=3600,
+            connect=lambda url: ScriptedSocket(sessions.pop(0) if sessions else [], sent),
+            on_reconnect=lambda open_orders: reconciled.append([s.client_order_id for s in open_orders]),
+        )
+        task = stream.start()
+        while stream.reconnects < 2:
+            await real_sleep(0)
+        await stream.close()
+        assert task.done()
+        return tracker
+
+    tracker = asyncio.run(run())
+    assert tracker.get("a").status == NEW
+    login = json.loads(sent[0])
+    assert login["op"] == "login" and set(login["args"][0]) == {"apiKey", "passphrase", "timestamp", "sign"}
+    assert json.loads(sent[1])["args"] == [{"channel": "orders", "instType": "SWAP"}]
+    assert reconciled[0] == ["a"]
@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from orders.binance import AsyncBinanceOrderClient
+from orders.symbol_rules import SymbolRulesIndex, fetch_exchange_info
+from orders.ws_api import BinanceWsApi, WsApiDisconnected, WsApiError, _rate_limit_headers
+from sim.exchange_server import ExchangeSimulator, SimConfig
+
+
+class SilentSocket:
+    """Accepts requests, never answers, and drops when ``drop`` is set."""
+
+    def __init__(self):
+        self.sent = []
+        self.drop = asyncio.Event()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def send(self, raw):
+        self.sent.append(raw)
+
+    async def close(self):
+        self.drop.set()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await self.drop.wait()
+        raise StopAsyncIteration
+
+
+def test_rate_limits_map_to_headers():
+    headers = _rate_limit_headers([
+        {"rateLimitType": "REQUEST_WEIGHT", "interval": "MINUTE", "intervalNum": 1, "count": 7},
+        {"rateLimitType": "ORDERS", "interval": "SECOND", "intervalNum": 10, "count": 2},
+    ])
+    assert headers == {"X-MBX-USED-WEIGHT-1M": "7", "X-MBX-ORDER-COUNT-10S": "2"}
+
+
+def test_signature_covers_sorted_params():
+    api = BinanceWsApi("key", "secret")
+    a = api.sign({"symbol": "BTCUSDT", "side": "BUY", "timestamp": 1})
+    b = api.sign({"timestamp": 1, "side": "BUY", "symbol": "BTCUSDT"})
+    assert a["signature"] == b["signature"] and a["apiKey"] == "key"
+
+
+def test_orders_go_over_websocket_and_fall_back_to_rest():
+    async def run():
+        sim = ExchangeSimulator(SimConfig())
+        await sim.start()
+        try:
+            rules = SymbolRulesIndex(lambda: fetch_exchange_info(sim.base_url))
+            ws_url = sim.env()["OMNI_BINANCE_WS_API_URL"]
+            async with AsyncBinanceOrderClient(
+                "k", "s", live=True, base_url=sim.base_url, rules=rules, use_ws=True, ws_url=ws_url
+            ) as client:
+                assert client.ws.connected
+                before = sim.requests
+                over_ws = await client.place_order("BTCUSDT", "BUY", "MARKET", 0.1)
+                assert sim.requests == before  # no HTTP request was made
+                with pytest.raises(WsApiError) as err:
+                    await client.ws.request("order.modify", {})
+                await client.ws.close()
+                over_rest = await client.place_order("ETHUSDT", "SELL", "MARKET", 0.1)
+                assert sim.requests == before + 1
+            return over_ws, over_rest, err.value, len(sim.orders)
+        finally:
+            await sim.stop()
+
+    over_ws, over_rest, err, placed = asyncio.run(run())
+    assert over_ws["status"] == "FILLED" and over_rest["status"] == "FILLED"
+    assert err.status == 400 and err.code == -1100
+    assert placed == 2
+
+
+def test_disconnect_fails_in_flight_requests_and_reconnects(monkeypatch):
+    sockets = []
+
+    def connect(url):
+        sockets.append(SilentSocket())
+        return sockets[-1]
+
+    real_sleep = asyncio.sleep
+    monkeypatch.setattr("orders.ws_api.asyncio.sleep", lambda delay: real_sleep(0))
+
+    async def run():
+        api = BinanceWsApi("k", "s", timeout_s=1, connect=connect)
+        assert await api.start()
+        pending = asyncio.create_task(api.request("order.place", {"symbol": "BTCUSDT"}))
+        while not sockets[0].sent:
+            await real_sleep(0)
+        sockets[0].drop.set()
+        with pytest.raises(WsApiDisconnected):
+            await pending
+        while not api.connected:
+            await real_sleep(0)
+        reconnects = api.reconnects
+        await api.close()
+        return reconnects
+
+    assert asyncio.run(run()) == 1
+    assert len(sockets) == 2
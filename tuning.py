@@ -8,14 +8,28 @@ import optuna
 from ray import tune
 import wandb
 
+from core.data.tick_store import TickStore
+from sim.backtest import BacktestConfig, Backtester
 
-def simulate_returns(params):
-    rng = np.random.default_rng(42)
-    return rng.normal(0, 1, 252)
+
+def backtest_returns(params, backtest=None):
+    """Per-period returns of the NetEdge backtest run with *params*.
+
+    *backtest* is the ``backtest`` section of the tuning config: the tick
+    ``store`` root, ``symbols`` (default: all in the store), the ``start`` /
+    ``end`` of the window and fixed ``config`` values that *params* override.
+    """
+    backtest = backtest or {}
+    store = TickStore(backtest.get("store", "data/store"))
+    symbols = list(backtest.get("symbols") or store.symbols())
+    config = BacktestConfig.from_params({**dict(backtest.get("config") or {}), **params})
+    result = Backtester(config).run_store(store, symbols, backtest.get("start"), backtest.get("end"))
+    return result.returns
 
 
 def sharpe_ratio(returns: np.ndarray) -> float:
-    return float(returns.mean() / returns.std())
+    std = returns.std()
+    return float(returns.mean() / std) if std > 0 else 0.0
 
 
 def max_drawdown(returns: np.ndarray) -> float:
@@ -25,8 +39,10 @@ def max_drawdown(returns: np.ndarray) -> float:
     return float(drawdown.min())
 
 
-def evaluate(params):
-    returns = simulate_returns(params)
+def evaluate(params, backtest=None):
+    returns = backtest_returns(params, backtest)
+    if returns.size == 0:
+        return 0.0, 0.0
     sr = sharpe_ratio(returns)
     mdd = max_drawdown(returns)
     return sr, mdd
@@ -38,7 +54,7 @@ def make_optuna_objective(cfg: DictConfig):
             name: trial.suggest_float(name, space.low, space.high)
             for name, space in cfg.search_space.items()
         }
-        sr, mdd = evaluate(params)
+        sr, mdd = evaluate(params, cfg.get("backtest"))
         trial.set_user_attr("max_dd", mdd)
         if abs(mdd) > cfg.constraint.max_dd:
             raise optuna.TrialPruned(f"MaxDD {mdd} exceeds {cfg.constraint.max_dd}")
@@ -61,7 +77,7 @@ def main(cfg: DictConfig) -> float:
         mdd = best_trial.user_attrs.get("max_dd", 0.0)
     else:
         def tune_objective(config):
-            sr, mdd = evaluate(config)
+            sr, mdd = evaluate(config, cfg.get("backtest"))
             tune.report(sharpe_oos=sr, max_dd=mdd)
 
         search_space = {
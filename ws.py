@@ -7,7 +7,9 @@ import asyncio
 import websockets
 from typing import Any, Dict
 
-WS_URL = "wss://contract-ws.mexc.com"
+from core.exchange import endpoints
+
+WS_URL = endpoints.MEXC_WS_URL
 
 async def connect_ws(params: Dict[str, Any] = {}) -> None:
     """